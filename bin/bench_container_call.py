@@ -0,0 +1,102 @@
+#!/usr/bin/env -S uv run --script
+
+# /// script
+# dependencies = ["cibuildwheel"]
+# [tool.uv.sources]
+# cibuildwheel = { path = "..", editable = true }
+# ///
+
+"""
+Measures the overhead of OCIContainer.call, and how fast it relays output.
+
+By default the commands run in a local bash that stands in for the container
+shell, which measures cibuildwheel's side of the protocol only. Pass --image
+to run them in a real container.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import subprocess
+import sys
+import time
+from typing import TYPE_CHECKING
+
+from cibuildwheel.oci_container import OCIContainer, OCIContainerEngineConfig, OCIPlatform
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from contextlib import AbstractContextManager
+
+
+@contextlib.contextmanager
+def local_shell() -> Iterator[OCIContainer]:
+    container = OCIContainer(image="local", oci_platform=OCIPlatform.native())
+    with subprocess.Popen(["bash"], stdin=subprocess.PIPE, stdout=subprocess.PIPE) as process:
+        assert process.stdin
+        assert process.stdout
+        container.process = process
+        container.bash_stdin = process.stdin
+        container.bash_stdout = process.stdout
+        yield container
+        process.stdin.close()
+
+
+@contextlib.contextmanager
+def stdout_to_devnull() -> Iterator[None]:
+    # the relayed output shouldn't be timed against the terminal
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+def bench(container: OCIContainer, calls: int, lines: int, size_mb: int) -> None:
+    with stdout_to_devnull():
+        start = time.perf_counter()
+        for _ in range(calls):
+            container.call(["true"], capture_output=True)
+        per_call = (time.perf_counter() - start) / calls
+
+        start = time.perf_counter()
+        container.call(["seq", "1", str(lines)])
+        lines_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        container.call(["sh", "-c", f"head -c {size_mb}M /dev/zero | tr '\\0' x"])
+        bytes_duration = time.perf_counter() - start
+
+    print(f"call overhead:     {per_call * 1000:.2f} ms per call ({calls} calls)")
+    print(f"line throughput:   {lines / lines_duration:,.0f} lines/s ({lines:,} lines)")
+    print(f"no-newline output: {size_mb / bytes_duration:,.1f} MB/s ({size_mb} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, allow_abbrev=False)
+    parser.add_argument("--image", help="run in this container image, instead of a local bash")
+    parser.add_argument("--engine", default="docker", choices=["docker", "podman"])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=500_000)
+    parser.add_argument("--size-mb", type=int, default=100)
+    args = parser.parse_args()
+
+    container_context: AbstractContextManager[OCIContainer]
+    if args.image:
+        container_context = OCIContainer(
+            image=args.image,
+            oci_platform=OCIPlatform.native(),
+            engine=OCIContainerEngineConfig(args.engine),
+        )
+    else:
+        container_context = local_shell()
+
+    with container_context as container:
+        bench(container, args.calls, args.lines, args.size_mb)
@@ -0,0 +1,124 @@
+#!/usr/bin/env -S uv run --script
+
+# /// script
+# dependencies = ["cibuildwheel"]
+# [tool.uv.sources]
+# cibuildwheel = { path = "..", editable = true }
+# ///
+
+"""
+Compares the time it takes to set up the virtual environments of a build,
+when each one is created by virtualenv, and when they're cloned from a
+template.
+
+Each identifier needs a build venv and a test venv, so `--identifiers N`
+sets up 2*N venvs per interpreter. Templates are made in a temporary cache,
+so the time to make the first one is included.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import cibuildwheel.venv
+from cibuildwheel.util.cmd import call
+from cibuildwheel.util.packaging import DependencyConstraints
+from cibuildwheel.venv import (
+    _ensure_virtualenv,
+    _parse_pip_constraint_for_virtualenv,
+    _virtualenv_command,
+    virtualenv,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@contextlib.contextmanager
+def stdout_to_devnull() -> Iterator[None]:
+    # virtualenv's output shouldn't be timed against the terminal
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+def python_version(python: Path) -> str:
+    return subprocess.run(
+        [python, "-c", "import sys; print('%d.%d' % sys.version_info[:2])"],
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout.strip()
+
+
+def bench(python: Path, venvs: int, pip_version: str | None) -> None:
+    python = python.resolve()
+    version = python_version(python)
+    # download virtualenv up front, into the real cache
+    _ensure_virtualenv(version)
+
+    with tempfile.TemporaryDirectory() as tmp, stdout_to_devnull():
+        tmp_path = Path(tmp)
+        if pip_version is None:
+            # the pip that cibuildwheel pins for this version of Python
+            constraints = DependencyConstraints.pinned().get_for_python_version(
+                version=version, tmp_dir=tmp_path
+            )
+            pip_version = _parse_pip_constraint_for_virtualenv(constraints)
+        cibuildwheel.venv.CIBW_CACHE_PATH = tmp_path / "cache"  # type: ignore[attr-defined]
+
+        command = _virtualenv_command(version, python, pip_version)
+        start = time.perf_counter()
+        for i in range(venvs):
+            call(*command, tmp_path / f"fresh-{i}")
+        fresh = (time.perf_counter() - start) / venvs
+
+        start = time.perf_counter()
+        for i in range(venvs):
+            virtualenv(
+                version,
+                python,
+                tmp_path / f"clone-{i}",
+                None,
+                use_uv=False,
+                pip_version=pip_version,
+            )
+        cloned = (time.perf_counter() - start) / venvs
+
+    print(f"{python} ({version}), {venvs} venvs:")
+    print(f"  virtualenv: {fresh * 1000:8.1f} ms per venv")
+    print(f"  template:   {cloned * 1000:8.1f} ms per venv (including the template)")
+    print(f"  per identifier: {fresh * 2:.2f}s -> {cloned * 2:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, allow_abbrev=False)
+    parser.add_argument(
+        "--python",
+        type=Path,
+        action="append",
+        help="interpreter to make venvs for, can be repeated (default: this one)",
+    )
+    parser.add_argument("--identifiers", type=int, default=5)
+    parser.add_argument(
+        "--pip-version", help="default: the version in cibuildwheel's pinned constraints"
+    )
+    args = parser.parse_args()
+
+    for python in args.python or [Path(sys.executable)]:
+        bench(python, 2 * args.identifiers, args.pip_version)
@@ -91,6 +91,20 @@
     maximum: 3
     default: 0
     description: Increase/decrease the output of pip wheel.
+  compiler-cache:
+    default: none
+    description: Cache compiler output with ccache or sccache, between builds and runs
+    oneOf:
+      - enum: [none, ccache, sccache]
+      - type: string
+        pattern: '^(none|ccache|sccache); ?max-size:'
+      - type: object
+        additionalProperties: false
+        properties:
+          tool:
+            enum: [none, ccache, sccache]
+          max-size:
+            type: string
   config-settings:
     description: Specify config-settings for the build backend.
     type: string_table_array
@@ -98,9 +112,9 @@
     oneOf:
       - enum: [docker, podman]
       - type: string
-        pattern: '^docker; ?(create_args|disable_host_mount):'
+        pattern: '^docker; ?(create_args|disable_host_mount|mount_project|mount_cache|pool_ttl):'
       - type: string
-        pattern: '^podman; ?(create_args|disable_host_mount):'
+        pattern: '^podman; ?(create_args|disable_host_mount|mount_project|mount_cache|pool_ttl):'
       - type: object
         additionalProperties: false
         required: [name]
@@ -113,6 +127,46 @@
               type: string
           disable-host-mount:
             type: boolean
+          mount-project:
+            type: boolean
+          mount-cache:
+            type: boolean
+          pool-ttl:
+            type: integer
+            minimum: 0
+  project-sync:
+    default: copy
+    description: How the project is copied into Linux build containers
+    oneOf:
+      - enum: [copy, incremental]
+      - type: string
+        pattern: '^(copy|incremental); ?exclude:'
+      - type: object
+        additionalProperties: false
+        properties:
+          mode:
+            enum: [copy, incremental]
+          exclude:
+            type: array
+            items:
+              type: string
+  before-all-snapshot:
+    default: false
+    description: Save Linux build containers as images after before-all, and start from them next time
+    oneOf:
+      - type: boolean
+      - enum: ["true", "false"]
+      - type: string
+        pattern: '^(true|false); ?files:'
+      - type: object
+        additionalProperties: false
+        properties:
+          enabled:
+            type: boolean
+          files:
+            type: array
+            items:
+              type: string
   dependency-versions:
     default: pinned
     description: Specify how cibuildwheel controls the versions of the tools it uses
@@ -205,6 +259,9 @@
   xbuild-files:
     description: Platform-specific files in the build environment
     type: string_table_array
+  post-build-command:
+    description: Execute a shell command on each wheel once it's in the output directory, in the background.
+    type: string_array
   pyodide-version:
     type: string
     description: Specify the version of Pyodide to use
@@ -326,11 +383,15 @@
         xbuild-tools: {"$ref": "#/$defs/inherit"}
         xbuild-files: {"$ref": "#/$defs/inherit"}
         before-test: {"$ref": "#/$defs/inherit"}
+        compiler-cache: {"$ref": "#/$defs/inherit"}
         config-settings: {"$ref": "#/$defs/inherit"}
         container-engine: {"$ref": "#/$defs/inherit"}
+        project-sync: {"$ref": "#/$defs/inherit"}
+        before-all-snapshot: {"$ref": "#/$defs/inherit"}
         environment: {"$ref": "#/$defs/inherit"}
         environment-pass: {"$ref": "#/$defs/inherit"}
         repair-wheel-command: {"$ref": "#/$defs/inherit"}
+        post-build-command: {"$ref": "#/$defs/inherit"}
         test-command: {"$ref": "#/$defs/inherit"}
         test-extras: {"$ref": "#/$defs/inherit"}
         test-sources: {"$ref": "#/$defs/inherit"}
@@ -358,6 +419,8 @@
 
 del not_linux["environment-pass"]
 del not_linux["container-engine"]
+del not_linux["project-sync"]
+del not_linux["before-all-snapshot"]
 for key in list(not_linux):
     if "linux-" in key:
         del not_linux[key]
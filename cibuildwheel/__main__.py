@@ -6,18 +6,24 @@
     "cibuildwheel._compat.tarfile",
     "cibuildwheel.architecture",
     "cibuildwheel.ci",
+    "cibuildwheel.incremental",
     "cibuildwheel.logger",
     "cibuildwheel.options",
     "cibuildwheel.platforms",
+    "cibuildwheel.post_build",
+    "cibuildwheel.prefetch",
     "cibuildwheel.selector",
+    "cibuildwheel.sharding",
     "cibuildwheel.typing",
     "cibuildwheel.util",
     "cibuildwheel.util.file",
     "cibuildwheel.util.helpers",
     "cibuildwheel.util.resources",
+    "cibuildwheel.wheel_cache",
     "contextlib",
     "functools",
     "io",
+    "json",
     "pathlib",
     "shutil",
     "tempfile",
@@ -30,6 +36,7 @@
 import dataclasses
 import functools
 import io
+import json
 import os
 import shutil
 import sys
@@ -44,14 +51,26 @@
 from cibuildwheel._compat.tarfile import TarFile, safe_extractall
 from cibuildwheel.architecture import Architecture, allowed_architectures_check
 from cibuildwheel.ci import CIProvider, detect_ci_provider, fix_ansi_codes_for_github_actions
+from cibuildwheel.incremental import Checkpoint, IncrementalBuilds, build_fingerprints
 from cibuildwheel.logger import log
 from cibuildwheel.options import CommandLineArguments, Options, compute_options
 from cibuildwheel.platforms import ALL_PLATFORM_MODULES, get_build_identifiers, native_platform
+from cibuildwheel.post_build import post_build_queue
+from cibuildwheel.prefetch import plan_artifacts, prefetch_artifacts
 from cibuildwheel.selector import BuildSelector, EnableGroup, selector_matches
+from cibuildwheel.sharding import (
+    ShardSpec,
+    identifier_groups,
+    plan_shards,
+    plan_summary,
+    read_durations,
+    record_durations,
+)
 from cibuildwheel.typing import PLATFORMS, PlatformName
 from cibuildwheel.util.file import CIBW_CACHE_PATH, ensure_cache_sentinel
 from cibuildwheel.util.helpers import strtobool
 from cibuildwheel.util.resources import read_all_configs
+from cibuildwheel.wheel_cache import WheelCache, describe_wheel_cache
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
@@ -158,6 +177,41 @@ def main_inner(global_options: GlobalOptions) -> None:
         """,
     )
 
+    parser.add_argument(
+        "--shard",
+        default=os.environ.get("CIBW_SHARD") or None,
+        metavar="INDEX/COUNT",
+        help="""
+            Only build one of COUNT shards of the selected identifiers, e.g.
+            2/3, to split the builds between CI nodes. Identifiers that share
+            a container on Linux are kept together where possible. Overrides
+            CIBW_SHARD.
+        """,
+    )
+
+    parser.add_argument(
+        "--shard-durations",
+        type=Path,
+        default=Path(d) if (d := os.environ.get("CIBW_SHARD_DURATIONS")) else None,
+        metavar="FILE",
+        help="""
+            A JSON file of build durations by identifier, or the output of
+            --plan, used to balance the shards. Every node must be given the
+            same file. Overrides CIBW_SHARD_DURATIONS.
+        """,
+    )
+
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="""
+            Print how the identifiers would be split into shards, as JSON, then
+            exit. Needs --shard for the number of shards. Unless
+            --shard-durations is given, the durations of the builds that ran
+            on this machine are used.
+        """,
+    )
+
     parser.add_argument(
         "--output-dir",
         type=Path,
@@ -210,6 +264,61 @@ def main_inner(global_options: GlobalOptions) -> None:
         help="Do not report an error code if the build does not match any wheels.",
     )
 
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="""
+            Number of builds to run at the same time. On Linux, the jobs are
+            shared between containers, and then between the Python versions
+            built in each container. Default: 1.
+        """,
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="""
+            Skip the builds whose wheel is already in the output directory,
+            built by an earlier run from the same sources and options.
+        """,
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="""
+            Carry on from where the last run for this platform and output
+            directory failed, skipping the builds that it completed, as long
+            as their wheels are still in the output directory.
+        """,
+    )
+
+    parser.add_argument(
+        "--wheel-cache",
+        default=None,
+        metavar="LOCATION",
+        help="""
+            A directory or an HTTP URL to restore wheels from, and to store
+            the wheels built into, shared between runs and CI jobs. Overrides
+            CIBW_WHEEL_CACHE.
+        """,
+    )
+
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Print the hits and the bytes saved by the wheel cache, then exit.",
+    )
+
+    parser.add_argument(
+        "--pipeline-tests",
+        action="store_true",
+        help="""
+            Test each wheel in the background, while the next one builds.
+            Test failures are reported once the test has finished.
+        """,
+    )
+
     parser.add_argument(
         "--debug-traceback",
         action="store_true",
@@ -361,11 +470,46 @@ def build_in_directory(args: CommandLineArguments) -> None:
         architectures=options.globals.architectures,
     )
 
+    shard_note = None
+    empty_shard = False
+    if args.plan and not args.shard:
+        msg = "--plan needs --shard, for the number of shards"
+        raise errors.ConfigurationError(msg)
+    if args.shard:
+        shard = ShardSpec.from_string(args.shard)
+        if args.shard_durations is not None:
+            durations = read_durations(args.shard_durations)
+        elif args.plan:
+            # other nodes don't have this history, so it's only for a preview
+            durations = read_durations()
+        else:
+            durations = {}
+        groups = identifier_groups(options=options, platform=platform, identifiers=identifiers)
+        shards = plan_shards(groups, durations, shard.count)
+        if args.plan:
+            print(json.dumps(plan_summary(shards, durations), indent=2))
+            sys.exit(0)
+        shard_identifiers = shards[shard.index - 1].identifiers
+        options.skip_identifiers(i for i in identifiers if i not in shard_identifiers)
+        shard_note = (
+            f"Building shard {shard}, {len(shard_identifiers)} of {len(identifiers)} wheels"
+        )
+        # with more shards than builds, some shards are left empty
+        empty_shard = bool(identifiers) and not shard_identifiers
+        identifiers = shard_identifiers
+
     if args.print_build_identifiers:
         for identifier in identifiers:
             print(identifier)
         sys.exit(0)
 
+    if args.cache_stats:
+        if options.globals.wheel_cache is None:
+            msg = "--cache-stats needs a wheel cache, set with --wheel-cache or CIBW_WHEEL_CACHE"
+            raise errors.ConfigurationError(msg)
+        print(describe_wheel_cache(options.globals.wheel_cache))
+        sys.exit(0)
+
     # Add CIBUILDWHEEL environment variable
     os.environ["CIBUILDWHEEL"] = "1"
 
@@ -379,14 +523,64 @@ def build_in_directory(args: CommandLineArguments) -> None:
     CIBW_CACHE_PATH.mkdir(parents=True, exist_ok=True)
     ensure_cache_sentinel(CIBW_CACHE_PATH)
 
+    checkpoint = Checkpoint(options.globals.output_dir, platform=platform, resume=args.resume)
+    skipped = {
+        identifier: f"{wheel} was built before the last run failed"
+        for identifier, wheel in checkpoint.completed(identifiers).items()
+    }
+    wheel_cache_config = options.globals.wheel_cache
+    incremental_builds = None
+    wheel_cache = None
+    if (options.globals.incremental or wheel_cache_config) and identifiers:
+        fingerprints = build_fingerprints(options, identifiers)
+        if options.globals.incremental:
+            incremental_builds = IncrementalBuilds(options.globals.output_dir, fingerprints)
+            skipped |= {
+                identifier: f"{wheel} is up to date"
+                for identifier, wheel in incremental_builds.up_to_date().items()
+                if identifier not in skipped
+            }
+        if wheel_cache_config:
+            wheel_cache = WheelCache(wheel_cache_config, fingerprints)
+            restored = wheel_cache.restore(
+                [i for i in identifiers if i not in skipped], options.globals.output_dir
+            )
+            if incremental_builds is not None:
+                incremental_builds.record_wheels(restored)
+            skipped |= {
+                identifier: f"restored {wheel.name} from the wheel cache"
+                for identifier, wheel in restored.items()
+            }
+
+    # must happen before the options are printed, which computes them
+    if skipped:
+        options.skip_identifiers(skipped)
+        identifiers = [i for i in identifiers if i not in skipped]
+
     print_preamble(platform=platform, options=options, identifiers=identifiers)
 
+    if shard_note:
+        print(f"info: {shard_note}")
+    for identifier, reason in skipped.items():
+        print(f"info: Skipping {identifier}, {reason}")
+
     try:
         options.check_for_invalid_configuration(identifiers)
         allowed_architectures_check(platform, options.globals.architectures)
     except ValueError as err:
         raise errors.DeprecationError(*err.args) from err
 
+    if not identifiers and skipped:
+        if wheel_cache is not None:
+            wheel_cache.finish()
+        checkpoint.clear()
+        print("\ncibuildwheel: all wheels are up to date")
+        return
+
+    if empty_shard:
+        print("\ncibuildwheel: nothing to build in this shard, there are more shards than builds")
+        return
+
     if not identifiers:
         message = f"No build identifiers selected: {options.globals.build_selector}"
         if options.globals.allow_empty:
@@ -398,10 +592,31 @@ def build_in_directory(args: CommandLineArguments) -> None:
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    # fetch the interpreters and tools that the builds will need all at
+    # once, rather than one at a time as each build gets to them
+    prefetch_artifacts(plan_artifacts(platform_module, identifiers))
+
     tmp_path = Path(mkdtemp(prefix="cibw-run-")).resolve(strict=True)
     try:
-        with log.print_summary(options=options):
-            platform_module.build(options, tmp_path)
+        with log.print_summary(options=options), contextlib.ExitStack() as stack:
+            if any(options.build_options(i).post_build_command for i in identifiers):
+                stack.enter_context(post_build_queue(jobs=options.globals.jobs))
+            try:
+                platform_module.build(options, tmp_path)
+            except BaseException:
+                checkpoint.record(log.summary)
+                raise
+            else:
+                checkpoint.clear()
+            finally:
+                # also record the wheels built before a failure, so that the
+                # next run can carry on from there
+                record_durations(log.summary)
+                if incremental_builds is not None:
+                    incremental_builds.record(log.summary)
+                if wheel_cache is not None:
+                    wheel_cache.save(log.summary)
+                    wheel_cache.finish()
     finally:
         # avoid https://github.com/python/cpython/issues/86962 by performing
         # cleanup manually
@@ -45,11 +45,34 @@ def safe_extractall(tar: tarfile.TarFile, path: Path) -> None:  # pragma: no cov
         """
         base = path.resolve()
         for member in tar.getmembers():
-            _validate_safe_member(member, base)
+            validate_safe_member(member, base)
         tar.extractall(path)
 
 
-def _validate_safe_member(member: tarfile.TarInfo, base: Path) -> None:
+if sys.version_info >= (3, 11, 5):
+
+    def safe_extract(
+        tar: tarfile.TarFile, member: tarfile.TarInfo, path: Path
+    ) -> None:  # pragma: no cover
+        """Extract ``member`` of ``tar`` into ``path`` via the PEP 706 ``data`` filter."""
+        tar.extract(member, path, filter="data")
+
+else:
+
+    def safe_extract(
+        tar: tarfile.TarFile, member: tarfile.TarInfo, path: Path
+    ) -> None:  # pragma: no cover
+        """Validate ``member`` of ``tar`` as ``safe_extractall`` does, then extract it into ``path``.
+
+        Unlike ``safe_extractall``, this works on streamed archives, one member at a time.
+
+        """
+        validate_safe_member(member, path.resolve())
+        tar.extract(member, path)
+
+
+def validate_safe_member(member: tarfile.TarInfo, base: Path) -> None:
+    """Raise ``tarfile.TarError`` if extracting ``member`` into ``base`` (resolved) could write outside it."""
     if member.ischr() or member.isblk() or member.isfifo():
         msg = f"refusing to extract special device file {member.name!r}"
         raise tarfile.TarError(msg)
@@ -67,5 +90,7 @@ def _validate_safe_member(member: tarfile.TarInfo, base: Path) -> None:
 
 __all__ = [
     "TarFile",
+    "safe_extract",
     "safe_extractall",
+    "validate_safe_member",
 ]
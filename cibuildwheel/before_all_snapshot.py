@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+__lazy_modules__ = {
+    "cibuildwheel.util",
+    "cibuildwheel.util.helpers",
+    "hashlib",
+    "json",
+}
+
+import dataclasses
+import hashlib
+import json
+
+from cibuildwheel.util.helpers import parse_key_value_string, strtobool
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from pathlib import Path
+    from typing import Self
+
+# the repository that snapshot images are committed to, tagged with their hash
+SNAPSHOT_REPOSITORY = "cibuildwheel-before-all"
+# set on snapshot images, so that they're easy to find and remove
+SNAPSHOT_LABEL = "cibuildwheel.before-all-snapshot"
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class BeforeAllSnapshotConfig:
+    enabled: bool = False
+    files: tuple[str, ...] = ()
+
+    @classmethod
+    def from_config_string(cls, config_string: str) -> Self:
+        config_dict = parse_key_value_string(config_string, ["enabled"], ["files"])
+        enabled_options = config_dict.get("enabled") or []
+        return cls(
+            enabled=strtobool(enabled_options[-1]) if enabled_options else False,
+            files=tuple(config_dict.get("files") or []),
+        )
+
+    def options_summary(self) -> str | dict[str, str]:
+        if not self.files:
+            return str(self.enabled).lower()
+        return {"enabled": str(self.enabled).lower(), "files": repr(self.files)}
+
+
+def _matching_files(project_dir: Path, pattern: str) -> Iterator[Path]:
+    for path in project_dir.glob(pattern):
+        if path.is_dir():
+            yield from (p for p in path.rglob("*") if p.is_file())
+        elif path.is_file():
+            yield path
+
+
+def snapshot_tag(
+    *,
+    base_image_id: str,
+    oci_platform: str,
+    setup_key: str,
+    project_dir: Path,
+    files: Sequence[str],
+) -> str:
+    """
+    The image tag of the snapshot taken after before_all, for the base image
+    `base_image_id`. It changes when the setup (before_all and environment,
+    as described by `setup_key`) or the contents of the project files that
+    match `files` change.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps([base_image_id, oci_platform, setup_key]).encode("utf8"))
+    for pattern in files:
+        hasher.update(f"\0pattern:{pattern}".encode())
+        for path in sorted(set(_matching_files(project_dir, pattern))):
+            hasher.update(f"\0{path.relative_to(project_dir).as_posix()}\0".encode())
+            with path.open("rb") as f:
+                hasher.update(hashlib.file_digest(f, "sha256").digest())
+    return f"{SNAPSHOT_REPOSITORY}:{hasher.hexdigest()[:32]}"
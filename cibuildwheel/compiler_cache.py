@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+__lazy_modules__ = {
+    "cibuildwheel.util",
+    "cibuildwheel.util.cmd",
+    "cibuildwheel.util.file",
+    "cibuildwheel.util.helpers",
+    "json",
+    "shutil",
+    "subprocess",
+}
+
+import dataclasses
+import json
+import shutil
+import subprocess
+import typing
+from typing import Literal, assert_never
+
+from cibuildwheel import errors
+from cibuildwheel.util.cmd import call
+from cibuildwheel.util.file import CIBW_CACHE_PATH
+from cibuildwheel.util.helpers import parse_key_value_string
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+    from pathlib import Path, PurePath
+    from typing import Self
+
+CompilerCacheTool = Literal["ccache", "sccache"]
+
+# the counters of `ccache --print-stats`. ccache 3.7 uses different names
+# from ccache 4, and both are still found in build images.
+CCACHE_HIT_COUNTERS = frozenset(
+    {"direct_cache_hit", "preprocessed_cache_hit", "cache_hit_direct", "cache_hit_preprocessed"}
+)
+CCACHE_MISS_COUNTERS = frozenset({"cache_miss"})
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class CompilerCacheConfig:
+    tool: CompilerCacheTool | None = None
+    max_size: str | None = None
+
+    @classmethod
+    def from_config_string(cls, config_string: str) -> Self:
+        config_dict = parse_key_value_string(config_string, ["tool"], ["max-size", "max_size"])
+        tool = " ".join(config_dict.get("tool") or ["none"])
+        if tool not in {"none", "ccache", "sccache"}:
+            msg = f"unknown compiler cache {tool!r}, expected 'ccache', 'sccache' or 'none'"
+            raise ValueError(msg)
+        max_size_options = config_dict.get("max-size") or config_dict.get("max_size")
+        return cls(
+            tool=None if tool == "none" else typing.cast("CompilerCacheTool", tool),
+            max_size=max_size_options[-1] if max_size_options else None,
+        )
+
+    def options_summary(self) -> str | dict[str, str]:
+        if self.max_size is None:
+            return self.tool or "none"
+        return {"tool": self.tool or "none", "max-size": self.max_size}
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class CompilerCacheStats:
+    hits: int
+    misses: int
+
+    def __sub__(self, other: CompilerCacheStats) -> CompilerCacheStats:
+        return CompilerCacheStats(hits=self.hits - other.hits, misses=self.misses - other.misses)
+
+    def __str__(self) -> str:
+        total = self.hits + self.misses
+        if not total:
+            return "no compilations"
+        return f"{self.hits} hits, {self.misses} misses ({self.hits / total:.0%} hit rate)"
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class CompilerCache:
+    """A compiler cache tool that's ready to use, and where it keeps its cache."""
+
+    tool: CompilerCacheTool
+    tool_path: str
+    cache_dir: PurePath
+
+
+def compiler_cache_dir() -> Path:
+    """
+    The host directory that holds the caches of the compiler cache tools,
+    in a subdirectory named after each tool.
+    """
+    return CIBW_CACHE_PATH / "compiler-cache"
+
+
+def host_compiler_cache(tool: CompilerCacheTool) -> CompilerCache:
+    """
+    Find `tool` on this machine. Unlike in Linux containers, tools aren't
+    installed on the host, as that's the job of its package manager.
+    """
+    tool_path = shutil.which(tool)
+    if tool_path is None:
+        msg = (
+            f"compiler-cache is set to {tool!r}, but {tool} wasn't found on PATH. Install it "
+            f"before running cibuildwheel, e.g. with `brew install {tool}`, "
+            f"`choco install {tool}`, or `pip install sccache` for sccache."
+        )
+        raise errors.ConfigurationError(msg)
+    return CompilerCache(tool=tool, tool_path=tool_path, cache_dir=compiler_cache_dir() / tool)
+
+
+def compiler_cache_environment(
+    cache: CompilerCache,
+    *,
+    config: CompilerCacheConfig,
+    base_dir: PurePath,
+    env: Mapping[str, str],
+    compilers: tuple[str, str] | None,
+) -> dict[str, str]:
+    """
+    Returns `env`, with the variables that make builds go through `cache`.
+    CMake picks the tool up as a compiler launcher. Other build systems use
+    it through CC and CXX, when `compilers` names the C and C++ compilers
+    to wrap. Variables that are already set in `env` are left alone.
+    """
+    new_env = dict(env)
+    match cache.tool:
+        case "ccache":
+            new_env.setdefault("CCACHE_DIR", str(cache.cache_dir))
+            # lets builds of the project in different directories share
+            # their results, e.g. parallel builds in a Linux container
+            new_env.setdefault("CCACHE_BASEDIR", str(base_dir))
+            new_env.setdefault("CCACHE_NOHASHDIR", "1")
+            if config.max_size:
+                new_env.setdefault("CCACHE_MAXSIZE", config.max_size)
+        case "sccache":
+            new_env.setdefault("SCCACHE_DIR", str(cache.cache_dir))
+            if config.max_size:
+                new_env.setdefault("SCCACHE_CACHE_SIZE", config.max_size)
+        case _:
+            assert_never(cache.tool)
+
+    new_env.setdefault("CMAKE_C_COMPILER_LAUNCHER", cache.tool_path)
+    new_env.setdefault("CMAKE_CXX_COMPILER_LAUNCHER", cache.tool_path)
+    if compilers is not None:
+        cc, cxx = compilers
+        new_env.setdefault("CC", f"{cache.tool_path} {cc}")
+        new_env.setdefault("CXX", f"{cache.tool_path} {cxx}")
+    return new_env
+
+
+def parse_stats(tool: CompilerCacheTool, output: str) -> CompilerCacheStats:
+    """
+    Parse the output of the command from `stats_command`.
+    """
+    match tool:
+        case "ccache":
+            hits = misses = 0
+            for line in output.splitlines():
+                name, _, value = line.partition("\t")
+                if name in CCACHE_HIT_COUNTERS:
+                    hits += int(value)
+                elif name in CCACHE_MISS_COUNTERS:
+                    misses += int(value)
+            return CompilerCacheStats(hits=hits, misses=misses)
+        case "sccache":
+            stats = json.loads(output)["stats"]
+            return CompilerCacheStats(
+                hits=sum(stats["cache_hits"]["counts"].values()),
+                misses=sum(stats["cache_misses"]["counts"].values()),
+            )
+        case _:
+            assert_never(tool)
+
+
+def stats_command(tool: CompilerCacheTool, tool_path: str) -> list[str]:
+    match tool:
+        case "ccache":
+            return [tool_path, "--print-stats"]
+        case "sccache":
+            return [tool_path, "--show-stats", "--stats-format=json"]
+        case _:
+            assert_never(tool)
+
+
+def read_stats(cache: CompilerCache, run: Callable[[list[str]], str]) -> CompilerCacheStats | None:
+    """
+    Read the counters of `cache`, using `run` to run a command and capture
+    its output. Returns None if they can't be read, as the stats are only
+    informative.
+    """
+    try:
+        return parse_stats(cache.tool, run(stats_command(cache.tool, cache.tool_path)))
+    except (OSError, subprocess.CalledProcessError, ValueError, KeyError, AttributeError):
+        return None
+
+
+def read_host_stats(cache: CompilerCache, env: Mapping[str, str]) -> CompilerCacheStats | None:
+    return read_stats(cache, lambda args: call(*args, env=env, capture_stdout=True))
+
+
+def describe_stats_change(
+    before: CompilerCacheStats | None, after: CompilerCacheStats | None
+) -> str | None:
+    """
+    Describe the compilations between two readings of the stats. When
+    builds run in parallel, this includes their compilations too.
+    """
+    if before is None or after is None:
+        return None
+    return str(after - before)
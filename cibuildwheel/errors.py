@@ -127,3 +127,9 @@ def __init__(self) -> None:
         )
         super().__init__(message)
         self.return_code = 10
+
+
+class PostBuildCommandError(FatalError):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+        self.return_code = 11
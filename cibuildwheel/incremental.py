@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+__lazy_modules__ = {
+    "cibuildwheel.options",
+    "cibuildwheel.project_sync",
+    "cibuildwheel.util",
+    "cibuildwheel.util.file",
+    "hashlib",
+    "json",
+    "subprocess",
+    "tempfile",
+}
+
+import dataclasses
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+import cibuildwheel
+from cibuildwheel.options import Options
+from cibuildwheel.project_sync import build_manifest, list_project_files, project_exclude
+from cibuildwheel.util.file import CIBW_CACHE_PATH
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from cibuildwheel.logger import BuildInfo
+
+# build options that don't change the wheel that's produced
+FINGERPRINT_IGNORED_OPTIONS = frozenset({"globals", "build_verbosity", "post_build_command"})
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class BuildRecord:
+    """
+    The wheel built for an identifier, and the fingerprint of its inputs,
+    which checkpoints don't record.
+    """
+
+    wheel: str
+    sha256: str
+    fingerprint: str | None = None
+
+
+def _git_version(project_dir: Path) -> str | None:
+    """
+    The commit and tag that the checkout at `project_dir` is on, which
+    tools like setuptools-scm build the version from.
+    """
+    try:
+        return subprocess.run(
+            ["git", "describe", "--tags", "--always", "--long"],
+            cwd=project_dir,
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def source_digest(project_dir: Path, exclude: Sequence[str] = ()) -> str:
+    """
+    A hash of the files of the project at `project_dir`. In a git checkout,
+    the files that git ignores are left out, like when the project is
+    copied into a container. The repository itself is left out too, as it
+    differs between clones, but the commit and tag that it's on are kept.
+    """
+    paths = list_project_files(project_dir, [*exclude, "/.git"])
+    manifest = build_manifest(project_dir, paths)
+    hasher = hashlib.sha256()
+    hasher.update(f"git:{_git_version(project_dir)}\0".encode())
+    for path, (_, _, digest) in sorted(manifest.items()):
+        hasher.update(f"{path}\0{digest}\0".encode())
+    return hasher.hexdigest()
+
+
+def build_fingerprint(*, options: Options, identifier: str, source_digest: str) -> str:
+    """
+    A hash of everything that goes into the wheel for `identifier`: the
+    project files, the build options, and the cibuildwheel version, which
+    pins the Python interpreters and the default container images.
+    """
+    build_options = options.build_options(identifier)
+    resolved_options = {
+        field.name: Options.option_summary_value(getattr(build_options, field.name))
+        for field in dataclasses.fields(build_options)
+        if field.name not in FINGERPRINT_IGNORED_OPTIONS
+    }
+    fingerprint_inputs = [
+        cibuildwheel.__version__,
+        options.platform,
+        identifier,
+        str(build_options.package_dir),
+        options.globals.test_selector(identifier),
+        resolved_options,
+        source_digest,
+    ]
+    return hashlib.sha256(json.dumps(fingerprint_inputs).encode("utf8")).hexdigest()
+
+
+def _output_dir_hash(output_dir: Path) -> str:
+    return hashlib.sha256(os.fsencode(output_dir.resolve())).hexdigest()[:16]
+
+
+def _records_path(output_dir: Path) -> Path:
+    return CIBW_CACHE_PATH / "incremental" / f"{_output_dir_hash(output_dir)}.json"
+
+
+def _checkpoint_path(output_dir: Path, platform: str) -> Path:
+    return CIBW_CACHE_PATH / "checkpoints" / f"{platform}-{_output_dir_hash(output_dir)}.json"
+
+
+def read_records(records_path: Path) -> dict[str, BuildRecord]:
+    try:
+        records = json.loads(records_path.read_text(encoding="utf8"))
+        return {identifier: BuildRecord(**record) for identifier, record in records.items()}
+    except (OSError, ValueError, TypeError):
+        return {}
+
+
+def write_records(records_path: Path, records: dict[str, BuildRecord]) -> None:
+    records_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=records_path.parent, suffix=".tmp", delete=False, encoding="utf8"
+    ) as records_file:
+        json.dump({k: dataclasses.asdict(v) for k, v in sorted(records.items())}, records_file)
+    Path(records_file.name).replace(records_path)
+
+
+def _file_sha256(path: Path) -> str | None:
+    try:
+        with path.open("rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    except OSError:
+        return None
+
+
+def build_fingerprints(options: Options, identifiers: Iterable[str]) -> dict[str, str]:
+    """
+    The fingerprints of the builds of `identifiers`, from the project in the
+    current directory. Work these out before anything is built, as builds
+    on the host can leave files in the project.
+    """
+    project_dir = Path.cwd()
+    exclude = project_exclude(
+        options.build_options(None).project_sync,
+        root=project_dir,
+        output_dir=options.globals.output_dir,
+    )
+    digest = source_digest(project_dir, exclude)
+    return {
+        identifier: build_fingerprint(options=options, identifier=identifier, source_digest=digest)
+        for identifier in identifiers
+    }
+
+
+class IncrementalBuilds:
+    """
+    Tracks the wheels built into an output directory across runs, so that
+    identifiers whose wheel is already up to date can be skipped.
+    """
+
+    def __init__(self, output_dir: Path, fingerprints: Mapping[str, str]) -> None:
+        self.output_dir = output_dir
+        self.fingerprints = fingerprints
+        self.records = read_records(_records_path(output_dir))
+
+    def up_to_date(self) -> dict[str, str]:
+        """
+        The identifiers whose wheel was built from the same inputs, and is
+        still in the output directory, mapped to the name of that wheel.
+        """
+        result = {}
+        for identifier, fingerprint in self.fingerprints.items():
+            record = self.records.get(identifier)
+            if record is None or record.fingerprint != fingerprint:
+                continue
+            if _file_sha256(self.output_dir / record.wheel) == record.sha256:
+                result[identifier] = record.wheel
+        return result
+
+    def record(self, builds: Iterable[BuildInfo]) -> None:
+        """
+        Save the fingerprints of the wheels produced by `builds`, including
+        the abi3 wheels that were reused rather than built again.
+        """
+        self.record_wheels(
+            {build.identifier: build.wheel for build in builds if build.wheel is not None}
+        )
+
+    def record_wheels(self, wheels: Mapping[str, Path]) -> None:
+        """
+        Save the fingerprints of `wheels`, which are in the output directory,
+        by identifier.
+        """
+        updated = False
+        for identifier, wheel in wheels.items():
+            fingerprint = self.fingerprints.get(identifier)
+            sha256 = _file_sha256(wheel)
+            if fingerprint is None or sha256 is None:
+                continue
+            self.records[identifier] = BuildRecord(
+                fingerprint=fingerprint, wheel=wheel.name, sha256=sha256
+            )
+            updated = True
+        if updated:
+            write_records(_records_path(self.output_dir), self.records)
+
+
+class Checkpoint:
+    """
+    The wheels built by a run, kept when the run fails, so that the next run
+    can resume from the failure with --resume. Unlike IncrementalBuilds,
+    this trusts that nothing else has changed since the failed run.
+    """
+
+    def __init__(self, output_dir: Path, *, platform: str, resume: bool) -> None:
+        self.output_dir = output_dir
+        self.path = _checkpoint_path(output_dir, platform)
+        self.records = read_records(self.path) if resume else {}
+
+    def completed(self, identifiers: Iterable[str]) -> dict[str, str]:
+        """
+        The identifiers among `identifiers` that were built before the
+        failure, and whose wheel is still in the output directory, unchanged,
+        mapped to the name of that wheel.
+        """
+        result = {}
+        for identifier in identifiers:
+            record = self.records.get(identifier)
+            if record is not None and _file_sha256(self.output_dir / record.wheel) == record.sha256:
+                result[identifier] = record.wheel
+        return result
+
+    def record(self, builds: Iterable[BuildInfo]) -> None:
+        """
+        Save the wheels produced or reused by `builds`, along with the ones
+        carried over from the run that's being resumed.
+        """
+        for build in builds:
+            if build.wheel is None:
+                continue
+            sha256 = _file_sha256(build.wheel)
+            if sha256 is not None:
+                self.records[build.identifier] = BuildRecord(wheel=build.wheel.name, sha256=sha256)
+        write_records(self.path, self.records)
+
+    def clear(self) -> None:
+        """Forget the checkpoint, once the run has succeeded."""
+        self.path.unlink(missing_ok=True)
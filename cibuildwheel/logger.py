@@ -22,11 +22,13 @@
 import re
 import sys
 import textwrap
+import threading
 import time
 from pathlib import Path
 
 import humanize
 
+from cibuildwheel import errors
 from cibuildwheel.ci import CIProvider, detect_ci_provider, filter_ansi_codes
 
 TYPE_CHECKING = False
@@ -106,6 +108,16 @@ class BuildInfo:
     identifier: str
     filename: Path | None
     duration: float
+    # how the compiler cache did during the build, if one was used
+    compiler_cache: str | None = None
+    # the wheel in the output directory that was reused instead of building
+    # one, when another identifier already built a compatible (abi3) wheel
+    reused_wheel: Path | None = None
+
+    @property
+    def wheel(self) -> Path | None:
+        """The wheel in the output directory for this identifier, if any."""
+        return self.filename or self.reused_wheel
 
     @functools.cached_property
     def size(self) -> str | None:
@@ -123,22 +135,58 @@ def sha256(self) -> str | None:
 
     def __str__(self) -> str:
         duration = humanize.naturaldelta(self.duration)
+        compiler_cache = f", compiler cache: {self.compiler_cache}" if self.compiler_cache else ""
         if self.filename:
-            return f"{self.identifier}: {self.filename.name} {self.size} in {duration}, SHA256={self.sha256}"
-        return f"{self.identifier}: {duration} (test only)"
+            return f"{self.identifier}: {self.filename.name} {self.size} in {duration}, SHA256={self.sha256}{compiler_cache}"
+        return f"{self.identifier}: {duration} (test only){compiler_cache}"
 
 
-class Logger:
-    fold_mode: Literal["azure", "github", "travis", "disabled"]
-    colors_enabled: bool
-    unicode_enabled: bool
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class PostBuildInfo:
+    identifier: str
+    wheel: Path
+    duration: float
+    # why the post-build-command failed, or None if it succeeded
+    error: str | None = None
+
+    def __str__(self) -> str:
+        duration = humanize.naturaldelta(self.duration)
+        if self.error:
+            return f"{self.identifier}: {self.wheel.name} failed in {duration}, {self.error}"
+        return f"{self.identifier}: {self.wheel.name} in {duration}"
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class ActiveBuild:
+    """A build in progress, handed from one thread to another."""
+
+    identifier: str
+    start_time: float
+
+
+class _BuildState(threading.local):
+    """
+    The parts of the Logger that track the build in progress. These are
+    per-thread, so that builds running concurrently keep their own timings
+    and fold groups.
+    """
+
     active_build_identifier: str | None = None
     build_start_time: float | None = None
     step_start_time: float | None = None
     active_fold_group_name: str | None = None
+
+
+class Logger:
+    fold_mode: Literal["azure", "github", "travis", "disabled"]
+    colors_enabled: bool
+    unicode_enabled: bool
     summary: list[BuildInfo]
+    post_build_summary: list[PostBuildInfo]
 
     def __init__(self) -> None:
+        self._state = _BuildState()
+
         if sys.platform == "win32" and hasattr(sys.stdout, "reconfigure"):
             # the encoding on Windows can be a 1-byte charmap, but all CIs
             # support utf8, so we hardcode that
@@ -170,6 +218,7 @@ def __init__(self) -> None:
                 self.colors_enabled = file_supports_color(sys.stdout)
 
         self.summary = []
+        self.post_build_summary = []
 
     def build_start(self, identifier: str) -> None:
         self.step_end()
@@ -180,46 +229,99 @@ def build_start(self, identifier: str) -> None:
         print(f"{description}")
         print()
 
-        self.build_start_time = time.time()
-        self.active_build_identifier = identifier
-
-    def build_end(self, filename: Path | None) -> None:
-        assert self.build_start_time is not None
-        assert self.active_build_identifier is not None
+        self._state.build_start_time = time.time()
+        self._state.active_build_identifier = identifier
+
+    def build_end(
+        self,
+        filename: Path | None,
+        *,
+        reused_wheel: Path | None = None,
+        compiler_cache: str | None = None,
+    ) -> None:
+        assert self._state.build_start_time is not None
+        assert self._state.active_build_identifier is not None
         self.step_end()
 
         c = self.colors
         s = self.symbols
-        duration = time.time() - self.build_start_time
+        duration = time.time() - self._state.build_start_time
         duration_str = humanize.naturaldelta(duration, minimum_unit="milliseconds")
 
         print()
-        print(f"{c.green}{s.done} {c.end}{self.active_build_identifier} finished in {duration_str}")
+        print(
+            f"{c.green}{s.done} {c.end}{self._state.active_build_identifier} finished in {duration_str}"
+        )
         self.summary.append(
-            BuildInfo(identifier=self.active_build_identifier, filename=filename, duration=duration)
+            BuildInfo(
+                identifier=self._state.active_build_identifier,
+                filename=filename,
+                duration=duration,
+                compiler_cache=compiler_cache,
+                reused_wheel=reused_wheel,
+            )
         )
 
-        self.build_start_time = None
-        self.active_build_identifier = None
+        self._state.build_start_time = None
+        self._state.active_build_identifier = None
+
+    def post_build_end(
+        self, *, identifier: str, wheel: Path, duration: float, error: str | None = None
+    ) -> None:
+        self.step_end(success=error is None)
+
+        c = self.colors
+        s = self.symbols
+        duration_str = humanize.naturaldelta(duration, minimum_unit="milliseconds")
+        status = f"{c.green}{s.done} {c.end}" if error is None else f"{c.red}{s.error} {c.end}"
+        outcome = "finished" if error is None else f"failed ({error})"
+
+        print()
+        print(f"{status}post-build-command for {identifier} {outcome} in {duration_str}")
+        self.post_build_summary.append(
+            PostBuildInfo(identifier=identifier, wheel=wheel, duration=duration, error=error)
+        )
+
+    def handoff_build(self) -> ActiveBuild:
+        """
+        Stop tracking the build in progress in this thread, so that another
+        thread can carry on with it, after calling `resume_build`.
+        """
+        assert self._state.build_start_time is not None
+        assert self._state.active_build_identifier is not None
+        self.step_end()
+
+        build = ActiveBuild(
+            identifier=self._state.active_build_identifier,
+            start_time=self._state.build_start_time,
+        )
+        self._state.build_start_time = None
+        self._state.active_build_identifier = None
+        return build
+
+    def resume_build(self, build: ActiveBuild) -> None:
+        self.step_end()
+        self._state.build_start_time = build.start_time
+        self._state.active_build_identifier = build.identifier
 
     def step(self, step_description: str) -> None:
         self.step_end()
-        self.step_start_time = time.time()
+        self._state.step_start_time = time.time()
         self._start_fold_group(step_description)
 
     def step_end(self, success: bool = True) -> None:
-        if self.step_start_time is not None:
+        if self._state.step_start_time is not None:
             self._end_fold_group()
             c = self.colors
             s = self.symbols
-            duration = time.time() - self.step_start_time
+            duration = time.time() - self._state.step_start_time
 
             if success:
                 print(f"{c.green}{s.done} {c.end}{duration:.2f}s".rjust(78))
             else:
                 print(f"{c.red}{s.error} {c.end}{duration:.2f}s".rjust(78))
 
-            self.step_start_time = None
+            self._state.step_start_time = None
 
     def step_end_with_error(self, error: BaseException | str) -> None:
         self.step_end(success=False)
@@ -268,31 +370,55 @@ def print_summary(self, *, options: Options) -> Generator[None, None, None]:
             print(" ", build_info)
         self._end_fold_group()
 
+        post_build_failures = [info for info in self.post_build_summary if info.error]
+        if self.post_build_summary:
+            n_post_builds = len(self.post_build_summary)
+            s = "s" if n_post_builds > 1 else ""
+            self._start_fold_group(
+                f"post-build-command ran on {n_post_builds} wheel{s}, "
+                f"{len(post_build_failures)} failed"
+            )
+            for post_build_info in self.post_build_summary:
+                print(" ", post_build_info)
+            self._end_fold_group()
+
         self.summary = []
+        self.post_build_summary = []
+
+        if post_build_failures:
+            identifiers = ", ".join(info.identifier for info in post_build_failures)
+            msg = f"post-build-command failed for {identifiers}"
+            raise errors.PostBuildCommandError(msg)
 
     @property
     def step_active(self) -> bool:
-        return self.step_start_time is not None
+        return self._state.step_start_time is not None
 
     def _start_fold_group(self, name: str) -> None:
         self._end_fold_group()
-        self.active_fold_group_name = name
+        self._state.active_fold_group_name = name
         fold_start_pattern = FOLD_PATTERNS.get(self.fold_mode, DEFAULT_FOLD_PATTERN)[0]
         identifier = self._fold_group_identifier(name)
 
-        print(fold_start_pattern.format(name=self.active_fold_group_name, identifier=identifier))
+        print(
+            fold_start_pattern.format(
+                name=self._state.active_fold_group_name, identifier=identifier
+            )
+        )
         print()
         sys.stdout.flush()
 
     def _end_fold_group(self) -> None:
-        if self.active_fold_group_name:
+        if self._state.active_fold_group_name:
             fold_start_pattern = FOLD_PATTERNS.get(self.fold_mode, DEFAULT_FOLD_PATTERN)[1]
-            identifier = self._fold_group_identifier(self.active_fold_group_name)
+            identifier = self._fold_group_identifier(self._state.active_fold_group_name)
             print(
-                fold_start_pattern.format(name=self.active_fold_group_name, identifier=identifier)
+                fold_start_pattern.format(
+                    name=self._state.active_fold_group_name, identifier=identifier
+                )
             )
             sys.stdout.flush()
-            self.active_fold_group_name = None
+            self._state.active_fold_group_name = None
 
     @staticmethod
     def _fold_group_identifier(name: str) -> str:
@@ -1,25 +1,42 @@
 from __future__ import annotations
 
 __lazy_modules__ = {
+    "cibuildwheel._compat",
+    "cibuildwheel._compat.tarfile",
     "cibuildwheel.ci",
     "cibuildwheel.errors",
     "cibuildwheel.logger",
     "cibuildwheel.util",
     "cibuildwheel.util.cmd",
+    "cibuildwheel.util.resources",
+    "cibuildwheel.util.concurrency",
     "cibuildwheel.util.helpers",
+    "concurrent",
+    "concurrent.futures",
     "contextlib",
+    "copy",
+    "filelock",
+    "gzip",
+    "hashlib",
+    "humanize",
     "io",
     "json",
     "platform",
     "shlex",
     "shutil",
     "subprocess",
+    "tarfile",
     "textwrap",
+    "time",
     "uuid",
+    "zlib",
 }
 
 import contextlib
+import copy
 import dataclasses
+import gzip
+import hashlib
 import io
 import json
 import os
@@ -28,25 +45,38 @@
 import shutil
 import subprocess
 import sys
+import tarfile
 import textwrap
+import threading
+import time
 import typing
 import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from pathlib import PurePosixPath
+from pathlib import Path, PurePosixPath
 from typing import Literal, assert_never
 
+import humanize
+from filelock import FileLock, Timeout
+
+from cibuildwheel._compat.tarfile import TarFile, safe_extract
 from cibuildwheel.ci import CIProvider, detect_ci_provider
-from cibuildwheel.errors import OCIEngineTooOldError
+from cibuildwheel.errors import FatalError, OCIEngineTooOldError
 from cibuildwheel.logger import log
+from cibuildwheel.util import resources
 from cibuildwheel.util.cmd import call
+from cibuildwheel.util.concurrency import output_is_captured
+from cibuildwheel.util.file import CIBW_CACHE_PATH
 from cibuildwheel.util.helpers import FlexibleVersion, parse_key_value_string, strtobool
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
-    from collections.abc import Mapping, Sequence
-    from pathlib import Path, PurePath
+    from collections.abc import Callable, Generator, Mapping, Sequence
+    from concurrent.futures import Future
+    from pathlib import PurePath
     from types import TracebackType
-    from typing import IO, Self
+    from typing import IO, Any, Self
 
     from cibuildwheel.typing import PathOrStr
 
@@ -92,13 +122,27 @@ class OCIContainerEngineConfig:
     _: dataclasses.KW_ONLY
     create_args: tuple[str, ...] = dataclasses.field(default_factory=tuple)
     disable_host_mount: bool = False
+    mount_project: bool = False
+    mount_cache: bool = False
+    pool_ttl: int = 0
 
     @classmethod
     def from_config_string(cls, config_string: str) -> Self:
         config_dict = parse_key_value_string(
             config_string,
             ["name"],
-            ["create_args", "create-args", "disable_host_mount", "disable-host-mount"],
+            [
+                "create_args",
+                "create-args",
+                "disable_host_mount",
+                "disable-host-mount",
+                "mount_project",
+                "mount-project",
+                "mount_cache",
+                "mount-cache",
+                "pool_ttl",
+                "pool-ttl",
+            ],
         )
         name = " ".join(config_dict["name"])
         if name not in {"docker", "podman"}:
@@ -114,6 +158,20 @@ def from_config_string(cls, config_string: str) -> Self:
         disable_host_mount = (
             strtobool(disable_host_mount_options[-1]) if disable_host_mount_options else False
         )
+        mount_project_options = (
+            config_dict.get("mount_project") or config_dict.get("mount-project") or []
+        )
+        mount_project = strtobool(mount_project_options[-1]) if mount_project_options else False
+        mount_cache_options = config_dict.get("mount_cache") or config_dict.get("mount-cache") or []
+        mount_cache = strtobool(mount_cache_options[-1]) if mount_cache_options else False
+        pool_ttl_options = config_dict.get("pool_ttl") or config_dict.get("pool-ttl") or []
+        try:
+            pool_ttl = int(pool_ttl_options[-1]) if pool_ttl_options else 0
+        except ValueError:
+            pool_ttl = -1
+        if pool_ttl < 0:
+            msg = f"invalid pool_ttl {pool_ttl_options[-1]!r}, must be a number of seconds"
+            raise ValueError(msg)
         if "--platform" in create_args or any(arg.startswith("--platform=") for arg in create_args):
             msg = "Using '--platform' in 'container-engine::create_args' is deprecated. It will be ignored."
             log.warning(msg)
@@ -124,21 +182,169 @@ def from_config_string(cls, config_string: str) -> Self:
             else:
                 create_args = [arg for arg in create_args if not arg.startswith("--platform=")]
 
-        return cls(name=name, create_args=tuple(create_args), disable_host_mount=disable_host_mount)
+        return cls(
+            name=name,
+            create_args=tuple(create_args),
+            disable_host_mount=disable_host_mount,
+            mount_project=mount_project,
+            mount_cache=mount_cache,
+            pool_ttl=pool_ttl,
+        )
 
     def options_summary(self) -> str | dict[str, str]:
-        if not self.create_args:
+        if (
+            not self.create_args
+            and not self.mount_project
+            and not self.mount_cache
+            and not self.pool_ttl
+        ):
             return self.name
         else:
             return {
                 "name": self.name,
                 "create_args": repr(self.create_args),
                 "disable_host_mount": str(self.disable_host_mount),
+                "mount_project": str(self.mount_project),
+                "mount_cache": str(self.mount_cache),
+                "pool_ttl": str(self.pool_ttl),
             }
 
 
 DEFAULT_ENGINE = OCIContainerEngineConfig("docker")
 
+# label set on the containers that are kept between runs
+POOL_LABEL = "cibuildwheel.pool"
+
+# where the project is mounted, when the engine's mount_project is set
+PROJECT_MOUNT_PATH = PurePosixPath("/cibuildwheel/project-mount")
+
+# where the download cache is mounted, when the engine's mount_cache is set
+CACHE_MOUNT_PATH = PurePosixPath("/cibuildwheel/cache")
+
+# where the compiler cache directory is mounted, when compiler-cache is set
+COMPILER_CACHE_MOUNT_PATH = PurePosixPath("/cibuildwheel/compiler-cache")
+
+
+def container_cache_dir(oci_platform: OCIPlatform) -> Path:
+    """
+    The host directory that holds the pip and uv caches of the containers
+    of `oci_platform`, when the engine's mount_cache is set.
+    """
+    return CIBW_CACHE_PATH / "container-cache" / oci_platform.value.replace("/", "-")
+
+
+# how long the results of engine and image probes are kept in the cache
+PROBE_CACHE_TTL = 24 * 60 * 60
+
+# results of the probes run by this process, shared between its containers
+_probe_results: dict[str, Any] = {}
+_probe_key_locks: dict[str, threading.Lock] = {}
+# images known to be available locally, by reference and platform
+_local_images: dict[str, str] = {}
+_probe_lock = threading.Lock()
+
+
+def _read_probe_cache() -> dict[str, Any]:
+    try:
+        cache = json.loads((CIBW_CACHE_PATH / "container-probes.json").read_text(encoding="utf8"))
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _write_probe_cache(key: str, entry: dict[str, Any]) -> None:
+    cache_path = CIBW_CACHE_PATH / "container-probes.json"
+    now = time.time()
+    cache = {
+        k: v
+        for k, v in _read_probe_cache().items()
+        if isinstance(v, dict) and now - v.get("time", 0) < PROBE_CACHE_TTL
+    }
+    cache[key] = entry
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # other cibuildwheel processes might be writing the cache at the same time
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_path.write_text(json.dumps(cache), encoding="utf8")
+    tmp_path.replace(cache_path)
+
+
+def _cached_probe(key: str, description: str, probe: Callable[[], Any]) -> Any:  # noqa: ANN401
+    """
+    Run `probe`, or reuse its result from earlier in this process, or from
+    the cache if it's no older than PROBE_CACHE_TTL. `key` must change
+    whenever the result could. Results are stored as JSON, so tuples come
+    back as lists. Probes that raise aren't cached.
+    """
+    with _probe_lock:
+        key_lock = _probe_key_locks.setdefault(key, threading.Lock())
+
+    # builds starting together wait for the first one's probe
+    with key_lock:
+        entry = _probe_results.get(key)
+        if entry is None:
+            cached = _read_probe_cache().get(key)
+            if (
+                isinstance(cached, dict)
+                and "result" in cached
+                and time.time() - cached.get("time", 0) < PROBE_CACHE_TTL
+            ):
+                entry = cached
+        if entry is not None:
+            print(f"info: Reused the result of {description}, saving {entry['duration']:.1f}s")
+            _probe_results[key] = entry
+            return entry["result"]
+
+        start = time.time()
+        result = probe()
+        entry = {"result": result, "duration": time.time() - start, "time": time.time()}
+        _probe_results[key] = entry
+        with contextlib.suppress(OSError):
+            _write_probe_cache(key, entry)
+        return result
+
+
+def _engine_server_id(engine: OCIContainerEngineConfig) -> str | None:
+    """
+    Something that changes whenever the engine's daemon could have been
+    upgraded, or None if there's no cheap way to tell. A daemon recreates
+    its socket when it starts, so the socket's inode and modification time
+    stand in for its version.
+    """
+    endpoint = engine_endpoint(engine)
+    if endpoint == "" and sys.platform.startswith("linux"):
+        # podman runs the containers itself, the client is the server
+        return "local"
+    if endpoint is None or not endpoint.startswith("unix://"):
+        return None
+    try:
+        socket_stat = Path(endpoint.removeprefix("unix://")).stat()
+    except OSError:
+        return None
+    return f"{endpoint}:{socket_stat.st_ino}:{socket_stat.st_mtime_ns}"
+
+
+def _check_engine_version_cached(engine: OCIContainerEngineConfig) -> None:
+    """
+    Check the engine version, once per engine client and daemon. The
+    client binary's size and modification time stand in for its version.
+    Daemons that can't be identified cheaply, e.g. remote ones, are checked
+    every time.
+    """
+    binary = shutil.which(engine.name)
+    server_id = _engine_server_id(engine)
+    if binary is None or server_id is None:
+        _check_engine_version(engine)
+        return
+
+    binary_stat = Path(binary).stat()
+    key = f"version:{binary}:{binary_stat.st_size}:{binary_stat.st_mtime_ns}:{server_id}"
+
+    def check() -> bool:
+        _check_engine_version(engine)
+        return True
+
+    _cached_probe(key, f"the {engine.name} version check", check)
+
 
 def _check_engine_version(engine: OCIContainerEngineConfig) -> None:
     try:
@@ -192,6 +398,52 @@ def _check_engine_version(engine: OCIContainerEngineConfig) -> None:
         raise OCIEngineTooOldError(msg) from e
 
 
+class _ContainerAgent:
+    """
+    A long-running python process in the container, that answers simple
+    queries and file operations over a JSON-lines channel, so that they
+    don't each need a new process. See resources/container_agent.py.
+    """
+
+    def __init__(self, process: subprocess.Popen[bytes]) -> None:
+        assert process.stdin
+        assert process.stdout
+        self.process = process
+        self._stdin = process.stdin
+        self._stdout = process.stdout
+        # shared by the container's exec sessions
+        self._lock = threading.Lock()
+
+    def request(self, op: str, *, cmd: Sequence[PathOrStr] = (), **kwargs: object) -> Any:  # noqa: ANN401
+        """
+        Run `op` in the agent and return its result. A failed operation
+        raises CalledProcessError, like the equivalent `cmd` would.
+        """
+        message = json.dumps({"op": op, **kwargs}) + "\n"
+        with self._lock:
+            self._stdin.write(message.encode("utf8"))
+            self._stdin.flush()
+            line = self._stdout.readline()
+        if not line:
+            msg = "The agent in the container exited unexpectedly"
+            raise OSError(msg)
+        response = json.loads(line)
+        if "error" in response:
+            raise subprocess.CalledProcessError(1, list(cmd) or [op], response["error"])
+        return response["result"]
+
+    def close(self) -> None:
+        with contextlib.suppress(OSError):
+            self._stdin.close()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        with contextlib.suppress(OSError):
+            self._stdout.close()
+
+
 class OCIContainer:
     """
     An object that represents a running OCI (e.g. Docker) container.
@@ -224,6 +476,8 @@ class OCIContainer:
     """
 
     UTILITY_PYTHON = "/opt/python/cp39-cp39/bin/python"
+    # size of the blocks read from the shell's output
+    READ_SIZE = 64 * 1024
 
     bash_stdin: IO[bytes]
     bash_stdout: IO[bytes]
@@ -235,6 +489,10 @@ def __init__(
         oci_platform: OCIPlatform,
         cwd: PathOrStr | None = None,
         engine: OCIContainerEngineConfig = DEFAULT_ENGINE,
+        setup_key: str = "",
+        project_dir: Path | None = None,
+        from_snapshot: bool = False,
+        compiler_cache_dir: Path | None = None,
     ):
         if not image:
             msg = "Must have a non-empty image to run."
@@ -245,10 +503,27 @@ def __init__(
         self.cwd = cwd
         self.name: str | None = None
         self.process: subprocess.Popen[bytes] | None = None
+        # output read from the shell, but not yet relayed
+        self._read_buffer = bytearray()
+        self._agent: _ContainerAgent | None = None
         self.engine = engine
-        self.host_tar_format = ""
-        if sys.platform.startswith("darwin"):
-            self.host_tar_format = "--format gnutar"
+        self.shell_args: list[str] = ["/bin/bash"]
+        # describes what the caller sets up in the container (e.g. before_all),
+        # so that pooled containers are only reused for the same setup
+        self.setup_key = setup_key
+        # true if the container's filesystem was left by a previous run, as
+        # a pooled container or an image committed from one
+        self.reused = from_snapshot
+        self._pool_lock: FileLock | None = None
+        self._pool_state_path: Path | None = None
+        # the host directory mounted at PROJECT_MOUNT_PATH, if any
+        self.project_mount: Path | None = project_dir if engine.mount_project else None
+        # the host directory mounted at CACHE_MOUNT_PATH, if any
+        self.cache_mount: Path | None = (
+            container_cache_dir(oci_platform) if engine.mount_cache else None
+        )
+        # the host directory mounted at COMPILER_CACHE_MOUNT_PATH, if any
+        self.compiler_cache_mount: Path | None = compiler_cache_dir
 
     def _get_platform_args(self, *, oci_platform: OCIPlatform | None = None) -> tuple[str, str]:
         if oci_platform is None:
@@ -256,35 +531,88 @@ def _get_platform_args(self, *, oci_platform: OCIPlatform | None = None) -> tupl
 
         # we need '--pull=always' otherwise some images with the wrong platform get reused (e.g. 386 image for amd64)
         # c.f. https://github.com/moby/moby/issues/48197#issuecomment-2282802313
-        pull = "always"
+        pull = "never" if self.local_image_id(oci_platform) else "always"
+        return f"--platform={oci_platform.value}", f"--pull={pull}"
+
+    def local_image_id(self, oci_platform: OCIPlatform) -> str | None:
+        """
+        The ID of the local image, if it's there for `oci_platform`. Found
+        images are remembered for the rest of the process, as builds don't
+        remove them, but missing ones are checked again, as the first
+        container to start pulls them.
+        """
+        key = f"image:{self.engine.name}:{self.image}:{oci_platform.value}"
+        with _probe_lock:
+            if key in _local_images:
+                return _local_images[key]
+
         try:
-            image_platform = call(
+            image_id, image_platform = call(
                 self.engine.name,
                 "image",
                 "inspect",
                 self.image,
                 "--format",
                 (
-                    "{{.Os}}/{{.Architecture}}/{{.Variant}}"
+                    "{{.Id}} {{.Os}}/{{.Architecture}}/{{.Variant}}"
                     if len(oci_platform.value.split("/")) == 3
-                    else "{{.Os}}/{{.Architecture}}"
+                    else "{{.Id}} {{.Os}}/{{.Architecture}}"
                 ),
                 capture_stdout=True,
+            ).split()
+        except (subprocess.CalledProcessError, ValueError):
+            return None
+        if image_platform != oci_platform.value:
+            return None
+
+        # in case the correct image is already present, don't pull
+        # this allows to run local only images
+        with _probe_lock:
+            _local_images[key] = image_id
+        return image_id
+
+    def _probe_32_bit(self, platform_args: tuple[str, str]) -> tuple[bool, tuple[str, str]]:
+        """
+        Find out whether the image needs `linux32` to report a 32-bit
+        machine. Returns that and the platform args to create it with.
+        """
+        # If the architecture running the image is already the right one
+        # or the image entrypoint takes care of enforcing this, then we don't need to
+        # simulate this
+        run_cmd = [self.engine.name, "run", "--rm"]
+        ctr_cmd = ["uname", "-m"]
+        try:
+            container_machine = call(
+                *run_cmd, *platform_args, self.image, *ctr_cmd, capture_stdout=True
             ).strip()
-            if image_platform == oci_platform.value:
-                # in case the correct image is already present, don't pull
-                # this allows to run local only images
-                pull = "never"
         except subprocess.CalledProcessError:
-            # silently fallback to "--pull=always"
-            pass
-        return f"--platform={oci_platform.value}", f"--pull={pull}"
+            if self.oci_platform == OCIPlatform.i386:
+                # The image might have been built with amd64 architecture
+                # Let's try that
+                platform_args = self._get_platform_args(oci_platform=OCIPlatform.AMD64)
+                container_machine = call(
+                    *run_cmd, *platform_args, self.image, *ctr_cmd, capture_stdout=True
+                ).strip()
+            else:
+                raise
+        simulate_32_bit = container_machine not in {"i686", "armv7l", "armv8l"}
+        if simulate_32_bit:
+            # sanity check to ensure no deadlock waiting for container to start
+            call(
+                *run_cmd,
+                *platform_args,
+                self.image,
+                "linux32",
+                "/bin/true",
+                capture_stdout=True,
+            )
+        return simulate_32_bit, platform_args
 
     def __enter__(self) -> Self:
         assert self.process is None
         self.name = f"cibuildwheel-{uuid.uuid4()}"
 
-        _check_engine_version(self.engine)
+        _check_engine_version_cached(self.engine)
 
         # work-around for Travis-CI PPC64le Docker runs since 2021:
         # this avoids network splits
@@ -296,40 +624,50 @@ def __enter__(self) -> Self:
 
         platform_args = self._get_platform_args()
 
+        if self.project_mount is not None and engine_is_remote(self.engine):
+            log.warning(
+                f"{self.engine.name} is running on another machine, so the project can't be "
+                "mounted in the container. It will be copied instead."
+            )
+            self.project_mount = None
+        if self.cache_mount is not None and engine_is_remote(self.engine):
+            log.warning(
+                f"{self.engine.name} is running on another machine, so the download cache "
+                "can't be mounted in the container."
+            )
+            self.cache_mount = None
+        if self.compiler_cache_mount is not None and engine_is_remote(self.engine):
+            log.warning(
+                f"{self.engine.name} is running on another machine, so the compiler cache "
+                "can't be mounted in the container. It will only be kept for this run."
+            )
+            self.compiler_cache_mount = None
+
+        if self.engine.pool_ttl:
+            reap_idle_pooled_containers(self.engine)
+            if self._start_pooled_container():
+                return self
+
         simulate_32_bit = False
         if self.oci_platform in {OCIPlatform.i386, OCIPlatform.ARMV7}:
-            # If the architecture running the image is already the right one
-            # or the image entrypoint takes care of enforcing this, then we don't need to
-            # simulate this
-            run_cmd = [self.engine.name, "run", "--rm"]
-            ctr_cmd = ["uname", "-m"]
-            try:
-                container_machine = call(
-                    *run_cmd, *platform_args, self.image, *ctr_cmd, capture_stdout=True
-                ).strip()
-            except subprocess.CalledProcessError:
-                if self.oci_platform == OCIPlatform.i386:
-                    # The image might have been built with amd64 architecture
-                    # Let's try that
-                    platform_args = self._get_platform_args(oci_platform=OCIPlatform.AMD64)
-                    container_machine = call(
-                        *run_cmd, *platform_args, self.image, *ctr_cmd, capture_stdout=True
-                    ).strip()
-                else:
-                    raise
-            if container_machine not in {"i686", "armv7l", "armv8l"}:
-                simulate_32_bit = True
-                # sanity check to ensure no deadlock waiting for container to start
-                call(
-                    *run_cmd,
-                    *platform_args,
-                    self.image,
-                    "linux32",
-                    "/bin/true",
-                    capture_stdout=True,
+            image_id = self.local_image_id(self.oci_platform)
+            if image_id is None:
+                simulate_32_bit, platform_args = self._probe_32_bit(platform_args)
+            else:
+                # the result only depends on the image, so it's kept between runs
+                def probe() -> tuple[bool, bool]:
+                    simulate_32_bit, probe_platform_args = self._probe_32_bit(platform_args)
+                    return simulate_32_bit, probe_platform_args != platform_args
+
+                simulate_32_bit, use_amd64 = _cached_probe(
+                    f"32-bit:{self.engine.name}:{image_id}:{self.oci_platform.value}",
+                    f"the 32-bit probes of {self.image}",
+                    probe,
                 )
+                if use_amd64:
+                    platform_args = self._get_platform_args(oci_platform=OCIPlatform.AMD64)
 
-        shell_args = ["linux32", "/bin/bash"] if simulate_32_bit else ["/bin/bash"]
+        self.shell_args = ["linux32", "/bin/bash"] if simulate_32_bit else ["/bin/bash"]
 
         subprocess.run(
             [
@@ -340,15 +678,129 @@ def __enter__(self) -> Self:
                 f"--name={self.name}",
                 "--interactive",
                 *(["--volume=/:/host"] if not self.engine.disable_host_mount else []),
+                *self._project_mount_args(),
+                *self._cache_mount_args(),
+                *self._compiler_cache_mount_args(),
+                *([f"--label={POOL_LABEL}"] if self._pool_state_path else []),
                 *network_args,
                 *platform_args,
                 *self.engine.create_args,
                 self.image,
-                *shell_args,
+                *self.shell_args,
             ],
             check=True,
         )
 
+        try:
+            self._start_shell()
+        except BaseException:
+            self._release_pool_slot()
+            raise
+        return self
+
+    def commit(self, tag: str, *, labels: Mapping[str, str] | None = None) -> None:
+        """
+        Save the container's filesystem as the local image `tag`. Mounted
+        volumes aren't included.
+        """
+        assert self.name is not None
+        call(
+            self.engine.name,
+            "commit",
+            *(f"--change=LABEL {key}={value}" for key, value in (labels or {}).items()),
+            self.name,
+            tag,
+            capture_stdout=True,
+        )
+
+    def _project_mount_args(self) -> list[str]:
+        if self.project_mount is None:
+            return []
+        source = self.project_mount.resolve()
+        match self.engine.name:
+            case "docker":
+                return [f"--volume={source}:{PROJECT_MOUNT_PATH}:ro"]
+            case "podman":
+                # podman can put a copy-on-write layer on the mount itself,
+                # which is discarded when the container stops
+                return [f"--volume={source}:{PROJECT_MOUNT_PATH}:O"]
+            case _:
+                assert_never(self.engine.name)
+
+    def _cache_mount_args(self) -> list[str]:
+        if self.cache_mount is None:
+            return []
+        self.cache_mount.mkdir(parents=True, exist_ok=True)
+        return [
+            f"--volume={self.cache_mount}:{CACHE_MOUNT_PATH}",
+            f"--env=PIP_CACHE_DIR={CACHE_MOUNT_PATH / 'pip'}",
+            f"--env=UV_CACHE_DIR={CACHE_MOUNT_PATH / 'uv'}",
+        ]
+
+    def _compiler_cache_mount_args(self) -> list[str]:
+        if self.compiler_cache_mount is None:
+            return []
+        self.compiler_cache_mount.mkdir(parents=True, exist_ok=True)
+        return [f"--volume={self.compiler_cache_mount}:{COMPILER_CACHE_MOUNT_PATH}"]
+
+    def setup_project_mount(self, to_path: PurePosixPath) -> None:
+        """
+        Make the mounted project available at `to_path`, writable, without
+        changing the host's copy. Under docker, this is an overlay on the
+        read-only mount if the container is allowed to create one, or a copy
+        of it otherwise.
+        """
+        assert self.project_mount is not None
+        match self.engine.name:
+            case "docker":
+                upper = PurePosixPath("/cibuildwheel/project-upper")
+                script = textwrap.dedent(
+                    f"""
+                    set -e
+                    rm -rf {shell_quote(to_path)}
+                    mkdir -p {shell_quote(to_path)} {upper}
+                    if mount -t tmpfs tmpfs {upper} 2>/dev/null; then
+                        mkdir -p {upper}/data {upper}/work
+                        if mount -t overlay overlay \
+                            -o lowerdir={PROJECT_MOUNT_PATH},upperdir={upper}/data,workdir={upper}/work \
+                            {shell_quote(to_path)} 2>/dev/null; then
+                            echo overlay
+                            exit 0
+                        fi
+                        umount {upper}
+                    fi
+                    cp -a {PROJECT_MOUNT_PATH}/. {shell_quote(to_path)}
+                    echo copy
+                    """
+                )
+                method = self.call(["sh", "-c", script], capture_output=True, cwd="/").strip()
+            case "podman":
+                self.call(
+                    [
+                        "sh",
+                        "-c",
+                        f"rm -rf {shell_quote(to_path)} && ln -s {PROJECT_MOUNT_PATH} {shell_quote(to_path)}",
+                    ],
+                    cwd="/",
+                )
+                method = "overlay"
+            case _:
+                assert_never(self.engine.name)
+
+        if method == "overlay":
+            print(f"info: Mounted {self.project_mount} at {to_path}, with a copy-on-write layer")
+        else:
+            print(
+                f"info: Mounted {self.project_mount} and copied it to {to_path}, as the "
+                "container can't create an overlay (it needs the SYS_ADMIN capability)"
+            )
+
+    def _start_shell(self) -> None:
+        """
+        Start the (created or stopped) container, and attach to its shell.
+        The container is removed if it doesn't respond.
+        """
+        assert self.name is not None
         try:
             self.process = subprocess.Popen(
                 [
@@ -366,6 +818,7 @@ def __enter__(self) -> Self:
             assert self.process.stdout
             self.bash_stdin = self.process.stdin
             self.bash_stdout = self.process.stdout
+            self._read_buffer = bytearray()
 
             # run a noop command to block until the container is responding
             self.call(["/bin/true"], cwd="/")
@@ -375,8 +828,13 @@ def __enter__(self) -> Self:
                 # does not exist, podman does not. There does not seem to be a way
                 # to setup a workdir for a container running in podman.
                 self.call(["mkdir", "-p", os.fspath(self.cwd)], cwd="/")
+
+            self._agent = self._start_agent()
         except BaseException:
             # clean-up
+            if self._agent is not None:
+                self._agent.close()
+                self._agent = None
             if self.process is not None:
                 if self.process.poll() is None:
                     self.process.kill()
@@ -384,7 +842,140 @@ def __enter__(self) -> Self:
             self.process = None
             self._remove_container()
             raise
-        return self
+
+    def _start_agent(self) -> _ContainerAgent | None:
+        """
+        Start the agent that answers queries without a round trip through
+        the shell. Returns None if the image can't run it (e.g. it has no
+        utility python), in which case shell commands are used instead.
+        """
+        assert self.name is not None
+        process = subprocess.Popen(
+            [
+                self.engine.name,
+                "exec",
+                "--interactive",
+                self.name,
+                self.UTILITY_PYTHON,
+                "-c",
+                resources.CONTAINER_AGENT_SCRIPT.read_text(encoding="utf8"),
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        agent = _ContainerAgent(process)
+        try:
+            agent.request("ping")
+        except (OSError, ValueError, subprocess.CalledProcessError):
+            agent.close()
+            return None
+        return agent
+
+    def _pool_key(self) -> str | None:
+        """
+        The key identifying containers that can be reused for this one, or
+        None if the image isn't available locally yet.
+        """
+        try:
+            image_id = call(
+                self.engine.name,
+                "image",
+                "inspect",
+                self.image,
+                "--format",
+                "{{.Id}}",
+                capture_stdout=True,
+            ).strip()
+        except subprocess.CalledProcessError:
+            return None
+        key_data = json.dumps(
+            [
+                image_id,
+                self.oci_platform.value,
+                self.engine.name,
+                self.engine.create_args,
+                self.engine.disable_host_mount,
+                self.setup_key,
+                os.fspath(self.cwd or ""),
+                os.fspath(self.project_mount or ""),
+                os.fspath(self.cache_mount or ""),
+                os.fspath(self.compiler_cache_mount or ""),
+            ]
+        )
+        return hashlib.sha256(key_data.encode("utf8")).hexdigest()[:16]
+
+    def _start_pooled_container(self) -> bool:
+        """
+        Claim this container's slot in the pool, and restart the container
+        that's waiting there, if any. Returns True if a pooled container is
+        now running. When it returns False, the slot is still claimed if it
+        could be, and the container that's created next will fill it.
+        """
+        key = self._pool_key()
+        if key is None:
+            # the key needs the image ID, so pull it now
+            with contextlib.suppress(subprocess.CalledProcessError):
+                call(self.engine.name, "pull", f"--platform={self.oci_platform.value}", self.image)
+                key = self._pool_key()
+        if key is None:
+            return False
+
+        pool_dir = CIBW_CACHE_PATH / "container-pool"
+        pool_dir.mkdir(parents=True, exist_ok=True)
+        lock = FileLock(pool_dir / f"{key}.lock")
+        try:
+            lock.acquire(timeout=0)
+        except Timeout:
+            # another build is using the pooled container
+            return False
+        self._pool_lock = lock
+        self._pool_state_path = pool_dir / f"{key}.json"
+
+        try:
+            state = json.loads(self._pool_state_path.read_text(encoding="utf8"))
+        except (OSError, ValueError):
+            return False
+        self._pool_state_path.unlink()
+
+        name = state.get("name")
+        exists = name and (
+            subprocess.run(
+                [self.engine.name, "container", "inspect", name],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            ).returncode
+            == 0
+        )
+        if not exists:
+            return False
+
+        self.name = name
+        self.shell_args = state["shell_args"]
+        try:
+            self._start_shell()
+            # reset the workspace left by the previous build. The project is
+            # left for the caller to update, see project_sync.
+            self.call(["rm", "-rf", "/output", "/tmp/cibuildwheel"], cwd="/")
+        except (subprocess.CalledProcessError, OSError):
+            log.warning(f"Failed to restart pooled container {name!r}, creating a new one.")
+            if self.process is not None:
+                self._end_shell()
+            if self.name is not None:
+                self._remove_container()
+            self.name = f"cibuildwheel-{uuid.uuid4()}"
+            return False
+
+        print(f"Reusing pooled container {name}")
+        self.reused = True
+        return True
+
+    def _release_pool_slot(self) -> None:
+        if self._pool_lock is not None:
+            self._pool_lock.release()
+            self._pool_lock = None
+        self._pool_state_path = None
 
     def __exit__(
         self,
@@ -394,7 +985,35 @@ def __exit__(
     ) -> None:
         assert self.process is not None
         try:
-            # Ask bash to exit cleanly and wait for the `start` process to finish.
+            if self._agent is not None:
+                self._agent.close()
+                self._agent = None
+            self._end_shell()
+        finally:
+            try:
+                if self._pool_state_path is not None and exc_type is None:
+                    # the shell has exited, so the container is stopped. Leave
+                    # it for the next run.
+                    assert self.name is not None
+                    state = {
+                        "name": self.name,
+                        "engine": self.engine.name,
+                        "shell_args": self.shell_args,
+                        "last_used": time.time(),
+                    }
+                    self._pool_state_path.write_text(json.dumps(state), encoding="utf8")
+                    self.name = None
+                else:
+                    keep_container = strtobool(os.environ.get("CIBW_DEBUG_KEEP_CONTAINER", ""))
+                    if not keep_container:
+                        self._remove_container()
+            finally:
+                self._release_pool_slot()
+
+    def _end_shell(self) -> None:
+        assert self.process is not None
+        try:
+            # Ask bash to exit cleanly and wait for the process to finish.
             # If the container/bash has already died, the write raises
             # BrokenPipeError; if bash refuses to exit, `wait` raises
             # TimeoutExpired. Both are handled below so we always reach the
@@ -422,9 +1041,34 @@ def __exit__(
                 self.bash_stdout.close()
             self.process = None
 
-            keep_container = strtobool(os.environ.get("CIBW_DEBUG_KEEP_CONTAINER", ""))
-            if not keep_container:
-                self._remove_container()
+    @contextlib.contextmanager
+    def exec_session(self) -> Generator[Self, None, None]:
+        """
+        Open another shell in this running container, so that commands can
+        run at the same time as those in other sessions. The session has the
+        same interface as the container, and ends when the `with` block
+        exits - the container itself keeps running.
+        """
+        assert self.process is not None
+        assert self.name is not None
+
+        session = copy.copy(self)
+        session.process = subprocess.Popen(
+            [self.engine.name, "exec", "--interactive", self.name, *self.shell_args],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        assert session.process.stdin
+        assert session.process.stdout
+        session.bash_stdin = session.process.stdin
+        session.bash_stdout = session.process.stdout
+        session._read_buffer = bytearray()
+
+        try:
+            session.call(["/bin/true"], cwd="/")
+            yield session
+        finally:
+            session._end_shell()
 
     def _remove_container(self) -> None:
         assert self.name is not None
@@ -439,18 +1083,56 @@ def _remove_container(self) -> None:
             log.warning(msg)
         self.name = None
 
-    def copy_into(self, from_path: Path, to_path: PurePath) -> None:
+    def copy_into(
+        self, from_path: Path, to_path: PurePath, *, paths: Sequence[str] | None = None
+    ) -> None:
+        """
+        Copy the file or directory `from_path` to `to_path` in the container.
+        For a directory, `paths` can list the relative paths to copy, instead
+        of the whole tree.
+        """
         if from_path.is_dir():
-            self.call(["mkdir", "-p", to_path])
-            subprocess.run(
-                f"tar -c {self.host_tar_format} -f - . | {self.engine.name} exec -i {self.name} tar --no-same-owner -xC {shell_quote(to_path)} -f -",
-                shell=True,
-                check=True,
-                cwd=from_path,
-            )
-        else:
+            self.mkdir(to_path)
+            compress = engine_is_remote(self.engine)
+            start = time.time()
             exec_process: subprocess.Popen[bytes]
-            self.call(["mkdir", "-p", to_path.parent])
+            with subprocess.Popen(
+                [
+                    self.engine.name,
+                    "exec",
+                    "-i",
+                    str(self.name),
+                    "tar",
+                    "--no-same-owner",
+                    "-x",
+                    *(["-z"] if compress else []),
+                    "-C",
+                    os.fspath(to_path),
+                    "-f",
+                    "-",
+                ],
+                stdin=subprocess.PIPE,
+            ) as exec_process:
+                assert exec_process.stdin
+                wire = _CountingStream(exec_process.stdin)
+                try:
+                    with _tar_stream(wire, "w", compress=compress) as tar:
+                        if paths is None:
+                            tar.add(from_path, arcname=".")
+                        else:
+                            for path in paths:
+                                tar.add(from_path / path, arcname=path, recursive=False)
+                        size = tar.offset
+                finally:
+                    with contextlib.suppress(OSError):
+                        exec_process.stdin.close()
+                exec_process.wait()
+
+            if exec_process.returncode:
+                raise subprocess.CalledProcessError(exec_process.returncode, exec_process.args)
+            _log_transfer(f"{from_path} into the container", size, wire.count, compress, start)
+        else:
+            self.mkdir(to_path.parent)
             with subprocess.Popen(
                 [
                     self.engine.name,
@@ -475,14 +1157,63 @@ def copy_into(self, from_path: Path, to_path: PurePath) -> None:
                         exec_process.returncode, exec_process.args, None, None
                     )
 
-    def copy_out(self, from_path: PurePath, to_path: Path) -> None:
-        # note: we assume from_path is a dir
+    def copy_out(
+        self, from_path: PurePath, to_path: Path, *, paths: Sequence[str] | None = None
+    ) -> None:
+        """
+        Copy the directory `from_path` in the container to `to_path`. `paths`
+        can list the relative paths to copy, instead of the whole tree.
+        """
         to_path.mkdir(parents=True, exist_ok=True)
-        call(self.engine.name, "cp", f"{self.name}:{from_path}/.", to_path)
+        compress = engine_is_remote(self.engine)
+        start = time.time()
+        exec_process: subprocess.Popen[bytes]
+        with subprocess.Popen(
+            [
+                self.engine.name,
+                "exec",
+                str(self.name),
+                "tar",
+                "-c",
+                *(["-z"] if compress else []),
+                "-C",
+                os.fspath(from_path),
+                "-f",
+                "-",
+                *(paths if paths is not None else ["."]),
+            ],
+            stdout=subprocess.PIPE,
+        ) as exec_process:
+            assert exec_process.stdout
+            wire = _CountingStream(exec_process.stdout)
+            stream_error: Exception | None = None
+            size = 0
+            try:
+                with _tar_stream(wire, "r", compress=compress) as tar:
+                    # the container decides what's in the archive, so nothing
+                    # may land outside to_path
+                    for member in tar:
+                        safe_extract(tar, member, to_path)
+                    size = tar.offset
+            except (tarfile.TarError, EOFError, zlib.error) as e:
+                # a truncated stream, most likely because tar failed in the container
+                stream_error = e
+            exec_process.wait()
+
+        if exec_process.returncode:
+            raise subprocess.CalledProcessError(exec_process.returncode, exec_process.args)
+        if stream_error is not None:
+            raise stream_error
+        _log_transfer(f"{from_path} out of the container", size, wire.count, compress, start)
 
     def glob(self, path: PurePosixPath, pattern: str) -> list[PurePosixPath]:
         glob_pattern = path.joinpath(pattern)
 
+        if self._agent is not None:
+            return [
+                PurePosixPath(p) for p in self._agent.request("glob", pattern=str(glob_pattern))
+            ]
+
         path_strings = json.loads(
             self.call(
                 [
@@ -516,6 +1247,9 @@ def call(
         )
         command = " ".join(shlex.quote(str(a)) for a in args)
         end_of_message = str(uuid.uuid4())
+        # the container's stderr goes straight to ours, so when this thread's
+        # output is being buffered, send it through stdout instead
+        redirect = " 2>&1" if not capture_output and output_is_captured() else ""
 
         # log the command we're executing
         print(f"    + {command}")
@@ -531,7 +1265,7 @@ def call(
             bytes(
                 f"""(
             {chdir}
-            env {env_assignments} {command}
+            env {env_assignments} {command}{redirect}
             printf "%04d%s\n" $? {end_of_message}
         )
         """,
@@ -546,27 +1280,7 @@ def call(
         else:
             output_io = sys.stdout.buffer
 
-        while True:
-            line = self.bash_stdout.readline()
-
-            if line.endswith(bytes(end_of_message, encoding="utf8") + b"\n"):
-                # fmt: off
-                footer_offset = (
-                    len(line)
-                    - 1  # newline character
-                    - len(end_of_message)  # delimiter
-                    - 4  # 4 return code decimals
-                )
-                # fmt: on
-                return_code_str = line[footer_offset : footer_offset + 4]
-                return_code = int(return_code_str)
-                # add the last line to output, without the footer
-                output_io.write(line[0:footer_offset])
-                output_io.flush()
-                break
-            else:
-                output_io.write(line)
-                output_io.flush()
+        return_code = self._relay_output(bytes(end_of_message, encoding="utf8"), output_io)
 
         if isinstance(output_io, io.BytesIO):
             output = str(output_io.getvalue(), encoding="utf8", errors="surrogateescape")
@@ -578,7 +1292,121 @@ def call(
 
         return output
 
+    def _relay_output(self, end_of_message: bytes, output_io: IO[bytes]) -> int:
+        """
+        Copy the shell's output to `output_io` until the footer that ends the
+        current command, and return the command's return code.
+
+        The output is read in large blocks rather than line by line, so that
+        chatty commands and output without newlines are relayed cheaply. Each
+        block is written out in one go, apart from the last few bytes, which
+        are held back in case they're the start of a footer that's split
+        across reads.
+        """
+        # fmt: off
+        footer_end = end_of_message + b"\n"
+        footer_length = (
+            4  # 4 return code decimals
+            + len(footer_end)  # delimiter and newline character
+        )
+        # fmt: on
+        buffer = self._read_buffer
+        fd = self.bash_stdout.fileno()
+
+        while True:
+            footer_index = buffer.find(footer_end)
+            if footer_index != -1:
+                footer_offset = footer_index - 4
+                return_code = int(buffer[footer_offset:footer_index])
+                # add the last of the output, without the footer
+                output_io.write(buffer[:footer_offset])
+                output_io.flush()
+                del buffer[: footer_offset + footer_length]
+                return return_code
+
+            if len(buffer) >= footer_length:
+                output_io.write(buffer[: 1 - footer_length])
+                output_io.flush()
+                del buffer[: 1 - footer_length]
+
+            chunk = os.read(fd, self.READ_SIZE)
+            if not chunk:
+                output_io.write(buffer)
+                output_io.flush()
+                buffer.clear()
+                msg = "The shell in the container exited unexpectedly"
+                raise OSError(msg)
+            buffer += chunk
+
+    def _agent_or_shell(
+        self, op: str, shell_command: Sequence[PathOrStr], **kwargs: object
+    ) -> None:
+        # the agent is quiet, so log the equivalent command
+        if self._agent is None:
+            self.call(shell_command)
+        else:
+            print(f"    + {shlex.join(str(a) for a in shell_command)}")
+            self._agent.request(op, cmd=shell_command, **kwargs)
+
+    def mkdir(self, path: PurePath) -> None:
+        """Create the directory `path` and its parents, if they don't exist."""
+        self._agent_or_shell("mkdir", ["mkdir", "-p", path], path=str(path))
+
+    def remove(self, path: PurePath) -> None:
+        """Remove the file or directory tree at `path`, if it exists."""
+        self._agent_or_shell("rm", ["rm", "-rf", path], path=str(path))
+
+    def move(self, src: PurePath, dst: PurePath) -> None:
+        """Move `src` to `dst`, or into `dst` if that's a directory."""
+        self._agent_or_shell("mv", ["mv", src, dst], src=str(src), dst=str(dst))
+
+    def file_manifest(
+        self, path: PurePath, known: Mapping[str, Sequence[object]]
+    ) -> dict[str, list[Any]] | None:
+        """
+        The size, mtime in ns and sha256 of each file under `path`, by
+        relative path, reusing the hashes in `known` for files whose size
+        and mtime match. None if the container can't run the agent.
+        """
+        if self._agent is None:
+            return None
+        return typing.cast(
+            "dict[str, list[Any]]",
+            self._agent.request("manifest", root=str(path), known=dict(known)),
+        )
+
+    def exists(self, path: PurePath) -> bool:
+        if self._agent is not None:
+            return bool(self._agent.request("exists", path=str(path)))
+        try:
+            self.call(["test", "-e", path], capture_output=True)
+        except subprocess.CalledProcessError:
+            return False
+        return True
+
+    def which(self, name: str, env: Mapping[str, str] | None = None) -> str | None:
+        """
+        Find the executable `name` on the PATH in `env`, or on the
+        container's PATH if `env` is None.
+        """
+        if self._agent is not None:
+            path = env.get("PATH") if env is not None else None
+            return typing.cast("str | None", self._agent.request("which", name=name, path=path))
+        try:
+            return self.call(["which", name], env=env, capture_output=True).strip() or None
+        except subprocess.CalledProcessError:
+            return None
+
+    def make_temp_dir(self) -> PurePosixPath:
+        if self._agent is not None:
+            return PurePosixPath(self._agent.request("mktemp", cmd=["mktemp", "-d"]))
+        return PurePosixPath(self.call(["mktemp", "-d"], capture_output=True).strip())
+
     def get_environment(self) -> dict[str, str]:
+        if self._agent is not None:
+            cwd = os.fspath(self.cwd) if self.cwd else None
+            return typing.cast("dict[str, str]", self._agent.request("environ", cwd=cwd))
+
         env = json.loads(
             self.call(
                 [
@@ -611,5 +1439,264 @@ def debug_info(self) -> str:
         return output
 
 
+def reap_idle_pooled_containers(engine: OCIContainerEngineConfig) -> None:
+    """
+    Remove the pooled containers of this engine that have not been used for
+    longer than `engine.pool_ttl` seconds. Containers that are in use, or
+    belong to another engine, are left alone.
+    """
+    pool_dir = CIBW_CACHE_PATH / "container-pool"
+    if not pool_dir.is_dir():
+        return
+
+    now = time.time()
+    for state_path in sorted(pool_dir.glob("*.json")):
+        lock = FileLock(state_path.with_suffix(".lock"))
+        try:
+            lock.acquire(timeout=0)
+        except Timeout:
+            continue
+        try:
+            try:
+                state = json.loads(state_path.read_text(encoding="utf8"))
+            except (OSError, ValueError):
+                state_path.unlink(missing_ok=True)
+                continue
+            if state.get("engine") != engine.name:
+                continue
+            if now - state.get("last_used", 0) <= engine.pool_ttl:
+                continue
+            print(f"Removing idle pooled container {state['name']}")
+            subprocess.run(
+                [engine.name, "rm", "--force", "-v", state["name"]],
+                stdout=subprocess.DEVNULL,
+                check=False,
+            )
+            state_path.unlink(missing_ok=True)
+        finally:
+            lock.release()
+
+
+@dataclasses.dataclass(kw_only=True)
+class _ImagePull:
+    duration: float = 0.0
+    pulled: bool = False
+    error: str | None = None
+
+
+class ImagePrefetcher:
+    """
+    Pulls the images of upcoming containers in the background, at most
+    `jobs` at a time, so that they download while earlier steps build.
+    Pulls that fail are ignored; the container that needs the image will
+    pull it again, and report the error. Use as a context manager; pulls
+    still running on exit are stopped.
+    """
+
+    def __init__(self, *, jobs: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="image-pull")
+        self._pulls: dict[tuple[str, str, str], Future[_ImagePull]] = {}
+        self._processes: set[subprocess.Popen[bytes]] = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.hidden_time = 0.0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        with self._lock:
+            self._closed = True
+            for process in self._processes:
+                process.terminate()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def prefetch(
+        self, image: str, oci_platform: OCIPlatform, engine: OCIContainerEngineConfig
+    ) -> None:
+        key = (engine.name, image, oci_platform.value)
+        if key not in self._pulls:
+            self._pulls[key] = self._executor.submit(self._pull, image, oci_platform, engine)
+
+    def _pull(
+        self, image: str, oci_platform: OCIPlatform, engine: OCIContainerEngineConfig
+    ) -> _ImagePull:
+        try:
+            container = OCIContainer(image=image, oci_platform=oci_platform, engine=engine)
+            if container.local_image_id(oci_platform):
+                return _ImagePull()
+
+            start = time.time()
+            with self._lock:
+                if self._closed:
+                    return _ImagePull()
+                process = subprocess.Popen(
+                    [engine.name, "pull", "--quiet", f"--platform={oci_platform.value}", image],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+                self._processes.add(process)
+            try:
+                process.wait()
+            finally:
+                with self._lock:
+                    self._processes.discard(process)
+        except (OSError, subprocess.SubprocessError, FatalError) as e:
+            # e.g. the engine isn't installed, which the build reports itself
+            return _ImagePull(error=str(e) or type(e).__name__)
+        return _ImagePull(duration=time.time() - start, pulled=process.returncode == 0)
+
+    def wait(self, image: str, oci_platform: OCIPlatform, engine: OCIContainerEngineConfig) -> None:
+        """
+        Wait for the pull of `image`, if it was prefetched, and log how much
+        of it happened while other work was going on.
+        """
+        future = self._pulls.get((engine.name, image, oci_platform.value))
+        if future is None:
+            return
+        start = time.time()
+        pull = future.result()
+        if pull.error is not None:
+            log.warning(
+                f"Couldn't prefetch {image}, pulling it when it's needed instead: {pull.error}"
+            )
+            return
+        if not pull.pulled:
+            return
+        hidden = max(0.0, pull.duration - (time.time() - start))
+        with self._lock:
+            self.hidden_time += hidden
+        print(
+            f"info: Pulled {image} in the background in {pull.duration:.1f}s, "
+            f"{hidden:.1f}s of it while other work was running"
+        )
+
+
+# environment variables that select the daemon the engines talk to
+ENGINE_HOST_VARIABLES = ("DOCKER_HOST", "DOCKER_CONTEXT", "CONTAINER_HOST", "CONTAINER_CONNECTION")
+
+
+def _docker_config() -> dict[str, Any]:
+    config_dir = Path(os.environ.get("DOCKER_CONFIG") or Path.home() / ".docker")
+    try:
+        config = json.loads((config_dir / "config.json").read_text(encoding="utf8"))
+    except (OSError, ValueError):
+        return {}
+    return config if isinstance(config, dict) else {}
+
+
+def _docker_context_host(context: str) -> str | None:
+    """
+    The daemon address of the docker context named `context`, read from
+    the docker CLI's context store, or None if it isn't there.
+    """
+    config_dir = Path(os.environ.get("DOCKER_CONFIG") or Path.home() / ".docker")
+    context_id = hashlib.sha256(context.encode("utf8")).hexdigest()
+    meta_path = config_dir / "contexts" / "meta" / context_id / "meta.json"
+    try:
+        host = json.loads(meta_path.read_text(encoding="utf8"))["Endpoints"]["docker"]["Host"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return host if isinstance(host, str) else None
+
+
+def engine_endpoint(engine: OCIContainerEngineConfig) -> str | None:
+    """
+    The address of the daemon that the engine talks to, e.g.
+    `unix:///var/run/docker.sock`. For podman, that's "" when it runs the
+    containers itself, rather than through a service. None if the address
+    can't be found, e.g. a podman connection or a docker context that's
+    missing from the context store.
+    """
+    match engine.name:
+        case "docker":
+            if host := os.environ.get("DOCKER_HOST"):
+                return host
+            context = os.environ.get("DOCKER_CONTEXT") or _docker_config().get("currentContext")
+            if not context or context == "default":
+                if sys.platform == "win32":
+                    return "npipe:////./pipe/docker_engine"
+                return "unix:///var/run/docker.sock"
+            return _docker_context_host(str(context))
+        case "podman":
+            if host := os.environ.get("CONTAINER_HOST"):
+                return host
+            if os.environ.get("CONTAINER_CONNECTION"):
+                return None
+            return ""
+        case _:
+            assert_never(engine.name)
+
+
+def engine_is_remote(engine: OCIContainerEngineConfig) -> bool:
+    """
+    True if the engine's daemon is on another machine, so that copies into
+    and out of containers are worth compressing. A daemon that can't be
+    found is assumed to be remote.
+    """
+    endpoint = engine_endpoint(engine)
+    if endpoint is None:
+        return True
+    return bool(endpoint) and not endpoint.startswith(("unix://", "npipe://"))
+
+
+class _CountingStream:
+    """Wraps a binary pipe, counting the bytes that go through it."""
+
+    def __init__(self, stream: IO[bytes]) -> None:
+        self._stream = stream
+        self.count = 0
+
+    def write(self, data: bytes) -> int:
+        self._stream.write(data)
+        self.count += len(data)
+        return len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self.count += len(data)
+        return data
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+@contextlib.contextmanager
+def _tar_stream(
+    stream: _CountingStream, mode: Literal["r", "w"], *, compress: bool
+) -> Generator[tarfile.TarFile, None, None]:
+    """
+    Open a streamed tar archive on `stream`, gzipped if `compress` is set.
+    Compression uses a fast level, as it's only meant to save bandwidth.
+    """
+    fileobj = typing.cast("IO[bytes]", stream)
+    with contextlib.ExitStack() as stack:
+        if compress:
+            gzip_file = gzip.GzipFile(fileobj=fileobj, mode=f"{mode}b", compresslevel=1)
+            fileobj = typing.cast("IO[bytes]", stack.enter_context(gzip_file))
+        if mode == "r":
+            tar = TarFile.open(fileobj=fileobj, mode="r|")
+        else:
+            tar = TarFile.open(fileobj=fileobj, mode="w|", format=tarfile.GNU_FORMAT)
+        with tar:
+            yield tar
+
+
+def _log_transfer(
+    description: str, size: int, wire_size: int, compressed: bool, start: float
+) -> None:
+    duration = time.time() - start
+    rate = humanize.naturalsize(size / duration) if duration > 0 else "-"
+    details = f"{humanize.naturalsize(size)} in {duration:.1f}s, {rate}/s"
+    if compressed:
+        details += f", {humanize.naturalsize(wire_size)} compressed"
+    print(f"info: Copied {description} ({details})")
+
+
 def shell_quote(path: PurePath) -> str:
     return shlex.quote(os.fspath(path))
@@ -6,12 +6,16 @@
     "cibuildwheel.frontend",
     "cibuildwheel.logger",
     "cibuildwheel.oci_container",
+    "cibuildwheel.before_all_snapshot",
+    "cibuildwheel.compiler_cache",
+    "cibuildwheel.project_sync",
     "cibuildwheel.projectfiles",
     "cibuildwheel.selector",
     "cibuildwheel.typing",
     "cibuildwheel.util",
     "cibuildwheel.util.helpers",
     "cibuildwheel.util.packaging",
+    "cibuildwheel.wheel_cache",
     "collections",
     "configparser",
     "contextlib",
@@ -42,16 +46,20 @@
 
 from cibuildwheel import errors
 from cibuildwheel.architecture import Architecture
+from cibuildwheel.before_all_snapshot import BeforeAllSnapshotConfig
+from cibuildwheel.compiler_cache import CompilerCacheConfig
 from cibuildwheel.environment import EnvironmentParseError, ParsedEnvironment, parse_environment
 from cibuildwheel.frontend import BuildFrontendConfig
 from cibuildwheel.logger import log
 from cibuildwheel.oci_container import OCIContainerEngineConfig
+from cibuildwheel.project_sync import ProjectSyncConfig
 from cibuildwheel.projectfiles import get_requires_python_str, resolve_dependency_groups
 from cibuildwheel.selector import BuildSelector, EnableGroup, TestSelector, selector_matches
 from cibuildwheel.typing import PLATFORMS, PlatformName
 from cibuildwheel.util import resources
 from cibuildwheel.util.helpers import format_safe, parse_key_value_string, strtobool, unwrap
 from cibuildwheel.util.packaging import DependencyConstraints
+from cibuildwheel.wheel_cache import WheelCacheConfig
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
@@ -88,10 +96,19 @@ class CommandLineArguments:
     archs: str | None
     output_dir: Path
     only: str | None
+    shard: str | None
+    shard_durations: Path | None
+    plan: bool
     config_file: str
     package_dir: Path
     print_build_identifiers: bool
     allow_empty: bool
+    jobs: int | None
+    pipeline_tests: bool
+    incremental: bool
+    resume: bool
+    wheel_cache: str | None
+    cache_stats: bool
     debug_traceback: bool
     enable: list[str]
     clean_cache: bool
@@ -101,8 +118,17 @@ def defaults(cls) -> Self:
         return cls(
             platform="auto",
             allow_empty=False,
+            jobs=None,
+            pipeline_tests=False,
+            incremental=False,
+            resume=False,
+            wheel_cache=None,
+            cache_stats=False,
             archs=None,
             only=None,
+            shard=None,
+            shard_durations=None,
+            plan=False,
             config_file="",
             output_dir=Path("wheelhouse"),
             package_dir=Path(),
@@ -121,6 +147,10 @@ class GlobalOptions:
     test_selector: TestSelector
     architectures: set[Architecture]
     allow_empty: bool
+    jobs: int
+    pipeline_tests: bool
+    incremental: bool
+    wheel_cache: WheelCacheConfig | None
 
 
 @dataclasses.dataclass(frozen=True)
@@ -146,6 +176,7 @@ class BuildOptions:
     xbuild_tools: list[str] | None
     xbuild_files: dict[str, list[str]]
     repair_command: str
+    post_build_command: str | None
     manylinux_images: dict[str, str] | None
     musllinux_images: dict[str, str] | None
     dependency_constraints: DependencyConstraints
@@ -163,6 +194,9 @@ class BuildOptions:
     build_frontend: BuildFrontendConfig
     config_settings: str
     container_engine: OCIContainerEngineConfig
+    project_sync: ProjectSyncConfig
+    before_all_snapshot: BeforeAllSnapshotConfig
+    compiler_cache: CompilerCacheConfig
     pyodide_version: str | None
 
     @property
@@ -690,6 +724,29 @@ def globals(self) -> GlobalOptions:
 
         allow_empty = args.allow_empty or strtobool(self.env.get("CIBW_ALLOW_EMPTY", "0"))
 
+        jobs_str = str(args.jobs) if args.jobs is not None else self.env.get("CIBW_JOBS", "1")
+        try:
+            jobs = int(jobs_str)
+        except ValueError:
+            jobs = 0
+        if jobs < 1:
+            msg = f"Invalid number of jobs {jobs_str!r}, must be a positive integer"
+            raise errors.ConfigurationError(msg)
+
+        pipeline_tests = args.pipeline_tests or strtobool(self.env.get("CIBW_PIPELINE_TESTS", "0"))
+        incremental = args.incremental or strtobool(self.env.get("CIBW_INCREMENTAL", "0"))
+
+        wheel_cache_str = (
+            args.wheel_cache
+            if args.wheel_cache is not None
+            else self.env.get("CIBW_WHEEL_CACHE", "")
+        )
+        try:
+            wheel_cache = WheelCacheConfig.from_config_string(wheel_cache_str)
+        except ValueError as e:
+            msg = f"Failed to parse wheel cache config. {e}"
+            raise errors.ConfigurationError(msg) from e
+
         enable_groups = self.reader.get(
             "enable", env_plat=False, option_format=ListFormat(sep=" "), env_rule=InheritRule.APPEND
         )
@@ -736,8 +793,26 @@ def globals(self) -> GlobalOptions:
             test_selector=test_selector,
             architectures=architectures,
             allow_empty=allow_empty,
+            jobs=jobs,
+            pipeline_tests=pipeline_tests,
+            incremental=incremental,
+            wheel_cache=wheel_cache,
         )
 
+    def skip_identifiers(self, identifiers: Iterable[str]) -> None:
+        """
+        Leave `identifiers` out of the build, on top of the skip option.
+        Call this before any build options are computed, as they hold a
+        reference to the global options.
+        """
+        build_selector = self.globals.build_selector
+        skip_config = " ".join([build_selector.skip_config, *identifiers]).strip()
+        self.globals = dataclasses.replace(
+            self.globals,
+            build_selector=dataclasses.replace(build_selector, skip_config=skip_config),
+        )
+        self.build_options.cache_clear()
+
     def _check_pinned_image(self, value: str, pinned_images: Mapping[str, str]) -> None:
         error_set = {"manylinux1", "manylinux2010", "manylinux_2_24", "musllinux_1_1"}
         # Currently no warnings, next: https://github.com/pypa/manylinux/issues/1925
@@ -779,6 +854,9 @@ def _compute_build_options(self, identifier: str | None) -> BuildOptions:
             repair_command = self.reader.get(
                 "repair-wheel-command", option_format=ListFormat(sep=" && ")
             )
+            post_build_command = self.reader.get(
+                "post-build-command", option_format=ListFormat(sep=" && ")
+            )
             config_settings = self.reader.get(
                 "config-settings", option_format=ShlexTableFormat(sep=" ", pair_sep="=")
             )
@@ -934,6 +1012,41 @@ def _compute_build_options(self, identifier: str | None) -> BuildOptions:
                 msg = f"Failed to parse container config. {e}"
                 raise errors.ConfigurationError(msg) from e
 
+            project_sync_str = self.reader.get(
+                "project-sync",
+                option_format=ShlexTableFormat(sep="; ", pair_sep=":", allow_merge=False),
+            )
+
+            try:
+                project_sync = ProjectSyncConfig.from_config_string(project_sync_str)
+            except ValueError as e:
+                msg = f"Failed to parse project sync config. {e}"
+                raise errors.ConfigurationError(msg) from e
+
+            before_all_snapshot_str = self.reader.get(
+                "before-all-snapshot",
+                option_format=ShlexTableFormat(sep="; ", pair_sep=":", allow_merge=False),
+            )
+
+            try:
+                before_all_snapshot = BeforeAllSnapshotConfig.from_config_string(
+                    before_all_snapshot_str
+                )
+            except ValueError as e:
+                msg = f"Failed to parse before-all snapshot config. {e}"
+                raise errors.ConfigurationError(msg) from e
+
+            compiler_cache_str = self.reader.get(
+                "compiler-cache",
+                option_format=ShlexTableFormat(sep="; ", pair_sep=":", allow_merge=False),
+            )
+
+            try:
+                compiler_cache = CompilerCacheConfig.from_config_string(compiler_cache_str)
+            except ValueError as e:
+                msg = f"Failed to parse compiler cache config. {e}"
+                raise errors.ConfigurationError(msg) from e
+
             pyodide_version = self.reader.get("pyodide-version", env_plat=False)
 
             audit_command_str = self.reader.get(
@@ -963,6 +1076,7 @@ def _compute_build_options(self, identifier: str | None) -> BuildOptions:
                 xbuild_tools=xbuild_tools,
                 xbuild_files=xbuild_files,
                 repair_command=repair_command,
+                post_build_command=post_build_command,
                 environment=environment,
                 dependency_constraints=dependency_constraints,
                 manylinux_images=manylinux_images or None,
@@ -970,6 +1084,9 @@ def _compute_build_options(self, identifier: str | None) -> BuildOptions:
                 build_frontend=build_frontend,
                 config_settings=config_settings,
                 container_engine=container_engine,
+                project_sync=project_sync,
+                before_all_snapshot=before_all_snapshot,
+                compiler_cache=compiler_cache,
                 pyodide_version=pyodide_version or None,
                 audit_command=audit_command,
                 audit_requires=audit_requires,
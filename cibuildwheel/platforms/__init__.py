@@ -16,6 +16,7 @@
     from cibuildwheel.options import Options
     from cibuildwheel.selector import BuildSelector
     from cibuildwheel.typing import GenericPythonConfiguration, PlatformName
+    from cibuildwheel.util.file import Artifact
 
 
 class PlatformModule(Protocol):
@@ -27,6 +28,8 @@ def get_python_configurations(
         self, build_selector: BuildSelector, architectures: set[Architecture]
     ) -> Sequence[GenericPythonConfiguration]: ...
 
+    def required_artifacts(self, identifiers: Sequence[str]) -> list[Artifact]: ...
+
     def build(self, options: Options, tmp_path: Path) -> None: ...
 
 
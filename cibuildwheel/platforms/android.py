@@ -7,7 +7,10 @@
     "cibuildwheel.audit",
     "cibuildwheel.frontend",
     "cibuildwheel.logger",
+    "cibuildwheel.post_build",
+    "cibuildwheel.project_sync",
     "cibuildwheel.util.cmd",
+    "cibuildwheel.util.concurrency",
     "cibuildwheel.util.file",
     "cibuildwheel.util.helpers",
     "cibuildwheel.util.packaging",
@@ -28,6 +31,7 @@
     "typing",
 }
 
+import functools
 import os
 import platform
 import re
@@ -35,6 +39,7 @@
 import shutil
 import subprocess
 import sys
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from pprint import pprint
@@ -56,27 +61,39 @@
     prepare_config_settings,
 )
 from cibuildwheel.logger import log
+from cibuildwheel.post_build import submit_post_build
+from cibuildwheel.project_sync import copy_project_for_build
 from cibuildwheel.util import resources
 from cibuildwheel.util.cmd import call, shell
+from cibuildwheel.util.concurrency import run_in_parallel
 from cibuildwheel.util.file import (
     CIBW_CACHE_PATH,
+    Artifact,
     copy_test_sources,
     download,
     move_file,
     remove_on_error,
 )
 from cibuildwheel.util.helpers import prepare_command
-from cibuildwheel.util.packaging import find_compatible_wheel
-from cibuildwheel.util.python_build_standalone import create_python_build_standalone_environment
-from cibuildwheel.venv import constraint_flags, find_uv, virtualenv
+from cibuildwheel.util.packaging import BuiltWheels, find_compatible_wheel
+from cibuildwheel.util.python_build_standalone import (
+    create_python_build_standalone_environment,
+    python_build_standalone_artifact,
+)
+from cibuildwheel.venv import constraint_flags, find_uv, virtualenv, virtualenv_artifact
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+
     from cibuildwheel.options import BuildOptions, Options
     from cibuildwheel.selector import BuildSelector
     from cibuildwheel.typing import PathOrStr
 
 RESOURCES_ANDROID = resources.PATH / "android"
+_audit_lock = threading.Lock()
+_test_lock = threading.Lock()
+
 ANDROID_TRIPLET = {
     "arm64_v8a": "aarch64-linux-android",
     "x86_64": "x86_64-linux-android",
@@ -112,6 +129,27 @@ def all_python_configurations() -> list[PythonConfiguration]:
     return [PythonConfiguration(**item) for item in resources.read_python_configs("android")]
 
 
+def required_artifacts(identifiers: Sequence[str]) -> list[Artifact]:
+    """
+    The files that building `identifiers` downloads, for them to be
+    prefetched.
+    """
+    result = []
+    for config in all_python_configurations():
+        if config.identifier not in identifiers:
+            continue
+        result.append(
+            Artifact(
+                url=config.url,
+                sha256=config.sha256,
+                path=CIBW_CACHE_PATH / config.url.rpartition("/")[-1],
+            )
+        )
+        result.append(python_build_standalone_artifact(config.version, CIBW_CACHE_PATH))
+        result.append(virtualenv_artifact(config.version))
+    return result
+
+
 def get_python_configurations(
     build_selector: BuildSelector, architectures: set[Architecture]
 ) -> list[PythonConfiguration]:
@@ -122,10 +160,13 @@ def get_python_configurations(
     ]
 
 
-def shell_prepared(command: str, *, build_options: BuildOptions, env: dict[str, str]) -> None:
+def shell_prepared(
+    command: str, *, build_options: BuildOptions, env: dict[str, str], cwd: Path | None = None
+) -> None:
     shell(
         prepare_command(command, project=".", package=build_options.package_dir),
         env=env,
+        cwd=cwd,
     )
 
 
@@ -144,6 +185,7 @@ def before_all(options: Options, python_configurations: list[PythonConfiguration
 class BuildState:
     config: PythonConfiguration
     options: BuildOptions
+    project_dir: Path
     build_path: Path
     python_dir: Path
     build_env: dict[str, str]
@@ -167,48 +209,111 @@ def build(options: Options, tmp_path: Path) -> None:
     try:
         before_all(options, configs)
 
-        built_wheels: list[Path] = []
-        for config in configs:
-            log.build_start(config.identifier)
-            build_options = options.build_options(config.identifier)
-            build_path = tmp_path / config.identifier
-            build_path.mkdir()
-            python_dir = setup_target_python(config, build_path)
-            build_env, android_env = setup_env(config, build_options, build_path, python_dir)
-
-            state = BuildState(
-                config, build_options, build_path, python_dir, build_env, android_env
+        built_wheels = BuiltWheels[Path]()
+        jobs = min(options.globals.jobs, len(configs))
+
+        if jobs <= 1:
+            for config in configs:
+                _build_identifier(
+                    build_options=options.build_options(config.identifier),
+                    config=config,
+                    tmp_path=tmp_path,
+                    project_dir=Path.cwd(),
+                    built_wheels=built_wheels,
+                )
+        else:
+
+            def build_in_copy(config: PythonConfiguration) -> None:
+                # each build gets its own copy of the project, so that in-tree
+                # build artifacts don't collide
+                project_dir = tmp_path / "projects" / config.identifier
+                _build_identifier(
+                    build_options=copy_project_for_build(
+                        options.build_options(config.identifier), project_dir
+                    ),
+                    config=config,
+                    tmp_path=tmp_path,
+                    project_dir=project_dir,
+                    built_wheels=built_wheels,
+                )
+
+            run_in_parallel(
+                [
+                    (config.identifier, functools.partial(build_in_copy, config))
+                    for config in configs
+                ],
+                jobs=jobs,
             )
-            setup_xbuild_files(state)
 
-            compatible_wheel = find_compatible_wheel(built_wheels, config.identifier)
-            if compatible_wheel:
+    except subprocess.CalledProcessError as error:
+        msg = f"Command {error.cmd} failed with code {error.returncode}. {error.stdout or ''}"
+        raise errors.FatalError(msg) from error
+
+
+def _build_identifier(
+    *,
+    build_options: BuildOptions,
+    config: PythonConfiguration,
+    tmp_path: Path,
+    project_dir: Path,
+    built_wheels: BuiltWheels[Path],
+) -> None:
+    """
+    Build, test and move to the output directory the wheel for `config`,
+    from the project at `project_dir`. Builds of other identifiers might be
+    running alongside this one, each in its own project directory.
+    """
+    log.build_start(config.identifier)
+    build_path = tmp_path / config.identifier
+    build_path.mkdir()
+    python_dir = setup_target_python(config, build_path)
+    build_env, android_env = setup_env(config, build_options, project_dir, build_path, python_dir)
+
+    state = BuildState(
+        config, build_options, project_dir, build_path, python_dir, build_env, android_env
+    )
+    setup_xbuild_files(state)
+
+    compatible_wheel = built_wheels.find_compatible(config.identifier)
+    if compatible_wheel:
+        print(
+            f"\nFound previously built wheel {compatible_wheel.name} that is "
+            f"compatible with {config.identifier}. Skipping build step..."
+        )
+        repaired_wheel = compatible_wheel
+    else:
+        before_build(state)
+        built_wheel = build_wheel(state)
+        repaired_wheel = repair_wheel(state, built_wheel)
+        # the audit venv is shared between builds
+        with _audit_lock:
+            run_audit(tmp_dir=tmp_path, build_options=build_options, wheel=repaired_wheel)
+
+    # builds running alongside each other take turns with the emulator
+    with _test_lock:
+        test_wheel(state, repaired_wheel)
+
+    output_wheel: Path | None = None
+    if compatible_wheel is None:
+        with built_wheels.lock:
+            if repaired_wheel.name in {wheel.name for wheel in built_wheels.wheels}:
+                # a build running alongside this one might have produced the
+                # same abi3 wheel, in which case that one is reused
+                compatible_wheel = find_compatible_wheel(built_wheels.wheels, config.identifier)
+                if compatible_wheel is None or compatible_wheel.name != repaired_wheel.name:
+                    raise errors.AlreadyBuiltWheelError(repaired_wheel.name)
                 print(
-                    f"\nFound previously built wheel {compatible_wheel.name} that is "
-                    f"compatible with {config.identifier}. Skipping build step..."
+                    f"\nWheel {compatible_wheel.name} was also built for another identifier in the meantime, reusing it for {config.identifier}..."
                 )
-                repaired_wheel = compatible_wheel
             else:
-                before_build(state)
-                built_wheel = build_wheel(state)
-                repaired_wheel = repair_wheel(state, built_wheel)
-                run_audit(tmp_dir=tmp_path, build_options=build_options, wheel=repaired_wheel)
-
-            test_wheel(state, repaired_wheel)
-
-            output_wheel: Path | None = None
-            if compatible_wheel is None:
                 output_wheel = move_file(
                     repaired_wheel, build_options.output_dir / repaired_wheel.name
                 )
-                built_wheels.append(output_wheel)
+                built_wheels.wheels.append(output_wheel)
 
-            shutil.rmtree(build_path)
-            log.build_end(output_wheel)
-
-    except subprocess.CalledProcessError as error:
-        msg = f"Command {error.cmd} failed with code {error.returncode}. {error.stdout or ''}"
-        raise errors.FatalError(msg) from error
+    shutil.rmtree(build_path)
+    log.build_end(output_wheel, reused_wheel=compatible_wheel)
+    submit_post_build(build_options=build_options, identifier=config.identifier, wheel=output_wheel)
 
 
 def setup_target_python(config: PythonConfiguration, build_path: Path) -> Path:
@@ -232,7 +337,11 @@ def setup_target_python(config: PythonConfiguration, build_path: Path) -> Path:
 
 
 def setup_env(
-    config: PythonConfiguration, build_options: BuildOptions, build_path: Path, python_dir: Path
+    config: PythonConfiguration,
+    build_options: BuildOptions,
+    project_dir: Path,
+    build_path: Path,
+    python_dir: Path,
 ) -> tuple[dict[str, str], dict[str, str]]:
     """
     Returns two environment dicts, both pointing at the same virtual environment:
@@ -311,7 +420,7 @@ def make_extra_environ(self) -> dict[str, str]:
         parse_config_settings(
             prepare_config_settings(
                 build_options.config_settings,
-                project=Path.cwd(),
+                project=project_dir,
                 package=build_options.package_dir,
             )
         ),
@@ -580,6 +689,7 @@ def before_build(state: BuildState) -> None:
             state.options.before_build,
             build_options=state.options,
             env=state.android_env,
+            cwd=state.project_dir,
         )
 
 
@@ -602,11 +712,12 @@ def build_wheel(state: BuildState) -> Path:
                     state.options.build_verbosity,
                     prepare_config_settings(
                         state.options.config_settings,
-                        project=Path.cwd(),
+                        project=state.project_dir,
                         package=state.options.package_dir,
                     ),
                 ),
                 env=state.android_env,
+                cwd=state.project_dir,
             )
         case "uv":
             uv_path = find_uv()
@@ -623,11 +734,12 @@ def build_wheel(state: BuildState) -> Path:
                     state.options.build_verbosity,
                     prepare_config_settings(
                         state.options.config_settings,
-                        project=Path.cwd(),
+                        project=state.project_dir,
                         package=state.options.package_dir,
                     ),
                 ),
                 env=state.android_env,
+                cwd=state.project_dir,
             )
         case x:
             msg = f"Android requires the build frontend to be 'build' or 'uv', not {x!r}"
@@ -665,6 +777,7 @@ def repair_wheel(state: BuildState, built_wheel: Path) -> Path:
                 project=".",
             ),
             env=state.build_env,
+            cwd=state.project_dir,
         )
     else:
         shutil.move(built_wheel, repaired_wheel_dir)
@@ -702,6 +815,7 @@ def test_wheel(state: BuildState, wheel: Path) -> None:
             state.options.before_test,
             build_options=state.options,
             env=state.android_env,
+            cwd=state.project_dir,
         )
 
     # Install the wheel and test-requires.
@@ -718,7 +832,7 @@ def test_wheel(state: BuildState, wheel: Path) -> None:
     cwd_dir = state.build_path / "cwd"
     cwd_dir.mkdir()
     if state.options.test_sources:
-        copy_test_sources(state.options.test_sources, Path.cwd(), cwd_dir)
+        copy_test_sources(state.options.test_sources, state.project_dir, cwd_dir)
     else:
         (cwd_dir / "test_fail.py").write_text(
             resources.TEST_FAIL_CWD_FILE.read_text(),
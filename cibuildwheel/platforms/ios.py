@@ -5,6 +5,7 @@
     "cibuildwheel.frontend",
     "cibuildwheel.logger",
     "cibuildwheel.platforms.macos",
+    "cibuildwheel.post_build",
     "cibuildwheel.util",
     "cibuildwheel.util.cmd",
     "cibuildwheel.util.file",
@@ -45,19 +46,23 @@
     prepare_config_settings,
 )
 from cibuildwheel.logger import log
+from cibuildwheel.platforms.macos import cpython_installer_artifacts
 from cibuildwheel.platforms.macos import install_cpython as install_build_cpython
+from cibuildwheel.post_build import submit_post_build
 from cibuildwheel.util import resources
 from cibuildwheel.util.cmd import call, shell, split_command
 from cibuildwheel.util.file import (
     CIBW_CACHE_PATH,
+    Artifact,
     copy_test_sources,
-    download,
+    fetch,
     move_file,
+    prefetched_path,
     remove_on_error,
 )
 from cibuildwheel.util.helpers import prepare_command, unwrap_preserving_paragraphs
 from cibuildwheel.util.packaging import find_compatible_wheel
-from cibuildwheel.venv import constraint_flags, virtualenv
+from cibuildwheel.venv import constraint_flags, virtualenv, virtualenv_artifact
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
@@ -163,6 +168,31 @@ def get_python_configurations(
     return python_configurations
 
 
+def required_artifacts(identifiers: Sequence[str]) -> list[Artifact]:
+    """
+    The files that building `identifiers` downloads, for them to be
+    prefetched.
+    """
+    result = []
+    for config in all_python_configurations():
+        if config.identifier not in identifiers:
+            continue
+        free_threading = "t-ios" in config.identifier
+        result += cpython_installer_artifacts(
+            config.version, config.build_url, free_threading, config.build_sha256
+        )
+        result.append(
+            Artifact(
+                url=config.url,
+                sha256=config.sha256,
+                path=prefetched_path(config.url),
+                installed=CIBW_CACHE_PATH / config.url.rsplit("/", 1)[-1].removesuffix(".tar.gz"),
+            )
+        )
+        result.append(virtualenv_artifact(config.version))
+    return result
+
+
 def install_target_cpython(tmp: Path, config: PythonConfiguration, free_threading: bool) -> Path:
     if free_threading:
         msg = "Free threading builds aren't available for iOS (yet)"
@@ -176,7 +206,7 @@ def install_target_cpython(tmp: Path, config: PythonConfiguration, free_threadin
     with FileLock(str(installation_path) + ".lock"):
         if not installation_path.exists():
             downloaded_tar_gz = tmp / ios_python_tar_gz
-            download(config.url, downloaded_tar_gz, sha256=config.sha256)
+            fetch(config.url, downloaded_tar_gz, sha256=config.sha256)
             with remove_on_error(installation_path):
                 installation_path.mkdir(parents=True)
                 call("tar", "-C", installation_path, "-xf", downloaded_tar_gz)
@@ -810,7 +840,10 @@ def build(options: Options, tmp_path: Path) -> None:
             # Clean up
             shutil.rmtree(identifier_tmp_dir)
 
-            log.build_end(output_wheel)
+            log.build_end(output_wheel, reused_wheel=compatible_wheel)
+            submit_post_build(
+                build_options=build_options, identifier=config.identifier, wheel=output_wheel
+            )
     except subprocess.CalledProcessError as error:
         msg = f"Command {error.cmd} failed with code {error.returncode}. {error.stdout or ''}"
         raise errors.FatalError(msg) from error
@@ -2,49 +2,86 @@
 
 __lazy_modules__ = {
     "cibuildwheel.audit",
+    "cibuildwheel.before_all_snapshot",
+    "cibuildwheel.compiler_cache",
     "cibuildwheel.frontend",
     "cibuildwheel.logger",
+    "cibuildwheel.post_build",
+    "cibuildwheel.project_sync",
     "cibuildwheel.util",
+    "cibuildwheel.util.cmd",
+    "cibuildwheel.util.concurrency",
     "cibuildwheel.util.file",
     "cibuildwheel.util.helpers",
     "cibuildwheel.util.packaging",
     "collections",
     "contextlib",
+    "functools",
+    "humanize",
     "pathlib",
     "shutil",
     "subprocess",
+    "tempfile",
     "textwrap",
+    "time",
     "typing",
 }
 
 import contextlib
 import dataclasses
+import functools
 import shutil
 import subprocess
 import sys
+import tempfile
 import textwrap
+import threading
+import time
 from collections import OrderedDict
 from pathlib import Path, PurePath, PurePosixPath
 from typing import assert_never
 
+import humanize
+
 from cibuildwheel import errors
 from cibuildwheel.architecture import Architecture
 from cibuildwheel.audit import needs_audit, run_audit
+from cibuildwheel.before_all_snapshot import SNAPSHOT_LABEL, snapshot_tag
+from cibuildwheel.compiler_cache import (
+    CompilerCache,
+    compiler_cache_dir,
+    compiler_cache_environment,
+    describe_stats_change,
+    read_stats,
+)
 from cibuildwheel.frontend import get_build_frontend_extra_flags, prepare_config_settings
 from cibuildwheel.logger import log
-from cibuildwheel.oci_container import OCIContainer, OCIContainerEngineConfig, OCIPlatform
+from cibuildwheel.oci_container import (
+    COMPILER_CACHE_MOUNT_PATH,
+    ImagePrefetcher,
+    OCIContainer,
+    OCIContainerEngineConfig,
+    OCIPlatform,
+    container_cache_dir,
+)
+from cibuildwheel.post_build import submit_post_build
+from cibuildwheel.project_sync import sync_project
 from cibuildwheel.util import resources
-from cibuildwheel.util.file import copy_test_sources
+from cibuildwheel.util.cmd import call
+from cibuildwheel.util.concurrency import BackgroundQueue, run_in_parallel
+from cibuildwheel.util.file import copy_test_sources, directory_size
 from cibuildwheel.util.helpers import prepare_command, unwrap
-from cibuildwheel.util.packaging import find_compatible_wheel
+from cibuildwheel.util.packaging import BuiltWheels, find_compatible_wheel
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator, Sequence, Set
+    from collections.abc import Iterable, Iterator, Mapping, Sequence, Set
 
+    from cibuildwheel.compiler_cache import CompilerCacheStats, CompilerCacheTool
     from cibuildwheel.options import BuildOptions, Options
     from cibuildwheel.selector import BuildSelector
     from cibuildwheel.typing import PathOrStr
+    from cibuildwheel.util.file import Artifact
 
 ARCHITECTURE_OCI_PLATFORM_MAP = {
     Architecture.x86_64: OCIPlatform.AMD64,
@@ -76,11 +113,52 @@ class BuildStep:
     container_image: str
 
 
+_audit_lock = threading.Lock()
+
+# prints the path to ccache, installing it with the image's package manager
+# if needed. Installer output goes to stderr, so that stdout is just the path.
+CCACHE_INSTALL_SCRIPT = """
+set -e
+if ! command -v ccache > /dev/null; then
+    if command -v dnf > /dev/null; then
+        dnf install -y ccache >&2 || { dnf install -y epel-release && dnf install -y ccache; } >&2
+    elif command -v yum > /dev/null; then
+        yum install -y ccache >&2 || { yum install -y epel-release && yum install -y ccache; } >&2
+    elif command -v apk > /dev/null; then
+        apk add --no-cache ccache >&2
+    elif command -v apt-get > /dev/null; then
+        { apt-get update && apt-get install -y ccache; } >&2
+    fi
+fi
+command -v ccache
+"""
+
+# sccache is installed from its wheel on PyPI, with the utility python
+SCCACHE_PREFIX = PurePosixPath("/opt/cibuildwheel/sccache")
+SCCACHE_INSTALL_SCRIPT = f"""
+set -e
+if ! command -v sccache > /dev/null; then
+    {OCIContainer.UTILITY_PYTHON} -m pip install --prefix={SCCACHE_PREFIX} sccache >&2
+    echo {SCCACHE_PREFIX / "bin" / "sccache"}
+else
+    command -v sccache
+fi
+"""
+
+
 def all_python_configurations() -> list[PythonConfiguration]:
     config_dicts = resources.read_python_configs("linux")
     return [PythonConfiguration(**item) for item in config_dicts]
 
 
+def required_artifacts(identifiers: Sequence[str]) -> list[Artifact]:  # noqa: ARG001
+    """
+    The files that building `identifiers` downloads. Linux builds run in
+    containers that already have everything they need, so none.
+    """
+    return []
+
+
 def get_python_configurations(
     build_selector: BuildSelector,
     architectures: Set[Architecture],
@@ -150,6 +228,50 @@ def get_build_steps(
     yield from steps.values()
 
 
+def install_compiler_cache(container: OCIContainer, tool: CompilerCacheTool) -> CompilerCache:
+    """
+    Make `tool` available in the container, and choose where it keeps its
+    cache: in the host directory mounted into the container, if there is
+    one, so that it's kept between runs.
+    """
+    match tool:
+        case "ccache":
+            script = CCACHE_INSTALL_SCRIPT
+        case "sccache":
+            script = SCCACHE_INSTALL_SCRIPT
+        case _:
+            assert_never(tool)
+
+    env = {"PIP_DISABLE_PIP_VERSION_CHECK": "1", "PIP_ROOT_USER_ACTION": "ignore"}
+    try:
+        output = container.call(["sh", "-c", script], env=env, capture_output=True)
+    except subprocess.CalledProcessError as error:
+        msg = (
+            f"compiler-cache is set to {tool!r}, but {tool} couldn't be installed in "
+            f"{container.image}. Install it in before-all instead."
+        )
+        raise errors.FatalError(msg) from error
+
+    if container.compiler_cache_mount is not None:
+        cache_dir = COMPILER_CACHE_MOUNT_PATH / tool
+    else:
+        cache_dir = PurePosixPath("/tmp/cibuildwheel/compiler-cache") / tool
+    return CompilerCache(tool=tool, tool_path=output.strip().splitlines()[-1], cache_dir=cache_dir)
+
+
+def _read_compiler_cache_stats(
+    *,
+    container: OCIContainer,
+    compiler_cache: CompilerCache | None,
+    env: Mapping[str, str],
+) -> CompilerCacheStats | None:
+    if compiler_cache is None:
+        return None
+    return read_stats(
+        compiler_cache, functools.partial(container.call, env=env, capture_output=True)
+    )
+
+
 def check_all_python_exist(
     *, platform_configs: Iterable[PythonConfiguration], container: OCIContainer
 ) -> None:
@@ -186,6 +308,13 @@ def check_all_python_exist(
         raise errors.FatalError(message)
 
 
+# how many images are pulled at the same time, ahead of the steps that use them
+IMAGE_PREFETCH_JOBS = 3
+
+# written in pooled containers once before_all has succeeded
+BEFORE_ALL_DONE_MARKER = PurePosixPath("/var/lib/cibuildwheel/before_all_done")
+
+
 def build_in_container(
     *,
     options: Options,
@@ -194,18 +323,40 @@ def build_in_container(
     container_project_path: PurePath,
     container_package_dir: PurePath,
     local_tmp_dir: Path,
+    jobs: int = 1,
+    before_all_snapshot: str | None = None,
 ) -> None:
+    """
+    Build the wheels for `platform_configs` in `container`. If
+    `before_all_snapshot` is set, the container is saved as that image
+    after before_all runs.
+    """
     container_output_dir = PurePosixPath("/output")
 
     check_all_python_exist(platform_configs=platform_configs, container=container)
 
-    log.step("Copying project into container...")
-    container.copy_into(Path.cwd(), container_project_path)
-
     before_all_options_identifier = platform_configs[0].identifier
     before_all_options = options.build_options(before_all_options_identifier)
 
-    if before_all_options.before_all:
+    if container.project_mount is not None:
+        log.step("Mounting project into container...")
+        container.setup_project_mount(PurePosixPath(container_project_path))
+    else:
+        log.step("Copying project into container...")
+        sync_project(
+            container,
+            Path.cwd(),
+            PurePosixPath(container_project_path),
+            before_all_options.project_sync,
+        )
+
+    if (
+        before_all_options.before_all
+        and container.reused
+        and container.exists(BEFORE_ALL_DONE_MARKER)
+    ):
+        print("info: Skipping before_all, it already ran in this container")
+    elif before_all_options.before_all:
         log.step("Running before_all...")
 
         env = container.get_environment()
@@ -222,289 +373,506 @@ def build_in_container(
             package=container_package_dir,
         )
         container.call(["sh", "-c", before_all_prepared], env=env)
+        if container.engine.pool_ttl or before_all_snapshot:
+            container.mkdir(BEFORE_ALL_DONE_MARKER.parent)
+            container.call(["touch", BEFORE_ALL_DONE_MARKER])
+        if before_all_snapshot:
+            log.step("Saving a snapshot of the container...")
+            start = time.time()
+            container.commit(before_all_snapshot, labels={SNAPSHOT_LABEL: "1"})
+            print(
+                f"info: Saved the container as {before_all_snapshot} in "
+                f"{time.time() - start:.1f}s, later runs will start from it"
+            )
 
-    built_wheels: list[PurePosixPath] = []
+    compiler_caches: dict[CompilerCacheTool, CompilerCache] = {}
+    for tool in sorted(
+        {
+            tool
+            for config in platform_configs
+            if (tool := options.build_options(config.identifier).compiler_cache.tool)
+        }
+    ):
+        log.step(f"Installing {tool}...")
+        compiler_caches[tool] = install_compiler_cache(container, tool)
+
+    built_wheels = BuiltWheels[PurePosixPath]()
+
+    if jobs <= 1:
+        with contextlib.ExitStack() as stack:
+            test_queue = None
+            if options.globals.pipeline_tests:
+                test_queue = stack.enter_context(BackgroundQueue())
+            for config in platform_configs:
+                _build_identifier(
+                    options=options,
+                    config=config,
+                    container=container,
+                    container_project_path=container_project_path,
+                    container_package_dir=container_package_dir,
+                    container_output_dir=container_output_dir,
+                    local_tmp_dir=local_tmp_dir,
+                    built_wheels=built_wheels,
+                    compiler_caches=compiler_caches,
+                    test_queue=test_queue,
+                )
+    else:
+
+        def build_in_session(config: PythonConfiguration) -> None:
+            # each build gets its own shell, and its own copy of the project,
+            # so that in-tree build artifacts don't collide
+            with container.exec_session() as session:
+                project_path = PurePosixPath("/tmp/cibuildwheel") / config.identifier / "project"
+                session.mkdir(project_path)
+                session.call(["cp", "-a", f"{container_project_path}/.", project_path])
+                session.cwd = project_path
+                _build_identifier(
+                    options=options,
+                    config=config,
+                    container=session,
+                    container_project_path=project_path,
+                    container_package_dir=project_path
+                    / container_package_dir.relative_to(container_project_path),
+                    container_output_dir=container_output_dir,
+                    local_tmp_dir=local_tmp_dir,
+                    built_wheels=built_wheels,
+                    compiler_caches=compiler_caches,
+                )
 
-    for config in platform_configs:
-        log.build_start(config.identifier)
-        local_identifier_tmp_dir = local_tmp_dir / config.identifier
-        build_options = options.build_options(config.identifier)
-        build_frontend = build_options.build_frontend
-        use_uv = build_frontend.name in {"build[uv]", "uv"}
-        pip = ["uv", "pip"] if use_uv else ["pip"]
+        run_in_parallel(
+            [
+                (config.identifier, functools.partial(build_in_session, config))
+                for config in platform_configs
+            ],
+            jobs=jobs,
+        )
 
-        log.step("Setting up build environment...")
 
-        dependency_constraint_flags: list[PathOrStr] = []
-        local_constraints_file = build_options.dependency_constraints.get_for_python_version(
-            version=config.version,
-            tmp_dir=local_identifier_tmp_dir,
-        )
-        if local_constraints_file:
-            container_constraints_file = PurePosixPath("/constraints.txt")
-            container.copy_into(local_constraints_file, container_constraints_file)
-            dependency_constraint_flags = ["-c", container_constraints_file]
+def _build_identifier(
+    *,
+    options: Options,
+    config: PythonConfiguration,
+    container: OCIContainer,
+    container_project_path: PurePath,
+    container_package_dir: PurePath,
+    container_output_dir: PurePosixPath,
+    local_tmp_dir: Path,
+    built_wheels: BuiltWheels[PurePosixPath],
+    compiler_caches: Mapping[CompilerCacheTool, CompilerCache],
+    test_queue: BackgroundQueue | None = None,
+) -> None:
+    """
+    Build and test the wheel for `config`. If `test_queue` is given, the
+    test runs from there, in another shell session, and this returns as
+    soon as the wheel is built.
+    """
+    log.build_start(config.identifier)
+    local_identifier_tmp_dir = local_tmp_dir / config.identifier
+    build_options = options.build_options(config.identifier)
+    build_frontend = build_options.build_frontend
+    use_uv = build_frontend.name in {"build[uv]", "uv"}
 
-        env = container.get_environment()
-        env["PIP_DISABLE_PIP_VERSION_CHECK"] = "1"
-        env["PIP_ROOT_USER_ACTION"] = "ignore"
+    log.step("Setting up build environment...")
 
-        # put this config's python top of the list
-        python_bin = config.path / "bin"
-        env["PATH"] = f"{python_bin}:{env['PATH']}"
+    temp_dir = PurePosixPath("/tmp/cibuildwheel") / config.identifier
 
-        env = build_options.environment.as_dictionary(env, executor=container.environment_executor)
-        env["CIBUILDWHEEL_BUILD_IDENTIFIER"] = config.identifier
+    dependency_constraint_flags: list[PathOrStr] = []
+    local_constraints_file = build_options.dependency_constraints.get_for_python_version(
+        version=config.version,
+        tmp_dir=local_identifier_tmp_dir,
+    )
+    if local_constraints_file:
+        container_constraints_file = temp_dir / "constraints.txt"
+        container.copy_into(local_constraints_file, container_constraints_file)
+        dependency_constraint_flags = ["-c", container_constraints_file]
+
+    env = container.get_environment()
+    env["PIP_DISABLE_PIP_VERSION_CHECK"] = "1"
+    env["PIP_ROOT_USER_ACTION"] = "ignore"
+
+    # put this config's python top of the list
+    python_bin = config.path / "bin"
+    env["PATH"] = f"{python_bin}:{env['PATH']}"
+
+    env = build_options.environment.as_dictionary(env, executor=container.environment_executor)
+    env["CIBUILDWHEEL_BUILD_IDENTIFIER"] = config.identifier
+
+    compiler_cache_tool = build_options.compiler_cache.tool
+    compiler_cache = compiler_caches[compiler_cache_tool] if compiler_cache_tool else None
+    compiler_cache_stats: str | None = None
+    if compiler_cache is not None:
+        env = compiler_cache_environment(
+            compiler_cache,
+            config=build_options.compiler_cache,
+            base_dir=container_project_path,
+            env=env,
+            compilers=("gcc", "g++"),
+        )
 
-        # check config python is still on PATH
-        which_python = container.call(["which", "python"], env=env, capture_output=True).strip()
-        if PurePosixPath(which_python) != python_bin / "python":
-            msg = "python available on PATH doesn't match our installed instance. If you have modified PATH, ensure that you don't overwrite cibuildwheel's entry or insert python above it."
+    # check config python is still on PATH
+    which_python = container.which("python", env=env)
+    if which_python is None or PurePosixPath(which_python) != python_bin / "python":
+        msg = "python available on PATH doesn't match our installed instance. If you have modified PATH, ensure that you don't overwrite cibuildwheel's entry or insert python above it."
+        raise errors.FatalError(msg)
+    container.call(["python", "-V", "-V"], env=env)
+
+    if use_uv:
+        which_uv = container.which("uv", env=env)
+        if not which_uv:
+            msg = "uv not found on PATH. You must use a supported manylinux or musllinux environment with uv."
+            raise errors.FatalError(msg)
+    else:
+        which_pip = container.which("pip", env=env)
+        if which_pip is None or PurePosixPath(which_pip) != python_bin / "pip":
+            msg = "pip available on PATH doesn't match our installed instance. If you have modified PATH, ensure that you don't overwrite cibuildwheel's entry or insert pip above it."
             raise errors.FatalError(msg)
-        container.call(["python", "-V", "-V"], env=env)
 
-        if use_uv:
-            which_uv = container.call(["which", "uv"], env=env, capture_output=True).strip()
-            if not which_uv:
-                msg = "uv not found on PATH. You must use a supported manylinux or musllinux environment with uv."
-                raise errors.FatalError(msg)
-        else:
-            which_pip = container.call(["which", "pip"], env=env, capture_output=True).strip()
-            if PurePosixPath(which_pip) != python_bin / "pip":
-                msg = "pip available on PATH doesn't match our installed instance. If you have modified PATH, ensure that you don't overwrite cibuildwheel's entry or insert pip above it."
+    compatible_wheel = built_wheels.find_compatible(config.identifier)
+    if compatible_wheel:
+        log.step_end()
+        print(
+            f"\nFound previously built wheel {compatible_wheel.name}, that's compatible with {config.identifier}. Skipping build step..."
+        )
+        repaired_wheel = compatible_wheel
+    else:
+        if build_options.before_build:
+            log.step("Running before_build...")
+            before_build_prepared = prepare_command(
+                build_options.before_build,
+                project=container_project_path,
+                package=container_package_dir,
+            )
+            before_build_env = env.copy()
+            if use_uv:
+                # On Linux, no virtualenv is created for the build environment
+                # (unlike macOS/Windows, where one is set up before before_build
+                # runs). uv requires either an active venv or an explicit Python
+                # target to install packages. Pin UV_PYTHON to the exact interpreter
+                # for this build so that `uv pip install` works in before_build
+                # without requiring users to pass --system.
+                before_build_env["UV_PYTHON"] = str(python_bin / "python")
+            container.call(["sh", "-c", before_build_prepared], env=before_build_env)
+
+        log.step("Building wheel...")
+
+        built_wheel_dir = temp_dir / "built_wheel"
+        container.remove(built_wheel_dir)
+        container.mkdir(built_wheel_dir)
+
+        read_compiler_cache_stats = functools.partial(
+            _read_compiler_cache_stats, container=container, compiler_cache=compiler_cache, env=env
+        )
+        compiler_cache_stats_before = read_compiler_cache_stats()
+
+        extra_flags = get_build_frontend_extra_flags(
+            build_frontend,
+            build_options.build_verbosity,
+            prepare_config_settings(
+                build_options.config_settings,
+                project=container_project_path,
+                package=container_package_dir,
+            ),
+        )
+
+        match build_frontend.name:
+            case "pip":
+                container.call(
+                    [
+                        "python",
+                        "-m",
+                        "pip",
+                        "wheel",
+                        container_package_dir,
+                        f"--wheel-dir={built_wheel_dir}",
+                        "--no-deps",
+                        *extra_flags,
+                    ],
+                    env=env,
+                )
+            case "build" | "build[uv]":
+                if use_uv and "--no-isolation" not in extra_flags and "-n" not in extra_flags:
+                    extra_flags += ["--installer=uv"]
+                container.call(
+                    [
+                        "python",
+                        "-m",
+                        "build",
+                        container_package_dir,
+                        "--wheel",
+                        f"--outdir={built_wheel_dir}",
+                        *extra_flags,
+                    ],
+                    env=env,
+                )
+            case "uv":
+                container.call(
+                    [
+                        "uv",
+                        "build",
+                        f"--python={python_bin / 'python'}",
+                        container_package_dir,
+                        "--wheel",
+                        f"--out-dir={built_wheel_dir}",
+                        *extra_flags,
+                    ],
+                    env=env,
+                )
+            case "pyodide-build":
+                msg = "The 'pyodide-build' build frontend is not supported on this platform"
                 raise errors.FatalError(msg)
+            case _:
+                assert_never(build_frontend)
 
-        compatible_wheel = find_compatible_wheel(built_wheels, config.identifier)
-        if compatible_wheel:
-            log.step_end()
-            print(
-                f"\nFound previously built wheel {compatible_wheel.name}, that's compatible with {config.identifier}. Skipping build step..."
+        compiler_cache_stats = describe_stats_change(
+            compiler_cache_stats_before, read_compiler_cache_stats()
+        )
+        if compiler_cache_stats:
+            print(f"info: Compiler cache: {compiler_cache_stats}")
+
+        try:
+            built_wheel = container.glob(built_wheel_dir, "*.whl")[0]
+        except IndexError:
+            raise errors.BuildProducedNoWheelError() from None
+
+        repaired_wheel_dir = temp_dir / "repaired_wheel"
+        container.remove(repaired_wheel_dir)
+        container.mkdir(repaired_wheel_dir)
+
+        if built_wheel.name.endswith("none-any.whl"):
+            raise errors.NonPlatformWheelError()
+
+        if build_options.repair_command:
+            log.step("Repairing wheel...")
+            repair_command_prepared = prepare_command(
+                build_options.repair_command,
+                wheel=built_wheel,
+                dest_dir=repaired_wheel_dir,
+                package=container_package_dir,
+                project=container_project_path,
             )
-            repaired_wheel = compatible_wheel
+            container.call(["sh", "-c", repair_command_prepared], env=env)
         else:
-            if build_options.before_build:
-                log.step("Running before_build...")
-                before_build_prepared = prepare_command(
-                    build_options.before_build,
-                    project=container_project_path,
-                    package=container_package_dir,
-                )
-                before_build_env = env.copy()
-                if use_uv:
-                    # On Linux, no virtualenv is created for the build environment
-                    # (unlike macOS/Windows, where one is set up before before_build
-                    # runs). uv requires either an active venv or an explicit Python
-                    # target to install packages. Pin UV_PYTHON to the exact interpreter
-                    # for this build so that `uv pip install` works in before_build
-                    # without requiring users to pass --system.
-                    before_build_env["UV_PYTHON"] = str(python_bin / "python")
-                container.call(["sh", "-c", before_build_prepared], env=before_build_env)
-
-            log.step("Building wheel...")
-
-            temp_dir = PurePosixPath("/tmp/cibuildwheel")
-            built_wheel_dir = temp_dir / "built_wheel"
-            container.call(["rm", "-rf", built_wheel_dir])
-            container.call(["mkdir", "-p", built_wheel_dir])
-
-            extra_flags = get_build_frontend_extra_flags(
-                build_frontend,
-                build_options.build_verbosity,
-                prepare_config_settings(
-                    build_options.config_settings,
-                    project=container_project_path,
-                    package=container_package_dir,
-                ),
-            )
+            container.move(built_wheel, repaired_wheel_dir)
 
-            match build_frontend.name:
-                case "pip":
-                    container.call(
-                        [
-                            "python",
-                            "-m",
-                            "pip",
-                            "wheel",
-                            container_package_dir,
-                            f"--wheel-dir={built_wheel_dir}",
-                            "--no-deps",
-                            *extra_flags,
-                        ],
-                        env=env,
-                    )
-                case "build" | "build[uv]":
-                    if use_uv and "--no-isolation" not in extra_flags and "-n" not in extra_flags:
-                        extra_flags += ["--installer=uv"]
-                    container.call(
-                        [
-                            "python",
-                            "-m",
-                            "build",
-                            container_package_dir,
-                            "--wheel",
-                            f"--outdir={built_wheel_dir}",
-                            *extra_flags,
-                        ],
-                        env=env,
-                    )
-                case "uv":
-                    container.call(
-                        [
-                            "uv",
-                            "build",
-                            f"--python={python_bin / 'python'}",
-                            container_package_dir,
-                            "--wheel",
-                            f"--out-dir={built_wheel_dir}",
-                            *extra_flags,
-                        ],
-                        env=env,
-                    )
-                case "pyodide-build":
-                    msg = "The 'pyodide-build' build frontend is not supported on this platform"
-                    raise errors.FatalError(msg)
-                case _:
-                    assert_never(build_frontend)
+        match container.glob(repaired_wheel_dir, "*.whl"):
+            case []:
+                raise errors.RepairStepProducedNoWheelError()
+            case [repaired_wheel]:
+                pass
+            case too_many:
+                raise errors.RepairStepProducedMultipleWheelsError([p.name for p in too_many])
 
+        log.step_end()
+
+        if needs_audit(build_options.audit_command, repaired_wheel.name):
+            local_abi3audit_dir = local_identifier_tmp_dir / "audit"
+            local_abi3audit_dir.mkdir(parents=True, exist_ok=True)
             try:
-                built_wheel = container.glob(built_wheel_dir, "*.whl")[0]
-            except IndexError:
-                raise errors.BuildProducedNoWheelError() from None
-
-            repaired_wheel_dir = temp_dir / "repaired_wheel"
-            container.call(["rm", "-rf", repaired_wheel_dir])
-            container.call(["mkdir", "-p", repaired_wheel_dir])
-
-            if built_wheel.name.endswith("none-any.whl"):
-                raise errors.NonPlatformWheelError()
-
-            if build_options.repair_command:
-                log.step("Repairing wheel...")
-                repair_command_prepared = prepare_command(
-                    build_options.repair_command,
-                    wheel=built_wheel,
-                    dest_dir=repaired_wheel_dir,
-                    package=container_package_dir,
-                    project=container_project_path,
-                )
-                container.call(["sh", "-c", repair_command_prepared], env=env)
-            else:
-                container.call(["mv", built_wheel, repaired_wheel_dir])
-
-            match container.glob(repaired_wheel_dir, "*.whl"):
-                case []:
-                    raise errors.RepairStepProducedNoWheelError()
-                case [repaired_wheel]:
-                    pass
-                case too_many:
-                    raise errors.RepairStepProducedMultipleWheelsError([p.name for p in too_many])
-
-            if repaired_wheel.name in {wheel.name for wheel in built_wheels}:
-                raise errors.AlreadyBuiltWheelError(repaired_wheel.name)
-
-            log.step_end()
-
-            if needs_audit(build_options.audit_command, repaired_wheel.name):
-                local_abi3audit_dir = local_identifier_tmp_dir / "audit"
-                local_abi3audit_dir.mkdir(parents=True, exist_ok=True)
-                try:
-                    container.copy_out(repaired_wheel_dir, local_abi3audit_dir)
-                    local_wheel = local_abi3audit_dir / repaired_wheel.name
+                container.copy_out(repaired_wheel_dir, local_abi3audit_dir)
+                local_wheel = local_abi3audit_dir / repaired_wheel.name
+                # the audit venv in local_tmp_dir is shared between builds
+                with _audit_lock:
                     run_audit(tmp_dir=local_tmp_dir, build_options=build_options, wheel=local_wheel)
-                finally:
-                    shutil.rmtree(local_abi3audit_dir, ignore_errors=True)
-
-        if build_options.test_command and build_options.test_selector(config.identifier):
-            log.step("Testing wheel...")
-
-            # set up a virtual environment to install and test from, to make sure
-            # there are no dependencies that were pulled in at build time.
-            if not use_uv:
-                container.call(
-                    ["pip", "install", "virtualenv", *dependency_constraint_flags], env=env
-                )
+            finally:
+                shutil.rmtree(local_abi3audit_dir, ignore_errors=True)
+
+    test_wheel = None
+    if build_options.test_command and build_options.test_selector(config.identifier):
+        test_wheel = functools.partial(
+            _test_identifier,
+            config=config,
+            build_options=build_options,
+            env=env,
+            repaired_wheel=repaired_wheel,
+            dependency_constraint_flags=dependency_constraint_flags,
+        )
 
-            testing_temp_dir = PurePosixPath(
-                container.call(["mktemp", "-d"], capture_output=True).strip()
+    def finish(container: OCIContainer, project_path: PurePath) -> None:
+        if test_wheel is not None:
+            test_wheel(
+                container=container,
+                container_project_path=project_path,
+                container_package_dir=project_path
+                / container_package_dir.relative_to(container_project_path),
             )
-            venv_dir = testing_temp_dir / "venv"
 
-            if use_uv:
-                container.call(["uv", "venv", venv_dir, "--python", python_bin / "python"], env=env)
-            else:
-                # Use embedded dependencies from virtualenv to ensure determinism
-                venv_args = ["--no-periodic-update", "--pip=embed", "--no-setuptools"]
-                if "38" in config.identifier:
-                    venv_args.append("--no-wheel")
-                container.call(["python", "-m", "virtualenv", *venv_args, venv_dir], env=env)
-
-            virtualenv_env = env.copy()
-            virtualenv_env["PATH"] = f"{venv_dir / 'bin'}:{virtualenv_env['PATH']}"
-            virtualenv_env["VIRTUAL_ENV"] = str(venv_dir)
-            virtualenv_env = build_options.test_environment.as_dictionary(
-                prev_environment=virtualenv_env
+        output_wheel: Path | None = None
+        reused_wheel: PurePosixPath | None = compatible_wheel
+        if compatible_wheel is None:
+            # only tested wheels go to the output, where later builds look
+            # for ones to reuse
+            with built_wheels.lock:
+                if repaired_wheel.name in {wheel.name for wheel in built_wheels.wheels}:
+                    # a build running alongside this one might have produced
+                    # the same abi3 wheel, in which case that one is reused
+                    reused_wheel = find_compatible_wheel(built_wheels.wheels, config.identifier)
+                    if reused_wheel is None or reused_wheel.name != repaired_wheel.name:
+                        raise errors.AlreadyBuiltWheelError(repaired_wheel.name)
+                    print(
+                        f"\nWheel {reused_wheel.name} was also built for another identifier in the meantime, reusing it for {config.identifier}..."
+                    )
+                else:
+                    container.mkdir(container_output_dir)
+                    container.move(repaired_wheel, container_output_dir)
+                    built_wheels.wheels.append(container_output_dir / repaired_wheel.name)
+                    output_wheel = options.globals.output_dir / repaired_wheel.name
+
+        if output_wheel is not None:
+            log.step("Copying wheel to the output directory...")
+            _copy_wheel_out(
+                container, container_output_dir / output_wheel.name, output_wheel.parent
             )
+        log.build_end(
+            output_wheel,
+            # reused_wheel is in the container, this is its copy on the host
+            reused_wheel=None
+            if reused_wheel is None
+            else options.globals.output_dir / reused_wheel.name,
+            compiler_cache=compiler_cache_stats,
+        )
+        submit_post_build(
+            build_options=build_options, identifier=config.identifier, wheel=output_wheel
+        )
 
-            if build_options.before_test:
-                before_test_prepared = prepare_command(
-                    build_options.before_test,
-                    project=container_project_path,
-                    package=container_package_dir,
-                )
-                container.call(["sh", "-c", before_test_prepared], env=virtualenv_env)
+    if test_wheel is None or test_queue is None:
+        finish(container, container_project_path)
+        return
 
-            # Install the wheel we just built
-            container.call(
-                [*pip, "install", str(repaired_wheel) + build_options.test_extras],
-                env=virtualenv_env,
-            )
+    # test in another shell, while this one moves on to the next build. The
+    # test gets its own copy of the project, as the next build writes to it
+    test_project_path = temp_dir / "test_project"
+    container.remove(test_project_path)
+    container.mkdir(test_project_path)
+    container.call(["cp", "-a", f"{container_project_path}/.", test_project_path])
+    build = log.handoff_build()
 
-            # Install any requirements to run the tests
-            if build_options.test_requires:
-                container.call([*pip, "install", *build_options.test_requires], env=virtualenv_env)
+    def test_in_session() -> None:
+        with container.exec_session() as session:
+            session.cwd = test_project_path
+            log.resume_build(build)
+            finish(session, test_project_path)
+            session.remove(test_project_path)
 
-            # Run the tests from a different directory
-            test_command_prepared = prepare_command(
-                build_options.test_command,
-                project=container_project_path,
-                package=container_package_dir,
-                wheel=repaired_wheel,
-            )
+    test_queue.submit(config.identifier, test_in_session)
 
-            test_cwd = testing_temp_dir / "test_cwd"
-            container.call(["mkdir", "-p", test_cwd])
 
-            if build_options.test_sources:
-                copy_test_sources(
-                    build_options.test_sources,
-                    Path.cwd(),
-                    test_cwd,
-                    copy_into=container.copy_into,
-                )
-            else:
-                # Use the test_fail.py file to raise a nice error if the user
-                # tries to run tests in the cwd
-                container.copy_into(resources.TEST_FAIL_CWD_FILE, test_cwd / "test_fail.py")
+def _copy_wheel_out(container: OCIContainer, wheel: PurePosixPath, output_dir: Path) -> Path:
+    """
+    Copy `wheel` out of the container, into `output_dir`. It's copied to a
+    temporary directory in `output_dir` first, then renamed into place, so
+    that only complete wheels ever appear there.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix=".cibuildwheel-", dir=output_dir) as tmp:
+        container.copy_out(wheel.parent, Path(tmp), paths=[wheel.name])
+        return Path(tmp, wheel.name).replace(output_dir / wheel.name)
 
-            container.call(["sh", "-c", test_command_prepared], cwd=test_cwd, env=virtualenv_env)
 
-            # clean up test environment
-            container.call(["rm", "-rf", testing_temp_dir])
+def _test_identifier(
+    *,
+    config: PythonConfiguration,
+    build_options: BuildOptions,
+    container: OCIContainer,
+    env: dict[str, str],
+    repaired_wheel: PurePosixPath,
+    dependency_constraint_flags: Sequence[PathOrStr],
+    container_project_path: PurePath,
+    container_package_dir: PurePath,
+) -> None:
+    use_uv = build_options.build_frontend.name in {"build[uv]", "uv"}
+    pip = ["uv", "pip"] if use_uv else ["pip"]
+    python_bin = config.path / "bin"
+    assert build_options.test_command
+
+    log.step("Testing wheel...")
+
+    # set up a virtual environment to install and test from, to make sure
+    # there are no dependencies that were pulled in at build time.
+    if not use_uv:
+        container.call(["pip", "install", "virtualenv", *dependency_constraint_flags], env=env)
+
+    testing_temp_dir = container.make_temp_dir()
+    venv_dir = testing_temp_dir / "venv"
+
+    if use_uv:
+        container.call(["uv", "venv", venv_dir, "--python", python_bin / "python"], env=env)
+    else:
+        # Use embedded dependencies from virtualenv to ensure determinism
+        venv_args = ["--no-periodic-update", "--pip=embed", "--no-setuptools"]
+        if "38" in config.identifier:
+            venv_args.append("--no-wheel")
+        container.call(["python", "-m", "virtualenv", *venv_args, venv_dir], env=env)
+
+    virtualenv_env = env.copy()
+    virtualenv_env["PATH"] = f"{venv_dir / 'bin'}:{virtualenv_env['PATH']}"
+    virtualenv_env["VIRTUAL_ENV"] = str(venv_dir)
+    virtualenv_env = build_options.test_environment.as_dictionary(prev_environment=virtualenv_env)
+
+    if build_options.before_test:
+        before_test_prepared = prepare_command(
+            build_options.before_test,
+            project=container_project_path,
+            package=container_package_dir,
+        )
+        container.call(["sh", "-c", before_test_prepared], env=virtualenv_env)
 
-        # move repaired wheel to output
-        output_wheel: Path | None = None
-        if compatible_wheel is None:
-            container.call(["mkdir", "-p", container_output_dir])
-            container.call(["mv", repaired_wheel, container_output_dir])
-            built_wheels.append(container_output_dir / repaired_wheel.name)
-            output_wheel = options.globals.output_dir / repaired_wheel.name
+    # Install the wheel we just built
+    container.call(
+        [*pip, "install", str(repaired_wheel) + build_options.test_extras],
+        env=virtualenv_env,
+    )
+
+    # Install any requirements to run the tests
+    if build_options.test_requires:
+        container.call([*pip, "install", *build_options.test_requires], env=virtualenv_env)
+
+    # Run the tests from a different directory
+    test_command_prepared = prepare_command(
+        build_options.test_command,
+        project=container_project_path,
+        package=container_package_dir,
+        wheel=repaired_wheel,
+    )
+
+    test_cwd = testing_temp_dir / "test_cwd"
+    container.mkdir(test_cwd)
+
+    if build_options.test_sources:
+        copy_test_sources(
+            build_options.test_sources,
+            Path.cwd(),
+            test_cwd,
+            copy_into=(
+                functools.partial(
+                    _copy_from_container_project,
+                    container=container,
+                    container_project_path=container_project_path,
+                )
+                if container.project_mount is not None
+                else container.copy_into
+            ),
+        )
+    else:
+        # Use the test_fail.py file to raise a nice error if the user
+        # tries to run tests in the cwd
+        container.copy_into(resources.TEST_FAIL_CWD_FILE, test_cwd / "test_fail.py")
 
-        log.build_end(output_wheel)
+    container.call(["sh", "-c", test_command_prepared], cwd=test_cwd, env=virtualenv_env)
 
-    log.step("Copying wheels back to host...")
-    # copy the output back into the host
-    container.copy_out(container_output_dir, options.globals.output_dir)
-    log.step_end()
+    # clean up test environment
+    container.remove(testing_temp_dir)
+
+
+def _copy_from_container_project(
+    source: Path, dest: PurePath, *, container: OCIContainer, container_project_path: PurePath
+) -> None:
+    """
+    A copy_into for copy_test_sources, that copies from the project already
+    in the container, rather than from the host.
+    """
+    relative_source = source.relative_to(Path.cwd().resolve())
+    container.mkdir(dest.parent)
+    container.call(["cp", "-a", container_project_path / relative_source.as_posix(), dest])
 
 
 def build(options: Options, tmp_path: Path) -> None:
@@ -521,52 +889,222 @@ def build(options: Options, tmp_path: Path) -> None:
     container_project_path = PurePosixPath("/project")
     container_package_dir = container_project_path / abs_package_dir.relative_to(cwd)
 
-    for build_step in get_build_steps(options, python_configurations):
-        try:
-            # check the container engine is installed
-            subprocess.run(
-                [build_step.container_engine.name, "--version"],
-                check=True,
-                stdout=subprocess.DEVNULL,
-            )
-        except subprocess.CalledProcessError as error:
-            msg = unwrap(
-                f"""
-                {build_step.container_engine.name} not found. An OCI exe like
-                Docker or Podman is required to run Linux builds. If you're
-                building on Travis CI, add `services: [docker]` to your
-                .travis.yml. If you're building on Circle CI in Linux, add a
-                `setup_remote_docker` step to your .circleci/config.yml.
-                """
-            )
-            raise errors.ConfigurationError(msg) from error
+    build_steps = list(get_build_steps(options, python_configurations))
+    # run as many containers as the job budget allows, and share what's left
+    # between the builds inside each container
+    jobs = min(options.globals.jobs, len(build_steps))
+    jobs_per_step = max(1, options.globals.jobs // max(1, jobs))
+
+    with contextlib.ExitStack() as stack:
+        image_prefetcher = None
+        if len(build_steps) > 1:
+            # pull the images of later steps while the first ones build
+            image_prefetcher = stack.enter_context(ImagePrefetcher(jobs=IMAGE_PREFETCH_JOBS))
+            for step in build_steps:
+                image_prefetcher.prefetch(
+                    step.container_image, _oci_platform(step), step.container_engine
+                )
 
-        try:
-            ids_to_build = [x.identifier for x in build_step.platform_configs]
-            log.step(f"Starting container image {build_step.container_image}...")
-
-            print(f"info: This container will host the build for {', '.join(ids_to_build)}...")
-            architecture = Architecture(build_step.platform_tag.split("_", 1)[1])
-
-            with OCIContainer(
-                image=build_step.container_image,
-                oci_platform=ARCHITECTURE_OCI_PLATFORM_MAP[architecture],
-                cwd=container_project_path,
-                engine=build_step.container_engine,
-            ) as container:
-                build_in_container(
+        if jobs > 1:
+            # each step gets its own scratch directory, so that steps running at
+            # the same time don't share constraint files or audit venvs
+            run_in_parallel(
+                [
+                    (
+                        f"{step.platform_tag} ({', '.join(c.identifier for c in step.platform_configs)})",
+                        functools.partial(
+                            _build_step,
+                            options=options,
+                            build_step=step,
+                            container_project_path=container_project_path,
+                            container_package_dir=container_package_dir,
+                            local_tmp_dir=tmp_path / f"step{index}",
+                            jobs=jobs_per_step,
+                            image_prefetcher=image_prefetcher,
+                        ),
+                    )
+                    for index, step in enumerate(build_steps)
+                ],
+                jobs=jobs,
+            )
+        else:
+            for build_step in build_steps:
+                _build_step(
                     options=options,
-                    platform_configs=build_step.platform_configs,
-                    container=container,
+                    build_step=build_step,
                     container_project_path=container_project_path,
                     container_package_dir=container_package_dir,
                     local_tmp_dir=tmp_path,
+                    jobs=jobs_per_step,
+                    image_prefetcher=image_prefetcher,
+                )
+
+        if image_prefetcher is not None and image_prefetcher.hidden_time:
+            print(
+                f"info: Pulling images in the background saved "
+                f"{image_prefetcher.hidden_time:.1f}s of waiting"
+            )
+
+    cache_dirs = {
+        container_cache_dir(_oci_platform(step))
+        for step in build_steps
+        if step.container_engine.mount_cache
+    }
+    for cache_dir in sorted(cache_dirs):
+        size = humanize.naturalsize(directory_size(cache_dir))
+        print(f"info: The download cache at {cache_dir} holds {size}")
+
+    if compiler_cache_dir().exists() and any(
+        options.build_options(c.identifier).compiler_cache.tool
+        for step in build_steps
+        for c in step.platform_configs
+    ):
+        size = humanize.naturalsize(directory_size(compiler_cache_dir()))
+        print(f"info: The compiler cache at {compiler_cache_dir()} holds {size}")
+
+
+def _oci_platform(build_step: BuildStep) -> OCIPlatform:
+    architecture = Architecture(build_step.platform_tag.split("_", 1)[1])
+    return ARCHITECTURE_OCI_PLATFORM_MAP[architecture]
+
+
+def _build_step(
+    *,
+    options: Options,
+    build_step: BuildStep,
+    container_project_path: PurePath,
+    container_package_dir: PurePath,
+    local_tmp_dir: Path,
+    jobs: int,
+    image_prefetcher: ImagePrefetcher | None = None,
+) -> None:
+    try:
+        # check the container engine is installed
+        subprocess.run(
+            [build_step.container_engine.name, "--version"],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+    except subprocess.CalledProcessError as error:
+        msg = unwrap(
+            f"""
+            {build_step.container_engine.name} not found. An OCI exe like
+            Docker or Podman is required to run Linux builds. If you're
+            building on Travis CI, add `services: [docker]` to your
+            .travis.yml. If you're building on Circle CI in Linux, add a
+            `setup_remote_docker` step to your .circleci/config.yml.
+            """
+        )
+        raise errors.ConfigurationError(msg) from error
+
+    local_tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        ids_to_build = [x.identifier for x in build_step.platform_configs]
+        log.step(f"Starting container image {build_step.container_image}...")
+
+        print(f"info: This container will host the build for {', '.join(ids_to_build)}...")
+        oci_platform = _oci_platform(build_step)
+        if image_prefetcher is not None:
+            image_prefetcher.wait(
+                build_step.container_image, oci_platform, build_step.container_engine
+            )
+
+        container_image = build_step.container_image
+        snapshot = _before_all_snapshot(options, build_step, oci_platform)
+        from_snapshot = False
+        if snapshot is not None and _image_id(snapshot, oci_platform, build_step):
+            print(f"info: Starting from {snapshot}, saved after before_all by a previous run")
+            container_image = snapshot
+            from_snapshot = True
+
+        with OCIContainer(
+            image=container_image,
+            oci_platform=oci_platform,
+            cwd=container_project_path,
+            engine=build_step.container_engine,
+            setup_key=_container_setup_key(options, build_step),
+            project_dir=Path.cwd(),
+            from_snapshot=from_snapshot,
+            compiler_cache_dir=(
+                compiler_cache_dir()
+                if any(
+                    options.build_options(c.identifier).compiler_cache.tool
+                    for c in build_step.platform_configs
                 )
+                else None
+            ),
+        ) as container:
+            build_in_container(
+                options=options,
+                platform_configs=build_step.platform_configs,
+                container=container,
+                container_project_path=container_project_path,
+                container_package_dir=container_package_dir,
+                local_tmp_dir=local_tmp_dir,
+                jobs=jobs,
+                before_all_snapshot=None if from_snapshot else snapshot,
+            )
+
+    except subprocess.CalledProcessError as error:
+        troubleshoot(options, error)
+        msg = f"Command {error.cmd} failed with code {error.returncode}. {error.stdout or ''}"
+        raise errors.FatalError(msg) from error
+
+
+def _container_setup_key(options: Options, build_step: BuildStep) -> str:
+    """
+    Describes the setup that build_in_container does before building, so
+    that pooled containers are only reused when before_all is unchanged.
+    """
+    before_all_options = options.build_options(build_step.platform_configs[0].identifier)
+    return repr((before_all_options.before_all, before_all_options.environment))
+
+
+def _before_all_snapshot(
+    options: Options, build_step: BuildStep, oci_platform: OCIPlatform
+) -> str | None:
+    """
+    The tag of the image saved after before_all for this step, or None if
+    snapshots aren't enabled, or there's no before_all to save.
+    """
+    before_all_options = options.build_options(build_step.platform_configs[0].identifier)
+    config = before_all_options.before_all_snapshot
+    if not config.enabled or not before_all_options.before_all:
+        return None
+
+    engine = build_step.container_engine
+    base_image_id = _image_id(build_step.container_image, oci_platform, build_step)
+    if base_image_id is None:
+        # the snapshot is tied to the exact base image, so pull it first
+        with contextlib.suppress(subprocess.CalledProcessError):
+            call(
+                engine.name,
+                "pull",
+                f"--platform={oci_platform.value}",
+                build_step.container_image,
+            )
+        base_image_id = _image_id(build_step.container_image, oci_platform, build_step)
+    if base_image_id is None:
+        log.warning(
+            f"Couldn't find the ID of {build_step.container_image}, so before_all "
+            "won't be saved or restored from a snapshot"
+        )
+        return None
+
+    return snapshot_tag(
+        base_image_id=base_image_id,
+        oci_platform=oci_platform.value,
+        setup_key=_container_setup_key(options, build_step),
+        project_dir=Path.cwd(),
+        files=config.files,
+    )
+
 
-        except subprocess.CalledProcessError as error:
-            troubleshoot(options, error)
-            msg = f"Command {error.cmd} failed with code {error.returncode}. {error.stdout or ''}"
-            raise errors.FatalError(msg) from error
+def _image_id(image: str, oci_platform: OCIPlatform, build_step: BuildStep) -> str | None:
+    return OCIContainer(
+        image=image, oci_platform=oci_platform, engine=build_step.container_engine
+    ).local_image_id(oci_platform)
 
 
 def _matches_prepared_command(error_cmd: Sequence[str], command_template: str) -> bool:
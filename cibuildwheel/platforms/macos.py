@@ -3,14 +3,18 @@
 __lazy_modules__ = {
     "cibuildwheel.audit",
     "cibuildwheel.ci",
+    "cibuildwheel.compiler_cache",
     "cibuildwheel.frontend",
     "cibuildwheel.logger",
+    "cibuildwheel.post_build",
     "cibuildwheel.util",
     "cibuildwheel.util.cmd",
+    "cibuildwheel.util.concurrency",
     "cibuildwheel.util.file",
     "cibuildwheel.util.helpers",
     "cibuildwheel.util.packaging",
     "cibuildwheel.venv",
+    "contextlib",
     "filelock",
     "inspect",
     "packaging",
@@ -22,6 +26,7 @@
     "subprocess",
 }
 
+import contextlib
 import dataclasses
 import functools
 import inspect
@@ -41,33 +46,52 @@
 from cibuildwheel import errors
 from cibuildwheel.audit import run_audit
 from cibuildwheel.ci import detect_ci_provider
+from cibuildwheel.compiler_cache import (
+    compiler_cache_environment,
+    describe_stats_change,
+    host_compiler_cache,
+    read_host_stats,
+)
 from cibuildwheel.frontend import (
     BuildFrontendName,
     get_build_frontend_extra_flags,
     prepare_config_settings,
 )
 from cibuildwheel.logger import log
+from cibuildwheel.post_build import submit_post_build
 from cibuildwheel.util import resources
 from cibuildwheel.util.cmd import call, shell
+from cibuildwheel.util.concurrency import BackgroundQueue, Lookahead
 from cibuildwheel.util.file import (
     CIBW_CACHE_PATH,
+    Artifact,
     copy_test_sources,
     download,
+    fetch,
     move_file,
+    prefetched_path,
     remove_on_error,
 )
 from cibuildwheel.util.helpers import prepare_command, unwrap
 from cibuildwheel.util.packaging import find_compatible_wheel, get_pip_version
-from cibuildwheel.venv import constraint_flags, find_uv, target_marker_env, virtualenv
+from cibuildwheel.venv import (
+    constraint_flags,
+    find_uv,
+    prepare_virtualenv,
+    target_marker_env,
+    virtualenv,
+    virtualenv_artifact,
+)
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
-    from collections.abc import Set
+    from collections.abc import Sequence, Set
     from typing import Literal
 
     from cibuildwheel.architecture import Architecture
     from cibuildwheel.environment import ParsedEnvironment
-    from cibuildwheel.options import Options
+    from cibuildwheel.logger import ActiveBuild
+    from cibuildwheel.options import BuildOptions, Options
     from cibuildwheel.selector import BuildSelector
 
 
@@ -164,9 +188,62 @@ def get_python_configurations(
     return python_configurations
 
 
+def _cpython_installation_path(version: str, free_threading: bool) -> Path:
+    ft = "T" if free_threading else ""
+    return Path(f"/Library/Frameworks/Python{ft}.framework/Versions/{version}")
+
+
+def cpython_installer_artifacts(
+    version: str, url: str, free_threading: bool, sha256: str
+) -> list[Artifact]:
+    """
+    The installer that install_cpython downloads. It's only used in CI, as
+    CPython isn't installed by cibuildwheel when it runs locally.
+    """
+    if detect_ci_provider() is None:
+        return []
+    return [
+        Artifact(
+            url=url,
+            sha256=sha256,
+            path=CIBW_CACHE_PATH / "cpython-installer" / url.rsplit("/", 1)[-1],
+            installed=_cpython_installation_path(version, free_threading),
+        )
+    ]
+
+
+def required_artifacts(identifiers: Sequence[str]) -> list[Artifact]:
+    """
+    The files that building `identifiers` downloads, for them to be
+    prefetched.
+    """
+    result = []
+    for config in all_python_configurations():
+        if config.identifier not in identifiers:
+            continue
+        if config.identifier.startswith("cp"):
+            free_threading = "t-macos" in config.identifier
+            result += cpython_installer_artifacts(
+                config.version, config.url, free_threading, config.sha256
+            )
+        else:
+            archive = config.url.rsplit("/", 1)[-1]
+            extension = ".tar.bz2" if config.identifier.startswith("pp") else ".tar.gz"
+            result.append(
+                Artifact(
+                    url=config.url,
+                    sha256=config.sha256,
+                    path=prefetched_path(config.url),
+                    installed=CIBW_CACHE_PATH / archive.removesuffix(extension),
+                )
+            )
+        result.append(virtualenv_artifact(config.version))
+    return result
+
+
 def install_cpython(_tmp: Path, version: str, url: str, free_threading: bool, sha256: str) -> Path:
     ft = "T" if free_threading else ""
-    installation_path = Path(f"/Library/Frameworks/Python{ft}.framework/Versions/{version}")
+    installation_path = _cpython_installation_path(version, free_threading)
     with FileLock(CIBW_CACHE_PATH / f"cpython{version}.lock"):
         installed_system_packages = call("pkgutil", "--pkgs", capture_stdout=True).splitlines()
         # if this version of python isn't installed, get it from python.org and install
@@ -222,7 +299,7 @@ def install_pypy(tmp: Path, url: str, sha256: str) -> Path:
     with FileLock(str(installation_path) + ".lock"):
         if not installation_path.exists():
             downloaded_tar_bz2 = tmp / pypy_tar_bz2
-            download(url, downloaded_tar_bz2, sha256=sha256)
+            fetch(url, downloaded_tar_bz2, sha256=sha256)
             installation_path.parent.mkdir(parents=True, exist_ok=True)
             with remove_on_error(installation_path):
                 call("tar", "-C", installation_path.parent, "-xf", downloaded_tar_bz2)
@@ -238,7 +315,7 @@ def install_graalpy(tmp: Path, url: str, sha256: str) -> Path:
     with FileLock(str(installation_path) + ".lock"):
         if not installation_path.exists():
             downloaded_archive = tmp / graalpy_archive
-            download(url, downloaded_archive, sha256=sha256)
+            fetch(url, downloaded_archive, sha256=sha256)
             with remove_on_error(installation_path):
                 installation_path.mkdir(parents=True)
                 # GraalPy top-folder name is inconsistent with archive name
@@ -254,36 +331,64 @@ def install_graalpy(tmp: Path, url: str, sha256: str) -> Path:
     return installation_path / "bin" / "graalpy"
 
 
-def setup_python(
-    tmp: Path,
-    python_configuration: PythonConfiguration,
-    dependency_constraint: Path | None,
-    environment: ParsedEnvironment,
-    build_frontend: BuildFrontendName,
-) -> tuple[Path, dict[str, str]]:
-    uv_path = find_uv()
-    use_uv = build_frontend in {"build[uv]", "uv"}
-
-    tmp.mkdir()
+def install_python(tmp: Path, python_configuration: PythonConfiguration) -> Path:
     implementation_id = python_configuration.identifier.split("-")[0]
-    log.step(f"Installing Python {implementation_id}...")
     if implementation_id.startswith("cp"):
         free_threading = "t-macos" in python_configuration.identifier
-        base_python = install_cpython(
+        return install_cpython(
             tmp,
             python_configuration.version,
             python_configuration.url,
             free_threading,
             python_configuration.sha256,
         )
-
     elif implementation_id.startswith("pp"):
-        base_python = install_pypy(tmp, python_configuration.url, python_configuration.sha256)
+        return install_pypy(tmp, python_configuration.url, python_configuration.sha256)
     elif implementation_id.startswith("gp"):
-        base_python = install_graalpy(tmp, python_configuration.url, python_configuration.sha256)
+        return install_graalpy(tmp, python_configuration.url, python_configuration.sha256)
     else:
         msg = "Unknown Python implementation"
         raise ValueError(msg)
+
+
+def prepare_python(
+    tmp: Path,
+    python_configuration: PythonConfiguration,
+    build_options: BuildOptions,
+) -> None:
+    """
+    Install the Python for `python_configuration` and the template of its
+    build venv, ahead of setup_python, while another identifier builds.
+    """
+    tmp.mkdir(parents=True)
+    dependency_constraint = build_options.dependency_constraints.get_for_python_version(
+        version=python_configuration.version, tmp_dir=tmp
+    )
+    base_python = install_python(tmp, python_configuration)
+    implementation_id = python_configuration.identifier.split("-")[0]
+    prepare_virtualenv(
+        python_configuration.version,
+        base_python,
+        dependency_constraint,
+        use_uv=build_options.build_frontend.name in {"build[uv]", "uv"},
+        marker_env=target_marker_env(implementation_id=implementation_id),
+    )
+
+
+def setup_python(
+    tmp: Path,
+    python_configuration: PythonConfiguration,
+    dependency_constraint: Path | None,
+    environment: ParsedEnvironment,
+    build_frontend: BuildFrontendName,
+) -> tuple[Path, dict[str, str]]:
+    uv_path = find_uv()
+    use_uv = build_frontend in {"build[uv]", "uv"}
+
+    tmp.mkdir()
+    implementation_id = python_configuration.identifier.split("-")[0]
+    log.step(f"Installing Python {implementation_id}...")
+    base_python = install_python(tmp, python_configuration)
     assert base_python.exists(), (
         f"{base_python.name} not found, has {list(base_python.parent.iterdir())}"
     )
@@ -481,327 +586,435 @@ def build(options: Options, tmp_path: Path) -> None:
 
         built_wheels: list[Path] = []
 
-        for config in python_configurations:
-            build_options = options.build_options(config.identifier)
-            build_frontend = build_options.build_frontend
-            use_uv = build_frontend.name in {"build[uv]", "uv"}
-            uv_path = find_uv()
-            if use_uv and uv_path is None:
-                msg = "uv not found"
-                raise AssertionError(msg)
-            pip = ["pip"] if not use_uv else [str(uv_path), "pip"]
-            log.build_start(config.identifier)
-
-            identifier_tmp_dir = tmp_path / config.identifier
-            identifier_tmp_dir.mkdir()
-            built_wheel_dir = identifier_tmp_dir / "built_wheel"
-            repaired_wheel_dir = identifier_tmp_dir / "repaired_wheel"
-
-            config_is_arm64 = config.identifier.endswith("arm64")
-            config_is_universal2 = config.identifier.endswith("universal2")
-
-            constraints_path = build_options.dependency_constraints.get_for_python_version(
-                version=config.version, tmp_dir=identifier_tmp_dir
-            )
-
-            base_python, env = setup_python(
-                identifier_tmp_dir / "build",
-                config,
-                constraints_path,
-                build_options.environment,
-                build_frontend.name,
-            )
-            env["CIBUILDWHEEL_BUILD_IDENTIFIER"] = config.identifier
-            pip_version = None if use_uv else get_pip_version(env)
-
-            compatible_wheel = find_compatible_wheel(built_wheels, config.identifier)
-            if compatible_wheel:
-                log.step_end()
-                print(
-                    f"\nFound previously built wheel {compatible_wheel.name}, that's compatible with {config.identifier}. Skipping build step..."
+        with contextlib.ExitStack() as stack:
+            test_queue = None
+            if options.globals.pipeline_tests:
+                test_queue = stack.enter_context(BackgroundQueue())
+            lookahead = stack.enter_context(Lookahead())
+            for config, next_config in zip(
+                python_configurations, [*python_configurations[1:], None], strict=True
+            ):
+                build_options = options.build_options(config.identifier)
+                build_frontend = build_options.build_frontend
+                use_uv = build_frontend.name in {"build[uv]", "uv"}
+                uv_path = find_uv()
+                if use_uv and uv_path is None:
+                    msg = "uv not found"
+                    raise AssertionError(msg)
+                log.build_start(config.identifier)
+
+                identifier_tmp_dir = tmp_path / config.identifier
+                identifier_tmp_dir.mkdir()
+                built_wheel_dir = identifier_tmp_dir / "built_wheel"
+                repaired_wheel_dir = identifier_tmp_dir / "repaired_wheel"
+
+                config_is_arm64 = config.identifier.endswith("arm64")
+                config_is_universal2 = config.identifier.endswith("universal2")
+
+                constraints_path = build_options.dependency_constraints.get_for_python_version(
+                    version=config.version, tmp_dir=identifier_tmp_dir
                 )
-                repaired_wheel = compatible_wheel
-            else:
-                if build_options.before_build:
-                    log.step("Running before_build...")
-                    before_build_prepared = prepare_command(
-                        build_options.before_build, project=".", package=build_options.package_dir
+
+                # get the next identifier's Python ready while this one builds
+                lookahead.wait(config.identifier)
+                if next_config is not None:
+                    lookahead.prepare(
+                        next_config.identifier,
+                        functools.partial(
+                            prepare_python,
+                            tmp_path / "prepare" / next_config.identifier,
+                            next_config,
+                            options.build_options(next_config.identifier),
+                        ),
                     )
-                    shell(before_build_prepared, env=env)
-
-                log.step("Building wheel...")
-                built_wheel_dir.mkdir()
-
-                extra_flags = get_build_frontend_extra_flags(
-                    build_frontend,
-                    build_options.build_verbosity,
-                    prepare_config_settings(
-                        build_options.config_settings,
-                        project=Path.cwd(),
-                        package=build_options.package_dir,
-                    ),
+
+                base_python, env = setup_python(
+                    identifier_tmp_dir / "build",
+                    config,
+                    constraints_path,
+                    build_options.environment,
+                    build_frontend.name,
                 )
+                env["CIBUILDWHEEL_BUILD_IDENTIFIER"] = config.identifier
+                pip_version = None if use_uv else get_pip_version(env)
+
+                compiler_cache = None
+                compiler_cache_stats: str | None = None
+                if build_options.compiler_cache.tool:
+                    compiler_cache = host_compiler_cache(build_options.compiler_cache.tool)
+                    env = compiler_cache_environment(
+                        compiler_cache,
+                        config=build_options.compiler_cache,
+                        base_dir=Path.cwd(),
+                        env=env,
+                        compilers=("clang", "clang++"),
+                    )
 
-                build_env = env.copy()
-
-                match build_frontend.name:
-                    case "pip":
-                        # Path.resolve() is needed. Without it pip wheel may try to fetch package from pypi.org
-                        # see https://github.com/pypa/cibuildwheel/pull/369
-                        call(
-                            "python",
-                            "-m",
-                            "pip",
-                            "wheel",
-                            build_options.package_dir.resolve(),
-                            f"--wheel-dir={built_wheel_dir}",
-                            "--no-deps",
-                            *extra_flags,
-                            env=build_env,
-                        )
-                    case "build" | "build[uv]":
-                        if (
-                            use_uv
-                            and "--no-isolation" not in extra_flags
-                            and "-n" not in extra_flags
-                        ):
-                            extra_flags.append("--installer=uv")
-                        call(
-                            "python",
-                            "-m",
-                            "build",
-                            build_options.package_dir,
-                            "--wheel",
-                            f"--outdir={built_wheel_dir}",
-                            *extra_flags,
-                            env=build_env,
+                compatible_wheel = find_compatible_wheel(built_wheels, config.identifier)
+                if compatible_wheel:
+                    log.step_end()
+                    print(
+                        f"\nFound previously built wheel {compatible_wheel.name}, that's compatible with {config.identifier}. Skipping build step..."
+                    )
+                    repaired_wheel = compatible_wheel
+                else:
+                    if build_options.before_build:
+                        log.step("Running before_build...")
+                        before_build_prepared = prepare_command(
+                            build_options.before_build,
+                            project=".",
+                            package=build_options.package_dir,
                         )
-                    case "uv":
-                        assert uv_path is not None
-                        call(
-                            uv_path,
-                            "build",
-                            f"--python={base_python}",
-                            build_options.package_dir,
-                            "--wheel",
-                            f"--out-dir={built_wheel_dir}",
-                            *extra_flags,
-                            env=build_env,
+                        shell(before_build_prepared, env=env)
+
+                    log.step("Building wheel...")
+                    built_wheel_dir.mkdir()
+
+                    extra_flags = get_build_frontend_extra_flags(
+                        build_frontend,
+                        build_options.build_verbosity,
+                        prepare_config_settings(
+                            build_options.config_settings,
+                            project=Path.cwd(),
+                            package=build_options.package_dir,
+                        ),
+                    )
+
+                    build_env = env.copy()
+                    compiler_cache_stats_before = (
+                        read_host_stats(compiler_cache, env) if compiler_cache else None
+                    )
+
+                    match build_frontend.name:
+                        case "pip":
+                            # Path.resolve() is needed. Without it pip wheel may try to fetch package from pypi.org
+                            # see https://github.com/pypa/cibuildwheel/pull/369
+                            call(
+                                "python",
+                                "-m",
+                                "pip",
+                                "wheel",
+                                build_options.package_dir.resolve(),
+                                f"--wheel-dir={built_wheel_dir}",
+                                "--no-deps",
+                                *extra_flags,
+                                env=build_env,
+                            )
+                        case "build" | "build[uv]":
+                            if (
+                                use_uv
+                                and "--no-isolation" not in extra_flags
+                                and "-n" not in extra_flags
+                            ):
+                                extra_flags.append("--installer=uv")
+                            call(
+                                "python",
+                                "-m",
+                                "build",
+                                build_options.package_dir,
+                                "--wheel",
+                                f"--outdir={built_wheel_dir}",
+                                *extra_flags,
+                                env=build_env,
+                            )
+                        case "uv":
+                            assert uv_path is not None
+                            call(
+                                uv_path,
+                                "build",
+                                f"--python={base_python}",
+                                build_options.package_dir,
+                                "--wheel",
+                                f"--out-dir={built_wheel_dir}",
+                                *extra_flags,
+                                env=build_env,
+                            )
+                        case "pyodide-build":
+                            msg = "The 'pyodide-build' build frontend is not supported on this platform"
+                            raise errors.FatalError(msg)
+                        case _:
+                            assert_never(build_frontend)
+
+                    if compiler_cache:
+                        compiler_cache_stats = describe_stats_change(
+                            compiler_cache_stats_before, read_host_stats(compiler_cache, env)
                         )
-                    case "pyodide-build":
-                        msg = "The 'pyodide-build' build frontend is not supported on this platform"
-                        raise errors.FatalError(msg)
-                    case _:
-                        assert_never(build_frontend)
+                        if compiler_cache_stats:
+                            print(f"info: Compiler cache: {compiler_cache_stats}")
 
-                try:
-                    built_wheel = next(built_wheel_dir.glob("*.whl"))
-                except StopIteration:
-                    raise errors.BuildProducedNoWheelError() from None
+                    try:
+                        built_wheel = next(built_wheel_dir.glob("*.whl"))
+                    except StopIteration:
+                        raise errors.BuildProducedNoWheelError() from None
 
-                repaired_wheel_dir.mkdir()
+                    repaired_wheel_dir.mkdir()
 
-                if built_wheel.name.endswith("none-any.whl"):
-                    raise errors.NonPlatformWheelError()
+                    if built_wheel.name.endswith("none-any.whl"):
+                        raise errors.NonPlatformWheelError()
 
-                if build_options.repair_command:
-                    log.step("Repairing wheel...")
+                    if build_options.repair_command:
+                        log.step("Repairing wheel...")
 
-                    if config_is_universal2:
-                        delocate_archs = "x86_64,arm64"
-                    elif config_is_arm64:
-                        delocate_archs = "arm64"
+                        if config_is_universal2:
+                            delocate_archs = "x86_64,arm64"
+                        elif config_is_arm64:
+                            delocate_archs = "arm64"
+                        else:
+                            delocate_archs = "x86_64"
+
+                        repair_command_prepared = prepare_command(
+                            build_options.repair_command,
+                            wheel=built_wheel,
+                            dest_dir=repaired_wheel_dir,
+                            delocate_archs=delocate_archs,
+                            package=build_options.package_dir,
+                            project=".",
+                        )
+                        shell(repair_command_prepared, env=env)
                     else:
-                        delocate_archs = "x86_64"
-
-                    repair_command_prepared = prepare_command(
-                        build_options.repair_command,
-                        wheel=built_wheel,
-                        dest_dir=repaired_wheel_dir,
-                        delocate_archs=delocate_archs,
-                        package=build_options.package_dir,
-                        project=".",
-                    )
-                    shell(repair_command_prepared, env=env)
-                else:
-                    shutil.move(str(built_wheel), repaired_wheel_dir)
+                        shutil.move(str(built_wheel), repaired_wheel_dir)
 
-                try:
-                    repaired_wheel = next(repaired_wheel_dir.glob("*.whl"))
-                except StopIteration:
-                    raise errors.RepairStepProducedNoWheelError() from None
+                    try:
+                        repaired_wheel = next(repaired_wheel_dir.glob("*.whl"))
+                    except StopIteration:
+                        raise errors.RepairStepProducedNoWheelError() from None
 
-                if repaired_wheel.name in {wheel.name for wheel in built_wheels}:
-                    raise errors.AlreadyBuiltWheelError(repaired_wheel.name)
+                    if repaired_wheel.name in {wheel.name for wheel in built_wheels}:
+                        # with pipelined tests, an earlier compatible build can
+                        # pass its test while this one builds, it's reused then
+                        existing_wheel = find_compatible_wheel(built_wheels, config.identifier)
+                        if existing_wheel is None or existing_wheel.name != repaired_wheel.name:
+                            raise errors.AlreadyBuiltWheelError(repaired_wheel.name)
 
-                log.step_end()
+                    log.step_end()
 
-                run_audit(tmp_dir=tmp_path, build_options=build_options, wheel=repaired_wheel)
+                    run_audit(tmp_dir=tmp_path, build_options=build_options, wheel=repaired_wheel)
 
-            if build_options.test_command and build_options.test_selector(config.identifier):
-                machine_arch = platform.machine()
-                testing_archs: list[Literal["x86_64", "arm64"]]
+                output_wheel = None
+                if compatible_wheel is None:
+                    output_wheel = build_options.output_dir.joinpath(repaired_wheel.name)
 
-                if config_is_arm64:
-                    testing_archs = ["arm64"]
-                elif config_is_universal2:
-                    testing_archs = ["x86_64", "arm64"]
+                finish = functools.partial(
+                    _test_and_finish,
+                    config=config,
+                    build_options=build_options,
+                    base_python=base_python,
+                    env=env,
+                    pip_version=pip_version,
+                    repaired_wheel=repaired_wheel,
+                    output_wheel=output_wheel,
+                    built_wheels=built_wheels,
+                    identifier_tmp_dir=identifier_tmp_dir,
+                    compiler_cache_stats=compiler_cache_stats,
+                )
+                if test_queue is None:
+                    finish()
                 else:
-                    testing_archs = ["x86_64"]
-
-                for testing_arch in testing_archs:
-                    if config_is_universal2:
-                        arch_specific_identifier = f"{config.identifier}:{testing_arch}"
-                        if not build_options.test_selector(arch_specific_identifier):
-                            continue
-
-                    if machine_arch == "x86_64" and testing_arch == "arm64":
-                        if config_is_arm64:
-                            log.warning(
-                                unwrap(
-                                    """
-                                    While arm64 wheels can be built on x86_64, they cannot be
-                                    tested. Consider building arm64 wheels natively, if your CI
-                                    provider offers this. To silence this warning, set
-                                    `CIBW_TEST_SKIP: "*-macosx_arm64"`.
-                                    """
-                                )
-                            )
-                        elif config_is_universal2:
-                            log.warning(
-                                unwrap(
-                                    """
-                                    While universal2 wheels can be built on x86_64, the arm64 part
-                                    of the wheel cannot be tested on x86_64. Consider building
-                                    universal2 wheels on an arm64 runner, if your CI provider offers
-                                    this. Notably, an arm64 runner can also test the x86_64 part of
-                                    the wheel, through Rosetta emulation. To silence this warning,
-                                    set `CIBW_TEST_SKIP: "*-macosx_universal2:arm64"`.
-                                    """
-                                )
-                            )
-                        else:
-                            msg = "unreachable"
-                            raise RuntimeError(msg)
-
-                        # skip this test
-                        continue
-
-                    log.step(
-                        "Testing wheel..."
-                        if testing_arch == machine_arch
-                        else f"Testing wheel on {testing_arch}..."
+                    # test in the background, while the next wheel builds
+                    test_queue.submit(
+                        config.identifier, functools.partial(finish, handoff=log.handoff_build())
                     )
+    except subprocess.CalledProcessError as error:
+        msg = f"Command {error.cmd} failed with code {error.returncode}. {error.stdout or ''}"
+        raise errors.FatalError(msg) from error
 
-                    arch_prefix = []
-                    uv_arch_args = []
-                    if testing_arch != machine_arch:
-                        if machine_arch == "arm64" and testing_arch == "x86_64":
-                            # rosetta2 will provide the emulation with just the arch prefix.
-                            arch_prefix = ["arch", "-x86_64"]
-                            uv_arch_args = ["--python-platform", "x86_64-apple-darwin"]
-                        else:
-                            msg = f"don't know how to emulate {testing_arch} on {machine_arch}"
-                            raise RuntimeError(msg)
-
-                    # define a custom 'call' function that adds the arch prefix each time
-                    call_with_arch = functools.partial(call, *arch_prefix)
-                    shell_with_arch = functools.partial(call, *arch_prefix, "/bin/sh", "-c")
-
-                    # set up a virtual environment to install and test from, to make sure
-                    # there are no dependencies that were pulled in at build time.
-                    venv_dir = identifier_tmp_dir / f"venv-test-{testing_arch}"
-                    virtualenv_env = virtualenv(
-                        config.version,
-                        base_python,
-                        venv_dir,
-                        None,
-                        use_uv=use_uv,
-                        env=env,
-                        pip_version=pip_version,
-                    )
-                    if use_uv:
-                        pip_install = functools.partial(call, *pip, "install", *uv_arch_args)
-                    else:
-                        pip_install = functools.partial(call_with_arch, *pip, "install")
 
-                    virtualenv_env["MACOSX_DEPLOYMENT_TARGET"] = get_test_macosx_deployment_target()
+def _test_and_finish(
+    *,
+    config: PythonConfiguration,
+    build_options: BuildOptions,
+    base_python: Path,
+    env: dict[str, str],
+    pip_version: str | None,
+    repaired_wheel: Path,
+    output_wheel: Path | None,
+    built_wheels: list[Path],
+    identifier_tmp_dir: Path,
+    compiler_cache_stats: str | None,
+    handoff: ActiveBuild | None = None,
+) -> None:
+    """
+    Test the wheel built for `config`, if it's selected for testing, and
+    move it to `output_wheel`, unless that's None because the wheel was
+    already there. Once it's there, it's added to `built_wheels`, for later
+    builds to reuse. `handoff` is the build to resume, when this runs in
+    another thread.
+    """
+    if handoff is not None:
+        log.resume_build(handoff)
+    use_uv = build_options.build_frontend.name in {"build[uv]", "uv"}
+    pip = ["pip"] if not use_uv else [str(find_uv()), "pip"]
+    config_is_arm64 = config.identifier.endswith("arm64")
+    config_is_universal2 = config.identifier.endswith("universal2")
+
+    if build_options.test_command and build_options.test_selector(config.identifier):
+        machine_arch = platform.machine()
+        testing_archs: list[Literal["x86_64", "arm64"]]
+
+        if config_is_arm64:
+            testing_archs = ["arm64"]
+        elif config_is_universal2:
+            testing_archs = ["x86_64", "arm64"]
+        else:
+            testing_archs = ["x86_64"]
 
-                    virtualenv_env = build_options.test_environment.as_dictionary(
-                        prev_environment=virtualenv_env
+        for testing_arch in testing_archs:
+            if config_is_universal2:
+                arch_specific_identifier = f"{config.identifier}:{testing_arch}"
+                if not build_options.test_selector(arch_specific_identifier):
+                    continue
+
+            if machine_arch == "x86_64" and testing_arch == "arm64":
+                if config_is_arm64:
+                    log.warning(
+                        unwrap(
+                            """
+                            While arm64 wheels can be built on x86_64, they cannot be
+                            tested. Consider building arm64 wheels natively, if your CI
+                            provider offers this. To silence this warning, set
+                            `CIBW_TEST_SKIP: "*-macosx_arm64"`.
+                            """
+                        )
                     )
+                elif config_is_universal2:
+                    log.warning(
+                        unwrap(
+                            """
+                            While universal2 wheels can be built on x86_64, the arm64 part
+                            of the wheel cannot be tested on x86_64. Consider building
+                            universal2 wheels on an arm64 runner, if your CI provider offers
+                            this. Notably, an arm64 runner can also test the x86_64 part of
+                            the wheel, through Rosetta emulation. To silence this warning,
+                            set `CIBW_TEST_SKIP: "*-macosx_universal2:arm64"`.
+                            """
+                        )
+                    )
+                else:
+                    msg = "unreachable"
+                    raise RuntimeError(msg)
 
-                    # check that we are using the Python from the virtual environment
-                    call_with_arch("which", "python", env=virtualenv_env)
+                # skip this test
+                continue
 
-                    if build_options.before_test:
-                        before_test_prepared = prepare_command(
-                            build_options.before_test,
-                            project=".",
-                            package=build_options.package_dir,
-                        )
-                        shell_with_arch(before_test_prepared, env=virtualenv_env)
+            log.step(
+                "Testing wheel..."
+                if testing_arch == machine_arch
+                else f"Testing wheel on {testing_arch}..."
+            )
 
-                    # install the wheel
-                    pip_install(
-                        f"{repaired_wheel}{build_options.test_extras}",
-                        env=virtualenv_env,
-                    )
+            arch_prefix = []
+            uv_arch_args = []
+            if testing_arch != machine_arch:
+                if machine_arch == "arm64" and testing_arch == "x86_64":
+                    # rosetta2 will provide the emulation with just the arch prefix.
+                    arch_prefix = ["arch", "-x86_64"]
+                    uv_arch_args = ["--python-platform", "x86_64-apple-darwin"]
+                else:
+                    msg = f"don't know how to emulate {testing_arch} on {machine_arch}"
+                    raise RuntimeError(msg)
+
+            # define a custom 'call' function that adds the arch prefix each time
+            call_with_arch = functools.partial(call, *arch_prefix)
+            shell_with_arch = functools.partial(call, *arch_prefix, "/bin/sh", "-c")
+
+            # set up a virtual environment to install and test from, to make sure
+            # there are no dependencies that were pulled in at build time.
+            venv_dir = identifier_tmp_dir / f"venv-test-{testing_arch}"
+            virtualenv_env = virtualenv(
+                config.version,
+                base_python,
+                venv_dir,
+                None,
+                use_uv=use_uv,
+                env=env,
+                pip_version=pip_version,
+            )
+            if use_uv:
+                pip_install = functools.partial(call, *pip, "install", *uv_arch_args)
+            else:
+                pip_install = functools.partial(call_with_arch, *pip, "install")
 
-                    # test the wheel
-                    if build_options.test_requires:
-                        pip_install(
-                            *build_options.test_requires,
-                            env=virtualenv_env,
-                        )
+            virtualenv_env["MACOSX_DEPLOYMENT_TARGET"] = get_test_macosx_deployment_target()
 
-                    # run the tests from a temp dir, with an absolute path in the command
-                    # (this ensures that Python runs the tests against the installed wheel
-                    # and not the repo code)
-                    test_command_prepared = prepare_command(
-                        build_options.test_command,
-                        project=Path.cwd(),
-                        package=build_options.package_dir.resolve(),
-                        wheel=repaired_wheel,
-                    )
+            virtualenv_env = build_options.test_environment.as_dictionary(
+                prev_environment=virtualenv_env
+            )
 
-                    test_cwd = identifier_tmp_dir / "test_cwd"
-
-                    if build_options.test_sources:
-                        # only create test_cwd if it doesn't already exist - it
-                        # may have been created during a previous `testing_arch`
-                        if not test_cwd.exists():
-                            test_cwd.mkdir()
-                            copy_test_sources(
-                                build_options.test_sources,
-                                Path.cwd(),
-                                test_cwd,
-                            )
-                    else:
-                        # Use the test_fail.py file to raise a nice error if the user
-                        # tries to run tests in the cwd
-                        test_cwd.mkdir(exist_ok=True)
-                        (test_cwd / "test_fail.py").write_text(
-                            resources.TEST_FAIL_CWD_FILE.read_text()
-                        )
+            # check that we are using the Python from the virtual environment
+            call_with_arch("which", "python", env=virtualenv_env)
 
-                    shell_with_arch(test_command_prepared, cwd=test_cwd, env=virtualenv_env)
+            if build_options.before_test:
+                before_test_prepared = prepare_command(
+                    build_options.before_test,
+                    project=".",
+                    package=build_options.package_dir,
+                )
+                shell_with_arch(before_test_prepared, env=virtualenv_env)
 
-            # we're all done here; move it to output (overwrite existing)
-            output_wheel = None
-            if compatible_wheel is None:
-                output_wheel = build_options.output_dir.joinpath(repaired_wheel.name)
-                moved_wheel = move_file(repaired_wheel, output_wheel)
-                if moved_wheel != output_wheel.resolve():
-                    log.warning(
-                        f"{repaired_wheel} was moved to {moved_wheel} instead of {output_wheel}"
-                    )
-                built_wheels.append(output_wheel)
+            # install the wheel
+            pip_install(
+                f"{repaired_wheel}{build_options.test_extras}",
+                env=virtualenv_env,
+            )
+
+            # test the wheel
+            if build_options.test_requires:
+                pip_install(
+                    *build_options.test_requires,
+                    env=virtualenv_env,
+                )
 
-            # clean up
-            shutil.rmtree(identifier_tmp_dir)
+            # run the tests from a temp dir, with an absolute path in the command
+            # (this ensures that Python runs the tests against the installed wheel
+            # and not the repo code)
+            test_command_prepared = prepare_command(
+                build_options.test_command,
+                project=Path.cwd(),
+                package=build_options.package_dir.resolve(),
+                wheel=repaired_wheel,
+            )
 
-            log.build_end(output_wheel)
-    except subprocess.CalledProcessError as error:
-        msg = f"Command {error.cmd} failed with code {error.returncode}. {error.stdout or ''}"
-        raise errors.FatalError(msg) from error
+            test_cwd = identifier_tmp_dir / "test_cwd"
+
+            if build_options.test_sources:
+                # only create test_cwd if it doesn't already exist - it
+                # may have been created during a previous `testing_arch`
+                if not test_cwd.exists():
+                    test_cwd.mkdir()
+                    copy_test_sources(
+                        build_options.test_sources,
+                        Path.cwd(),
+                        test_cwd,
+                    )
+            else:
+                # Use the test_fail.py file to raise a nice error if the user
+                # tries to run tests in the cwd
+                test_cwd.mkdir(exist_ok=True)
+                (test_cwd / "test_fail.py").write_text(resources.TEST_FAIL_CWD_FILE.read_text())
+
+            shell_with_arch(test_command_prepared, cwd=test_cwd, env=virtualenv_env)
+
+    reused_wheel = repaired_wheel if output_wheel is None else None
+    if output_wheel is not None and output_wheel in built_wheels:
+        # an earlier build of the same wheel passed its test in the meantime
+        print(
+            f"\nWheel {output_wheel.name} was also built for another identifier in the meantime, reusing it for {config.identifier}..."
+        )
+        reused_wheel, output_wheel = output_wheel, None
+
+    # we're all done here; move it to output (overwrite existing)
+    if output_wheel is not None:
+        moved_wheel = move_file(repaired_wheel, output_wheel)
+        if moved_wheel != output_wheel.resolve():
+            log.warning(f"{repaired_wheel} was moved to {moved_wheel} instead of {output_wheel}")
+        built_wheels.append(output_wheel)
+
+    # clean up
+    shutil.rmtree(identifier_tmp_dir)
+
+    log.build_end(
+        output_wheel,
+        reused_wheel=reused_wheel,
+        compiler_cache=compiler_cache_stats,
+    )
+    submit_post_build(build_options=build_options, identifier=config.identifier, wheel=output_wheel)
@@ -5,8 +5,11 @@
     "cibuildwheel.audit",
     "cibuildwheel.frontend",
     "cibuildwheel.logger",
+    "cibuildwheel.post_build",
+    "cibuildwheel.project_sync",
     "cibuildwheel.util",
     "cibuildwheel.util.cmd",
+    "cibuildwheel.util.concurrency",
     "cibuildwheel.util.file",
     "cibuildwheel.util.helpers",
     "cibuildwheel.util.packaging",
@@ -28,6 +31,7 @@
 import shutil
 import subprocess
 import sys
+import threading
 import tomllib
 import typing
 from pathlib import Path
@@ -41,35 +45,43 @@
 from cibuildwheel.audit import run_audit
 from cibuildwheel.frontend import get_build_frontend_extra_flags, prepare_config_settings
 from cibuildwheel.logger import log
+from cibuildwheel.post_build import submit_post_build
+from cibuildwheel.project_sync import copy_project_for_build
 from cibuildwheel.util import resources
 from cibuildwheel.util.cmd import call, shell
+from cibuildwheel.util.concurrency import run_in_parallel
 from cibuildwheel.util.file import (
     CIBW_CACHE_PATH,
+    Artifact,
     copy_test_sources,
-    download,
     extract_tar,
     extract_zip,
+    fetch,
     move_file,
+    prefetched_path,
     remove_on_error,
 )
 from cibuildwheel.util.helpers import prepare_command, unwrap, unwrap_preserving_paragraphs
-from cibuildwheel.util.packaging import find_compatible_wheel, get_pip_version
+from cibuildwheel.util.packaging import BuiltWheels, get_pip_version, is_abi3_wheel
 from cibuildwheel.util.python_build_standalone import (
     PythonBuildStandaloneError,
     create_python_build_standalone_environment,
+    python_build_standalone_artifact,
 )
-from cibuildwheel.venv import constraint_flags, virtualenv
+from cibuildwheel.venv import constraint_flags, virtualenv, virtualenv_artifact
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
-    from collections.abc import Set
+    from collections.abc import Sequence, Set
 
     from cibuildwheel.environment import ParsedEnvironment
-    from cibuildwheel.options import Options
+    from cibuildwheel.options import BuildOptions, Options
     from cibuildwheel.selector import BuildSelector
 
 IS_WIN: Final[bool] = sys.platform.startswith("win")
 
+_audit_lock = threading.Lock()
+
 
 @dataclasses.dataclass(frozen=True, kw_only=True)
 class PythonConfiguration:
@@ -93,8 +105,8 @@ class PyodideXBuildEnvInfo(TypedDict):
     compatible: bool
 
 
-@functools.cache
-def ensure_node(major_version: str) -> Path:
+def _node_archive(major_version: str) -> tuple[str, Path]:
+    """The URL of the archive of Node.js `major_version`, and where it's installed."""
     with resources.NODEJS.open("rb") as f:
         loaded_file = tomllib.load(f)
     version = str(loaded_file[major_version])
@@ -107,15 +119,38 @@ def ensure_node(major_version: str) -> Path:
         linux_arch.value, linux_arch.value
     )
     name = f"node-{version}-{platform}-{arch}"
-    path = CIBW_CACHE_PATH / name
+    return f"{base_url}{version}/{name}.{ext}", CIBW_CACHE_PATH / name
+
+
+def required_artifacts(identifiers: Sequence[str]) -> list[Artifact]:
+    """
+    The files that building `identifiers` downloads, for them to be
+    prefetched. The Pyodide xbuildenv and Emscripten are installed by
+    their own tools, so they aren't included.
+    """
+    result = []
+    for config in all_python_configurations():
+        if config.identifier not in identifiers:
+            continue
+        result.append(python_build_standalone_artifact(config.version, CIBW_CACHE_PATH))
+        node_url, node_path = _node_archive(config.node_version)
+        result.append(
+            Artifact(url=node_url, sha256=None, path=prefetched_path(node_url), installed=node_path)
+        )
+        result.append(virtualenv_artifact(config.version))
+    return result
+
+
+@functools.cache
+def ensure_node(major_version: str) -> Path:
+    url, path = _node_archive(major_version)
     with FileLock(str(path) + ".lock"):
         if not path.exists():
-            url = f"{base_url}{version}/{name}.{ext}"
             with TemporaryDirectory() as tmp_path:
-                archive = Path(tmp_path) / f"{name}.{ext}"
-                download(url, archive)
+                archive = Path(tmp_path) / url.rsplit("/", 1)[-1]
+                fetch(url, archive)
                 with remove_on_error(path):
-                    if ext == "zip":
+                    if archive.suffix == ".zip":
                         extract_zip(archive, path.parent)
                     else:
                         extract_tar(archive, path.parent)
@@ -420,217 +455,279 @@ def build(options: Options, tmp_path: Path) -> None:
             )
             shell(before_all_prepared, env=env)
 
-        built_wheels: list[Path] = []
-
-        for config in python_configurations:
-            build_options = options.build_options(config.identifier)
-            build_frontend = build_options.build_frontend
-
-            log.build_start(config.identifier)
-
-            identifier_tmp_dir = tmp_path / config.identifier
-
-            built_wheel_dir = identifier_tmp_dir / "built_wheel"
-            repaired_wheel_dir = identifier_tmp_dir / "repaired_wheel"
-            identifier_tmp_dir.mkdir()
-            built_wheel_dir.mkdir()
-            repaired_wheel_dir.mkdir()
-
-            constraints_path = build_options.dependency_constraints.get_for_python_version(
-                version=config.version, variant="pyodide", tmp_dir=identifier_tmp_dir
-            )
-
-            env = setup_python(
-                tmp=identifier_tmp_dir / "build",
-                python_configuration=config,
-                constraints_path=constraints_path,
-                environment=build_options.environment,
-                user_pyodide_version=build_options.pyodide_version,
-            )
-            env["CIBUILDWHEEL_BUILD_IDENTIFIER"] = config.identifier
-            pip_version = get_pip_version(env)
-            # The Pyodide command line runner mounts all directories in the host
-            # filesystem into the Pyodide file system, except for the custom
-            # file systems /dev, /lib, /proc, and /tmp. Mounting the mount
-            # points for alternate file systems causes some mysterious failure
-            # of the process (it just quits without any clear error).
-            #
-            # Because of this, by default Pyodide can't see anything under /tmp.
-            # This environment variable tells it also to mount our temp
-            # directory.
-            oldmounts = ""
-            extra_mounts = [str(identifier_tmp_dir)]
-            if Path.cwd().is_relative_to("/tmp"):
-                extra_mounts.append(str(Path.cwd()))
-
-            if "_PYODIDE_EXTRA_MOUNTS" in env:
-                oldmounts = env["_PYODIDE_EXTRA_MOUNTS"] + ":"
-            env["_PYODIDE_EXTRA_MOUNTS"] = oldmounts + ":".join(extra_mounts)
-
-            compatible_wheel = find_compatible_wheel(built_wheels, config.identifier)
-            if compatible_wheel:
-                log.step_end()
-                print(
-                    f"\nFound previously built wheel {compatible_wheel.name}, that's compatible with {config.identifier}. Skipping build step..."
+        built_wheels = BuiltWheels[Path]()
+        jobs = min(options.globals.jobs, len(python_configurations))
+
+        if jobs <= 1:
+            for config in python_configurations:
+                _build_identifier(
+                    build_options=options.build_options(config.identifier),
+                    config=config,
+                    tmp_path=tmp_path,
+                    project_dir=Path.cwd(),
+                    built_wheels=built_wheels,
                 )
-                built_wheel = compatible_wheel
-            else:
-                if build_options.before_build:
-                    log.step("Running before_build...")
-                    before_build_prepared = prepare_command(
-                        build_options.before_build, project=".", package=build_options.package_dir
-                    )
-                    shell(before_build_prepared, env=env)
-
-                log.step("Building wheel...")
-
-                extra_flags = get_build_frontend_extra_flags(
-                    build_frontend,
-                    build_options.build_verbosity,
-                    prepare_config_settings(
-                        build_options.config_settings,
-                        project=Path.cwd(),
-                        package=build_options.package_dir,
+        else:
+
+            def build_in_copy(config: PythonConfiguration) -> None:
+                # each build gets its own copy of the project, so that in-tree
+                # build artifacts don't collide
+                project_dir = tmp_path / "projects" / config.identifier
+                _build_identifier(
+                    build_options=copy_project_for_build(
+                        options.build_options(config.identifier), project_dir
                     ),
+                    config=config,
+                    tmp_path=tmp_path,
+                    project_dir=project_dir,
+                    built_wheels=built_wheels,
                 )
 
-                call(
-                    "pyodide",
-                    "build",
-                    build_options.package_dir,
-                    f"--outdir={built_wheel_dir}",
-                    *extra_flags,
-                    env=env,
-                )
-                try:
-                    built_wheel = next(built_wheel_dir.glob("*.whl"))
-                except StopIteration:
-                    raise errors.BuildProducedNoWheelError() from None
-
-                if built_wheel.name.endswith("none-any.whl"):
-                    raise errors.NonPlatformWheelError()
-
-                if build_options.repair_command:
-                    log.step("Repairing wheel...")
-
-                    repair_command_prepared = prepare_command(
-                        build_options.repair_command,
-                        wheel=built_wheel,
-                        dest_dir=repaired_wheel_dir,
-                        package=build_options.package_dir,
-                        project=".",
-                    )
-                    shell(repair_command_prepared, env=env)
-                    log.step_end()
-                else:
-                    shutil.move(str(built_wheel), repaired_wheel_dir)
+            run_in_parallel(
+                [
+                    (config.identifier, functools.partial(build_in_copy, config))
+                    for config in python_configurations
+                ],
+                jobs=jobs,
+            )
+
+    except subprocess.CalledProcessError as error:
+        msg = f"Command {error.cmd} failed with code {error.returncode}. {error.stdout or ''}"
+        raise errors.FatalError(msg) from error
 
-                try:
-                    repaired_wheel = next(repaired_wheel_dir.glob("*.whl"))
-                except StopIteration:
-                    raise errors.RepairStepProducedNoWheelError() from None
 
-                if repaired_wheel.name in {wheel.name for wheel in built_wheels}:
-                    raise errors.AlreadyBuiltWheelError(repaired_wheel.name)
+def _build_identifier(
+    *,
+    build_options: BuildOptions,
+    config: PythonConfiguration,
+    tmp_path: Path,
+    project_dir: Path,
+    built_wheels: BuiltWheels[Path],
+) -> None:
+    """
+    Build, test and move to the output directory the wheel for `config`,
+    from the project at `project_dir`. Builds of other identifiers might be
+    running alongside this one, each in its own project directory.
+    """
+    build_frontend = build_options.build_frontend
 
-                run_audit(tmp_dir=tmp_path, build_options=build_options, wheel=repaired_wheel)
+    log.build_start(config.identifier)
 
-            if build_options.test_command and build_options.test_selector(config.identifier):
-                log.step("Testing wheel...")
+    identifier_tmp_dir = tmp_path / config.identifier
 
-                venv_dir = identifier_tmp_dir / "venv-test"
-                # set up a virtual environment to install and test from, to make sure
-                # there are no dependencies that were pulled in at build time.
+    built_wheel_dir = identifier_tmp_dir / "built_wheel"
+    repaired_wheel_dir = identifier_tmp_dir / "repaired_wheel"
+    identifier_tmp_dir.mkdir()
+    built_wheel_dir.mkdir()
+    repaired_wheel_dir.mkdir()
 
-                virtualenv_env = env.copy()
-                virtualenv_env["PATH"] = os.pathsep.join(
-                    [
-                        str(ensure_node(config.node_version)),
-                        virtualenv_env["PATH"],
-                    ]
-                )
+    constraints_path = build_options.dependency_constraints.get_for_python_version(
+        version=config.version, variant="pyodide", tmp_dir=identifier_tmp_dir
+    )
 
-                # pyodide venv uses virtualenv under the hood
-                # use the pip embedded with virtualenv & disable network updates
-                virtualenv_create_env = virtualenv_env.copy()
-                virtualenv_create_env["VIRTUALENV_PIP"] = pip_version
-                virtualenv_create_env["VIRTUALENV_NO_PERIODIC_UPDATE"] = "1"
+    env = setup_python(
+        tmp=identifier_tmp_dir / "build",
+        python_configuration=config,
+        constraints_path=constraints_path,
+        environment=build_options.environment,
+        user_pyodide_version=build_options.pyodide_version,
+    )
+    env["CIBUILDWHEEL_BUILD_IDENTIFIER"] = config.identifier
+    pip_version = get_pip_version(env)
+    # The Pyodide command line runner mounts all directories in the host
+    # filesystem into the Pyodide file system, except for the custom
+    # file systems /dev, /lib, /proc, and /tmp. Mounting the mount
+    # points for alternate file systems causes some mysterious failure
+    # of the process (it just quits without any clear error).
+    #
+    # Because of this, by default Pyodide can't see anything under /tmp.
+    # This environment variable tells it also to mount our temp
+    # directory.
+    oldmounts = ""
+    extra_mounts = [str(identifier_tmp_dir)]
+    if project_dir.is_relative_to("/tmp"):
+        extra_mounts.append(str(project_dir))
+
+    if "_PYODIDE_EXTRA_MOUNTS" in env:
+        oldmounts = env["_PYODIDE_EXTRA_MOUNTS"] + ":"
+    env["_PYODIDE_EXTRA_MOUNTS"] = oldmounts + ":".join(extra_mounts)
+
+    compatible_wheel = built_wheels.find_compatible(config.identifier)
+    if compatible_wheel:
+        log.step_end()
+        print(
+            f"\nFound previously built wheel {compatible_wheel.name}, that's compatible with {config.identifier}. Skipping build step..."
+        )
+        repaired_wheel = compatible_wheel
+    else:
+        if build_options.before_build:
+            log.step("Running before_build...")
+            before_build_prepared = prepare_command(
+                build_options.before_build, project=".", package=build_options.package_dir
+            )
+            shell(before_build_prepared, env=env, cwd=project_dir)
+
+        log.step("Building wheel...")
+
+        extra_flags = get_build_frontend_extra_flags(
+            build_frontend,
+            build_options.build_verbosity,
+            prepare_config_settings(
+                build_options.config_settings,
+                project=project_dir,
+                package=build_options.package_dir,
+            ),
+        )
 
-                call("pyodide", "venv", venv_dir, env=virtualenv_create_env)
+        call(
+            "pyodide",
+            "build",
+            build_options.package_dir,
+            f"--outdir={built_wheel_dir}",
+            *extra_flags,
+            env=env,
+            cwd=project_dir,
+        )
+        try:
+            built_wheel = next(built_wheel_dir.glob("*.whl"))
+        except StopIteration:
+            raise errors.BuildProducedNoWheelError() from None
+
+        if built_wheel.name.endswith("none-any.whl"):
+            raise errors.NonPlatformWheelError()
+
+        if build_options.repair_command:
+            log.step("Repairing wheel...")
+
+            repair_command_prepared = prepare_command(
+                build_options.repair_command,
+                wheel=built_wheel,
+                dest_dir=repaired_wheel_dir,
+                package=build_options.package_dir,
+                project=".",
+            )
+            shell(repair_command_prepared, env=env, cwd=project_dir)
+            log.step_end()
+        else:
+            shutil.move(str(built_wheel), repaired_wheel_dir)
+
+        try:
+            repaired_wheel = next(repaired_wheel_dir.glob("*.whl"))
+        except StopIteration:
+            raise errors.RepairStepProducedNoWheelError() from None
+
+        # the audit venv is shared between builds
+        with _audit_lock:
+            run_audit(tmp_dir=tmp_path, build_options=build_options, wheel=repaired_wheel)
+
+    if build_options.test_command and build_options.test_selector(config.identifier):
+        log.step("Testing wheel...")
+
+        venv_dir = identifier_tmp_dir / "venv-test"
+        # set up a virtual environment to install and test from, to make sure
+        # there are no dependencies that were pulled in at build time.
+
+        virtualenv_env = env.copy()
+        virtualenv_env["PATH"] = os.pathsep.join(
+            [
+                str(ensure_node(config.node_version)),
+                virtualenv_env["PATH"],
+            ]
+        )
 
-                virtualenv_env["PATH"] = os.pathsep.join(
-                    [
-                        str(venv_dir / "bin"),
-                        virtualenv_env["PATH"],
-                    ]
-                )
-                virtualenv_env["VIRTUAL_ENV"] = str(venv_dir)
+        # pyodide venv uses virtualenv under the hood
+        # use the pip embedded with virtualenv & disable network updates
+        virtualenv_create_env = virtualenv_env.copy()
+        virtualenv_create_env["VIRTUALENV_PIP"] = pip_version
+        virtualenv_create_env["VIRTUALENV_NO_PERIODIC_UPDATE"] = "1"
 
-                virtualenv_env = build_options.test_environment.as_dictionary(
-                    prev_environment=virtualenv_env
-                )
+        call("pyodide", "venv", venv_dir, env=virtualenv_create_env)
 
-                # check that we are using the Python from the virtual environment
-                call("which", "python", env=virtualenv_env)
+        virtualenv_env["PATH"] = os.pathsep.join(
+            [
+                str(venv_dir / "bin"),
+                virtualenv_env["PATH"],
+            ]
+        )
+        virtualenv_env["VIRTUAL_ENV"] = str(venv_dir)
 
-                if build_options.before_test:
-                    before_test_prepared = prepare_command(
-                        build_options.before_test,
-                        project=".",
-                        package=build_options.package_dir,
-                        wheel=repaired_wheel,
-                    )
-                    shell(before_test_prepared, env=virtualenv_env)
-
-                # install the wheel
-                call(
-                    "pip",
-                    "install",
-                    f"{repaired_wheel}{build_options.test_extras}",
-                    env=virtualenv_env,
-                )
+        virtualenv_env = build_options.test_environment.as_dictionary(
+            prev_environment=virtualenv_env
+        )
 
-                # test the wheel
-                if build_options.test_requires:
-                    call("pip", "install", *build_options.test_requires, env=virtualenv_env)
-
-                # run the tests from a temp dir, with an absolute path in the command
-                # (this ensures that Python runs the tests against the installed wheel
-                # and not the repo code)
-                test_command_prepared = prepare_command(
-                    build_options.test_command,
-                    project=Path.cwd(),
-                    package=build_options.package_dir.resolve(),
-                )
+        # check that we are using the Python from the virtual environment
+        call("which", "python", env=virtualenv_env)
 
-                test_cwd = identifier_tmp_dir / "test_cwd"
-                test_cwd.mkdir(exist_ok=True)
+        if build_options.before_test:
+            before_test_prepared = prepare_command(
+                build_options.before_test,
+                project=".",
+                package=build_options.package_dir,
+                wheel=repaired_wheel,
+            )
+            shell(before_test_prepared, env=virtualenv_env, cwd=project_dir)
+
+        # install the wheel
+        call(
+            "pip",
+            "install",
+            f"{repaired_wheel}{build_options.test_extras}",
+            env=virtualenv_env,
+        )
 
-                if build_options.test_sources:
-                    copy_test_sources(
-                        build_options.test_sources,
-                        Path.cwd(),
-                        test_cwd,
-                    )
-                else:
-                    # Use the test_fail.py file to raise a nice error if the user
-                    # tries to run tests in the cwd
-                    (test_cwd / "test_fail.py").write_text(resources.TEST_FAIL_CWD_FILE.read_text())
+        # test the wheel
+        if build_options.test_requires:
+            call("pip", "install", *build_options.test_requires, env=virtualenv_env)
+
+        # run the tests from a temp dir, with an absolute path in the command
+        # (this ensures that Python runs the tests against the installed wheel
+        # and not the repo code)
+        test_command_prepared = prepare_command(
+            build_options.test_command,
+            project=project_dir,
+            package=build_options.package_dir.resolve(),
+        )
 
-                shell(test_command_prepared, cwd=test_cwd, env=virtualenv_env)
+        test_cwd = identifier_tmp_dir / "test_cwd"
+        test_cwd.mkdir(exist_ok=True)
 
-            # we're all done here; move it to output (overwrite existing)
-            output_wheel: Path | None = None
-            if compatible_wheel is None:
+        if build_options.test_sources:
+            copy_test_sources(
+                build_options.test_sources,
+                project_dir,
+                test_cwd,
+            )
+        else:
+            # Use the test_fail.py file to raise a nice error if the user
+            # tries to run tests in the cwd
+            (test_cwd / "test_fail.py").write_text(resources.TEST_FAIL_CWD_FILE.read_text())
+
+        shell(test_command_prepared, cwd=test_cwd, env=virtualenv_env)
+
+    # we're all done here; move it to output (overwrite existing)
+    output_wheel: Path | None = None
+    if compatible_wheel is None:
+        with built_wheels.lock:
+            if repaired_wheel.name in {wheel.name for wheel in built_wheels.wheels}:
+                # a build running alongside this one might have produced the
+                # same abi3 wheel, in which case that one is reused. Unlike
+                # find_compatible_wheel, this can tell that it's for the same
+                # Pyodide version, from its platform tag
+                if not is_abi3_wheel(repaired_wheel.name):
+                    raise errors.AlreadyBuiltWheelError(repaired_wheel.name)
+                compatible_wheel = next(
+                    wheel for wheel in built_wheels.wheels if wheel.name == repaired_wheel.name
+                )
+                print(
+                    f"\nWheel {compatible_wheel.name} was also built for another identifier in the meantime, reusing it for {config.identifier}..."
+                )
+            else:
                 output_wheel = build_options.output_dir.joinpath(repaired_wheel.name)
                 moved_wheel = move_file(repaired_wheel, output_wheel)
                 if moved_wheel != output_wheel.resolve():
                     log.warning(
                         f"{repaired_wheel} was moved to {moved_wheel} instead of {output_wheel}"
                     )
-                built_wheels.append(output_wheel)
-            log.build_end(output_wheel)
-
-    except subprocess.CalledProcessError as error:
-        msg = f"Command {error.cmd} failed with code {error.returncode}. {error.stdout or ''}"
-        raise errors.FatalError(msg) from error
+                built_wheels.wheels.append(output_wheel)
+    log.build_end(output_wheel, reused_wheel=compatible_wheel)
+    submit_post_build(build_options=build_options, identifier=config.identifier, wheel=output_wheel)
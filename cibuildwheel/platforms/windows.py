@@ -3,14 +3,18 @@
 __lazy_modules__ = {
     "cibuildwheel.architecture",
     "cibuildwheel.audit",
+    "cibuildwheel.compiler_cache",
     "cibuildwheel.frontend",
     "cibuildwheel.logger",
+    "cibuildwheel.post_build",
     "cibuildwheel.util",
     "cibuildwheel.util.cmd",
+    "cibuildwheel.util.concurrency",
     "cibuildwheel.util.file",
     "cibuildwheel.util.helpers",
     "cibuildwheel.util.packaging",
     "cibuildwheel.venv",
+    "contextlib",
     "filelock",
     "pathlib",
     "platform",
@@ -20,13 +24,14 @@
     "typing",
 }
 
+import contextlib
 import dataclasses
 import os
 import platform as platform_module
 import shutil
 import subprocess
 import textwrap
-from functools import cache
+from functools import cache, partial
 from pathlib import Path
 from typing import assert_never
 
@@ -35,32 +40,50 @@
 from cibuildwheel import errors
 from cibuildwheel.architecture import Architecture
 from cibuildwheel.audit import run_audit
+from cibuildwheel.compiler_cache import (
+    compiler_cache_environment,
+    describe_stats_change,
+    host_compiler_cache,
+    read_host_stats,
+)
 from cibuildwheel.frontend import (
     BuildFrontendName,
     get_build_frontend_extra_flags,
     prepare_config_settings,
 )
 from cibuildwheel.logger import log
+from cibuildwheel.post_build import submit_post_build
 from cibuildwheel.util import resources
 from cibuildwheel.util.cmd import call, shell
+from cibuildwheel.util.concurrency import BackgroundQueue, Lookahead
 from cibuildwheel.util.file import (
     CIBW_CACHE_PATH,
+    Artifact,
     copy_test_sources,
     download,
     extract_zip,
+    fetch,
     move_file,
+    prefetched_path,
     remove_on_error,
 )
 from cibuildwheel.util.helpers import prepare_command, unwrap
 from cibuildwheel.util.packaging import find_compatible_wheel, get_pip_version
-from cibuildwheel.venv import constraint_flags, find_uv, target_marker_env, virtualenv
+from cibuildwheel.venv import (
+    constraint_flags,
+    find_uv,
+    target_marker_env,
+    virtualenv,
+    virtualenv_artifact,
+)
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
     from collections.abc import MutableMapping, Sequence, Set
 
     from cibuildwheel.environment import ParsedEnvironment
-    from cibuildwheel.options import Options
+    from cibuildwheel.logger import ActiveBuild
+    from cibuildwheel.options import BuildOptions, Options
     from cibuildwheel.selector import BuildSelector
 
 
@@ -127,13 +150,41 @@ def get_python_configurations(
     return python_configurations
 
 
+NUGET_URL = "https://dist.nuget.org/win-x86-commandline/latest/nuget.exe"
+
+
+def required_artifacts(identifiers: Sequence[str]) -> list[Artifact]:
+    """
+    The files that building `identifiers` downloads, for them to be
+    prefetched. CPython is installed by nuget, which downloads it itself.
+    """
+    result = []
+    for config in all_python_configurations():
+        if config.identifier not in identifiers:
+            continue
+        if config.identifier.startswith("cp"):
+            result.append(Artifact(url=NUGET_URL, sha256=None, path=CIBW_CACHE_PATH / "nuget.exe"))
+        else:
+            assert config.url is not None
+            result.append(
+                Artifact(
+                    url=config.url,
+                    sha256=config.sha256,
+                    path=prefetched_path(config.url),
+                    installed=CIBW_CACHE_PATH / config.url.rsplit("/", 1)[-1].removesuffix(".zip"),
+                )
+            )
+        result.append(virtualenv_artifact(config.version))
+    return result
+
+
 @cache
 def _ensure_nuget() -> Path:
     nuget = CIBW_CACHE_PATH / "nuget.exe"
     with FileLock(str(nuget) + ".lock"):
         if not nuget.exists():
             with remove_on_error(nuget):
-                download("https://dist.nuget.org/win-x86-commandline/latest/nuget.exe", nuget)
+                download(NUGET_URL, nuget)
     return nuget
 
 
@@ -165,7 +216,7 @@ def install_pypy(tmp: Path, arch: str, url: str, sha256: str) -> Path:
     with FileLock(str(installation_path) + ".lock"):
         if not installation_path.exists():
             pypy_zip = tmp / zip_filename
-            download(url, pypy_zip, sha256=sha256)
+            fetch(url, pypy_zip, sha256=sha256)
             with remove_on_error(installation_path):
                 # Extract to the parent directory because the zip file still contains a directory
                 extract_zip(pypy_zip, installation_path.parent)
@@ -180,7 +231,7 @@ def install_graalpy(tmp: Path, url: str, sha256: str) -> Path:
     with FileLock(str(installation_path) + ".lock"):
         if not installation_path.exists():
             graalpy_zip = tmp / zip_filename
-            download(url, graalpy_zip, sha256=sha256)
+            fetch(url, graalpy_zip, sha256=sha256)
             with remove_on_error(installation_path):
                 # Extract to the parent directory because the zip file still contains a directory
                 extract_zip(graalpy_zip, installation_path.parent)
@@ -274,17 +325,16 @@ def setup_rust_cross_compile(
         )
 
 
-def setup_python(
-    tmp: Path,
-    python_configuration: PythonConfiguration,
-    dependency_constraint: Path | None,
-    environment: ParsedEnvironment,
-    build_frontend: BuildFrontendName,
-) -> tuple[Path, dict[str, str]]:
-    tmp.mkdir()
+def install_python(
+    tmp: Path, python_configuration: PythonConfiguration
+) -> tuple[Path, Path | None]:
+    """
+    Install the Python for `python_configuration`. Returns the interpreter
+    to build with, and when cross-compiling, the directory of the target's
+    import libraries.
+    """
     implementation_id = python_configuration.identifier.split("-")[0]
     python_libs_base = None
-    log.step(f"Installing Python {implementation_id}...")
     if implementation_id.startswith("cp"):
         native_arch = platform_module.machine()
         base_python = install_cpython(python_configuration)
@@ -308,6 +358,30 @@ def setup_python(
     else:
         msg = "Unknown Python implementation"
         raise ValueError(msg)
+    return base_python, python_libs_base
+
+
+def prepare_python(tmp: Path, python_configuration: PythonConfiguration) -> None:
+    """
+    Install the Python for `python_configuration` ahead of setup_python,
+    while another identifier builds. Virtual environments can't be prepared
+    on Windows, see cibuildwheel.venv.
+    """
+    tmp.mkdir(parents=True)
+    install_python(tmp, python_configuration)
+
+
+def setup_python(
+    tmp: Path,
+    python_configuration: PythonConfiguration,
+    dependency_constraint: Path | None,
+    environment: ParsedEnvironment,
+    build_frontend: BuildFrontendName,
+) -> tuple[Path, dict[str, str]]:
+    tmp.mkdir()
+    implementation_id = python_configuration.identifier.split("-")[0]
+    log.step(f"Installing Python {implementation_id}...")
+    base_python, python_libs_base = install_python(tmp, python_configuration)
     assert base_python.exists()
 
     use_uv = build_frontend in {"build[uv]", "uv"}
@@ -439,252 +513,362 @@ def build(options: Options, tmp_path: Path) -> None:
 
         built_wheels: list[Path] = []
 
-        for config in python_configurations:
-            build_options = options.build_options(config.identifier)
-            build_frontend = build_options.build_frontend
-            use_uv = build_frontend.name in {"build[uv]", "uv"}
-            log.build_start(config.identifier)
-
-            identifier_tmp_dir = tmp_path / config.identifier
-            identifier_tmp_dir.mkdir()
-            built_wheel_dir = identifier_tmp_dir / "built_wheel"
-            repaired_wheel_dir = identifier_tmp_dir / "repaired_wheel"
+        with contextlib.ExitStack() as stack:
+            test_queue = None
+            if options.globals.pipeline_tests:
+                test_queue = stack.enter_context(BackgroundQueue())
+            lookahead = stack.enter_context(Lookahead())
+            for config, next_config in zip(
+                python_configurations, [*python_configurations[1:], None], strict=True
+            ):
+                build_options = options.build_options(config.identifier)
+                build_frontend = build_options.build_frontend
+                use_uv = build_frontend.name in {"build[uv]", "uv"}
+                log.build_start(config.identifier)
+
+                identifier_tmp_dir = tmp_path / config.identifier
+                identifier_tmp_dir.mkdir()
+                built_wheel_dir = identifier_tmp_dir / "built_wheel"
+                repaired_wheel_dir = identifier_tmp_dir / "repaired_wheel"
+
+                constraints_path = build_options.dependency_constraints.get_for_python_version(
+                    version=config.version,
+                    tmp_dir=identifier_tmp_dir,
+                )
 
-            constraints_path = build_options.dependency_constraints.get_for_python_version(
-                version=config.version,
-                tmp_dir=identifier_tmp_dir,
-            )
+                # get the next identifier's Python ready while this one builds
+                lookahead.wait(config.identifier)
+                if next_config is not None:
+                    lookahead.prepare(
+                        next_config.identifier,
+                        partial(
+                            prepare_python,
+                            tmp_path / "prepare" / next_config.identifier,
+                            next_config,
+                        ),
+                    )
 
-            # install Python
-            base_python, env = setup_python(
-                identifier_tmp_dir / "build",
-                config,
-                constraints_path,
-                build_options.environment,
-                build_frontend.name,
-            )
-            env["CIBUILDWHEEL_BUILD_IDENTIFIER"] = config.identifier
-            pip_version = None if use_uv else get_pip_version(env)
-
-            compatible_wheel = find_compatible_wheel(built_wheels, config.identifier)
-            if compatible_wheel:
-                log.step_end()
-                print(
-                    f"\nFound previously built wheel {compatible_wheel.name}, that's compatible with {config.identifier}. Skipping build step..."
+                # install Python
+                base_python, env = setup_python(
+                    identifier_tmp_dir / "build",
+                    config,
+                    constraints_path,
+                    build_options.environment,
+                    build_frontend.name,
                 )
-                repaired_wheel = compatible_wheel
-            else:
-                # run the before_build command
-                if build_options.before_build:
-                    log.step("Running before_build...")
-                    before_build_prepared = prepare_command(
-                        build_options.before_build,
-                        project=".",
-                        package=options.globals.package_dir,
+                env["CIBUILDWHEEL_BUILD_IDENTIFIER"] = config.identifier
+                pip_version = None if use_uv else get_pip_version(env)
+
+                compiler_cache = None
+                compiler_cache_stats: str | None = None
+                if build_options.compiler_cache.tool:
+                    compiler_cache = host_compiler_cache(build_options.compiler_cache.tool)
+                    # MSVC can't be wrapped through CC, so only CMake builds use the cache
+                    env = compiler_cache_environment(
+                        compiler_cache,
+                        config=build_options.compiler_cache,
+                        base_dir=Path.cwd(),
+                        env=env,
+                        compilers=None,
                     )
-                    shell(before_build_prepared, env=env)
-
-                log.step("Building wheel...")
-                built_wheel_dir.mkdir()
-
-                extra_flags = get_build_frontend_extra_flags(
-                    build_frontend,
-                    build_options.build_verbosity,
-                    prepare_config_settings(
-                        build_options.config_settings,
-                        project=Path.cwd(),
-                        package=options.globals.package_dir,
-                    ),
-                )
 
-                match build_frontend.name:
-                    case "pip":
-                        # Path.resolve() is needed. Without it pip wheel may try to fetch package from pypi.org
-                        # see https://github.com/pypa/cibuildwheel/pull/369
-                        call(
-                            "python",
-                            "-m",
-                            "pip",
-                            "wheel",
-                            options.globals.package_dir.resolve(),
-                            f"--wheel-dir={built_wheel_dir}",
-                            "--no-deps",
-                            *extra_flags,
-                            env=env,
-                        )
-                    case "build" | "build[uv]":
-                        if (
-                            use_uv
-                            and "--no-isolation" not in extra_flags
-                            and "-n" not in extra_flags
-                        ):
-                            extra_flags.append("--installer=uv")
-
-                        call(
-                            "python",
-                            "-m",
-                            "build",
-                            build_options.package_dir,
-                            "--wheel",
-                            f"--outdir={built_wheel_dir}",
-                            *extra_flags,
-                            env=env,
-                        )
-                    case "uv":
-                        assert uv_path is not None
-                        call(
-                            uv_path,
-                            "build",
-                            f"--python={base_python}",
-                            build_options.package_dir,
-                            "--wheel",
-                            f"--out-dir={built_wheel_dir}",
-                            *extra_flags,
-                            env=env,
-                        )
-                    case "pyodide-build":
-                        msg = "The 'pyodide-build' build frontend is not supported on this platform"
-                        raise errors.FatalError(msg)
-                    case _:
-                        assert_never(build_frontend)
-
-                try:
-                    built_wheel = next(built_wheel_dir.glob("*.whl"))
-                except StopIteration:
-                    raise errors.BuildProducedNoWheelError() from None
-
-                # repair the wheel
-                repaired_wheel_dir.mkdir()
-
-                if built_wheel.name.endswith("none-any.whl"):
-                    raise errors.NonPlatformWheelError()
-
-                if build_options.repair_command:
-                    log.step("Repairing wheel...")
-                    repair_command_prepared = prepare_command(
-                        build_options.repair_command,
-                        wheel=built_wheel,
-                        dest_dir=repaired_wheel_dir,
-                        package=build_options.package_dir,
-                        project=".",
+                compatible_wheel = find_compatible_wheel(built_wheels, config.identifier)
+                if compatible_wheel:
+                    log.step_end()
+                    print(
+                        f"\nFound previously built wheel {compatible_wheel.name}, that's compatible with {config.identifier}. Skipping build step..."
                     )
-                    shell(repair_command_prepared, env=env)
+                    repaired_wheel = compatible_wheel
                 else:
-                    shutil.move(str(built_wheel), repaired_wheel_dir)
-
-                try:
-                    repaired_wheel = next(repaired_wheel_dir.glob("*.whl"))
-                except StopIteration:
-                    raise errors.RepairStepProducedNoWheelError() from None
-
-                if repaired_wheel.name in {wheel.name for wheel in built_wheels}:
-                    raise errors.AlreadyBuiltWheelError(repaired_wheel.name)
-
-                run_audit(tmp_dir=tmp_path, build_options=build_options, wheel=repaired_wheel)
-
-            test_selected = options.globals.test_selector(config.identifier)
-            if test_selected and config.arch == "ARM64" != platform_module.machine():
-                log.warning(
-                    unwrap(
-                        """
-                            While arm64 wheels can be built on other platforms, they cannot
-                            be tested. An arm64 runner is required. To silence this warning,
-                            set `CIBW_TEST_SKIP: "*-win_arm64"`.
-                            """
+                    # run the before_build command
+                    if build_options.before_build:
+                        log.step("Running before_build...")
+                        before_build_prepared = prepare_command(
+                            build_options.before_build,
+                            project=".",
+                            package=options.globals.package_dir,
+                        )
+                        shell(before_build_prepared, env=env)
+
+                    log.step("Building wheel...")
+                    built_wheel_dir.mkdir()
+
+                    extra_flags = get_build_frontend_extra_flags(
+                        build_frontend,
+                        build_options.build_verbosity,
+                        prepare_config_settings(
+                            build_options.config_settings,
+                            project=Path.cwd(),
+                            package=options.globals.package_dir,
+                        ),
                     )
-                )
-                # skip this test
-            elif test_selected and build_options.test_command:
-                log.step("Testing wheel...")
-                # set up a virtual environment to install and test from, to make sure
-                # there are no dependencies that were pulled in at build time.
-                venv_dir = identifier_tmp_dir / "venv-test"
-                virtualenv_env = virtualenv(
-                    config.version,
-                    base_python,
-                    venv_dir,
-                    None,
-                    use_uv=use_uv,
+
+                    compiler_cache_stats_before = (
+                        read_host_stats(compiler_cache, env) if compiler_cache else None
+                    )
+
+                    match build_frontend.name:
+                        case "pip":
+                            # Path.resolve() is needed. Without it pip wheel may try to fetch package from pypi.org
+                            # see https://github.com/pypa/cibuildwheel/pull/369
+                            call(
+                                "python",
+                                "-m",
+                                "pip",
+                                "wheel",
+                                options.globals.package_dir.resolve(),
+                                f"--wheel-dir={built_wheel_dir}",
+                                "--no-deps",
+                                *extra_flags,
+                                env=env,
+                            )
+                        case "build" | "build[uv]":
+                            if (
+                                use_uv
+                                and "--no-isolation" not in extra_flags
+                                and "-n" not in extra_flags
+                            ):
+                                extra_flags.append("--installer=uv")
+
+                            call(
+                                "python",
+                                "-m",
+                                "build",
+                                build_options.package_dir,
+                                "--wheel",
+                                f"--outdir={built_wheel_dir}",
+                                *extra_flags,
+                                env=env,
+                            )
+                        case "uv":
+                            assert uv_path is not None
+                            call(
+                                uv_path,
+                                "build",
+                                f"--python={base_python}",
+                                build_options.package_dir,
+                                "--wheel",
+                                f"--out-dir={built_wheel_dir}",
+                                *extra_flags,
+                                env=env,
+                            )
+                        case "pyodide-build":
+                            msg = "The 'pyodide-build' build frontend is not supported on this platform"
+                            raise errors.FatalError(msg)
+                        case _:
+                            assert_never(build_frontend)
+
+                    if compiler_cache:
+                        compiler_cache_stats = describe_stats_change(
+                            compiler_cache_stats_before, read_host_stats(compiler_cache, env)
+                        )
+                        if compiler_cache_stats:
+                            print(f"info: Compiler cache: {compiler_cache_stats}")
+
+                    try:
+                        built_wheel = next(built_wheel_dir.glob("*.whl"))
+                    except StopIteration:
+                        raise errors.BuildProducedNoWheelError() from None
+
+                    # repair the wheel
+                    repaired_wheel_dir.mkdir()
+
+                    if built_wheel.name.endswith("none-any.whl"):
+                        raise errors.NonPlatformWheelError()
+
+                    if build_options.repair_command:
+                        log.step("Repairing wheel...")
+                        repair_command_prepared = prepare_command(
+                            build_options.repair_command,
+                            wheel=built_wheel,
+                            dest_dir=repaired_wheel_dir,
+                            package=build_options.package_dir,
+                            project=".",
+                        )
+                        shell(repair_command_prepared, env=env)
+                    else:
+                        shutil.move(str(built_wheel), repaired_wheel_dir)
+
+                    try:
+                        repaired_wheel = next(repaired_wheel_dir.glob("*.whl"))
+                    except StopIteration:
+                        raise errors.RepairStepProducedNoWheelError() from None
+
+                    if repaired_wheel.name in {wheel.name for wheel in built_wheels}:
+                        # with pipelined tests, an earlier compatible build can
+                        # pass its test while this one builds, it's reused then
+                        existing_wheel = find_compatible_wheel(built_wheels, config.identifier)
+                        if existing_wheel is None or existing_wheel.name != repaired_wheel.name:
+                            raise errors.AlreadyBuiltWheelError(repaired_wheel.name)
+
+                    run_audit(tmp_dir=tmp_path, build_options=build_options, wheel=repaired_wheel)
+
+                output_wheel = None
+                if compatible_wheel is None:
+                    output_wheel = build_options.output_dir.joinpath(repaired_wheel.name)
+
+                finish = partial(
+                    _test_and_finish,
+                    options=options,
+                    config=config,
+                    build_options=build_options,
+                    base_python=base_python,
                     env=env,
                     pip_version=pip_version,
+                    repaired_wheel=repaired_wheel,
+                    output_wheel=output_wheel,
+                    built_wheels=built_wheels,
+                    identifier_tmp_dir=identifier_tmp_dir,
+                    compiler_cache_stats=compiler_cache_stats,
                 )
+                if test_queue is None:
+                    finish()
+                else:
+                    # test in the background, while the next wheel builds
+                    test_queue.submit(
+                        config.identifier, partial(finish, handoff=log.handoff_build())
+                    )
+    except subprocess.CalledProcessError as error:
+        msg = f"Command {error.cmd} failed with code {error.returncode}. {error.stdout or ''}"
+        raise errors.FatalError(msg) from error
 
-                virtualenv_env = build_options.test_environment.as_dictionary(
-                    prev_environment=virtualenv_env
-                )
 
-                # check that we are using the Python from the virtual environment
-                call("where", "python", env=virtualenv_env)
+def _test_and_finish(
+    *,
+    options: Options,
+    config: PythonConfiguration,
+    build_options: BuildOptions,
+    base_python: Path,
+    env: dict[str, str],
+    pip_version: str | None,
+    repaired_wheel: Path,
+    output_wheel: Path | None,
+    built_wheels: list[Path],
+    identifier_tmp_dir: Path,
+    compiler_cache_stats: str | None,
+    handoff: ActiveBuild | None = None,
+) -> None:
+    """
+    Test the wheel built for `config`, if it's selected for testing, and
+    move it to `output_wheel`, unless that's None because the wheel was
+    already there. Once it's there, it's added to `built_wheels`, for later
+    builds to reuse. `handoff` is the build to resume, when this runs in
+    another thread.
+    """
+    if handoff is not None:
+        log.resume_build(handoff)
+    use_uv = build_options.build_frontend.name in {"build[uv]", "uv"}
+
+    test_selected = options.globals.test_selector(config.identifier)
+    if test_selected and config.arch == "ARM64" != platform_module.machine():
+        log.warning(
+            unwrap(
+                """
+                    While arm64 wheels can be built on other platforms, they cannot
+                    be tested. An arm64 runner is required. To silence this warning,
+                    set `CIBW_TEST_SKIP: "*-win_arm64"`.
+                    """
+            )
+        )
+        # skip this test
+    elif test_selected and build_options.test_command:
+        log.step("Testing wheel...")
+        # set up a virtual environment to install and test from, to make sure
+        # there are no dependencies that were pulled in at build time.
+        venv_dir = identifier_tmp_dir / "venv-test"
+        virtualenv_env = virtualenv(
+            config.version,
+            base_python,
+            venv_dir,
+            None,
+            use_uv=use_uv,
+            env=env,
+            pip_version=pip_version,
+        )
 
-                if build_options.before_test:
-                    before_test_prepared = prepare_command(
-                        build_options.before_test,
-                        project=".",
-                        package=build_options.package_dir,
-                    )
-                    shell(before_test_prepared, env=virtualenv_env)
+        virtualenv_env = build_options.test_environment.as_dictionary(
+            prev_environment=virtualenv_env
+        )
 
-                pip: Sequence[Path | str]
-                if use_uv:
-                    assert uv_path is not None
-                    pip = [uv_path, "pip"]
-                else:
-                    pip = ["pip"]
-
-                # install the wheel
-                call(
-                    *pip,
-                    "install",
-                    str(repaired_wheel) + build_options.test_extras,
-                    env=virtualenv_env,
-                )
+        # check that we are using the Python from the virtual environment
+        call("where", "python", env=virtualenv_env)
 
-                # test the wheel
-                if build_options.test_requires:
-                    call(*pip, "install", *build_options.test_requires, env=virtualenv_env)
-
-                # run the tests from a temp dir, with an absolute path in the command
-                # (this ensures that Python runs the tests against the installed wheel
-                # and not the repo code)
-                test_cwd = identifier_tmp_dir / "test_cwd"
-                test_cwd.mkdir()
-
-                if build_options.test_sources:
-                    copy_test_sources(
-                        build_options.test_sources,
-                        Path.cwd(),
-                        test_cwd,
-                    )
-                else:
-                    # Use the test_fail.py file to raise a nice error if the user
-                    # tries to run tests in the cwd
-                    (test_cwd / "test_fail.py").write_text(resources.TEST_FAIL_CWD_FILE.read_text())
-
-                test_command_prepared = prepare_command(
-                    build_options.test_command,
-                    project=Path.cwd(),
-                    package=options.globals.package_dir.resolve(),
-                    wheel=repaired_wheel,
-                )
-                shell(test_command_prepared, cwd=test_cwd, env=virtualenv_env)
-
-            # we're all done here; move it to output (remove if already exists)
-            output_wheel = None
-            if compatible_wheel is None:
-                output_wheel = build_options.output_dir.joinpath(repaired_wheel.name)
-                moved_wheel = move_file(repaired_wheel, output_wheel)
-                if moved_wheel != output_wheel.resolve():
-                    log.warning(
-                        f"{repaired_wheel} was moved to {moved_wheel} instead of {output_wheel}"
-                    )
-                built_wheels.append(output_wheel)
+        if build_options.before_test:
+            before_test_prepared = prepare_command(
+                build_options.before_test,
+                project=".",
+                package=build_options.package_dir,
+            )
+            shell(before_test_prepared, env=virtualenv_env)
+
+        pip: Sequence[Path | str]
+        if use_uv:
+            uv_path = find_uv()
+            assert uv_path is not None
+            pip = [uv_path, "pip"]
+        else:
+            pip = ["pip"]
+
+        # install the wheel
+        call(
+            *pip,
+            "install",
+            str(repaired_wheel) + build_options.test_extras,
+            env=virtualenv_env,
+        )
 
-            # clean up
-            # (we ignore errors because occasionally Windows fails to unlink a file and we
-            # don't want to abort a build because of that)
-            shutil.rmtree(identifier_tmp_dir, ignore_errors=True)
+        # test the wheel
+        if build_options.test_requires:
+            call(*pip, "install", *build_options.test_requires, env=virtualenv_env)
+
+        # run the tests from a temp dir, with an absolute path in the command
+        # (this ensures that Python runs the tests against the installed wheel
+        # and not the repo code)
+        test_cwd = identifier_tmp_dir / "test_cwd"
+        test_cwd.mkdir()
+
+        if build_options.test_sources:
+            copy_test_sources(
+                build_options.test_sources,
+                Path.cwd(),
+                test_cwd,
+            )
+        else:
+            # Use the test_fail.py file to raise a nice error if the user
+            # tries to run tests in the cwd
+            (test_cwd / "test_fail.py").write_text(resources.TEST_FAIL_CWD_FILE.read_text())
+
+        test_command_prepared = prepare_command(
+            build_options.test_command,
+            project=Path.cwd(),
+            package=options.globals.package_dir.resolve(),
+            wheel=repaired_wheel,
+        )
+        shell(test_command_prepared, cwd=test_cwd, env=virtualenv_env)
 
-            log.build_end(output_wheel)
-    except subprocess.CalledProcessError as error:
-        msg = f"Command {error.cmd} failed with code {error.returncode}. {error.stdout or ''}"
-        raise errors.FatalError(msg) from error
+    reused_wheel = repaired_wheel if output_wheel is None else None
+    if output_wheel is not None and output_wheel in built_wheels:
+        # an earlier build of the same wheel passed its test in the meantime
+        print(
+            f"\nWheel {output_wheel.name} was also built for another identifier in the meantime, reusing it for {config.identifier}..."
+        )
+        reused_wheel, output_wheel = output_wheel, None
+
+    # we're all done here; move it to output (remove if already exists)
+    if output_wheel is not None:
+        moved_wheel = move_file(repaired_wheel, output_wheel)
+        if moved_wheel != output_wheel.resolve():
+            log.warning(f"{repaired_wheel} was moved to {moved_wheel} instead of {output_wheel}")
+        built_wheels.append(output_wheel)
+
+    # clean up
+    # (we ignore errors because occasionally Windows fails to unlink a file and we
+    # don't want to abort a build because of that)
+    shutil.rmtree(identifier_tmp_dir, ignore_errors=True)
+
+    log.build_end(
+        output_wheel,
+        reused_wheel=reused_wheel,
+        compiler_cache=compiler_cache_stats,
+    )
+    submit_post_build(build_options=build_options, identifier=config.identifier, wheel=output_wheel)
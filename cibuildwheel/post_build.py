@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+__lazy_modules__ = {
+    "cibuildwheel.logger",
+    "cibuildwheel.util",
+    "cibuildwheel.util.cmd",
+    "cibuildwheel.util.concurrency",
+    "cibuildwheel.util.helpers",
+    "contextlib",
+    "functools",
+    "subprocess",
+}
+
+import contextlib
+import functools
+import os
+import subprocess
+import time
+
+from cibuildwheel.logger import log
+from cibuildwheel.util.cmd import shell
+from cibuildwheel.util.concurrency import BackgroundQueue
+from cibuildwheel.util.helpers import prepare_command
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from pathlib import Path
+
+    from cibuildwheel.options import BuildOptions
+
+_queue: BackgroundQueue | None = None
+
+
+@contextlib.contextmanager
+def post_build_queue(*, jobs: int) -> Generator[None, None, None]:
+    """
+    Run the post-build-commands submitted inside this block in the
+    background, on `jobs` worker threads, while the builds carry on.
+    Leaving the block waits for them to finish, even when a build failed -
+    the wheels built before it are in the output directory all the same.
+    """
+    global _queue  # noqa: PLW0603
+
+    with BackgroundQueue(jobs=jobs) as queue:
+        _queue = queue
+        try:
+            yield
+        except Exception:
+            queue.wait()
+            raise
+        finally:
+            _queue = None
+
+
+def submit_post_build(*, build_options: BuildOptions, identifier: str, wheel: Path | None) -> None:
+    """
+    Run the post-build-command on `wheel`, once it's in the output
+    directory. Inside a post_build_queue block, it runs in the background,
+    otherwise it runs straight away.
+    """
+    if wheel is None or not build_options.post_build_command:
+        return
+
+    # prepared here, so that a problem with the command shows up in this
+    # identifier's build, rather than in whichever build submits next
+    prepared_command = prepare_command(
+        build_options.post_build_command,
+        wheel=wheel,
+        project=".",
+        package=build_options.package_dir,
+    )
+    task = functools.partial(
+        run_post_build_command, command=prepared_command, identifier=identifier, wheel=wheel
+    )
+    if _queue is None:
+        task()
+    else:
+        _queue.submit(f"post-build-command {identifier}", task)
+
+
+def run_post_build_command(*, command: str, identifier: str, wheel: Path) -> None:
+    """
+    Run the prepared `command` on `wheel`. Failures are recorded in the
+    build summary, rather than raised, so that the other wheels still get
+    processed.
+    """
+    env = os.environ.copy()
+    env["CIBUILDWHEEL_BUILD_IDENTIFIER"] = identifier
+
+    log.step(f"Running post-build-command for {identifier}...")
+    start = time.time()
+    error: str | None = None
+    try:
+        shell(command, env=env)
+    except subprocess.CalledProcessError as e:
+        error = f"exit code {e.returncode}"
+    except Exception as e:  # noqa: BLE001
+        error = str(e) or type(e).__name__
+    log.post_build_end(
+        identifier=identifier, wheel=wheel, duration=time.time() - start, error=error
+    )
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+__lazy_modules__ = {
+    "cibuildwheel.logger",
+    "cibuildwheel.util",
+    "cibuildwheel.util.file",
+    "cibuildwheel.util.python_build_standalone",
+    "concurrent",
+    "concurrent.futures",
+    "filelock",
+    "http",
+    "http.client",
+    "io",
+}
+
+import contextlib
+import http.client
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from filelock import FileLock
+
+from cibuildwheel import errors
+from cibuildwheel.logger import log
+from cibuildwheel.util.file import download
+from cibuildwheel.util.python_build_standalone import PythonBuildStandaloneError
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from typing import Final
+
+    from cibuildwheel.platforms import PlatformModule
+    from cibuildwheel.util.file import Artifact
+
+PREFETCH_JOBS: Final[int] = 4
+
+
+def plan_artifacts(platform_module: PlatformModule, identifiers: Sequence[str]) -> list[Artifact]:
+    """
+    The files that building `identifiers` will download and that aren't in
+    the cache yet, each listed once.
+    """
+    try:
+        # finding some of the files prints what's being looked for, which
+        # is repeated when the build needs them
+        with contextlib.redirect_stdout(io.StringIO()):
+            artifacts = platform_module.required_artifacts(identifiers)
+    except (errors.FatalError, PythonBuildStandaloneError, OSError) as e:
+        log.warning(f"Can't work out the files to prefetch: {e}")
+        return []
+    unique = {artifact.path: artifact for artifact in artifacts if artifact.needed}
+    return list(unique.values())
+
+
+def _prefetch(artifact: Artifact) -> str | None:
+    try:
+        with FileLock(f"{artifact.path}.lock"):
+            # a concurrent run might have fetched or installed it meanwhile
+            if artifact.needed:
+                download(artifact.url, artifact.path, sha256=artifact.sha256)
+    except (OSError, http.client.HTTPException, errors.FatalError) as e:
+        return f"{artifact.url}: {e}"
+    return None
+
+
+def prefetch_artifacts(artifacts: Sequence[Artifact]) -> None:
+    """
+    Download `artifacts` into the cache, several at a time, before the
+    first build starts. A failure isn't fatal, the build that needs the file
+    will try to download it again.
+    """
+    if not artifacts:
+        return
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=PREFETCH_JOBS) as executor:
+        failures = [e for e in executor.map(_prefetch, artifacts) if e is not None]
+    for failure in failures:
+        log.warning(f"Prefetching failed, the build will download it instead: {failure}")
+    fetched = len(artifacts) - len(failures)
+    print(f"info: Prefetched {fetched} of {len(artifacts)} files in {time.time() - start:.2f}s")
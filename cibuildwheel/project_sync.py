@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+__lazy_modules__ = {
+    "cibuildwheel.util",
+    "cibuildwheel.util.file",
+    "cibuildwheel.util.helpers",
+    "fnmatch",
+    "hashlib",
+    "humanize",
+    "json",
+    "shutil",
+    "subprocess",
+    "tempfile",
+}
+
+import dataclasses
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import stat
+import subprocess
+import tempfile
+import typing
+from pathlib import Path, PurePosixPath
+from typing import Literal
+
+import humanize
+
+from cibuildwheel.util.file import CIBW_CACHE_PATH
+from cibuildwheel.util.helpers import parse_key_value_string
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from typing import Self
+
+    from cibuildwheel.oci_container import OCIContainer
+    from cibuildwheel.options import BuildOptions
+
+ProjectSyncMode = Literal["copy", "incremental"]
+
+# (size, mtime in ns, sha256 of the contents or of the symlink target)
+ManifestEntry = tuple[int, int, str]
+Manifest = dict[str, ManifestEntry]
+
+# where the manifests of the projects synced into a container are kept
+CONTAINER_MANIFEST_DIR = PurePosixPath("/var/lib/cibuildwheel/project-manifests")
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class ProjectSyncConfig:
+    mode: ProjectSyncMode = "copy"
+    exclude: tuple[str, ...] = ()
+
+    @classmethod
+    def from_config_string(cls, config_string: str) -> Self:
+        config_dict = parse_key_value_string(config_string, ["mode"], ["exclude"])
+        mode = " ".join(config_dict.get("mode") or ["copy"])
+        if mode not in {"copy", "incremental"}:
+            msg = f"unknown project sync mode {mode!r}"
+            raise ValueError(msg)
+        return cls(
+            mode=typing.cast("ProjectSyncMode", mode),
+            exclude=tuple(config_dict.get("exclude") or []),
+        )
+
+    def options_summary(self) -> str | dict[str, str]:
+        if not self.exclude:
+            return self.mode
+        return {"mode": self.mode, "exclude": repr(self.exclude)}
+
+
+def is_excluded(path: str, patterns: Sequence[str]) -> bool:
+    """
+    True if the relative posix `path`, or one of the directories containing
+    it, matches one of the glob `patterns`. A pattern without a slash
+    matches by name, anywhere in the tree; other patterns are relative to
+    the project root.
+    """
+    parts = path.split("/")
+    prefixes = ["/".join(parts[:i]) for i in range(1, len(parts) + 1)]
+    for pattern in patterns:
+        pattern = pattern.rstrip("/")  # noqa: PLW2901
+        if "/" in pattern:
+            pattern = pattern.lstrip("/")  # noqa: PLW2901
+            if any(fnmatch.fnmatchcase(prefix, pattern) for prefix in prefixes):
+                return True
+        elif any(fnmatch.fnmatchcase(part, pattern) for part in parts):
+            return True
+    return False
+
+
+def _walk(root: Path, directory: str = "") -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(root / directory):
+        relative_dir = Path(dirpath).relative_to(root).as_posix()
+        prefix = "" if relative_dir == "." else f"{relative_dir}/"
+        for name in filenames:
+            yield prefix + name
+        for name in dirnames:
+            if Path(dirpath, name).is_symlink():
+                # copied as a link, like the rest of the tree
+                yield prefix + name
+
+
+def list_project_files(root: Path, exclude: Sequence[str] = ()) -> list[str]:
+    """
+    List the files to copy from the project at `root`, as relative posix
+    paths. In a git checkout, these are the files that git doesn't ignore,
+    plus the .git directory itself, which tools like setuptools-scm read.
+    Otherwise, everything is listed.
+    """
+    try:
+        git_output = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=root,
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        paths = set(_walk(root))
+    else:
+        paths = set()
+        for path in os.fsdecode(git_output).split("\0"):
+            if not path:
+                continue
+            full_path = root / path
+            if full_path.is_dir() and not full_path.is_symlink():
+                # a submodule
+                paths.update(_walk(root, path))
+            elif full_path.is_symlink() or full_path.exists():
+                # tracked files might have been deleted from the checkout
+                paths.add(path)
+        if (root / ".git").is_dir():
+            paths.update(_walk(root, ".git"))
+        elif (root / ".git").exists():
+            paths.add(".git")
+
+    return sorted(path for path in paths if not is_excluded(path, exclude))
+
+
+def copy_project(root: Path, dest: Path, exclude: Sequence[str] = ()) -> None:
+    """
+    Copy the files of the project at `root` into `dest`, as listed by
+    list_project_files, so that a build can run in a copy of its own.
+    """
+    for path in list_project_files(root, exclude):
+        target = dest / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if (root / path).is_symlink():
+            target.symlink_to((root / path).readlink())
+        else:
+            shutil.copy2(root / path, target)
+
+
+def project_exclude(project_sync: ProjectSyncConfig, *, root: Path, output_dir: Path) -> list[str]:
+    """
+    The exclude patterns for the project at `root`, including the output
+    directory when it's inside the project, as wheels built into it would
+    change the project after every build.
+    """
+    exclude = list(project_sync.exclude)
+    root, output_dir = root.resolve(), output_dir.resolve()
+    if output_dir.is_relative_to(root):
+        exclude.append("/" + output_dir.relative_to(root).as_posix())
+    return exclude
+
+
+def copy_project_for_build(build_options: BuildOptions, dest: Path) -> BuildOptions:
+    """
+    Copy the project in the working directory into `dest`, for a build that
+    runs on the host alongside others, and return `build_options` with the
+    package directory pointed at the copy. Builds that shared the project
+    would trip over each other's in-tree build artifacts.
+    """
+    root = Path.cwd().resolve()
+    exclude = project_exclude(
+        build_options.project_sync, root=root, output_dir=build_options.output_dir
+    )
+    copy_project(root, dest, exclude)
+    package_dir = build_options.package_dir.resolve()
+    if not package_dir.is_relative_to(root):
+        return build_options
+    copied_globals = dataclasses.replace(
+        build_options.globals, package_dir=dest / package_dir.relative_to(root)
+    )
+    return dataclasses.replace(build_options, globals=copied_globals)
+
+
+def _local_cache_path(root: Path) -> Path:
+    root_hash = hashlib.sha256(os.fsencode(root.resolve())).hexdigest()[:16]
+    return CIBW_CACHE_PATH / "project-sync" / f"{root_hash}.json"
+
+
+def build_manifest(root: Path, paths: Sequence[str]) -> Manifest:
+    """
+    Describe each of `paths` in the project at `root`. Hashes are kept in a
+    local cache, and only recomputed for files whose size or mtime changed.
+    """
+    cache_path = _local_cache_path(root)
+    try:
+        cache: Manifest = {
+            k: typing.cast("ManifestEntry", tuple(v))
+            for k, v in json.loads(cache_path.read_text(encoding="utf8")).items()
+        }
+    except (OSError, ValueError):
+        cache = {}
+
+    manifest: Manifest = {}
+    for path in paths:
+        full_path = root / path
+        st = full_path.lstat()
+        cached = cache.get(path)
+        if cached is not None and cached[:2] == (st.st_size, st.st_mtime_ns):
+            manifest[path] = cached
+            continue
+        if stat.S_ISLNK(st.st_mode):
+            digest = hashlib.sha256(b"link:" + os.fsencode(full_path.readlink())).hexdigest()
+        else:
+            with full_path.open("rb") as f:
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
+        manifest[path] = (st.st_size, st.st_mtime_ns, digest)
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # other build steps might be writing the cache at the same time
+    with tempfile.NamedTemporaryFile(
+        "w", dir=cache_path.parent, suffix=".tmp", delete=False, encoding="utf8"
+    ) as cache_file:
+        json.dump(manifest, cache_file)
+    Path(cache_file.name).replace(cache_path)
+    return manifest
+
+
+def _container_manifest_path(to_path: PurePosixPath) -> PurePosixPath:
+    to_path_hash = hashlib.sha256(str(to_path).encode("utf8")).hexdigest()[:16]
+    return CONTAINER_MANIFEST_DIR / f"{to_path_hash}.json"
+
+
+def _read_container_manifest(container: OCIContainer, to_path: PurePosixPath) -> Manifest | None:
+    manifest_path = _container_manifest_path(to_path)
+    if not container.exists(manifest_path):
+        return None
+    try:
+        contents = container.call(["cat", manifest_path], capture_output=True)
+        return {k: typing.cast("ManifestEntry", tuple(v)) for k, v in json.loads(contents).items()}
+    except (subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def sync_project(
+    container: OCIContainer,
+    from_path: Path,
+    to_path: PurePosixPath,
+    config: ProjectSyncConfig,
+) -> None:
+    """
+    Copy the project at `from_path` into the container at `to_path`. In
+    incremental mode, only the files that differ from what's in the
+    container are transferred, and any other files there are removed.
+    """
+    if config.mode == "copy":
+        if container.reused:
+            container.remove(to_path)
+            container.remove(_container_manifest_path(to_path))
+        # with exclude patterns, the same files as in incremental mode
+        paths = list_project_files(from_path, config.exclude) if config.exclude else None
+        container.copy_into(from_path, to_path, paths=paths)
+        return
+
+    manifest = build_manifest(from_path, list_project_files(from_path, config.exclude))
+    # the builds since the last sync might have changed files, or left some
+    # behind, so the files in the container are checked. The hashes from
+    # the last sync are reused for files that haven't been touched.
+    previous = _read_container_manifest(container, to_path)
+    found = None if previous is None else container.file_manifest(to_path, previous)
+    current: Manifest = {}
+    if found is None:
+        # we don't know what's there, so start from scratch
+        container.remove(to_path)
+    else:
+        current = {k: typing.cast("ManifestEntry", tuple(v)) for k, v in found.items()}
+
+    # files are compared by content, a new mtime alone doesn't need a copy
+    changed = {
+        path
+        for path, entry in manifest.items()
+        if path not in current or current[path][2] != entry[2]
+    }
+    removed = sorted(set(current) - set(manifest))
+
+    container.mkdir(to_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        if removed:
+            removed_list = tmp_path / "removed"
+            removed_list.write_bytes(b"\0".join(os.fsencode(p) for p in removed))
+            container_removed_list = _container_manifest_path(to_path).with_suffix(".removed")
+            container.copy_into(removed_list, container_removed_list)
+            container.call(
+                ["sh", "-c", f"xargs -0 rm -f -- < {container_removed_list}"], cwd=to_path
+            )
+            container.remove(container_removed_list)
+        if changed:
+            container.copy_into(from_path, to_path, paths=sorted(changed))
+
+        # the state of the files in the container, which is what the next
+        # sync checks against. The files that were copied are hashed again
+        # then, as their mtime in the container isn't known here.
+        container_manifest = {path: current[path] for path in manifest if path not in changed}
+        manifest_file = tmp_path / "manifest.json"
+        manifest_file.write_text(json.dumps(container_manifest), encoding="utf8")
+        container.copy_into(manifest_file, _container_manifest_path(to_path))
+
+    changed_size = sum(manifest[path][0] for path in changed)
+    print(
+        f"info: Synced project: {len(changed)} files changed "
+        f"({humanize.naturalsize(changed_size)}), {len(removed)} removed, "
+        f"{len(manifest) - len(changed)} unchanged"
+    )
@@ -0,0 +1,125 @@
+# container_agent.py
+#
+# Runs inside build containers, started by OCIContainer with the image's
+# utility python. It reads one JSON request per line on stdin, and answers
+# each with one JSON line on stdout, either {"result": ...} or {"error": ...}.
+# This saves starting a new process for each simple query or file operation.
+#
+# This must stay compatible with the oldest utility python (3.9), and only
+# use the standard library.
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+
+
+def op_ping() -> str:
+    return "pong"
+
+
+def op_environ(cwd: str | None = None) -> dict[str, str]:
+    env = os.environ.copy()
+    if cwd:
+        # what a shell started in cwd would report
+        env["PWD"] = cwd
+    return env
+
+
+def op_glob(pattern: str) -> list[str]:
+    return glob.glob(pattern)
+
+
+def op_which(name: str, path: str | None = None) -> str | None:
+    return shutil.which(name, path=path)
+
+
+def op_exists(path: str) -> bool:
+    return os.path.lexists(path)
+
+
+def op_mkdir(path: str) -> None:
+    os.makedirs(path, exist_ok=True)
+
+
+def op_rm(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.unlink(path)
+
+
+def op_mv(src: str, dst: str) -> str:
+    return shutil.move(src, dst)
+
+
+def op_mktemp() -> str:
+    return tempfile.mkdtemp()
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def op_manifest(root: str, known: dict[str, list[object]]) -> dict[str, list[object]]:
+    # [size, mtime in ns, sha256 of the contents or of the symlink target] of
+    # each file under root, like project_sync's manifests. The hashes in
+    # `known` are reused for files whose size and mtime haven't changed.
+    result: dict[str, list[object]] = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        links = [name for name in dirnames if os.path.islink(os.path.join(dirpath, name))]
+        for name in filenames + links:
+            full_path = os.path.join(dirpath, name)
+            path = os.path.relpath(full_path, root).replace(os.sep, "/")
+            st = os.lstat(full_path)
+            cached = known.get(path)
+            if cached is not None and cached[:2] == [st.st_size, st.st_mtime_ns]:
+                result[path] = cached
+                continue
+            if stat.S_ISLNK(st.st_mode):
+                target = os.fsencode(os.readlink(full_path))
+                digest = hashlib.sha256(b"link:" + target).hexdigest()
+            else:
+                digest = _file_sha256(full_path)
+            result[path] = [st.st_size, st.st_mtime_ns, digest]
+    return result
+
+
+OPS = {
+    "ping": op_ping,
+    "environ": op_environ,
+    "glob": op_glob,
+    "which": op_which,
+    "exists": op_exists,
+    "mkdir": op_mkdir,
+    "rm": op_rm,
+    "mv": op_mv,
+    "mktemp": op_mktemp,
+    "manifest": op_manifest,
+}
+
+
+def main() -> None:
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+            op = OPS[request.pop("op")]
+            response = {"result": op(**request)}
+        except Exception as e:  # noqa: BLE001
+            response = {"error": f"{type(e).__name__}: {e}"}
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
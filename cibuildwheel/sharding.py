@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+__lazy_modules__ = {
+    "cibuildwheel.platforms",
+    "cibuildwheel.platforms.linux",
+    "cibuildwheel.util",
+    "cibuildwheel.util.file",
+    "json",
+    "math",
+    "statistics",
+    "tempfile",
+}
+
+import dataclasses
+import json
+import math
+import re
+import statistics
+import tempfile
+from pathlib import Path
+
+from cibuildwheel import errors
+from cibuildwheel.platforms import linux
+from cibuildwheel.util.file import CIBW_CACHE_PATH
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping, Sequence
+    from typing import Any, Self
+
+    from cibuildwheel.logger import BuildInfo
+    from cibuildwheel.options import Options
+    from cibuildwheel.typing import PlatformName
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class ShardSpec:
+    """One of `count` shards of the build, numbered from 1."""
+
+    index: int
+    count: int
+
+    @classmethod
+    def from_string(cls, shard: str) -> Self:
+        match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", shard)
+        if match is None:
+            msg = f"Invalid shard {shard!r}, expected INDEX/COUNT, e.g. 1/3"
+            raise errors.ConfigurationError(msg)
+        index, count = int(match.group(1)), int(match.group(2))
+        if not 1 <= index <= count:
+            msg = f"Invalid shard {shard!r}, INDEX must be between 1 and COUNT"
+            raise errors.ConfigurationError(msg)
+        return cls(index=index, count=count)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+@dataclasses.dataclass(kw_only=True)
+class Shard:
+    identifiers: list[str] = dataclasses.field(default_factory=list)
+    estimated_duration: float = 0.0
+
+
+def _durations_path() -> Path:
+    return CIBW_CACHE_PATH / "build-durations.json"
+
+
+def read_durations(path: Path | None = None) -> dict[str, float]:
+    """
+    Build durations by identifier, from `path`, or from the durations
+    recorded on this machine. `path` can also be the output of --plan.
+    """
+    try:
+        durations = json.loads((path or _durations_path()).read_text(encoding="utf8"))
+    except (OSError, ValueError) as e:
+        if path is None:
+            return {}
+        msg = f"Failed to read the build durations from {path}: {e}"
+        raise errors.ConfigurationError(msg) from e
+    if isinstance(durations, dict) and isinstance(durations.get("durations"), dict):
+        durations = durations["durations"]
+    if not isinstance(durations, dict):
+        return {}
+    return {
+        identifier: float(duration)
+        for identifier, duration in durations.items()
+        if isinstance(duration, int | float)
+    }
+
+
+def record_durations(builds: Iterable[BuildInfo]) -> None:
+    """Remember how long `builds` took, to balance shards in later runs."""
+    new_durations = {build.identifier: round(build.duration, 1) for build in builds}
+    if not new_durations:
+        return
+    durations = read_durations() | new_durations
+    durations_path = _durations_path()
+    durations_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=durations_path.parent, suffix=".tmp", delete=False, encoding="utf8"
+    ) as durations_file:
+        json.dump(dict(sorted(durations.items())), durations_file, indent=2)
+    Path(durations_file.name).replace(durations_path)
+
+
+def identifier_groups(
+    *, options: Options, platform: PlatformName, identifiers: Sequence[str]
+) -> list[list[str]]:
+    """
+    Split `identifiers` into the groups that share a container on Linux, so
+    that shards can keep them together. Elsewhere, each identifier is on its
+    own, as there's nothing to share.
+    """
+    if platform != "linux":
+        return [[identifier] for identifier in identifiers]
+    selected = set(identifiers)
+    python_configurations = [
+        config for config in linux.all_python_configurations() if config.identifier in selected
+    ]
+    return [
+        [config.identifier for config in step.platform_configs]
+        for step in linux.get_build_steps(options, python_configurations)
+    ]
+
+
+def _split(group: Sequence[str], n_parts: int, duration: Callable[[str], float]) -> list[list[str]]:
+    """Split `group` into `n_parts` runs of identifiers of about the same duration."""
+    parts = []
+    remaining = list(group)
+    for n_left in range(n_parts, 1, -1):
+        part_target = sum(map(duration, remaining)) / n_left
+        part = [remaining.pop(0)]
+        while (
+            len(remaining) >= n_left
+            and sum(map(duration, part)) + duration(remaining[0]) / 2 <= part_target
+        ):
+            part.append(remaining.pop(0))
+        parts.append(part)
+    parts.append(remaining)
+    return parts
+
+
+def plan_shards(
+    groups: Sequence[Sequence[str]], durations: Mapping[str, float], count: int
+) -> list[Shard]:
+    """
+    Split `groups` of identifiers into `count` shards of about the same
+    estimated duration. Identifiers without a recorded duration are assumed
+    to take the median of the others. A group is only split up when it's
+    longer than a shard should be, as each part needs a container of its own.
+    The plan only depends on the arguments, so nodes that are given the same
+    durations agree on it.
+    """
+    all_identifiers = [identifier for group in groups for identifier in group]
+    known = [durations[i] for i in all_identifiers if i in durations]
+    default_duration = statistics.median(known) if known else 1.0
+
+    def duration(identifier: str) -> float:
+        return durations.get(identifier, default_duration)
+
+    total = sum(duration(identifier) for identifier in all_identifiers)
+    target = total / count if total else 1.0
+
+    parts: list[list[str]] = []
+    for group in groups:
+        n_parts = math.ceil(round(sum(map(duration, group)) / target, 6))
+        parts += _split(group, min(len(group), max(n_parts, 1)), duration)
+
+    shards = [Shard() for _ in range(count)]
+    # longest first, each to the shard that's least loaded so far
+    for part in sorted(parts, key=lambda p: -sum(map(duration, p))):
+        shard = min(shards, key=lambda s: s.estimated_duration)
+        shard.identifiers += part
+        shard.estimated_duration += sum(map(duration, part))
+
+    order = {identifier: i for i, identifier in enumerate(all_identifiers)}
+    for shard in shards:
+        shard.identifiers.sort(key=order.__getitem__)
+    return shards
+
+
+def plan_summary(shards: Sequence[Shard], durations: Mapping[str, float]) -> dict[str, Any]:
+    """The JSON printed by --plan."""
+    return {
+        "shards": [
+            {
+                "shard": f"{index}/{len(shards)}",
+                "identifiers": shard.identifiers,
+                "estimated_duration": round(shard.estimated_duration, 1),
+            }
+            for index, shard in enumerate(shards, start=1)
+        ],
+        "durations": {
+            identifier: durations[identifier]
+            for shard in shards
+            for identifier in shard.identifiers
+            if identifier in durations
+        },
+    }
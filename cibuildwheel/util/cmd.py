@@ -1,6 +1,12 @@
 from __future__ import annotations
 
-__lazy_modules__ = {"cibuildwheel.errors", "shlex", "shutil", "subprocess"}
+__lazy_modules__ = {
+    "cibuildwheel.errors",
+    "cibuildwheel.util.concurrency",
+    "shlex",
+    "shutil",
+    "subprocess",
+}
 
 import os
 import shlex
@@ -10,6 +16,7 @@
 import typing
 
 from cibuildwheel.errors import FatalError
+from cibuildwheel.util.concurrency import output_is_captured
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
@@ -63,6 +70,9 @@ def call(
         msg = f"Couldn't find {args_[0]!r} in PATH {path!r}"
         raise FatalError(msg)
     args_[0] = executable
+    if not capture_stdout and output_is_captured():
+        _run_relaying_output(args_, shell=_IS_WIN, env=env, cwd=cwd)
+        return None
     try:
         result = subprocess.run(
             args_,
@@ -88,9 +98,35 @@ def shell(
 ) -> None:
     command = " ".join(commands)
     print(f"+ {command}")
+    if output_is_captured():
+        _run_relaying_output(command, shell=True, env=env, cwd=cwd)
+        return
     subprocess.run(command, env=env, cwd=cwd, shell=True, check=True)
 
 
+def _run_relaying_output(
+    args: str | list[str],
+    *,
+    shell: bool,
+    env: Mapping[str, str] | None,
+    cwd: PathOrStr | None,
+) -> None:
+    """
+    Run a command, passing its output through sys.stdout rather than letting
+    it write to the terminal directly, so it ends up in the buffered log of
+    the concurrent task that ran it.
+    """
+    sys.stdout.flush()
+    with subprocess.Popen(
+        args, shell=shell, env=env, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    ) as process:
+        assert process.stdout is not None
+        shutil.copyfileobj(process.stdout, sys.stdout.buffer)
+    sys.stdout.flush()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, args)
+
+
 def split_command(lst: list[str]) -> Iterator[list[str]]:
     """
     Split a shell-style command, as returned by shlex.split, into a sequence
@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+__lazy_modules__ = {
+    "cibuildwheel.errors",
+    "cibuildwheel.logger",
+    "concurrent",
+    "concurrent.futures",
+    "contextlib",
+    "humanize",
+    "io",
+    "time",
+}
+
+import contextlib
+import io
+import sys
+import threading
+import time
+import typing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TypeVar
+
+import humanize
+
+from cibuildwheel import errors
+from cibuildwheel.logger import log
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Sequence
+    from concurrent.futures import Future
+    from types import TracebackType
+    from typing import Any, BinaryIO, Self, TextIO
+
+
+T = TypeVar("T")
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_install_count = 0
+_original_streams: tuple[TextIO, TextIO] | None = None
+
+
+class _ThreadRoutedStream:
+    """
+    Stands in for sys.stdout/sys.stderr while tasks run concurrently. Output
+    from a thread that is capturing is written to that thread's buffer,
+    everything else goes to the original stream.
+    """
+
+    def __init__(self, original: TextIO) -> None:
+        self._original = original
+
+    def _target(self) -> TextIO:
+        capture: TextIO | None = getattr(_local, "capture", None)
+        return capture if capture is not None else self._original
+
+    def write(self, s: str) -> int:
+        return self._target().write(s)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    @property
+    def buffer(self) -> BinaryIO:
+        return self._target().buffer
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        return getattr(self._target(), name)
+
+
+@contextlib.contextmanager
+def _routed_std_streams() -> Generator[None, None, None]:
+    global _install_count, _original_streams  # noqa: PLW0603
+
+    with _install_lock:
+        if _install_count == 0:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            _original_streams = (sys.stdout, sys.stderr)
+            sys.stdout = typing.cast("TextIO", _ThreadRoutedStream(sys.stdout))
+            sys.stderr = typing.cast("TextIO", _ThreadRoutedStream(sys.stderr))
+        _install_count += 1
+    try:
+        yield
+    finally:
+        with _install_lock:
+            _install_count -= 1
+            if _install_count == 0:
+                assert _original_streams is not None
+                sys.stdout, sys.stderr = _original_streams
+                _original_streams = None
+
+
+def output_is_captured() -> bool:
+    """
+    True if the current thread's output is being buffered by
+    run_in_parallel. Subprocesses write straight to the file descriptors, so
+    callers should relay their output through sys.stdout when this is set.
+    """
+    return getattr(_local, "capture", None) is not None
+
+
+@contextlib.contextmanager
+def _capture_output() -> Generator[io.BytesIO, None, None]:
+    """
+    Buffer everything the current thread writes to sys.stdout/sys.stderr.
+    The buffer is binary, so that writes to sys.stdout.buffer are kept in
+    order with text writes.
+    """
+    raw = io.BytesIO()
+    previous = getattr(_local, "capture", None)
+    _local.capture = io.TextIOWrapper(
+        raw, encoding="utf8", errors="surrogateescape", write_through=True
+    )
+    try:
+        yield raw
+    finally:
+        _local.capture = previous
+
+
+def _error_message(error: BaseException) -> str:
+    return str(error) or type(error).__name__
+
+
+def run_in_parallel(tasks: Sequence[tuple[str, Callable[[], T]]], *, jobs: int) -> list[T]:
+    """
+    Run each (name, callable) in `tasks` on a pool of `jobs` threads, and
+    return their results in the same order.
+
+    The output of each task is buffered and printed in one piece once it
+    finishes, so logs of concurrent tasks don't interleave. A short line is
+    printed as each task starts and finishes, to show progress. Every task
+    runs to completion even if others fail; the failures are then raised
+    together.
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        return [func() for _, func in tasks]
+
+    print_lock = threading.Lock()
+    with _routed_std_streams():
+        # the caller's own stdout, which might be a parent task's buffer
+        out = typing.cast("_ThreadRoutedStream", sys.stdout)._target()
+
+        def announce(message: str) -> None:
+            with print_lock:
+                print(message, file=out)
+                out.flush()
+
+        def run_task(
+            name: str, func: Callable[[], T]
+        ) -> tuple[T | None, BaseException | None, str]:
+            announce(f"info: {name} started")
+            start = time.time()
+            result: T | None = None
+            error: BaseException | None = None
+            with _capture_output() as raw_output:
+                try:
+                    result = func()
+                except BaseException as e:  # noqa: BLE001
+                    error = e
+                # close any fold group the task left open, so the replayed
+                # output is self-contained
+                log.step_end(success=error is None)
+                output = raw_output.getvalue().decode("utf8", errors="surrogateescape")
+            duration = humanize.naturaldelta(time.time() - start, minimum_unit="milliseconds")
+            status = "failed" if error is not None else "finished"
+            announce(f"info: {name} {status} in {duration}")
+            return result, error, output
+
+        results: dict[int, T | None] = {}
+        failures: list[tuple[str, BaseException]] = []
+
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="cibuildwheel") as executor:
+            pending: dict[Future[tuple[T | None, BaseException | None, str]], int] = {
+                executor.submit(run_task, name, func): index
+                for index, (name, func) in enumerate(tasks)
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: pending[f]):
+                    index = pending.pop(future)
+                    name = tasks[index][0]
+                    result, error, output = future.result()
+                    with print_lock:
+                        print(f"\n── {name} " + "─" * max(0, 74 - len(name)), file=out)
+                        out.write(output)
+                        out.flush()
+                    if error is not None:
+                        failures.append((name, error))
+                    else:
+                        results[index] = result
+
+    _raise_failures(failures, total=len(tasks))
+
+    return [results[index] for index in range(len(tasks))]  # type: ignore[misc]
+
+
+def _raise_failures(failures: Sequence[tuple[str, BaseException]], *, total: int) -> None:
+    if len(failures) == 1:
+        raise failures[0][1]
+    if failures:
+        messages = "\n".join(f"  {name}: {_error_message(e)}" for name, e in failures)
+        combined = errors.FatalError(f"{len(failures)} of {total} tasks failed:\n{messages}")
+        first = failures[0][1]
+        if isinstance(first, errors.FatalError):
+            combined.return_code = first.return_code
+        raise combined from first
+
+
+class BackgroundQueue:
+    """
+    Runs tasks on `jobs` worker threads, while the caller carries on with
+    other work. With the default of one worker, tasks run one after the
+    other, in the order they were submitted. As with run_in_parallel, the
+    output of each task is buffered and printed in one piece once it
+    finishes. Once a task fails, the tasks that haven't started yet are
+    skipped, and the failure is raised by the next call to `submit`, or
+    when the queue is closed.
+
+    Use as a context manager. Leaving the `with` block waits for the queued
+    tasks, unless it's left with an exception, in which case only the tasks
+    that are already running are waited for - call `wait` first to run the
+    rest anyway.
+    """
+
+    def __init__(self, *, jobs: int = 1) -> None:
+        self._jobs = jobs
+        self._lock = threading.Lock()
+        self._failures: list[tuple[str, BaseException]] = []
+        self._submitted = 0
+        self._executor: ThreadPoolExecutor | None = None
+        self._streams = contextlib.ExitStack()
+        self._out: TextIO | None = None
+
+    def __enter__(self) -> Self:
+        self._streams.enter_context(_routed_std_streams())
+        # the caller's own stdout, which might be a parent task's buffer
+        self._out = typing.cast("_ThreadRoutedStream", sys.stdout)._target()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._jobs, thread_name_prefix="cibuildwheel"
+        )
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        assert self._executor is not None
+        self._executor.shutdown(wait=True, cancel_futures=exc_val is not None)
+        self._streams.close()
+        if exc_val is None:
+            self._raise_failures()
+
+    def submit(self, name: str, func: Callable[[], object]) -> None:
+        assert self._executor is not None
+        self._raise_failures()
+        self._submitted += 1
+        self._executor.submit(self._run_task, name, func)
+
+    def wait(self) -> None:
+        """
+        Wait for all the queued tasks, without raising their failures. No
+        more tasks can be submitted afterwards.
+        """
+        assert self._executor is not None
+        self._executor.shutdown(wait=True)
+
+    def _raise_failures(self) -> None:
+        with self._lock:
+            failures = list(self._failures)
+        _raise_failures(failures, total=self._submitted)
+
+    def _run_task(self, name: str, func: Callable[[], object]) -> None:
+        with self._lock:
+            if self._failures:
+                return
+
+        error: BaseException | None = None
+        with _capture_output() as raw_output:
+            try:
+                func()
+            except BaseException as e:  # noqa: BLE001
+                error = e
+            log.step_end(success=error is None)
+            output = raw_output.getvalue().decode("utf8", errors="surrogateescape")
+
+        assert self._out is not None
+        with self._lock:
+            print(f"\n── {name} " + "─" * max(0, 74 - len(name)), file=self._out)
+            self._out.write(output)
+            self._out.flush()
+            if error is not None:
+                self._failures.append((name, error))
+
+
+class Lookahead:
+    """
+    Prepares what a later step will need on a background thread, e.g. the
+    interpreter of the next identifier while the current one builds.
+
+    Preparing is only ever a head start: the step does the same work again
+    when it gets there, which is quick once the preparation has finished,
+    and waits on the same file locks while it's still running. So a failed
+    preparation is only reported, and the step runs into the error again
+    and raises it.
+
+    The output of a preparation is buffered, and printed by `wait`, so that
+    it shows up in the log of the step it was for. Use as a context manager;
+    leaving the `with` block drops the preparations that haven't started.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[str, Future[tuple[BaseException | None, str]]] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        self._streams = contextlib.ExitStack()
+
+    def __enter__(self) -> Self:
+        self._streams.enter_context(_routed_std_streams())
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cibuildwheel")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        assert self._executor is not None
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._streams.close()
+
+    def prepare(self, name: str, func: Callable[[], object]) -> None:
+        """Start running `func` in the background, to be waited for as `name`."""
+        assert self._executor is not None
+        self._pending[name] = self._executor.submit(self._run_task, func)
+
+    def wait(self, name: str) -> None:
+        """
+        Wait for the preparation called `name`, if there is one, and print
+        its output.
+        """
+        future = self._pending.pop(name, None)
+        if future is None:
+            return
+        error, output = future.result()
+        if output:
+            print(f"\n── {name} (prepared in the background) " + "─" * max(0, 50 - len(name)))
+            sys.stdout.write(output)
+            sys.stdout.flush()
+        if error is not None:
+            log.warning(f"Preparing {name} in the background failed: {_error_message(error)}")
+
+    @staticmethod
+    def _run_task(func: Callable[[], object]) -> tuple[BaseException | None, str]:
+        error: BaseException | None = None
+        with _capture_output() as raw_output:
+            try:
+                func()
+            except BaseException as e:  # noqa: BLE001
+                error = e
+            log.step_end(success=error is None)
+            output = raw_output.getvalue().decode("utf8", errors="surrogateescape")
+        return error, output
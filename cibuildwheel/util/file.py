@@ -3,30 +3,45 @@
 __lazy_modules__ = {
     "certifi",
     "cibuildwheel.errors",
+    "concurrent",
+    "concurrent.futures",
+    "filelock",
     "hashlib",
+    "http",
+    "http.client",
     "shutil",
     "ssl",
     "tarfile",
+    "tempfile",
     "typing",
     "urllib",
+    "urllib.error",
+    "urllib.parse",
     "urllib.request",
     "zipfile",
 }
 
 
+import dataclasses
 import hashlib
+import http.client
 import os
 import shutil
 import ssl
 import tarfile
+import tempfile
 import time
+import urllib.error
+import urllib.parse
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path, PurePath
 from typing import Final
 from zipfile import ZipFile
 
 import certifi
+from filelock import FileLock
 from platformdirs import user_cache_path
 
 from cibuildwheel.errors import FatalError
@@ -40,6 +55,13 @@
     os.environ.get("CIBW_CACHE_PATH", DEFAULT_CIBW_CACHE_PATH)
 ).resolve()
 
+DOWNLOAD_CHUNK_SIZE: Final[int] = 1024 * 1024
+DOWNLOAD_TIMEOUT: Final[float] = 60
+DOWNLOAD_ATTEMPTS: Final[int] = 5
+# files at least this big are downloaded in parts, if the server allows it
+DOWNLOAD_PARALLEL_MIN_SIZE: Final[int] = 32 * 1024 * 1024
+DOWNLOAD_PARALLEL_PARTS: Final[int] = 4
+
 
 @contextmanager
 def remove_on_error(path: Path) -> Generator[None, None, None]:
@@ -77,7 +99,175 @@ def ensure_cache_sentinel(cache_path: Path) -> None:
             )
 
 
+def _open_url(
+    url: str,
+    context: ssl.SSLContext,
+    *,
+    start: int = 0,
+    end: int | None = None,
+    validator: str | None = None,
+) -> http.client.HTTPResponse:
+    """
+    GET `url`, from byte `start` to byte `end` (inclusive). A range request
+    is only honoured if the file still matches `validator`.
+    """
+    headers = {}
+    if start or end is not None:
+        headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+        if validator:
+            headers["If-Range"] = validator
+    request = urllib.request.Request(url, headers=headers)
+    return urllib.request.urlopen(request, context=context, timeout=DOWNLOAD_TIMEOUT)  # type: ignore[no-any-return]
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code >= 500 or error.code in {408, 429}
+    if isinstance(error, urllib.error.URLError) and isinstance(
+        error.reason, ssl.SSLCertVerificationError
+    ):
+        return False
+    return isinstance(error, OSError | http.client.HTTPException)
+
+
+def _retry_or_raise(error: Exception, failures: int) -> None:
+    """
+    Raise `error` if it's not worth trying again after `failures` failures
+    in a row, otherwise wait a little longer each time.
+    """
+    if isinstance(error, urllib.error.HTTPError):
+        # the error holds the response, and with it the connection
+        error.close()
+    if not _is_retryable(error) or failures >= DOWNLOAD_ATTEMPTS:
+        raise error
+    time.sleep(min(2**failures, 30))
+
+
+def _validator(response: http.client.HTTPResponse) -> str | None:
+    """What If-Range can check to make sure that the file hasn't changed."""
+    etag = response.headers.get("ETag")
+    # If-Range can't use weak ETags
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _expected_end(response: http.client.HTTPResponse, start: int) -> int | None:
+    """
+    The position that the body of `response` should end at, as reading it
+    in chunks doesn't check that the connection wasn't closed early.
+    """
+    content_length = response.headers.get("Content-Length")
+    if content_length is None:
+        return None
+    return (start if response.status == 206 else 0) + int(content_length)
+
+
+def _stream_download(
+    url: str, context: ssl.SSLContext, dest: Path, response: http.client.HTTPResponse
+) -> str:
+    """
+    Write the body of `response` to `dest`, resuming from where it stopped
+    if the connection fails, and return its SHA256.
+    """
+    validator = _validator(response)
+    hasher = hashlib.sha256()
+    written = 0
+    failures = 0
+    with dest.open("wb") as f:
+        while True:
+            try:
+                with response:
+                    if written and response.status != 206:
+                        # the server sent the whole file again
+                        f.seek(0)
+                        f.truncate()
+                        hasher = hashlib.sha256()
+                        written = 0
+                    expected = _expected_end(response, written)
+                    while chunk := response.read(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        hasher.update(chunk)
+                        written += len(chunk)
+                        failures = 0
+                    if expected is not None and written < expected:
+                        raise http.client.IncompleteRead(chunk, expected - written)
+                return hasher.hexdigest()
+            except (OSError, http.client.HTTPException) as e:
+                failures += 1
+                _retry_or_raise(e, failures)
+            while True:
+                try:
+                    response = _open_url(url, context, start=written, validator=validator)
+                    break
+                except (OSError, http.client.HTTPException) as e:
+                    failures += 1
+                    _retry_or_raise(e, failures)
+
+
+def _download_range(
+    url: str, context: ssl.SSLContext, dest: Path, start: int, end: int, validator: str
+) -> None:
+    """Download bytes `start` to `end` of `url` into the same place in `dest`."""
+    position = start
+    failures = 0
+    with dest.open("r+b") as f:
+        while position <= end:
+            try:
+                with _open_url(
+                    url, context, start=position, end=end, validator=validator
+                ) as response:
+                    if response.status != 206:
+                        msg = f"{url} changed during the download"
+                        raise OSError(msg)
+                    f.seek(position)
+                    while chunk := response.read(min(DOWNLOAD_CHUNK_SIZE, end + 1 - position)):
+                        f.write(chunk)
+                        position += len(chunk)
+                        failures = 0
+                    if position <= end:
+                        raise http.client.IncompleteRead(chunk, end + 1 - position)
+            except (OSError, http.client.HTTPException) as e:
+                failures += 1
+                _retry_or_raise(e, failures)
+
+
+def _parallel_download(
+    url: str, context: ssl.SSLContext, dest: Path, size: int, validator: str
+) -> str:
+    """
+    Download `url`, which is `size` bytes long, in parts at the same time,
+    and return its SHA256.
+    """
+    with dest.open("wb") as f:
+        f.truncate(size)
+    part_size = -(-size // DOWNLOAD_PARALLEL_PARTS)
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_PARALLEL_PARTS) as executor:
+        futures = [
+            executor.submit(
+                _download_range,
+                url,
+                context,
+                dest,
+                start,
+                min(start + part_size, size) - 1,
+                validator,
+            )
+            for start in range(0, size, part_size)
+        ]
+        for future in futures:
+            future.result()
+    with dest.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
 def download(url: str, dest: Path, *, sha256: str | None = None) -> None:
+    """
+    Download `url` to `dest`. The file is streamed to disk and hashed on
+    the way, interrupted transfers are resumed, and large files are fetched
+    in several parts at once when the server supports it. `dest` only
+    appears once the download is complete, and matches `sha256` if given.
+    """
     print(f"+ Download {url} to {dest}")
     dest_dir = dest.parent
     dest_dir.mkdir(parents=True, exist_ok=True)
@@ -86,25 +276,87 @@ def download(url: str, dest: Path, *, sha256: str | None = None) -> None:
     # so we use certifi (this sounds odd but requests also does this by default)
     cafile = os.environ.get("SSL_CERT_FILE", certifi.where())
     context = ssl.create_default_context(cafile=cafile)
-    repeat_num = 3
-    for i in range(repeat_num):
+
+    failures = 0
+    while True:
         try:
-            with urllib.request.urlopen(url, context=context) as response:
-                dest.write_bytes(response.read())
-                break
-
-        except OSError:
-            if i == repeat_num - 1:
-                raise
-            time.sleep(3)
-
-    if sha256:
-        with dest.open("rb") as f:
-            computed = hashlib.file_digest(f, "sha256").hexdigest()
-        if computed != sha256:
-            dest.unlink(missing_ok=True)
+            response = _open_url(url, context)
+            break
+        except (OSError, http.client.HTTPException) as e:
+            failures += 1
+            _retry_or_raise(e, failures)
+
+    with tempfile.TemporaryDirectory(prefix=".cibuildwheel-", dir=dest_dir) as tmp:
+        tmp_dest = Path(tmp, dest.name)
+        size = int(response.headers.get("Content-Length") or 0)
+        validator = _validator(response)
+        if (
+            size >= DOWNLOAD_PARALLEL_MIN_SIZE
+            and validator
+            and response.headers.get("Accept-Ranges") == "bytes"
+        ):
+            response.close()
+            computed = _parallel_download(url, context, tmp_dest, size, validator)
+        else:
+            computed = _stream_download(url, context, tmp_dest, response)
+
+        if sha256 and computed != sha256:
             msg = f"SHA256 mismatch for {url}: expected {sha256!r}, got {computed!r}"
             raise FatalError(msg)
+        tmp_dest.replace(dest)
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Artifact:
+    """
+    A file that a build downloads, which can be fetched ahead of time to
+    `path`. It isn't needed if `installed` exists, as it's already been
+    installed from.
+    """
+
+    url: str
+    sha256: str | None
+    path: Path
+    installed: Path | None = None
+
+    @property
+    def needed(self) -> bool:
+        return not self.path.exists() and not (self.installed and self.installed.exists())
+
+
+def prefetched_path(url: str) -> Path:
+    """
+    Where the file at `url` is prefetched to, when it's normally downloaded
+    to a temporary directory. See `fetch`. Named after a hash of the whole
+    URL, as different URLs can end with the same file name, followed by
+    that name for readability.
+    """
+    url_hash = hashlib.sha256(url.encode("utf8")).hexdigest()[:16]
+    name = urllib.parse.urlsplit(url).path.rsplit("/", 1)[-1]
+    return CIBW_CACHE_PATH / "prefetched" / (f"{url_hash}-{name}" if name else url_hash)
+
+
+def fetch(url: str, dest: Path, *, sha256: str | None = None) -> None:
+    """
+    Put the file at `url` at `dest`, using the file that was prefetched for
+    it if there is one, or downloading it otherwise. The prefetched file is
+    moved, as it's only needed once. Either way, the file is checked against
+    `sha256` if given - a prefetched file that doesn't match, e.g. from an
+    older run, is downloaded again.
+    """
+    prefetched = prefetched_path(url)
+    with FileLock(f"{prefetched}.lock"):
+        if prefetched.exists():
+            print(f"+ Use prefetched {url}")
+            moved = move_file(prefetched, dest)
+            if sha256 is None:
+                return
+            with moved.open("rb") as f:
+                if hashlib.file_digest(f, "sha256").hexdigest() == sha256:
+                    return
+            print(f"+ Prefetched {url} doesn't match its SHA256, downloading it again")
+            moved.unlink()
+    download(url, dest, sha256=sha256)
 
 
 def extract_zip(zip_src: Path, dest: Path) -> None:
@@ -156,13 +408,15 @@ def move_file(src_file: Path, dst_file: Path) -> Path:
     if dst_file.is_dir():
         msg = "dst_file must be a valid target filename, not an existing directory."
         raise IsADirectoryError(msg)
-    dst_file.unlink(missing_ok=True)
     dst_file.parent.mkdir(parents=True, exist_ok=True)
 
-    # using shutil.move() as Path.rename() is not guaranteed to work across filesystem boundaries
-    # explicit str() needed for Python 3.8
-    resulting_file = shutil.move(str(src_file), str(dst_file))
-    return Path(resulting_file).resolve(strict=True)
+    # using shutil.move() as Path.rename() is not guaranteed to work across filesystem boundaries.
+    # The file is moved next to `dst_file` first, then renamed into place, so that `dst_file` is
+    # never seen half-written, e.g. by builds running alongside this one.
+    with tempfile.TemporaryDirectory(prefix=".cibuildwheel-", dir=dst_file.parent) as tmp_dir:
+        tmp_file = Path(shutil.move(src_file, Path(tmp_dir, dst_file.name)))
+        tmp_file.replace(dst_file)
+    return dst_file.resolve(strict=True)
 
 
 def copy_into_local(src: Path, dst: PurePath) -> None:
@@ -199,3 +453,18 @@ def copy_test_sources(
             raise FatalError(msg)
 
         copy_into(source, test_dir / test_path)
+
+
+def directory_size(path: Path) -> int:
+    """
+    The total size of the files under `path`, or 0 if it doesn't exist.
+    Entries that can't be read are skipped.
+    """
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += Path(dirpath, name).lstat().st_size
+            except OSError:
+                continue
+    return total
@@ -9,9 +9,10 @@
 }
 
 import shlex
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path, PurePath
-from typing import TypeVar
+from typing import Generic, TypeVar
 
 from packaging.utils import parse_wheel_filename
 
@@ -193,6 +194,21 @@ def find_compatible_wheel(wheels: Sequence[T], identifier: str) -> T | None:
     return None
 
 
+@dataclass(kw_only=True)
+class BuiltWheels(Generic[T]):
+    """
+    The wheels built so far, for finding ones that can be reused. Builds
+    running at the same time share this, so access is guarded by `lock`.
+    """
+
+    wheels: list[T] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def find_compatible(self, identifier: str) -> T | None:
+        with self.lock:
+            return find_compatible_wheel(self.wheels, identifier)
+
+
 def is_abi3_wheel(wheel_name: str) -> bool:
     """Check if a wheel uses the abi3 stable ABI based on its filename."""
     _, _, _, tags = parse_wheel_filename(wheel_name)
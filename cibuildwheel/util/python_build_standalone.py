@@ -21,7 +21,7 @@
 
 from filelock import FileLock
 
-from cibuildwheel.util.file import download, extract_tar, remove_on_error
+from cibuildwheel.util.file import Artifact, download, extract_tar, remove_on_error
 from cibuildwheel.util.resources import PYTHON_BUILD_STANDALONE_RELEASES
 
 TYPE_CHECKING = False
@@ -192,6 +192,21 @@ def _find_python_executable(extracted_dir: Path) -> Path:
     return executable_path.resolve()  # Return absolute path
 
 
+def python_build_standalone_artifact(python_version: str, cache_dir: Path) -> Artifact:
+    """
+    The python-build-standalone archive that
+    create_python_build_standalone_environment uses, for prefetching.
+    """
+    arch_id, platform_id, libc_id = _get_platform_identifiers()
+    _, asset_url, asset_filename, asset_sha256 = _get_pbs_asset(
+        python_version=python_version,
+        arch_identifier=arch_id,
+        platform_identifier=platform_id,
+        libc_identifier=libc_id,
+    )
+    return Artifact(url=asset_url, sha256=asset_sha256 or None, path=cache_dir / asset_filename)
+
+
 def create_python_build_standalone_environment(
     python_version: str, temp_dir: Path, cache_dir: Path
 ) -> Path:
@@ -15,6 +15,7 @@
 
 PATH: Final[Path] = Path(__file__).parent.parent / "resources"
 INSTALL_CERTIFI_SCRIPT: Final[Path] = PATH / "install_certifi.py"
+CONTAINER_AGENT_SCRIPT: Final[Path] = PATH / "container_agent.py"
 FREE_THREAD_ENABLE_314: Final[Path] = PATH / "free-threaded-enable-314.xml"
 FREE_THREAD_ENABLE_315: Final[Path] = PATH / "free-threaded-enable-315.xml"
 NODEJS: Final[Path] = PATH / "nodejs.toml"
@@ -6,6 +6,8 @@
     "cibuildwheel.util.file",
     "contextlib",
     "filelock",
+    "hashlib",
+    "json",
     "packaging",
     "packaging.markers",
     "packaging.requirements",
@@ -17,6 +19,8 @@
 
 import contextlib
 import functools
+import hashlib
+import json
 import os
 import shutil
 import sys
@@ -31,7 +35,7 @@
 
 from cibuildwheel.util import resources
 from cibuildwheel.util.cmd import call
-from cibuildwheel.util.file import CIBW_CACHE_PATH, download, remove_on_error
+from cibuildwheel.util.file import CIBW_CACHE_PATH, Artifact, download, remove_on_error
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
@@ -59,22 +63,36 @@ def target_marker_env(
     return env
 
 
-@functools.cache
-def _ensure_virtualenv(version: str) -> tuple[Path, Version]:
+def _virtualenv_configuration(version: str) -> tuple[str, Artifact]:
+    """The version of virtualenv to use for Python `version`, and its zipapp."""
     version_parts = version.split(".")
     key = f"py{version_parts[0]}{version_parts[1]}"
     with resources.VIRTUALENV.open("rb") as f:
         loaded_file = tomllib.load(f)
     configuration = loaded_file.get(key, loaded_file["default"])
-    version = str(configuration["version"])
-    url = str(configuration["url"])
-    sha256 = str(configuration["sha256"])
-    path = CIBW_CACHE_PATH / f"virtualenv-{version}.pyz"
+    virtualenv_version = str(configuration["version"])
+    artifact = Artifact(
+        url=str(configuration["url"]),
+        sha256=str(configuration["sha256"]),
+        path=CIBW_CACHE_PATH / f"virtualenv-{virtualenv_version}.pyz",
+    )
+    return virtualenv_version, artifact
+
+
+def virtualenv_artifact(version: str) -> Artifact:
+    """The virtualenv zipapp that's used for Python `version`, for prefetching."""
+    return _virtualenv_configuration(version)[1]
+
+
+@functools.cache
+def _ensure_virtualenv(version: str) -> tuple[Path, Version]:
+    virtualenv_version, artifact = _virtualenv_configuration(version)
+    path = artifact.path
     with FileLock(str(path) + ".lock"):
         if not path.exists():
             with remove_on_error(path):
-                download(url, path, sha256=sha256)
-    return (path, Version(version))
+                download(artifact.url, path, sha256=artifact.sha256)
+    return (path, Version(virtualenv_version))
 
 
 def constraint_flags(
@@ -135,6 +153,102 @@ def _parse_pip_constraint_for_virtualenv(
     return "embed"
 
 
+def _virtualenv_command(version: str, python: Path, pip_version: str) -> list[str | Path]:
+    """
+    The command that creates a virtual environment for `python` with
+    virtualenv, less the path of the virtual environment.
+    """
+    virtualenv_app, virtualenv_version = _ensure_virtualenv(version)
+    additional_flags = [f"--pip={pip_version}", "--no-setuptools"]
+    if virtualenv_version < Version("20.31") or Version(version) < Version("3.9"):
+        additional_flags.append("--no-wheel")
+
+    # Using symlinks to pre-installed seed packages is really the fastest way to get a virtual
+    # environment. The initial cost is a bit higher but reusing is much faster.
+    # Windows does not always allow symlinks so just disabling for now.
+    # Requires pip>=19.3 so disabling for "embed" because this means we don't know what's the
+    # version of pip that will end-up installed.
+    # c.f. https://virtualenv.pypa.io/en/latest/cli_interface.html#section-seeder
+    if not _IS_WIN and pip_version != "embed" and Version(pip_version) >= Version("19.3"):
+        additional_flags.append("--symlink-app-data")
+
+    return [
+        sys.executable,
+        "-sS",  # just the stdlib, https://github.com/pypa/virtualenv/issues/2133#issuecomment-1003710125
+        virtualenv_app,
+        "--activators=",
+        "--no-periodic-update",
+        *additional_flags,
+        "--python",
+        python,
+    ]
+
+
+def _ensure_virtualenv_template(command: Sequence[str | Path], python: Path) -> Path:
+    """
+    A virtual environment created by `command`, kept in the cache to be
+    cloned by every build that needs the same one. The interpreter's size
+    and modification time are part of the key, so that a template isn't
+    used once the interpreter is reinstalled.
+    """
+    python_stat = python.stat()
+    key_inputs = [*map(str, command[2:]), python_stat.st_size, python_stat.st_mtime_ns]
+    key = hashlib.sha256(json.dumps(key_inputs).encode("utf8")).hexdigest()[:16]
+    template_path = (CIBW_CACHE_PATH / "venv-templates" / key).resolve()
+    ready_path = template_path.with_name(f"{key}.ready")
+    with FileLock(str(template_path) + ".lock"):
+        if not ready_path.exists():
+            # a template that isn't ready was left by a run that was interrupted
+            shutil.rmtree(template_path, ignore_errors=True)
+            template_path.parent.mkdir(parents=True, exist_ok=True)
+            with remove_on_error(template_path):
+                call(*command, template_path)
+            ready_path.touch()
+    return template_path
+
+
+_FICLONE: Final[int] = 0x40049409
+
+
+def _clone_file(src: str, dst: str) -> None:
+    """
+    Copy a file, sharing its data with the original on filesystems that
+    support it (reflinks on btrfs, XFS...). Hard links aren't used, as the
+    copy would then be modified along with the original.
+    """
+    if sys.platform == "linux":
+        import fcntl  # noqa: PLC0415
+
+        try:
+            with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+                fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+        except OSError:
+            pass
+        else:
+            shutil.copystat(src, dst)
+            return
+    shutil.copy2(src, dst)
+
+
+def clone_virtualenv(template_path: Path, venv_path: Path) -> None:
+    """
+    Copy the virtual environment at `template_path` to `venv_path`, and
+    point the files that refer to the template, like the shebangs of the
+    scripts, to the copy.
+    """
+    shutil.copytree(
+        template_path, venv_path, symlinks=True, copy_function=_clone_file, dirs_exist_ok=True
+    )
+    old_path = os.fsencode(template_path)
+    new_path = os.fsencode(venv_path.absolute())
+    for path in [venv_path / "pyvenv.cfg", *(venv_path / "bin").iterdir()]:
+        if path.is_symlink() or not path.is_file():
+            continue
+        contents = path.read_bytes()
+        if old_path in contents and b"\0" not in contents:
+            path.write_bytes(contents.replace(old_path, new_path))
+
+
 def virtualenv(
     version: str,
     python: Path,
@@ -162,33 +276,15 @@ def virtualenv(
         assert uv_path is not None
         call(uv_path, "venv", venv_path, "--python", python)
     else:
-        virtualenv_app, virtualenv_version = _ensure_virtualenv(version)
         if pip_version is None:
             pip_version = _parse_pip_constraint_for_virtualenv(dependency_constraint, marker_env)
-        additional_flags = [f"--pip={pip_version}", "--no-setuptools"]
-        if virtualenv_version < Version("20.31") or Version(version) < Version("3.9"):
-            additional_flags.append("--no-wheel")
-
-        # Using symlinks to pre-installed seed packages is really the fastest way to get a virtual
-        # environment. The initial cost is a bit higher but reusing is much faster.
-        # Windows does not always allow symlinks so just disabling for now.
-        # Requires pip>=19.3 so disabling for "embed" because this means we don't know what's the
-        # version of pip that will end-up installed.
-        # c.f. https://virtualenv.pypa.io/en/latest/cli_interface.html#section-seeder
-        if not _IS_WIN and pip_version != "embed" and Version(pip_version) >= Version("19.3"):
-            additional_flags.append("--symlink-app-data")
-
-        call(
-            sys.executable,
-            "-sS",  # just the stdlib, https://github.com/pypa/virtualenv/issues/2133#issuecomment-1003710125
-            virtualenv_app,
-            "--activators=",
-            "--no-periodic-update",
-            *additional_flags,
-            "--python",
-            python,
-            venv_path,
-        )
+        command = _virtualenv_command(version, python, pip_version)
+        if _IS_WIN:
+            # The script launchers in Scripts embed the path of the venv in a
+            # binary, so a copy of a venv can't be fixed up to work elsewhere.
+            call(*command, venv_path)
+        else:
+            clone_virtualenv(_ensure_virtualenv_template(command, python), venv_path)
     venv_env = activate_virtualenv(venv_path, env=env)
     if not use_uv and pip_version == "embed":
         call(
@@ -205,6 +301,27 @@ def virtualenv(
     return venv_env
 
 
+def prepare_virtualenv(
+    version: str,
+    python: Path,
+    dependency_constraint: Path | None,
+    *,
+    use_uv: bool,
+    pip_version: str | None = None,
+    marker_env: dict[str, str] | None = None,
+) -> None:
+    """
+    Create the template that `virtualenv` clones for the same arguments
+    ahead of time, so that it's ready when the virtual environment is needed.
+    """
+    if use_uv or _IS_WIN:
+        return
+    python = python.resolve()
+    if pip_version is None:
+        pip_version = _parse_pip_constraint_for_virtualenv(dependency_constraint, marker_env)
+    _ensure_virtualenv_template(_virtualenv_command(version, python, pip_version), python)
+
+
 def activate_virtualenv(
     venv_path: Path,
     env: dict[str, str] | None = None,
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+__lazy_modules__ = {
+    "certifi",
+    "cibuildwheel.logger",
+    "cibuildwheel.util",
+    "cibuildwheel.util.file",
+    "cibuildwheel.util.helpers",
+    "hashlib",
+    "http",
+    "http.client",
+    "humanize",
+    "json",
+    "re",
+    "shutil",
+    "ssl",
+    "tempfile",
+    "urllib",
+    "urllib.error",
+    "urllib.request",
+}
+
+import dataclasses
+import hashlib
+import http.client
+import json
+import os
+import re
+import shutil
+import ssl
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import certifi
+import humanize
+
+from cibuildwheel.logger import log
+from cibuildwheel.util.file import CIBW_CACHE_PATH
+from cibuildwheel.util.helpers import parse_key_value_string
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from typing import Self
+
+    from cibuildwheel.logger import BuildInfo
+
+REMOTE_SCHEMES = ("http://", "https://")
+# an absolute path on Windows, like C:\cache or D:/wheels
+WINDOWS_DRIVE_RE = re.compile(r"[A-Za-z]:[\\/]")
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(size: str) -> int:
+    """
+    Parse a size like `500M` or `10GB` into bytes. Units are powers of 1024.
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*", size, re.IGNORECASE)
+    if match is None:
+        msg = f"invalid size {size!r}, expected a number of bytes with an optional K, M, G or T"
+        raise ValueError(msg)
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class WheelCacheConfig:
+    location: str
+    max_size: int | None = None
+
+    @classmethod
+    def from_config_string(cls, config_string: str) -> Self | None:
+        leading_location = None
+        config_string = config_string.strip()
+        if config_string.startswith(REMOTE_SCHEMES) or WINDOWS_DRIVE_RE.match(config_string):
+            # the colon after the scheme or the drive letter would be read as
+            # a field name
+            leading_location, _, config_string = config_string.partition(";")
+        config_dict = parse_key_value_string(config_string, ["location"], ["max-size", "max_size"])
+        location = leading_location or " ".join(config_dict.get("location") or [])
+        if not location:
+            return None
+        max_size_options = config_dict.get("max-size") or config_dict.get("max_size")
+        return cls(
+            location=location,
+            max_size=parse_size(max_size_options[-1]) if max_size_options else None,
+        )
+
+    @property
+    def is_remote(self) -> bool:
+        return self.location.startswith(REMOTE_SCHEMES)
+
+    def options_summary(self) -> str | dict[str, str]:
+        if self.max_size is None:
+            return self.location
+        return {"location": self.location, "max-size": humanize.naturalsize(self.max_size)}
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class WheelCacheStats:
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+
+    def __add__(self, other: WheelCacheStats) -> WheelCacheStats:
+        return WheelCacheStats(
+            hits=self.hits + other.hits,
+            misses=self.misses + other.misses,
+            bytes_saved=self.bytes_saved + other.bytes_saved,
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses, "
+            f"{humanize.naturalsize(self.bytes_saved)} of wheels restored instead of built"
+        )
+
+
+def _copy_atomically(src: Path, dest: Path) -> None:
+    """Copy `src` to `dest`, so that `dest` never exists half-written."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix=".cibuildwheel-", dir=dest.parent) as tmp:
+        tmp_file = Path(tmp, dest.name)
+        shutil.copyfile(src, tmp_file)
+        tmp_file.replace(dest)
+
+
+class LocalWheelStore:
+    """
+    Wheels in a directory, which can be shared between jobs, e.g. on a
+    network drive. Each wheel is kept in a directory named after its
+    fingerprint. Wheels are touched when they're used, so that the least
+    recently used ones are removed first when the store is over `max_size`.
+    """
+
+    def __init__(self, root: Path, max_size: int | None = None) -> None:
+        self.root = root
+        self.max_size = max_size
+
+    def _entry_dir(self, fingerprint: str) -> Path:
+        return self.root / "wheels" / fingerprint[:2] / fingerprint
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        return [
+            (wheel, wheel.stat())
+            for wheel in (self.root / "wheels").glob("*/*/*.whl")
+            # entries that are still being written
+            if not wheel.parent.name.startswith(".")
+        ]
+
+    def get(self, fingerprint: str, dest_dir: Path) -> Path | None:
+        match list(self._entry_dir(fingerprint).glob("*.whl")):
+            case [wheel]:
+                pass
+            case _:
+                return None
+        dest = dest_dir / wheel.name
+        _copy_atomically(wheel, dest)
+        os.utime(wheel)
+        return dest
+
+    def put(self, fingerprint: str, wheel: Path) -> None:
+        entry_dir = self._entry_dir(fingerprint)
+        if entry_dir.exists():
+            return
+        entry_dir.parent.mkdir(parents=True, exist_ok=True)
+        # other jobs might be storing the same wheel at the same time, so the
+        # entry is prepared alongside, then renamed into place
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=entry_dir.parent))
+        try:
+            shutil.copyfile(wheel, tmp_dir / wheel.name)
+            tmp_dir.rename(entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not entry_dir.exists():
+                raise
+        self.evict()
+
+    def evict(self) -> None:
+        if self.max_size is None:
+            return
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        total = sum(st.st_size for _, st in entries)
+        for wheel, st in entries:
+            if total <= self.max_size:
+                break
+            shutil.rmtree(wheel.parent, ignore_errors=True)
+            total -= st.st_size
+
+    def describe(self) -> str:
+        entries = self._entries()
+        size = humanize.naturalsize(sum(st.st_size for _, st in entries))
+        limit = f" of {humanize.naturalsize(self.max_size)}" if self.max_size else ""
+        return f"{len(entries)} wheels, {size}{limit}"
+
+
+class HTTPWheelStore:
+    """
+    Wheels on an HTTP server. A wheel is stored with a PUT to
+    `<url>/<fingerprint>/<wheel name>`, then its name with a PUT to
+    `<url>/<fingerprint>.json`. Any server that supports GET and PUT will do.
+    Removing old wheels is up to the server.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url.rstrip("/")
+        cafile = os.environ.get("SSL_CERT_FILE", certifi.where())
+        self._context = ssl.create_default_context(cafile=cafile)
+
+    def _request(self, url: str, *, data: bytes | None = None) -> bytes | None:
+        request = urllib.request.Request(url, data=data, method="GET" if data is None else "PUT")
+        try:
+            with urllib.request.urlopen(request, context=self._context) as response:
+                return response.read()  # type: ignore[no-any-return]
+        except urllib.error.HTTPError as e:
+            e.close()
+            if e.code == 404 and data is None:
+                return None
+            raise
+
+    def get(self, fingerprint: str, dest_dir: Path) -> Path | None:
+        index = self._request(f"{self.url}/{fingerprint}.json")
+        if index is None:
+            return None
+        entry = json.loads(index)
+        if not (
+            isinstance(entry, dict)
+            and isinstance(entry.get("wheel"), str)
+            and isinstance(entry.get("sha256"), str)
+        ):
+            return None
+        wheel_name = Path(entry["wheel"]).name
+        contents = self._request(f"{self.url}/{fingerprint}/{wheel_name}")
+        if contents is None or hashlib.sha256(contents).hexdigest() != entry["sha256"]:
+            return None
+        dest = dest_dir / wheel_name
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix=".cibuildwheel-", dir=dest_dir) as tmp:
+            Path(tmp, wheel_name).write_bytes(contents)
+            Path(tmp, wheel_name).replace(dest)
+        return dest
+
+    def put(self, fingerprint: str, wheel: Path) -> None:
+        contents = wheel.read_bytes()
+        self._request(f"{self.url}/{fingerprint}/{wheel.name}", data=contents)
+        entry = {"wheel": wheel.name, "sha256": hashlib.sha256(contents).hexdigest()}
+        self._request(f"{self.url}/{fingerprint}.json", data=json.dumps(entry).encode("utf8"))
+
+
+def open_wheel_store(config: WheelCacheConfig) -> LocalWheelStore | HTTPWheelStore:
+    if config.is_remote:
+        return HTTPWheelStore(config.location)
+    return LocalWheelStore(Path(config.location).expanduser().resolve(), config.max_size)
+
+
+def _stats_path() -> Path:
+    return CIBW_CACHE_PATH / "wheel-cache-stats.json"
+
+
+def read_stats(location: str) -> WheelCacheStats:
+    """The stats of the wheel cache at `location`, over all the runs on this machine."""
+    try:
+        stats = json.loads(_stats_path().read_text(encoding="utf8"))
+        return WheelCacheStats(**stats[location])
+    except (OSError, ValueError, KeyError, TypeError):
+        return WheelCacheStats()
+
+
+def add_stats(location: str, stats: WheelCacheStats) -> None:
+    stats_path = _stats_path()
+    try:
+        all_stats = json.loads(stats_path.read_text(encoding="utf8"))
+    except (OSError, ValueError):
+        all_stats = {}
+    all_stats[location] = dataclasses.asdict(read_stats(location) + stats)
+    stats_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=stats_path.parent, suffix=".tmp", delete=False, encoding="utf8"
+    ) as stats_file:
+        json.dump(all_stats, stats_file)
+    Path(stats_file.name).replace(stats_path)
+
+
+def describe_wheel_cache(config: WheelCacheConfig) -> str:
+    """The report printed by --cache-stats."""
+    lines = [
+        f"Wheel cache: {config.location}",
+        f"  {read_stats(config.location)} (all runs on this machine)",
+    ]
+    store = open_wheel_store(config)
+    if isinstance(store, LocalWheelStore):
+        lines.append(f"  {store.describe()}")
+    return "\n".join(lines)
+
+
+class WheelCache:
+    """
+    Restores wheels from a wheel store, by the fingerprint of their build,
+    and stores the wheels built in this run. The cache only ever saves
+    time, so errors talking to the store are warnings.
+    """
+
+    def __init__(self, config: WheelCacheConfig, fingerprints: Mapping[str, str]) -> None:
+        self.config = config
+        self.store = open_wheel_store(config)
+        self.fingerprints = fingerprints
+        self.stats = WheelCacheStats()
+
+    def restore(self, identifiers: Iterable[str], output_dir: Path) -> dict[str, Path]:
+        """
+        Copy the cached wheels for `identifiers` into `output_dir`, and
+        return them by identifier.
+        """
+        restored = {}
+        for identifier in identifiers:
+            try:
+                wheel = self.store.get(self.fingerprints[identifier], output_dir)
+            except (OSError, http.client.HTTPException, ValueError, KeyError, TypeError) as e:
+                log.warning(f"Failed to read from the wheel cache: {e}")
+                wheel = None
+            if wheel is None:
+                self.stats += WheelCacheStats(misses=1)
+            else:
+                self.stats += WheelCacheStats(hits=1, bytes_saved=wheel.stat().st_size)
+                restored[identifier] = wheel
+        return restored
+
+    def save(self, builds: Iterable[BuildInfo]) -> None:
+        """Store the wheels produced or reused by `builds`."""
+        start = time.time()
+        stored = 0
+        for build in builds:
+            fingerprint = self.fingerprints.get(build.identifier)
+            if build.wheel is None or fingerprint is None:
+                continue
+            try:
+                self.store.put(fingerprint, build.wheel)
+            except (OSError, http.client.HTTPException) as e:
+                log.warning(f"Failed to store {build.wheel.name} in the wheel cache: {e}")
+            else:
+                stored += 1
+        if stored:
+            print(f"info: Stored {stored} wheels in the wheel cache in {time.time() - start:.1f}s")
+
+    def finish(self) -> None:
+        """Print the stats of this run, and add them to the totals."""
+        print(f"info: Wheel cache: {self.stats}")
+        try:
+            add_stats(self.config.location, self.stats)
+        except OSError as e:
+            log.warning(f"Failed to save the wheel cache stats: {e}")
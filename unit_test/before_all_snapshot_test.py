@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+
+from cibuildwheel.before_all_snapshot import BeforeAllSnapshotConfig, snapshot_tag
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.mark.parametrize(
+    ("config", "expected"),
+    [
+        ("false", BeforeAllSnapshotConfig()),
+        ("True", BeforeAllSnapshotConfig(enabled=True)),
+        (
+            "true; files: ci/install-deps.sh 'ci/requirements *.txt'",
+            BeforeAllSnapshotConfig(
+                enabled=True, files=("ci/install-deps.sh", "ci/requirements *.txt")
+            ),
+        ),
+        ("enabled: true; files: ci", BeforeAllSnapshotConfig(enabled=True, files=("ci",))),
+    ],
+)
+def test_config(config: str, expected: BeforeAllSnapshotConfig) -> None:
+    assert BeforeAllSnapshotConfig.from_config_string(config) == expected
+
+
+def test_snapshot_tag(tmp_path: Path) -> None:
+    (tmp_path / "ci").mkdir()
+    (tmp_path / "ci" / "install-deps.sh").write_text("yum install -y hdf5-devel\n")
+    (tmp_path / "setup.py").write_text("# setup\n")
+
+    def tag(files: tuple[str, ...] = ("ci",), setup_key: str = "before_all") -> str:
+        return snapshot_tag(
+            base_image_id="sha256:1234",
+            oci_platform="linux/amd64",
+            setup_key=setup_key,
+            project_dir=tmp_path,
+            files=files,
+        )
+
+    original = tag()
+    assert original.startswith("cibuildwheel-before-all:")
+    assert tag() == original
+    assert tag(setup_key="other before_all") != original
+
+    # files that don't match don't matter
+    (tmp_path / "setup.py").write_text("# changed\n")
+    assert tag() == original
+
+    (tmp_path / "ci" / "install-deps.sh").write_text("yum install -y openssl-devel\n")
+    changed = tag()
+    assert changed != original
+    assert tag(("ci/*.sh",)) != changed
+    (tmp_path / "ci" / "README.md").touch()
+    assert tag() != changed
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+from pathlib import PurePosixPath
+
+import pytest
+
+import cibuildwheel.compiler_cache
+from cibuildwheel import errors
+from cibuildwheel.compiler_cache import (
+    CompilerCache,
+    CompilerCacheConfig,
+    CompilerCacheStats,
+    compiler_cache_environment,
+    describe_stats_change,
+    host_compiler_cache,
+    parse_stats,
+    read_stats,
+)
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pathlib import Path
+
+CCACHE = CompilerCache(
+    tool="ccache", tool_path="/usr/bin/ccache", cache_dir=PurePosixPath("/cache/ccache")
+)
+
+
+@pytest.mark.parametrize(
+    ("config", "expected"),
+    [
+        ("none", CompilerCacheConfig()),
+        ("ccache", CompilerCacheConfig(tool="ccache")),
+        ("sccache; max-size: 2G", CompilerCacheConfig(tool="sccache", max_size="2G")),
+        ("tool: ccache; max_size: 500M", CompilerCacheConfig(tool="ccache", max_size="500M")),
+    ],
+)
+def test_config(config: str, expected: CompilerCacheConfig) -> None:
+    assert CompilerCacheConfig.from_config_string(config) == expected
+
+
+def test_config_invalid() -> None:
+    with pytest.raises(ValueError, match="unknown compiler cache 'distcc'"):
+        CompilerCacheConfig.from_config_string("distcc")
+
+
+def test_environment() -> None:
+    env = compiler_cache_environment(
+        CCACHE,
+        config=CompilerCacheConfig(tool="ccache", max_size="1G"),
+        base_dir=PurePosixPath("/project"),
+        env={"PATH": "/bin", "CXX": "clang++"},
+        compilers=("gcc", "g++"),
+    )
+    assert env == {
+        "PATH": "/bin",
+        "CCACHE_DIR": "/cache/ccache",
+        "CCACHE_BASEDIR": "/project",
+        "CCACHE_NOHASHDIR": "1",
+        "CCACHE_MAXSIZE": "1G",
+        "CMAKE_C_COMPILER_LAUNCHER": "/usr/bin/ccache",
+        "CMAKE_CXX_COMPILER_LAUNCHER": "/usr/bin/ccache",
+        "CC": "/usr/bin/ccache gcc",
+        # set by the user
+        "CXX": "clang++",
+    }
+
+
+def test_environment_sccache_without_compilers() -> None:
+    sccache = CompilerCache(
+        tool="sccache", tool_path="sccache.exe", cache_dir=PurePosixPath("/cache/sccache")
+    )
+    env = compiler_cache_environment(
+        sccache,
+        config=CompilerCacheConfig(tool="sccache"),
+        base_dir=PurePosixPath("/project"),
+        env={},
+        compilers=None,
+    )
+    assert env == {
+        "SCCACHE_DIR": "/cache/sccache",
+        "CMAKE_C_COMPILER_LAUNCHER": "sccache.exe",
+        "CMAKE_CXX_COMPILER_LAUNCHER": "sccache.exe",
+    }
+
+
+@pytest.mark.parametrize(
+    "output",
+    [
+        # ccache 4
+        (
+            "stats_updated_timestamp\t1700000000\ndirect_cache_hit\t3\n"
+            "preprocessed_cache_hit\t1\ncache_miss\t2\n"
+        ),
+        # ccache 3.7
+        "cache_hit_direct\t3\ncache_hit_preprocessed\t1\ncache_miss\t2\n",
+    ],
+)
+def test_parse_stats_ccache(output: str) -> None:
+    assert parse_stats("ccache", output) == CompilerCacheStats(hits=4, misses=2)
+
+
+def test_parse_stats_sccache() -> None:
+    output = json.dumps(
+        {
+            "stats": {
+                "cache_hits": {"counts": {"C/C++": 5, "CUDA": 1}},
+                "cache_misses": {"counts": {"C/C++": 2}},
+            }
+        }
+    )
+    assert parse_stats("sccache", output) == CompilerCacheStats(hits=6, misses=2)
+
+
+def test_read_stats() -> None:
+    commands = []
+
+    def run(args: list[str]) -> str:
+        commands.append(args)
+        return "direct_cache_hit\t1\n"
+
+    assert read_stats(CCACHE, run) == CompilerCacheStats(hits=1, misses=0)
+    assert commands == [["/usr/bin/ccache", "--print-stats"]]
+
+    # stats are only informative, so failing to read them isn't an error
+    assert read_stats(CCACHE, lambda _args: "direct_cache_hit\tmany\n") is None
+
+
+def test_describe_stats_change() -> None:
+    before = CompilerCacheStats(hits=10, misses=5)
+    after = CompilerCacheStats(hits=13, misses=6)
+    assert describe_stats_change(before, after) == "3 hits, 1 misses (75% hit rate)"
+    assert describe_stats_change(after, after) == "no compilations"
+    assert describe_stats_change(None, after) is None
+
+
+def test_host_compiler_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cibuildwheel.compiler_cache, "CIBW_CACHE_PATH", tmp_path / "cache")
+    monkeypatch.setattr("shutil.which", lambda name: f"/opt/bin/{name}")
+    assert host_compiler_cache("sccache") == CompilerCache(
+        tool="sccache",
+        tool_path="/opt/bin/sccache",
+        cache_dir=tmp_path / "cache" / "compiler-cache" / "sccache",
+    )
+
+    monkeypatch.setattr("shutil.which", lambda _name: None)
+    with pytest.raises(errors.ConfigurationError, match="ccache wasn't found on PATH"):
+        host_compiler_cache("ccache")
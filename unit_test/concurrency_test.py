@@ -0,0 +1,201 @@
+import functools
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from cibuildwheel import errors
+from cibuildwheel.util.cmd import call
+from cibuildwheel.util.concurrency import (
+    BackgroundQueue,
+    Lookahead,
+    output_is_captured,
+    run_in_parallel,
+)
+
+
+def test_results_in_order() -> None:
+    barrier = threading.Barrier(3)
+
+    def task(value: int) -> int:
+        # all three tasks must be running at the same time to get past this
+        barrier.wait(timeout=10)
+        return value * 2
+
+    results = run_in_parallel(
+        [(f"task {i}", functools.partial(task, i)) for i in range(3)],
+        jobs=3,
+    )
+
+    assert results == [0, 2, 4]
+
+
+def test_serial_when_one_job(capsys: pytest.CaptureFixture[str]) -> None:
+    def task() -> str:
+        assert not output_is_captured()
+        print("hello")
+        return threading.current_thread().name
+
+    results = run_in_parallel([("a", task), ("b", task)], jobs=1)
+
+    assert results == [threading.current_thread().name] * 2
+    assert capsys.readouterr().out == "hello\nhello\n"
+
+
+def test_output_is_not_interleaved(capsys: pytest.CaptureFixture[str]) -> None:
+    first_printed = threading.Event()
+
+    def first() -> None:
+        print("first: line 1")
+        first_printed.set()
+        second_printed.wait(timeout=10)
+        print("first: line 2", file=sys.stderr)
+
+    second_printed = threading.Event()
+
+    def second() -> None:
+        first_printed.wait(timeout=10)
+        print("second: line 1")
+        sys.stdout.buffer.write(b"second: line 2\n")
+        second_printed.set()
+
+    run_in_parallel([("first", first), ("second", second)], jobs=2)
+
+    out = capsys.readouterr().out
+    assert "first: line 1\nfirst: line 2\n" in out
+    assert "second: line 1\nsecond: line 2\n" in out
+    assert "info: first started" in out
+    assert "info: second finished in" in out
+    # the stream routing is removed again afterwards
+    assert type(sys.stdout).__name__ != "_ThreadRoutedStream"
+
+
+def test_subprocess_output_is_captured(capfd: pytest.CaptureFixture[str]) -> None:
+    def task(name: str) -> None:
+        assert output_is_captured()
+        call(sys.executable, "-c", f"print('from {name}')")
+
+    run_in_parallel([("one", lambda: task("one")), ("two", lambda: task("two"))], jobs=2)
+
+    out = capfd.readouterr().out
+    sections = {
+        section.split(maxsplit=1)[0]: section for section in out.split("── ")[1:] if section
+    }
+    assert "from one" in sections["one"]
+    assert "from two" not in sections["one"]
+    assert "from two" in sections["two"]
+
+
+def test_single_failure_is_reraised() -> None:
+    def fail() -> None:
+        raise subprocess.CalledProcessError(3, ["false"])
+
+    with pytest.raises(subprocess.CalledProcessError):
+        run_in_parallel([("ok", lambda: None), ("fail", fail)], jobs=2)
+
+
+def test_failures_are_combined(capsys: pytest.CaptureFixture[str]) -> None:
+    ran = []
+
+    def fail(name: str) -> None:
+        ran.append(name)
+        msg = f"{name} is broken"
+        raise errors.ConfigurationError(msg)
+
+    def succeed() -> None:
+        ran.append("ok")
+
+    with pytest.raises(errors.FatalError) as exc_info:
+        run_in_parallel(
+            [
+                ("a", lambda: fail("a")),
+                ("b", succeed),
+                ("c", lambda: fail("c")),
+            ],
+            jobs=2,
+        )
+
+    assert sorted(ran) == ["a", "c", "ok"]
+    message = str(exc_info.value)
+    assert "2 of 3 tasks failed" in message
+    assert "a: a is broken" in message
+    assert "c: c is broken" in message
+    assert exc_info.value.return_code == errors.ConfigurationError.return_code
+    assert "info: a failed in" in capsys.readouterr().out
+
+
+def test_background_queue_runs_alongside_caller(capsys: pytest.CaptureFixture[str]) -> None:
+    caller_done = threading.Event()
+    threads = []
+
+    def task(name: str) -> None:
+        # the caller must be able to carry on while this runs
+        assert caller_done.wait(timeout=10)
+        assert output_is_captured()
+        threads.append(threading.current_thread().name)
+        print(f"{name} output")
+
+    with BackgroundQueue() as queue:
+        queue.submit("one", lambda: task("one"))
+        queue.submit("two", lambda: task("two"))
+        caller_done.set()
+
+    assert len(threads) == 2
+    assert threading.current_thread().name not in threads
+    out = capsys.readouterr().out
+    assert out.index("── one") < out.index("one output") < out.index("── two")
+    assert out.index("── two") < out.index("two output")
+
+
+def test_background_queue_failure() -> None:
+    ran = []
+
+    def fail() -> None:
+        ran.append("fail")
+        msg = "tests failed"
+        raise errors.FatalError(msg)
+
+    def build_all() -> None:
+        with BackgroundQueue() as queue:
+            queue.submit("fail", fail)
+            # queued behind the failure, so it's skipped
+            queue.submit("skipped", lambda: ran.append("skipped"))
+
+    with pytest.raises(errors.FatalError, match="tests failed"):
+        build_all()
+
+    assert ran == ["fail"]
+
+
+def test_lookahead(capsys: pytest.CaptureFixture[str]) -> None:
+    caller_done = threading.Event()
+
+    def prepare() -> None:
+        # the caller must be able to carry on while this runs
+        assert caller_done.wait(timeout=10)
+        print("prepared")
+
+    with Lookahead() as lookahead:
+        lookahead.prepare("next", prepare)
+        print("building")
+        caller_done.set()
+        lookahead.wait("next")
+        # waiting for something that wasn't prepared does nothing
+        lookahead.wait("other")
+
+    out = capsys.readouterr().out
+    assert out.index("building") < out.index("── next") < out.index("prepared")
+
+
+def test_lookahead_failure(capsys: pytest.CaptureFixture[str]) -> None:
+    def prepare() -> None:
+        msg = "download failed"
+        raise errors.FatalError(msg)
+
+    with Lookahead() as lookahead:
+        lookahead.prepare("next", prepare)
+        lookahead.wait("next")
+
+    # the step will run into the error again, so it's only reported
+    assert "Preparing next in the background failed: download failed" in capsys.readouterr().err
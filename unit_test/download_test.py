@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import hashlib
+import http.server
+import re
 import ssl
+import threading
+import time
+import urllib.error
 
 import certifi
 import pytest
 
+import cibuildwheel.util.file
+from cibuildwheel import errors
 from cibuildwheel.util.file import download
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
+    from collections.abc import Generator
     from pathlib import Path
 
 DOWNLOAD_URL = "https://cdn.jsdelivr.net/gh/pypa/cibuildwheel@v1.6.3/requirements-dev.txt"
@@ -35,3 +44,133 @@ def test_download_bad_ssl_cert_file(monkeypatch: pytest.MonkeyPatch, tmp_path: P
     dest = tmp_path / "file.txt"
     with pytest.raises(ssl.SSLError):
         download(DOWNLOAD_URL, dest)
+
+
+CONTENTS = bytes(range(256)) * 4096  # 1 MiB
+
+
+class FileHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves CONTENTS, supporting range requests if `ranges` is set. The first
+    `failures` responses are cut off halfway through.
+    """
+
+    ranges = True
+    failures = 0
+    requests: list[str | None]
+
+    def do_GET(self) -> None:
+        self.requests.append(self.headers.get("Range"))
+        start, end = 0, len(CONTENTS) - 1
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if match and self.ranges and self.headers.get("If-Range") in {None, '"etag"'}:
+            start = int(match.group(1))
+            end = int(match.group(2) or end)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(CONTENTS)}")
+        else:
+            self.send_response(200)
+        if self.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"etag"')
+        self.send_header("Content-Length", str(end + 1 - start))
+        self.end_headers()
+        body = CONTENTS[start : end + 1]
+        if type(self).failures > 0:
+            type(self).failures -= 1
+            body = body[: len(body) // 2]
+            self.close_connection = True
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> Generator[tuple[str, type[FileHandler]], None, None]:
+    monkeypatch.setattr(time, "sleep", lambda _: None)
+    handler = type("Handler", (FileHandler,), {"requests": []})
+    http_server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{http_server.server_address[1]}/file.bin", handler
+    finally:
+        http_server.shutdown()
+        http_server.server_close()
+
+
+def test_download_local(server: tuple[str, type[FileHandler]], tmp_path: Path) -> None:
+    url, handler = server
+    dest = tmp_path / "file.bin"
+    download(url, dest, sha256=hashlib.sha256(CONTENTS).hexdigest())
+
+    assert dest.read_bytes() == CONTENTS
+    assert handler.requests == [None]
+    # nothing is left behind next to the file
+    assert list(tmp_path.iterdir()) == [dest]
+
+
+def test_download_resumes(server: tuple[str, type[FileHandler]], tmp_path: Path) -> None:
+    url, handler = server
+    handler.failures = 2
+    dest = tmp_path / "file.bin"
+    download(url, dest)
+
+    assert dest.read_bytes() == CONTENTS
+    half, three_quarters = len(CONTENTS) // 2, len(CONTENTS) * 3 // 4
+    assert handler.requests == [None, f"bytes={half}-", f"bytes={three_quarters}-"]
+
+
+def test_download_restarts_without_ranges(
+    server: tuple[str, type[FileHandler]], tmp_path: Path
+) -> None:
+    url, handler = server
+    handler.ranges = False
+    handler.failures = 1
+    dest = tmp_path / "file.bin"
+    download(url, dest)
+
+    assert dest.read_bytes() == CONTENTS
+    assert len(handler.requests) == 2
+
+
+def test_download_in_parts(
+    monkeypatch: pytest.MonkeyPatch, server: tuple[str, type[FileHandler]], tmp_path: Path
+) -> None:
+    monkeypatch.setattr(cibuildwheel.util.file, "DOWNLOAD_PARALLEL_MIN_SIZE", 1024)
+    url, handler = server
+    # the probe, then one of the parts
+    handler.failures = 2
+    dest = tmp_path / "file.bin"
+    download(url, dest, sha256=hashlib.sha256(CONTENTS).hexdigest())
+
+    assert dest.read_bytes() == CONTENTS
+    # the probe, one request per part, and one to resume the part that failed
+    assert handler.requests[0] is None
+    assert len(handler.requests) == 6
+    assert "bytes=0-262143" in handler.requests
+    assert "bytes=786432-1048575" in handler.requests
+
+
+def test_download_sha256_mismatch(server: tuple[str, type[FileHandler]], tmp_path: Path) -> None:
+    url, _ = server
+    dest = tmp_path / "file.bin"
+    with pytest.raises(errors.FatalError, match="SHA256 mismatch"):
+        download(url, dest, sha256="0" * 64)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_not_found(server: tuple[str, type[FileHandler]], tmp_path: Path) -> None:
+    url, handler = server
+
+    def not_found(self: FileHandler) -> None:
+        self.requests.append(self.headers.get("Range"))
+        self.send_error(404)
+
+    handler.do_GET = not_found  # type: ignore[method-assign]
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        download(url, tmp_path / "file.bin")
+    excinfo.value.close()
+    # not worth retrying
+    assert len(handler.requests) == 1
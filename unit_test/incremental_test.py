@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+import cibuildwheel.incremental
+import cibuildwheel.project_sync
+from cibuildwheel.incremental import (
+    Checkpoint,
+    IncrementalBuilds,
+    build_fingerprint,
+    build_fingerprints,
+    source_digest,
+)
+from cibuildwheel.logger import BuildInfo
+from cibuildwheel.options import CommandLineArguments, Options
+
+IDENTIFIERS = ["cp312-manylinux_x86_64", "cp313-manylinux_x86_64"]
+
+
+@pytest.fixture(autouse=True)
+def project(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(cibuildwheel.incremental, "CIBW_CACHE_PATH", cache)
+    monkeypatch.setattr(cibuildwheel.project_sync, "CIBW_CACHE_PATH", cache)
+
+    project = tmp_path / "project"
+    (project / "src").mkdir(parents=True)
+    (project / "src" / "spam.c").write_text("int x;\n")
+    (project / "pyproject.toml").write_text("[project]\nname = 'spam'\n")
+    monkeypatch.chdir(project)
+    return project
+
+
+def make_options(env: dict[str, str] | None = None) -> Options:
+    args = CommandLineArguments.defaults()
+    args.output_dir = Path("wheelhouse")
+    return Options(platform="linux", command_line_arguments=args, env=env or {})
+
+
+def incremental_builds_for(options: Options) -> IncrementalBuilds:
+    return IncrementalBuilds(options.globals.output_dir, build_fingerprints(options, IDENTIFIERS))
+
+
+def build_wheel(identifier: str, contents: str = "wheel") -> BuildInfo:
+    wheel = Path("wheelhouse", f"spam-0.1-{identifier.replace('-', '-none-')}.whl")
+    wheel.parent.mkdir(exist_ok=True)
+    wheel.write_text(contents)
+    return BuildInfo(identifier=identifier, filename=wheel, duration=1)
+
+
+def test_fingerprint(project: Path) -> None:
+    digest = source_digest(project)
+    fingerprint = build_fingerprint(
+        options=make_options(), identifier=IDENTIFIERS[0], source_digest=digest
+    )
+
+    assert fingerprint == build_fingerprint(
+        options=make_options(), identifier=IDENTIFIERS[0], source_digest=digest
+    )
+    assert fingerprint != build_fingerprint(
+        options=make_options(), identifier=IDENTIFIERS[1], source_digest=digest
+    )
+    assert fingerprint != build_fingerprint(
+        options=make_options({"CIBW_BEFORE_BUILD": "make"}),
+        identifier=IDENTIFIERS[0],
+        source_digest=digest,
+    )
+    # options that don't change the wheel are left out
+    assert fingerprint == build_fingerprint(
+        options=make_options({"CIBW_BUILD_VERBOSITY": "1"}),
+        identifier=IDENTIFIERS[0],
+        source_digest=digest,
+    )
+
+    (project / "src" / "spam.c").write_text("int y;\n")
+    assert source_digest(project) != digest
+
+
+def test_up_to_date() -> None:
+    incremental_builds = incremental_builds_for(make_options())
+    assert incremental_builds.up_to_date() == {}
+
+    # the second build failed
+    built = build_wheel(IDENTIFIERS[0])
+    assert built.filename is not None
+    incremental_builds.record(
+        [built, BuildInfo(identifier=IDENTIFIERS[1], filename=None, duration=1)]
+    )
+
+    # wheels in the output directory don't change the project
+    assert incremental_builds_for(make_options()).up_to_date() == {
+        IDENTIFIERS[0]: built.filename.name
+    }
+
+    # the wheel has been replaced since
+    built.filename.write_text("another wheel")
+    assert incremental_builds_for(make_options()).up_to_date() == {}
+
+
+def build_abi3_wheels() -> list[BuildInfo]:
+    """The first identifier builds an abi3 wheel, which the second one reuses."""
+    wheel = Path("wheelhouse", "spam-0.1-cp312-abi3-manylinux_x86_64.whl")
+    wheel.parent.mkdir(exist_ok=True)
+    wheel.write_text("abi3 wheel")
+    return [
+        BuildInfo(identifier=IDENTIFIERS[0], filename=wheel, duration=1),
+        BuildInfo(identifier=IDENTIFIERS[1], filename=None, duration=1, reused_wheel=wheel),
+    ]
+
+
+def test_up_to_date_abi3() -> None:
+    incremental_builds_for(make_options()).record(build_abi3_wheels())
+
+    # nothing is rebuilt, so the abi3 wheel isn't built again over itself
+    wheel_name = "spam-0.1-cp312-abi3-manylinux_x86_64.whl"
+    assert incremental_builds_for(make_options()).up_to_date() == dict.fromkeys(
+        IDENTIFIERS, wheel_name
+    )
+
+
+def test_out_of_date_after_change(project: Path) -> None:
+    incremental_builds_for(make_options()).record([build_wheel(IDENTIFIERS[0])])
+
+    (project / "src" / "spam.c").write_text("int y;\n")
+    assert incremental_builds_for(make_options()).up_to_date() == {}
+
+
+def test_checkpoint() -> None:
+    output_dir = Path("wheelhouse")
+    checkpoint = Checkpoint(output_dir, platform="linux", resume=False)
+    built = build_wheel(IDENTIFIERS[0])
+    assert built.filename is not None
+    checkpoint.record([built, BuildInfo(identifier=IDENTIFIERS[1], filename=None, duration=1)])
+
+    # only a resumed run skips the builds from the failed run
+    assert Checkpoint(output_dir, platform="linux", resume=False).completed(IDENTIFIERS) == {}
+    assert Checkpoint(output_dir, platform="macos", resume=True).completed(IDENTIFIERS) == {}
+    resumed = Checkpoint(output_dir, platform="linux", resume=True)
+    assert resumed.completed(IDENTIFIERS) == {IDENTIFIERS[0]: built.filename.name}
+    assert resumed.completed(IDENTIFIERS[1:]) == {}
+
+    # the resumed run fails again, after the second build
+    resumed.record([build_wheel(IDENTIFIERS[1])])
+    assert Checkpoint(output_dir, platform="linux", resume=True).completed(IDENTIFIERS).keys() == {
+        *IDENTIFIERS
+    }
+
+    # a wheel that changed since is rebuilt
+    built.filename.write_text("another wheel")
+    assert Checkpoint(output_dir, platform="linux", resume=True).completed(IDENTIFIERS).keys() == {
+        IDENTIFIERS[1]
+    }
+
+    # and once a run succeeds, there's nothing left to resume
+    resumed.clear()
+    assert Checkpoint(output_dir, platform="linux", resume=True).completed(IDENTIFIERS) == {}
+
+
+def test_checkpoint_abi3() -> None:
+    output_dir = Path("wheelhouse")
+    Checkpoint(output_dir, platform="linux", resume=False).record(build_abi3_wheels())
+
+    # the identifier that reused the wheel isn't built again when resuming
+    wheel_name = "spam-0.1-cp312-abi3-manylinux_x86_64.whl"
+    assert Checkpoint(output_dir, platform="linux", resume=True).completed(
+        IDENTIFIERS
+    ) == dict.fromkeys(IDENTIFIERS, wheel_name)
+
+
+def test_skip_identifiers() -> None:
+    options = make_options({"CIBW_SKIP": "pp*"})
+    assert options.globals.build_selector(IDENTIFIERS[0])
+
+    options.skip_identifiers([IDENTIFIERS[0]])
+
+    assert not options.globals.build_selector(IDENTIFIERS[0])
+    assert not options.globals.build_selector("pp311-manylinux_x86_64")
+    assert options.globals.build_selector(IDENTIFIERS[1])
+    assert options.build_options(IDENTIFIERS[1]).globals is options.globals
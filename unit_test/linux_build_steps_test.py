@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import textwrap
+from pathlib import PurePath, PurePosixPath
 from pprint import pprint
 
 import pytest
@@ -121,3 +122,30 @@ def test_package_dir_outside_working_directory_raises_configuration_error(
         ConfigurationError, match="package_dir must be inside the working directory"
     ):
         cibuildwheel.platforms.linux.build(options, tmp_path / "build")
+
+
+def test_copy_wheel_out(tmp_path: Path) -> None:
+    output_dir = tmp_path / "wheelhouse"
+    seen: list[list[str]] = []
+
+    class FakeContainer:
+        def copy_out(self, from_path: PurePath, to_path: Path, *, paths: list[str]) -> None:
+            assert from_path == PurePosixPath("/output")
+            # the wheel is written next to the output, not into it
+            assert to_path.parent == output_dir
+            seen.append(sorted(p.name for p in output_dir.iterdir()))
+            for path in paths:
+                (to_path / path).write_text("wheel")
+
+    wheel = PurePosixPath("/output/spam-0.1.0-cp313-cp313-manylinux_x86_64.whl")
+    result = cibuildwheel.platforms.linux._copy_wheel_out(
+        FakeContainer(),  # type: ignore[arg-type]
+        wheel,
+        output_dir,
+    )
+
+    assert result == output_dir / wheel.name
+    assert result.read_text() == "wheel"
+    assert [p.name for p in output_dir.iterdir()] == [wheel.name]
+    assert len(seen) == 1
+    assert wheel.name not in seen[0]
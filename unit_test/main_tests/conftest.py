@@ -9,6 +9,7 @@
 
 import pytest
 
+import cibuildwheel.__main__
 from cibuildwheel import architecture
 from cibuildwheel.logger import Logger
 from cibuildwheel.platforms import android, ios, linux, macos, pyodide, windows
@@ -47,6 +48,7 @@ def ignore_call(*args: object, **kwargs: object) -> None:
 
     monkeypatch.setattr(subprocess, "Popen", fail_on_call)
     monkeypatch.setattr(file, "download", fail_on_call)
+    monkeypatch.setattr(cibuildwheel.__main__, "prefetch_artifacts", ignore_call)
     monkeypatch.setattr(windows, "build", fail_on_call)
     monkeypatch.setattr(linux, "build", fail_on_call)
     monkeypatch.setattr(macos, "build", fail_on_call)
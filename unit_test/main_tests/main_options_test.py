@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import sys
 import tomllib
 from fnmatch import fnmatch
@@ -7,6 +8,7 @@
 
 import pytest
 
+from cibuildwheel import errors
 from cibuildwheel.__main__ import main
 from cibuildwheel.environment import ParsedEnvironment
 from cibuildwheel.frontend import _split_config_settings, parse_config_settings
@@ -683,3 +685,92 @@ def test_defaults(platform: str, intercepted_build_args: ArgsInterceptor) -> Non
         pinned_images = _get_pinned_container_images()
         default_x86_64_image = pinned_images["x86_64"][defaults["manylinux-x86_64-image"]]
         assert build_options.manylinux_images["x86_64"] == default_x86_64_image
+
+
+@pytest.mark.parametrize(
+    ("cli_jobs", "env_jobs", "expected"),
+    [(None, None, 1), (None, "3", 3), ("2", None, 2), ("2", "3", 2)],
+)
+def test_jobs(
+    cli_jobs: str | None,
+    env_jobs: str | None,
+    expected: int,
+    intercepted_build_args: ArgsInterceptor,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    if cli_jobs is not None:
+        monkeypatch.setattr(sys, "argv", [*sys.argv, "--jobs", cli_jobs])
+    if env_jobs is not None:
+        monkeypatch.setenv("CIBW_JOBS", env_jobs)
+
+    main()
+
+    assert intercepted_build_args.args[0].globals.jobs == expected
+
+
+@pytest.mark.usefixtures("platform", "intercepted_build_args")
+@pytest.mark.parametrize("env_jobs", ["0", "-1", "many"])
+def test_jobs_invalid(
+    env_jobs: str, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setenv("CIBW_JOBS", env_jobs)
+
+    with pytest.raises(SystemExit) as ex:
+        main()
+
+    assert ex.value.code == 2
+    assert f"Invalid number of jobs {env_jobs!r}" in capsys.readouterr().err
+
+
+def test_shard(
+    monkeypatch: pytest.MonkeyPatch,
+    intercepted_build_args: ArgsInterceptor,
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+) -> None:
+    durations = tmp_path / "durations.json"
+    durations.write_text('{"cp313-manylinux_x86_64": 100}')
+    monkeypatch.setenv("CIBW_BUILD", "cp31[23]-manylinux_x86_64")
+    argv = [*sys.argv, "--platform", "linux", "--shard", "2/2", "--shard-durations", str(durations)]
+
+    monkeypatch.setattr(sys, "argv", [*argv, "--plan"])
+    with pytest.raises(SystemExit) as exit:
+        main()
+    assert exit.value.code == 0
+    plan = json.loads(capsys.readouterr().out)
+    assert [shard["identifiers"] for shard in plan["shards"]] == [
+        ["cp312-manylinux_x86_64"],
+        ["cp313-manylinux_x86_64"],
+    ]
+
+    monkeypatch.setattr(sys, "argv", argv)
+    main()
+    options = intercepted_build_args.args[0]
+    assert not options.globals.build_selector("cp312-manylinux_x86_64")
+    assert options.globals.build_selector("cp313-manylinux_x86_64")
+
+
+def test_shard_empty(
+    monkeypatch: pytest.MonkeyPatch,
+    intercepted_build_args: ArgsInterceptor,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.setenv("CIBW_BUILD", "cp31[23]-manylinux_x86_64")
+    monkeypatch.setattr(sys, "argv", [*sys.argv, "--platform", "linux", "--shard", "5/5"])
+
+    main()
+
+    assert intercepted_build_args.call_count == 0
+    out = capsys.readouterr().out
+    assert "Building shard 5/5, 0 of 2 wheels" in out
+    assert "nothing to build in this shard" in out
+
+
+def test_shard_no_identifiers(monkeypatch: pytest.MonkeyPatch) -> None:
+    # a selection that matches nothing isn't an empty shard
+    monkeypatch.setenv("CIBW_SKIP", "*")
+    monkeypatch.setattr(sys, "argv", [*sys.argv, "--platform", "linux", "--shard", "1/2"])
+
+    with pytest.raises(SystemExit) as exit:
+        main()
+    assert exit.value.code == errors.NothingToDoError.return_code
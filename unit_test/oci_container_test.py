@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import contextlib
+import hashlib
 import json
 import os
 import random
 import shutil
 import subprocess
 import sys
+import tarfile
 import textwrap
 import time
 from contextlib import nullcontext
@@ -14,21 +16,30 @@
 
 import pytest
 import tomli_w
+from filelock import FileLock
 
 import cibuildwheel.oci_container
 from cibuildwheel.ci import CIProvider, detect_ci_provider
 from cibuildwheel.environment import EnvironmentAssignmentBash
 from cibuildwheel.errors import OCIEngineTooOldError
 from cibuildwheel.oci_container import (
+    DEFAULT_ENGINE,
+    ENGINE_HOST_VARIABLES,
+    ImagePrefetcher,
     OCIContainer,
     OCIContainerEngineConfig,
     OCIPlatform,
+    _cached_probe,
     _check_engine_version,
+    _check_engine_version_cached,
+    _ContainerAgent,
+    engine_is_remote,
 )
+from cibuildwheel.util import resources
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Iterator, Mapping
 
 # Test utilities
 
@@ -67,6 +78,14 @@ def get_images() -> set[str]:
             subprocess.run([request.param, "rmi", image], check=False)
 
 
+@pytest.fixture(autouse=True)
+def isolated_probes(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    # each test starts without results of engine or image probes
+    monkeypatch.setattr(cibuildwheel.oci_container, "_probe_results", {})
+    monkeypatch.setattr(cibuildwheel.oci_container, "_local_images", {})
+    monkeypatch.setattr(cibuildwheel.oci_container, "CIBW_CACHE_PATH", tmp_path / "cache")
+
+
 # Tests
 
 
@@ -131,6 +150,23 @@ def test_cwd(container_engine: OCIContainerEngineConfig) -> None:
         assert container.call(["pwd"], capture_output=True, cwd="/opt") == "/opt\n"
 
 
+def test_exec_session(container_engine: OCIContainerEngineConfig) -> None:
+    with OCIContainer(
+        engine=container_engine,
+        image=DEFAULT_IMAGE,
+        oci_platform=DEFAULT_OCI_PLATFORM,
+        cwd="/cibuildwheel/working_directory",
+    ) as container:
+        container.call(["sh", "-c", "echo main > /tmp/marker"])
+        with container.exec_session() as session:
+            assert session is not container
+            # the session shares the container's filesystem and cwd
+            assert session.call(["cat", "/tmp/marker"], capture_output=True) == "main\n"
+            assert session.call(["pwd"], capture_output=True) == "/cibuildwheel/working_directory\n"
+        # the main shell is still usable after the session ends
+        assert container.call(["echo", "hello"], capture_output=True) == "hello\n"
+
+
 def test_container_removed(container_engine: OCIContainerEngineConfig) -> None:
     # test is flaky on some platforms, implement retry for 5 second
     timeout = 50  # * 100 ms = 5s
@@ -495,6 +531,84 @@ def test_parse_engine_config(
         )
 
 
+@pytest.mark.parametrize(
+    ("config", "pool_ttl"),
+    [
+        ("docker", 0),
+        ("docker; pool_ttl: 3600", 3600),
+        ("podman; pool-ttl: 60; create_args: --abc", 60),
+    ],
+)
+def test_parse_engine_config_pool_ttl(config: str, pool_ttl: int) -> None:
+    engine_config = OCIContainerEngineConfig.from_config_string(config)
+    assert engine_config.pool_ttl == pool_ttl
+
+
+@pytest.mark.parametrize("value", ["soon", "-1"])
+def test_parse_engine_config_pool_ttl_invalid(value: str) -> None:
+    with pytest.raises(ValueError, match="invalid pool_ttl"):
+        OCIContainerEngineConfig.from_config_string(f"docker; pool_ttl: {value}")
+
+
+@pytest.mark.parametrize(
+    ("config", "mount_project"),
+    [
+        ("docker", False),
+        ("docker; mount_project: true", True),
+        ("podman; mount-project: yes; pool_ttl: 60", True),
+    ],
+)
+def test_parse_engine_config_mount_project(config: str, mount_project: bool) -> None:
+    engine_config = OCIContainerEngineConfig.from_config_string(config)
+    assert engine_config.mount_project == mount_project
+
+
+@pytest.mark.parametrize(
+    ("config", "mount_cache"),
+    [
+        ("docker", False),
+        ("docker; mount_cache: true", True),
+        ("podman; mount-cache: false; mount-project: true", False),
+    ],
+)
+def test_parse_engine_config_mount_cache(config: str, mount_cache: bool) -> None:
+    engine_config = OCIContainerEngineConfig.from_config_string(config)
+    assert engine_config.mount_cache == mount_cache
+
+
+def test_cache_mount_args(tmp_path: Path) -> None:
+    container = OCIContainer(
+        image="foo",
+        oci_platform=OCIPlatform.ARMV7,
+        engine=OCIContainerEngineConfig.from_config_string("docker; mount-cache: true"),
+    )
+    cache_dir = tmp_path / "cache" / "container-cache" / "linux-arm-v7"
+    assert container.cache_mount == cache_dir
+    assert container._cache_mount_args() == [
+        f"--volume={cache_dir}:/cibuildwheel/cache",
+        "--env=PIP_CACHE_DIR=/cibuildwheel/cache/pip",
+        "--env=UV_CACHE_DIR=/cibuildwheel/cache/uv",
+    ]
+    assert cache_dir.is_dir()
+
+    container = OCIContainer(image="foo", oci_platform=OCIPlatform.ARMV7)
+    assert container._cache_mount_args() == []
+
+
+def test_compiler_cache_mount_args(tmp_path: Path) -> None:
+    cache_dir = tmp_path / "compiler-cache"
+    container = OCIContainer(
+        image="foo", oci_platform=OCIPlatform.AMD64, compiler_cache_dir=cache_dir
+    )
+    assert container._compiler_cache_mount_args() == [
+        f"--volume={cache_dir}:/cibuildwheel/compiler-cache"
+    ]
+    assert cache_dir.is_dir()
+
+    container = OCIContainer(image="foo", oci_platform=OCIPlatform.AMD64)
+    assert container._compiler_cache_mount_args() == []
+
+
 @pytest.mark.skipif(DEFAULT_OCI_PLATFORM != OCIPlatform.AMD64, reason="Only runs on x86_64")
 def test_enforce_32_bit(container_engine: OCIContainerEngineConfig) -> None:
     with OCIContainer(
@@ -747,6 +861,621 @@ def test_exit_kills_process_on_shutdown_timeout(monkeypatch: pytest.MonkeyPatch)
     assert bash_stdout.closed
 
 
+def test_exit_keeps_pooled_container(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    process = _FakeProcess(alive=True)
+    container, removed = _container_ready_for_exit(
+        monkeypatch, process=process, bash_stdin=_FakeStream(), bash_stdout=_FakeStream()
+    )
+    lock = FileLock(tmp_path / "key.lock")
+    lock.acquire()
+    container._pool_lock = lock
+    container._pool_state_path = tmp_path / "key.json"
+
+    container.__exit__(None, None, None)
+
+    assert removed == []
+    assert not lock.is_locked
+    state = json.loads((tmp_path / "key.json").read_text())
+    assert state["name"] == "bar"
+    assert state["engine"] == "docker"
+    assert state["shell_args"] == ["/bin/bash"]
+
+
+def test_exit_removes_pooled_container_on_error(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    process = _FakeProcess(alive=True)
+    container, removed = _container_ready_for_exit(
+        monkeypatch, process=process, bash_stdin=_FakeStream(), bash_stdout=_FakeStream()
+    )
+    lock = FileLock(tmp_path / "key.lock")
+    lock.acquire()
+    container._pool_lock = lock
+    container._pool_state_path = tmp_path / "key.json"
+
+    container.__exit__(RuntimeError, RuntimeError(), None)
+
+    assert removed == [True]
+    assert not lock.is_locked
+    assert not (tmp_path / "key.json").exists()
+
+
+def test_reap_idle_pooled_containers(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(cibuildwheel.oci_container, "CIBW_CACHE_PATH", tmp_path)
+    pool_dir = tmp_path / "container-pool"
+    pool_dir.mkdir()
+    now = time.time()
+    states = {
+        "idle": {"name": "idle", "engine": "docker", "last_used": now - 120},
+        "recent": {"name": "recent", "engine": "docker", "last_used": now - 10},
+        "podman": {"name": "podman", "engine": "podman", "last_used": now - 120},
+        "busy": {"name": "busy", "engine": "docker", "last_used": now - 120},
+    }
+    for key, state in states.items():
+        (pool_dir / f"{key}.json").write_text(json.dumps(state))
+
+    removed: list[str] = []
+
+    def fake_run(args: list[str], **kwargs: object) -> subprocess.CompletedProcess[bytes]:
+        assert args[:4] == ["docker", "rm", "--force", "-v"]
+        removed.append(args[4])
+        return subprocess.CompletedProcess(args, 0)
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+    with FileLock(pool_dir / "busy.lock"):
+        cibuildwheel.oci_container.reap_idle_pooled_containers(
+            OCIContainerEngineConfig("docker", pool_ttl=60)
+        )
+
+    assert removed == ["idle"]
+    assert sorted(p.stem for p in pool_dir.glob("*.json")) == ["busy", "podman", "recent"]
+
+
+def test_container_pool(
+    container_engine: OCIContainerEngineConfig, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(cibuildwheel.oci_container, "CIBW_CACHE_PATH", tmp_path)
+    engine = OCIContainerEngineConfig(container_engine.name, pool_ttl=60)
+    setup_key = f"test-{random.randint(0, 1 << 32)}"
+
+    with OCIContainer(
+        engine=engine,
+        image=DEFAULT_IMAGE,
+        oci_platform=DEFAULT_OCI_PLATFORM,
+        cwd=PurePosixPath("/project"),
+        setup_key=setup_key,
+    ) as container:
+        assert not container.reused
+        container.call(["touch", "/kept", "/project/removed"])
+        name = container.name
+
+    try:
+        with OCIContainer(
+            engine=engine,
+            image=DEFAULT_IMAGE,
+            oci_platform=DEFAULT_OCI_PLATFORM,
+            cwd=PurePosixPath("/project"),
+            setup_key=setup_key,
+        ) as container:
+            assert container.reused
+            assert container.name == name
+            container.call(["test", "-e", "/kept"])
+            assert container.call(["ls", "-A"], capture_output=True) == ""
+    finally:
+        subprocess.run([engine.name, "rm", "--force", "-v", str(name)], check=False)
+
+
+def test_commit(container_engine: OCIContainerEngineConfig) -> None:
+    tag = f"cibuildwheel-test-commit:{random.randint(0, 1 << 32)}"
+    with OCIContainer(
+        engine=container_engine, image=DEFAULT_IMAGE, oci_platform=DEFAULT_OCI_PLATFORM
+    ) as container:
+        container.call(["sh", "-c", "echo installed > /installed.txt"])
+        container.commit(tag, labels={"cibuildwheel.test": "1"})
+
+    try:
+        with OCIContainer(
+            engine=container_engine, image=tag, oci_platform=DEFAULT_OCI_PLATFORM
+        ) as container:
+            assert container.call(["cat", "/installed.txt"], capture_output=True) == "installed\n"
+        label = subprocess.run(
+            [
+                container_engine.name,
+                "image",
+                "inspect",
+                tag,
+                "--format",
+                '{{index .Config.Labels "cibuildwheel.test"}}',
+            ],
+            check=True,
+            text=True,
+            stdout=subprocess.PIPE,
+        ).stdout
+        assert label.strip() == "1"
+    finally:
+        subprocess.run([container_engine.name, "rmi", tag], check=False)
+
+
+def test_project_mount(container_engine: OCIContainerEngineConfig, tmp_path: Path) -> None:
+    engine = OCIContainerEngineConfig(container_engine.name, mount_project=True)
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "setup.py").write_text("# setup\n")
+
+    with OCIContainer(
+        engine=engine,
+        image=DEFAULT_IMAGE,
+        oci_platform=DEFAULT_OCI_PLATFORM,
+        cwd=PurePosixPath("/project"),
+        project_dir=project,
+    ) as container:
+        container.setup_project_mount(PurePosixPath("/project"))
+        assert container.call(["cat", "setup.py"], capture_output=True) == "# setup\n"
+        # the project is writable in the container, but the host's copy isn't changed
+        container.call(["sh", "-c", "echo changed > setup.py && mkdir build"])
+        assert container.call(["cat", "setup.py"], capture_output=True) == "changed\n"
+
+    assert (project / "setup.py").read_text() == "# setup\n"
+    assert not (project / "build").exists()
+
+
+@pytest.mark.parametrize(
+    ("engine", "volume_options"),
+    [("docker", "ro"), ("podman", "O")],
+)
+def test_project_mount_args(engine: str, volume_options: str, tmp_path: Path) -> None:
+    container = OCIContainer(
+        image="foo",
+        oci_platform=OCIPlatform.AMD64,
+        engine=OCIContainerEngineConfig.from_config_string(f"{engine}; mount_project: true"),
+        project_dir=tmp_path,
+    )
+    assert container._project_mount_args() == [
+        f"--volume={tmp_path.resolve()}:/cibuildwheel/project-mount:{volume_options}"
+    ]
+
+    container = OCIContainer(image="foo", oci_platform=OCIPlatform.AMD64, project_dir=tmp_path)
+    assert container.project_mount is None
+    assert container._project_mount_args() == []
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+def test_setup_project_mount_podman(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    # with podman, the mount already has a copy-on-write layer, so the
+    # project is linked to it
+    mount_path = tmp_path / "mount"
+    mount_path.mkdir()
+    monkeypatch.setattr(cibuildwheel.oci_container, "PROJECT_MOUNT_PATH", mount_path)
+    project_path = tmp_path / "project"
+    project_path.mkdir()
+    (project_path / "stale").touch()
+
+    with _local_shell_container() as container:
+        container.engine = OCIContainerEngineConfig("podman", mount_project=True)
+        container.project_mount = tmp_path
+        container.setup_project_mount(PurePosixPath(project_path))
+
+    assert project_path.readlink() == mount_path
+    assert "info: Mounted" in capsys.readouterr().out
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+def test_exec_session_runs_separate_shell(monkeypatch: pytest.MonkeyPatch) -> None:
+    # stand in for `docker exec` with a local bash, to check the session
+    # protocol without a container engine
+    real_popen = subprocess.Popen
+    exec_args: list[list[str]] = []
+
+    def fake_popen(args: list[str], **kwargs: object) -> subprocess.Popen[bytes]:
+        exec_args.append(args)
+        return real_popen(["bash"], **kwargs)  # type: ignore[call-overload, no-any-return]
+
+    process = _FakeProcess()
+    container, removed = _container_ready_for_exit(
+        monkeypatch, process=process, bash_stdin=_FakeStream(), bash_stdout=_FakeStream()
+    )
+    monkeypatch.setattr(subprocess, "Popen", fake_popen)
+
+    with container.exec_session() as session:
+        assert session.call(["echo", "hello"], capture_output=True) == "hello\n"
+        with pytest.raises(subprocess.CalledProcessError):
+            session.call(["false"])
+        session_process = session.process
+        assert session_process is not None
+
+    assert exec_args == [["docker", "exec", "--interactive", "bar", "/bin/bash"]]
+    assert session_process.returncode == 0
+    assert session.process is None
+    # the container itself is untouched
+    assert container.process is not None
+    assert not process.killed
+    assert removed == []
+
+
+@contextlib.contextmanager
+def _local_shell_container() -> Iterator[OCIContainer]:
+    """A container whose shell is a local bash, to test the shell protocol."""
+    container = OCIContainer(image="foo", oci_platform=OCIPlatform.AMD64)
+    with subprocess.Popen(["bash"], stdin=subprocess.PIPE, stdout=subprocess.PIPE) as process:
+        assert process.stdin
+        assert process.stdout
+        container.process = process
+        container.bash_stdin = process.stdin
+        container.bash_stdout = process.stdout
+        try:
+            yield container
+        finally:
+            process.stdin.close()
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+@pytest.mark.parametrize("read_size", [1, 7, 64 * 1024])
+def test_call_output_framing(read_size: int) -> None:
+    with _local_shell_container() as container:
+        container.READ_SIZE = read_size
+        # output without a trailing newline is kept apart from the footer
+        assert container.call(["printf", "no newline"], capture_output=True) == "no newline"
+        assert container.call(["printf", ""], capture_output=True) == ""
+        big = container.call(["seq", "1", "20000"], capture_output=True)
+        assert big == "".join(f"{i}\n" for i in range(1, 20001))
+        with pytest.raises(subprocess.CalledProcessError) as exc_info:
+            container.call(["sh", "-c", "printf partial; exit 3"], capture_output=True)
+        assert exc_info.value.returncode == 3
+        assert exc_info.value.output == "partial"
+        # nothing is left over from previous calls
+        assert container.call(["echo", "done"], capture_output=True) == "done\n"
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+@pytest.mark.parametrize("use_agent", [True, False])
+def test_file_operations(
+    use_agent: bool, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    with _local_shell_container() as container, contextlib.ExitStack() as stack:
+        container.UTILITY_PYTHON = sys.executable
+        if use_agent:
+            # run the agent with the local python, instead of in a container
+            process = subprocess.Popen(
+                [sys.executable, "-c", resources.CONTAINER_AGENT_SCRIPT.read_text()],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+            container._agent = _ContainerAgent(process)
+            stack.callback(container._agent.close)
+
+        root = PurePosixPath(tmp_path)
+        container.mkdir(root / "a" / "b")
+        assert (tmp_path / "a" / "b").is_dir()
+        (tmp_path / "a" / "b" / "x.whl").touch()
+        assert container.glob(root / "a" / "b", "*.whl") == [root / "a" / "b" / "x.whl"]
+        assert container.exists(root / "a" / "b" / "x.whl")
+
+        container.move(root / "a" / "b" / "x.whl", root)
+        assert not container.exists(root / "a" / "b" / "x.whl")
+        assert (tmp_path / "x.whl").exists()
+
+        container.remove(root / "a")
+        container.remove(root / "a")
+        assert not (tmp_path / "a").exists()
+
+        assert container.which("sh", env={"PATH": "/usr/bin:/bin"}) in {"/usr/bin/sh", "/bin/sh"}
+        assert container.which("cibuildwheel-no-such-command", env={"PATH": "/bin"}) is None
+
+        temp_dir = container.make_temp_dir()
+        assert Path(temp_dir).is_dir()
+        Path(temp_dir).rmdir()
+
+        with pytest.raises(subprocess.CalledProcessError) as exc_info:
+            container.move(root / "missing", root / "elsewhere")
+        assert exc_info.value.cmd[0] == "mv"
+
+        container.cwd = root
+        env = container.get_environment()
+        assert env["PATH"] == os.environ["PATH"]
+        assert env["PWD"] == str(root)
+
+    out = capsys.readouterr().out
+    assert f"    + mkdir -p {root / 'a' / 'b'}" in out
+    assert f"    + rm -rf {root / 'a'}" in out
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+def test_call_shell_exited() -> None:
+    with _local_shell_container() as container:
+        # close the shell's output, like a dead container does, but keep it
+        # reading commands so that writing the next one doesn't fail
+        container.bash_stdin.write(b"exec >&-\n")
+        container.bash_stdin.flush()
+        with pytest.raises(OSError, match="exited unexpectedly"):
+            container.call(["true"])
+
+
+def test_cached_probe(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+    runs: list[str] = []
+
+    def probe() -> tuple[str, int]:
+        runs.append("probe")
+        return ("linux/386", 32)
+
+    assert _cached_probe("key", "the test probe", probe) == ("linux/386", 32)
+    assert runs == ["probe"]
+    # reused in the same process
+    assert _cached_probe("key", "the test probe", probe) == ("linux/386", 32)
+    assert runs == ["probe"]
+    assert "info: Reused the result of the test probe, saving 0.0s" in capsys.readouterr().out
+
+    # and by the next one, from the cache
+    monkeypatch.setattr(cibuildwheel.oci_container, "_probe_results", {})
+    assert _cached_probe("key", "the test probe", probe) == ["linux/386", 32]
+    assert runs == ["probe"]
+
+    # until the cached result expires
+    monkeypatch.setattr(cibuildwheel.oci_container, "_probe_results", {})
+    monkeypatch.setattr(cibuildwheel.oci_container, "PROBE_CACHE_TTL", 0)
+    assert _cached_probe("key", "the test probe", probe) == ("linux/386", 32)
+    assert runs == ["probe", "probe"]
+
+
+def test_cached_probe_error() -> None:
+    def probe() -> None:
+        raise subprocess.CalledProcessError(1, ["docker", "version"])
+
+    for _ in range(2):
+        with pytest.raises(subprocess.CalledProcessError):
+            _cached_probe("key", "the test probe", probe)
+
+
+def test_engine_version_cached(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    calls: list[tuple[object, ...]] = []
+
+    def mockcall(*args: object, **kwargs: object) -> str:
+        calls.append(args)
+        return '{"Client":{"Version":"5.2.0"},"Server":{"Version":"5.1.2"}}'
+
+    monkeypatch.setattr(cibuildwheel.oci_container, "call", mockcall)
+    monkeypatch.setattr(shutil, "which", lambda _name: sys.executable)
+    for name in ENGINE_HOST_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    socket = tmp_path / "podman.sock"
+    socket.touch()
+    monkeypatch.setenv("CONTAINER_HOST", f"unix://{socket}")
+    for _ in range(3):
+        _check_engine_version_cached(PODMAN)
+    assert len(calls) == 1
+
+    # a restarted daemon, which recreates its socket, is checked again
+    socket.unlink()
+    socket.touch()
+    os.utime(socket, ns=(0, 0))
+    _check_engine_version_cached(PODMAN)
+    assert len(calls) == 2
+
+    # a remote daemon is checked every time
+    monkeypatch.setenv("CONTAINER_HOST", "ssh://me@build-host/run/podman.sock")
+    for _ in range(2):
+        _check_engine_version_cached(PODMAN)
+    assert len(calls) == 4
+
+
+def testlocal_image_id(monkeypatch: pytest.MonkeyPatch) -> None:
+    inspect_output = ""
+    calls: list[tuple[object, ...]] = []
+
+    def mockcall(*args: object, **kwargs: object) -> str:
+        calls.append(args)
+        if not inspect_output:
+            raise subprocess.CalledProcessError(1, [str(arg) for arg in args])
+        return inspect_output
+
+    monkeypatch.setattr(cibuildwheel.oci_container, "call", mockcall)
+    container = OCIContainer(image="foo", oci_platform=OCIPlatform.AMD64)
+
+    # missing images are checked each time, as they're pulled by the first container
+    assert container._get_platform_args() == ("--platform=linux/amd64", "--pull=always")
+    inspect_output = "sha256:1234 linux/arm64\n"
+    assert container._get_platform_args() == ("--platform=linux/amd64", "--pull=always")
+    assert len(calls) == 2
+
+    inspect_output = "sha256:1234 linux/amd64\n"
+    for _ in range(3):
+        assert container._get_platform_args() == ("--platform=linux/amd64", "--pull=never")
+    assert container.local_image_id(OCIPlatform.AMD64) == "sha256:1234"
+    assert len(calls) == 3
+
+
+@pytest.fixture
+def fake_pulls(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    """Replaces `<engine> pull <image>` with a short sleep, failing for 'missing' images."""
+    pulls: list[list[str]] = []
+    real_popen = subprocess.Popen
+
+    def fake_popen(args: list[str], **kwargs: object) -> subprocess.Popen[bytes]:
+        assert args[1] == "pull"
+        pulls.append(args)
+        exit_code = 1 if args[-1] == "missing" else 0
+        return real_popen(  # type: ignore[call-overload, no-any-return]
+            [sys.executable, "-c", f"import time, sys; time.sleep(0.2); sys.exit({exit_code})"],
+            **kwargs,
+        )
+
+    monkeypatch.setattr(subprocess, "Popen", fake_popen)
+    monkeypatch.setattr(OCIContainer, "local_image_id", lambda *_args: None)
+    return pulls
+
+
+def test_image_prefetcher(fake_pulls: list[list[str]], capsys: pytest.CaptureFixture[str]) -> None:
+    with ImagePrefetcher(jobs=2) as prefetcher:
+        for image in ("first", "second", "first", "missing"):
+            prefetcher.prefetch(image, OCIPlatform.AMD64, DEFAULT_ENGINE)
+        # the other steps' builds run in the meantime
+        time.sleep(0.5)
+        for image in ("first", "second", "missing", "never-prefetched"):
+            prefetcher.wait(image, OCIPlatform.AMD64, DEFAULT_ENGINE)
+
+    assert sorted(args[-1] for args in fake_pulls) == ["first", "missing", "second"]
+    assert fake_pulls[0][:4] == ["docker", "pull", "--quiet", "--platform=linux/amd64"]
+    out = capsys.readouterr().out
+    assert "info: Pulled first in the background in 0." in out
+    assert "info: Pulled second in the background" in out
+    assert "missing" not in out
+    assert prefetcher.hidden_time > 0.2
+
+
+def test_image_prefetcher_exit(fake_pulls: list[list[str]]) -> None:
+    start = time.time()
+    with ImagePrefetcher(jobs=1) as prefetcher:
+        for image in ("first", "second", "third"):
+            prefetcher.prefetch(image, OCIPlatform.AMD64, DEFAULT_ENGINE)
+    # the running pull is stopped, and the queued ones never start
+    assert time.time() - start < 0.2
+    assert len(fake_pulls) <= 1
+
+
+def test_image_prefetcher_error(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    def missing_engine(*_args: object, **_kwargs: object) -> None:
+        msg = "No such file or directory: 'docker'"
+        raise FileNotFoundError(msg)
+
+    monkeypatch.setattr(OCIContainer, "local_image_id", lambda *_args: None)
+    monkeypatch.setattr(subprocess, "Popen", missing_engine)
+    with ImagePrefetcher(jobs=1) as prefetcher:
+        prefetcher.prefetch("first", OCIPlatform.AMD64, DEFAULT_ENGINE)
+        prefetcher.wait("first", OCIPlatform.AMD64, DEFAULT_ENGINE)
+
+    err = capsys.readouterr().err
+    assert "Couldn't prefetch first" in err
+    assert "No such file or directory: 'docker'" in err
+    assert prefetcher.hidden_time == 0
+
+
+def write_docker_contexts(config_dir: Path, contexts: Mapping[str, str]) -> None:
+    """Add contexts to a docker CLI context store, as `docker context create` does."""
+    for name, host in contexts.items():
+        meta_dir = config_dir / "contexts" / "meta" / hashlib.sha256(name.encode()).hexdigest()
+        meta_dir.mkdir(parents=True)
+        meta = {"Name": name, "Metadata": {}, "Endpoints": {"docker": {"Host": host}}}
+        (meta_dir / "meta.json").write_text(json.dumps(meta))
+
+
+def test_engine_is_remote_current_context(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    write_docker_contexts(tmp_path, {"build-host": "tcp://build-host:2376"})
+    monkeypatch.setenv("DOCKER_CONFIG", str(tmp_path))
+    for name in ENGINE_HOST_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    assert not engine_is_remote(DEFAULT_ENGINE)
+
+    # selected with `docker context use`
+    (tmp_path / "config.json").write_text(json.dumps({"currentContext": "build-host"}))
+    assert engine_is_remote(DEFAULT_ENGINE)
+
+
+@pytest.mark.parametrize(
+    ("engine", "env", "remote"),
+    [
+        ("docker", {}, False),
+        ("docker", {"DOCKER_HOST": "unix:///run/user/1000/docker.sock"}, False),
+        ("docker", {"DOCKER_HOST": "tcp://build-host:2376"}, True),
+        ("docker", {"DOCKER_HOST": "ssh://me@build-host"}, True),
+        ("podman", {"DOCKER_HOST": "ssh://me@build-host"}, False),
+        ("podman", {"CONTAINER_HOST": "unix:///run/podman/podman.sock"}, False),
+        ("podman", {"CONTAINER_HOST": "ssh://me@build-host/run/podman.sock"}, True),
+        ("podman", {"CONTAINER_CONNECTION": "build-host"}, True),
+        ("docker", {"DOCKER_CONTEXT": "default"}, False),
+        ("docker", {"DOCKER_CONTEXT": "desktop"}, False),
+        ("docker", {"DOCKER_CONTEXT": "build-host"}, True),
+        ("docker", {"DOCKER_CONTEXT": "unknown"}, True),
+        ("docker", {"DOCKER_CONTEXT": "build-host", "DOCKER_HOST": "unix:///a.sock"}, False),
+    ],
+)
+def test_engine_is_remote(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    engine: str,
+    env: dict[str, str],
+    remote: bool,
+) -> None:
+    write_docker_contexts(
+        tmp_path,
+        {"desktop": "unix:///home/me/.docker/run/docker.sock", "build-host": "ssh://me@build-host"},
+    )
+    monkeypatch.setenv("DOCKER_CONFIG", str(tmp_path))
+    for name in ENGINE_HOST_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    assert engine_is_remote(OCIContainerEngineConfig.from_config_string(engine)) == remote
+
+
+@pytest.mark.skipif(shutil.which("tar") is None, reason="needs tar")
+@pytest.mark.parametrize("remote", [False, True])
+def test_copy_streams(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    remote: bool,
+) -> None:
+    real_popen = subprocess.Popen
+
+    def local_popen(args: list[str], **kwargs: object) -> subprocess.Popen[bytes]:
+        # run `docker exec [-i] <name> <cmd>` as a local <cmd>
+        if args[:2] == ["docker", "exec"]:
+            args = args[3:] if args[2] == "-i" else args[2:]
+            args = args[1:]
+        return real_popen(args, **kwargs)  # type: ignore[call-overload, no-any-return]
+
+    monkeypatch.delenv("DOCKER_HOST", raising=False)
+    if remote:
+        monkeypatch.setenv("DOCKER_HOST", "ssh://me@build-host")
+
+    project = tmp_path / "project"
+    (project / "src").mkdir(parents=True)
+    (project / "src" / "mod.py").write_text("x = 1\n" * 1000)
+    (project / "pyproject.toml").write_text("[project]\n")
+    (project / "link").symlink_to("src/mod.py")
+
+    with _local_shell_container() as container:
+        container.name = "test"
+        monkeypatch.setattr(subprocess, "Popen", local_popen)
+
+        inside = PurePosixPath(tmp_path / "inside")
+        container.copy_into(project, inside)
+        assert (tmp_path / "inside" / "src" / "mod.py").read_text() == "x = 1\n" * 1000
+        assert (tmp_path / "inside" / "link").readlink() == Path("src/mod.py")
+
+        partial = PurePosixPath(tmp_path / "partial")
+        container.copy_into(project, partial, paths=["src/mod.py"])
+        assert [p.name for p in (tmp_path / "partial").rglob("*")] == ["src", "mod.py"]
+
+        output = tmp_path / "output"
+        container.copy_out(inside / "src", output)
+        assert [p.name for p in output.iterdir()] == ["mod.py"]
+
+        partial_output = tmp_path / "partial_output"
+        container.copy_out(inside, partial_output, paths=["pyproject.toml"])
+        assert [p.name for p in partial_output.iterdir()] == ["pyproject.toml"]
+
+        with pytest.raises(subprocess.CalledProcessError):
+            container.copy_out(PurePosixPath(tmp_path / "missing"), output)
+
+        # the container decides what's in the archive, links out of the
+        # destination aren't extracted
+        (tmp_path / "malicious").mkdir()
+        (tmp_path / "malicious" / "escape").symlink_to(tmp_path / "secret")
+        with pytest.raises(tarfile.TarError):
+            container.copy_out(PurePosixPath(tmp_path / "malicious"), tmp_path / "extracted")
+        assert not (tmp_path / "extracted" / "escape").is_symlink()
+
+    out = capsys.readouterr().out
+    assert f"info: Copied {project} into the container (" in out
+    assert f"info: Copied {inside / 'src'} out of the container (" in out
+    assert ("compressed)" in out) == remote
+
+
 @pytest.mark.flaky(reruns=2, reruns_delay=5)
 @pytest.mark.parametrize("platform", list(OCIPlatform))
 def test_multiarch_image(container_engine: OCIContainerEngineConfig, platform: OCIPlatform) -> None:
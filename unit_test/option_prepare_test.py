@@ -217,3 +217,41 @@ def test_build_with_override_launches(monkeypatch: pytest.MonkeyPatch, tmp_path:
     assert identifiers == {
         f"{x}-musllinux_i686" for x in ALL_IDS if "pp" not in x and "gp" not in x
     }
+
+
+@pytest.mark.parametrize(("jobs", "jobs_per_step"), [("1", 1), ("2", 1), ("4", 1), ("8", 2)])
+@pytest.mark.usefixtures("mock_build_container", "fake_package_dir")
+def test_build_jobs_split(monkeypatch: pytest.MonkeyPatch, jobs: str, jobs_per_step: int) -> None:
+    monkeypatch.setattr(sys, "argv", [*sys.argv, "--platform=linux"])
+    monkeypatch.setenv("CIBW_ARCHS", "auto64 auto32")
+    monkeypatch.setenv("CIBW_JOBS", jobs)
+    monkeypatch.delenv("CIBW_ENABLE", raising=False)
+
+    main()
+
+    build_in_container = typing.cast("mock.Mock", platforms.linux.build_in_container)
+
+    # the four containers share the job budget
+    assert build_in_container.call_count == 4
+    assert {c[1]["jobs"] for c in build_in_container.call_args_list} == {jobs_per_step}
+
+
+@pytest.mark.parametrize(
+    ("args", "env_value", "expected"),
+    [([], None, False), (["--pipeline-tests"], None, True), ([], "1", True)],
+)
+@pytest.mark.usefixtures("mock_build_container", "fake_package_dir")
+def test_pipeline_tests(
+    monkeypatch: pytest.MonkeyPatch, args: list[str], env_value: str | None, expected: bool
+) -> None:
+    monkeypatch.setattr(sys, "argv", [*sys.argv, "--platform=linux", *args])
+    if env_value is None:
+        monkeypatch.delenv("CIBW_PIPELINE_TESTS", raising=False)
+    else:
+        monkeypatch.setenv("CIBW_PIPELINE_TESTS", env_value)
+
+    main()
+
+    build_in_container = typing.cast("mock.Mock", platforms.linux.build_in_container)
+    options = build_in_container.call_args[1]["options"]
+    assert options.globals.pipeline_tests is expected
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import shlex
+import sys
+import time
+
+import pytest
+
+import cibuildwheel.post_build
+from cibuildwheel.logger import log
+from cibuildwheel.options import CommandLineArguments, Options
+from cibuildwheel.post_build import post_build_queue, submit_post_build
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from cibuildwheel.options import BuildOptions
+
+IDENTIFIER = "cp313-manylinux_x86_64"
+
+
+@pytest.fixture(autouse=True)
+def post_build_summary(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(log, "post_build_summary", [])
+
+
+def build_options(command: str) -> BuildOptions:
+    options = Options(
+        platform="linux",
+        command_line_arguments=CommandLineArguments.defaults(),
+        env={"CIBW_POST_BUILD_COMMAND": command},
+    )
+    return options.build_options(IDENTIFIER)
+
+
+def mark_command(suffix: str) -> str:
+    # writes a file next to the wheel, named after the identifier
+    script = (
+        "import os, sys; "
+        "open(sys.argv[1] + '.' + os.environ['CIBUILDWHEEL_BUILD_IDENTIFIER'] + sys.argv[2], 'w')"
+    )
+    return f"{shlex.quote(sys.executable)} -c {shlex.quote(script)} {{wheel}} {suffix}"
+
+
+@pytest.fixture
+def wheel(tmp_path: Path) -> Path:
+    wheel = tmp_path / "spam-0.1.0-cp313-cp313-manylinux_x86_64.whl"
+    wheel.write_text("wheel")
+    return wheel
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a POSIX shell")
+def test_post_build_runs_immediately(wheel: Path) -> None:
+    submit_post_build(
+        build_options=build_options(mark_command(".done")), identifier=IDENTIFIER, wheel=wheel
+    )
+
+    assert (wheel.parent / f"{wheel.name}.{IDENTIFIER}.done").exists()
+    assert [(info.identifier, info.error) for info in log.post_build_summary] == [
+        (IDENTIFIER, None)
+    ]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a POSIX shell")
+def test_post_build_queue(wheel: Path) -> None:
+    options = build_options(mark_command(".queued"))
+    failing_options = build_options("exit 3")
+
+    with post_build_queue(jobs=2):
+        submit_post_build(build_options=options, identifier=IDENTIFIER, wheel=wheel)
+        submit_post_build(build_options=failing_options, identifier="cp312", wheel=wheel)
+
+    # failures are collected for the summary, rather than stopping the queue
+    assert (wheel.parent / f"{wheel.name}.{IDENTIFIER}.queued").exists()
+    assert sorted((info.identifier, info.error) for info in log.post_build_summary) == [
+        ("cp312", "exit code 3"),
+        (IDENTIFIER, None),
+    ]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a POSIX shell")
+def test_post_build_queue_build_failure(wheel: Path) -> None:
+    slow_options = build_options(f"sleep 0.5 && {mark_command('.queued')}")
+    options = build_options(mark_command(".queued"))
+
+    def build() -> None:
+        # the second command is still queued when the build fails
+        with post_build_queue(jobs=1):
+            submit_post_build(build_options=slow_options, identifier="cp312", wheel=wheel)
+            submit_post_build(build_options=options, identifier=IDENTIFIER, wheel=wheel)
+            msg = "build failed"
+            raise RuntimeError(msg)
+
+    with pytest.raises(RuntimeError, match="build failed"):
+        build()
+
+    assert (wheel.parent / f"{wheel.name}.cp312.queued").exists()
+    assert (wheel.parent / f"{wheel.name}.{IDENTIFIER}.queued").exists()
+    assert sorted(info.identifier for info in log.post_build_summary) == ["cp312", IDENTIFIER]
+
+
+def test_post_build_queue_error(wheel: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def shell(*args: object, **kwargs: object) -> None:
+        msg = "No such file or directory: 'sh'"
+        raise OSError(msg)
+
+    monkeypatch.setattr(cibuildwheel.post_build, "shell", shell)
+    options = build_options("true")
+
+    # the error is recorded, rather than raised by the next submit
+    with post_build_queue(jobs=1):
+        submit_post_build(build_options=options, identifier="cp312", wheel=wheel)
+        time.sleep(0.1)
+        submit_post_build(build_options=options, identifier=IDENTIFIER, wheel=wheel)
+
+    assert sorted((info.identifier, info.error) for info in log.post_build_summary) == [
+        ("cp312", "No such file or directory: 'sh'"),
+        (IDENTIFIER, "No such file or directory: 'sh'"),
+    ]
+
+
+def test_post_build_skipped(wheel: Path) -> None:
+    # no command, or no wheel because the build reused a compatible one
+    submit_post_build(build_options=build_options(""), identifier=IDENTIFIER, wheel=wheel)
+    submit_post_build(build_options=build_options("exit 1"), identifier=IDENTIFIER, wheel=None)
+
+    assert log.post_build_summary == []
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import http.server
+import threading
+
+import pytest
+
+import cibuildwheel.util.file
+from cibuildwheel import errors
+from cibuildwheel.platforms import macos
+from cibuildwheel.prefetch import plan_artifacts, prefetch_artifacts
+from cibuildwheel.util.file import Artifact, fetch, prefetched_path
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Generator, Sequence
+    from pathlib import Path
+
+
+@pytest.fixture
+def server(tmp_path: Path) -> Generator[str, None, None]:
+    """Serves the files in tmp_path/"served", returning its URL."""
+    served = tmp_path / "served"
+    served.mkdir()
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    httpd = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(Handler, directory=served)
+    )
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_plan_artifacts(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    (tmp_path / "cached").touch()
+    (tmp_path / "installed").mkdir()
+    artifacts = [
+        Artifact(url="https://example.com/a", sha256=None, path=tmp_path / "a"),
+        Artifact(url="https://example.com/cached", sha256=None, path=tmp_path / "cached"),
+        Artifact(
+            url="https://example.com/b",
+            sha256=None,
+            path=tmp_path / "b",
+            installed=tmp_path / "installed",
+        ),
+        Artifact(url="https://example.com/a", sha256=None, path=tmp_path / "a"),
+    ]
+    requested: list[Sequence[str]] = []
+
+    def required_artifacts(identifiers: Sequence[str]) -> list[Artifact]:
+        requested.append(identifiers)
+        return artifacts
+
+    monkeypatch.setattr(macos, "required_artifacts", required_artifacts)
+
+    assert plan_artifacts(macos, ["cp313-macosx_arm64"]) == artifacts[:1]
+    assert requested == [["cp313-macosx_arm64"]]
+
+
+def test_plan_artifacts_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    def required_artifacts(_: Sequence[str]) -> list[Artifact]:
+        msg = "no release found"
+        raise errors.FatalError(msg)
+
+    monkeypatch.setattr(macos, "required_artifacts", required_artifacts)
+    assert plan_artifacts(macos, ["cp313-macosx_arm64"]) == []
+
+
+def test_prefetch_artifacts(
+    server: str, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    for name in ["a", "b", "c"]:
+        (tmp_path / "served" / name).write_bytes(name.encode() * 1000)
+    artifacts = [
+        Artifact(
+            url=f"{server}/{name}",
+            sha256=hashlib.sha256(name.encode() * 1000).hexdigest(),
+            path=tmp_path / "cache" / name,
+        )
+        for name in ["a", "b", "c"]
+    ]
+    missing = Artifact(url=f"{server}/missing", sha256=None, path=tmp_path / "cache" / "missing")
+
+    prefetch_artifacts([*artifacts, missing])
+
+    for name in ["a", "b", "c"]:
+        assert (tmp_path / "cache" / name).read_bytes() == name.encode() * 1000
+    assert not missing.path.exists()
+    captured = capsys.readouterr()
+    assert f"{server}/missing" in captured.err
+    assert "Prefetched 3 of 4 files" in captured.out
+
+
+def test_fetch(monkeypatch: pytest.MonkeyPatch, server: str, tmp_path: Path) -> None:
+    monkeypatch.setattr(cibuildwheel.util.file, "CIBW_CACHE_PATH", tmp_path / "cache")
+    (tmp_path / "served" / "archive.tar.gz").write_bytes(b"served")
+    url = f"{server}/archive.tar.gz"
+
+    # without a prefetched file, it's downloaded
+    fetch(url, tmp_path / "1" / "archive.tar.gz")
+    assert (tmp_path / "1" / "archive.tar.gz").read_bytes() == b"served"
+
+    # a prefetched file is used once
+    prefetched = prefetched_path(url)
+    assert prefetched.is_relative_to(tmp_path / "cache")
+    prefetched.parent.mkdir(parents=True, exist_ok=True)
+    prefetched.write_bytes(b"prefetched")
+    fetch(url, tmp_path / "2" / "archive.tar.gz")
+    assert (tmp_path / "2" / "archive.tar.gz").read_bytes() == b"prefetched"
+    assert not prefetched.exists()
+
+    # a prefetched file that doesn't match the hash is downloaded again
+    prefetched.write_bytes(b"stale")
+    fetch(url, tmp_path / "3" / "archive.tar.gz", sha256=hashlib.sha256(b"served").hexdigest())
+    assert (tmp_path / "3" / "archive.tar.gz").read_bytes() == b"served"
+    assert not prefetched.exists()
+
+
+def test_prefetched_path() -> None:
+    # files with the same name, at different URLs, don't collide
+    path = prefetched_path("https://example.com/3.13.1/python.tar.gz")
+    assert path.name.endswith("-python.tar.gz")
+    assert path != prefetched_path("https://example.com/3.13.2/python.tar.gz")
+    assert prefetched_path("https://example.com/download?version=2").name.endswith("-download")
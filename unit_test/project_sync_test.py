@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import runpy
+import shutil
+import subprocess
+from pathlib import Path, PurePath, PurePosixPath
+
+import pytest
+
+import cibuildwheel.project_sync
+from cibuildwheel.options import CommandLineArguments, Options
+from cibuildwheel.project_sync import (
+    ProjectSyncConfig,
+    build_manifest,
+    copy_project_for_build,
+    is_excluded,
+    list_project_files,
+    sync_project,
+)
+from cibuildwheel.util import resources
+
+
+@pytest.fixture(autouse=True)
+def cache_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(cibuildwheel.project_sync, "CIBW_CACHE_PATH", cache)
+    return cache
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    project = tmp_path / "project"
+    (project / "src" / "pkg").mkdir(parents=True)
+    (project / "src" / "pkg" / "__init__.py").write_text("")
+    (project / "pyproject.toml").write_text("[project]\nname = 'pkg'\n")
+    (project / "build" / "lib").mkdir(parents=True)
+    (project / "build" / "lib" / "pkg.so").write_text("binary")
+    (project / ".gitignore").write_text("build/\n")
+    return project
+
+
+@pytest.mark.parametrize(
+    ("config", "expected"),
+    [
+        ("copy", ProjectSyncConfig()),
+        ("incremental", ProjectSyncConfig(mode="incremental")),
+        (
+            "incremental; exclude: docs *.so",
+            ProjectSyncConfig(mode="incremental", exclude=("docs", "*.so")),
+        ),
+        ("mode: copy; exclude: wheelhouse", ProjectSyncConfig(exclude=("wheelhouse",))),
+    ],
+)
+def test_config(config: str, expected: ProjectSyncConfig) -> None:
+    assert ProjectSyncConfig.from_config_string(config) == expected
+
+
+def test_config_invalid() -> None:
+    with pytest.raises(ValueError, match="unknown project sync mode"):
+        ProjectSyncConfig.from_config_string("rsync")
+
+
+@pytest.mark.parametrize(
+    ("path", "patterns", "excluded"),
+    [
+        ("docs/index.md", ["docs"], True),
+        ("src/docs/index.md", ["docs"], True),
+        ("src/docs/index.md", ["/docs"], False),
+        ("src/pkg/_core.so", ["*.so"], True),
+        ("benchmarks/data/big.csv", ["benchmarks/data"], True),
+        ("benchmarks/run.py", ["benchmarks/data"], False),
+        ("src/pkg/__init__.py", [], False),
+    ],
+)
+def test_is_excluded(path: str, patterns: list[str], excluded: bool) -> None:
+    assert is_excluded(path, patterns) == excluded
+
+
+def test_list_project_files_no_git(project: Path) -> None:
+    assert list_project_files(project, ["*.so"]) == [
+        ".gitignore",
+        "pyproject.toml",
+        "src/pkg/__init__.py",
+    ]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+def test_list_project_files_git(project: Path) -> None:
+    subprocess.run(["git", "init", "-q"], cwd=project, check=True)
+
+    files = list_project_files(project)
+
+    # ignored files are left out, but not the repository itself
+    assert "build/lib/pkg.so" not in files
+    assert {".gitignore", "pyproject.toml", "src/pkg/__init__.py"} <= set(files)
+    assert ".git/HEAD" in files
+    assert ".git/HEAD" not in list_project_files(project, [".git"])
+
+
+def test_copy_project_for_build(
+    project: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (project / "wheelhouse").mkdir()
+    (project / "wheelhouse" / "old.whl").write_text("wheel")
+    (project / "link").symlink_to("pyproject.toml")
+    monkeypatch.chdir(project)
+    args = CommandLineArguments.defaults()
+    args.package_dir = project / "src"
+    args.output_dir = project / "wheelhouse"
+    options = Options(
+        platform="pyodide",
+        command_line_arguments=args,
+        env={"CIBW_PROJECT_SYNC": "copy; exclude: *.so"},
+    )
+    build_options = options.build_options("cp312-pyodide_wasm32")
+
+    copied_options = copy_project_for_build(build_options, tmp_path / "copy")
+
+    assert copied_options.package_dir == tmp_path / "copy" / "src"
+    assert copied_options.output_dir == build_options.output_dir
+    assert (tmp_path / "copy" / "src" / "pkg" / "__init__.py").exists()
+    assert (tmp_path / "copy" / "link").readlink() == Path("pyproject.toml")
+    # the output directory and excluded files are left out
+    assert not (tmp_path / "copy" / "wheelhouse").exists()
+    assert not (tmp_path / "copy" / "build" / "lib" / "pkg.so").exists()
+
+
+def test_build_manifest_reuses_hashes(project: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    paths = ["pyproject.toml", "src/pkg/__init__.py"]
+    manifest = build_manifest(project, paths)
+    assert manifest["src/pkg/__init__.py"][0] == 0
+
+    # unchanged files aren't read again
+    def fail(*args: object, **kwargs: object) -> None:
+        msg = "should use the cache"
+        raise AssertionError(msg)
+
+    monkeypatch.setattr("hashlib.file_digest", fail)
+    assert build_manifest(project, paths) == manifest
+    monkeypatch.undo()
+
+    (project / "pyproject.toml").write_text("[project]\nname = 'other'\n")
+    new_manifest = build_manifest(project, paths)
+    assert new_manifest["pyproject.toml"][2] != manifest["pyproject.toml"][2]
+    assert new_manifest["src/pkg/__init__.py"] == manifest["src/pkg/__init__.py"]
+
+
+class FakeContainer:
+    """Records what sync_project does to a container, in a local directory."""
+
+    reused = False
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.copied: list[str] = []
+
+    def _local(self, path: PurePath) -> Path:
+        return self.root / PurePosixPath(path).relative_to("/")
+
+    def exists(self, path: PurePath) -> bool:
+        return self._local(path).exists()
+
+    def file_manifest(
+        self, path: PurePath, known: dict[str, list[object]]
+    ) -> dict[str, list[object]]:
+        agent = runpy.run_path(str(resources.CONTAINER_AGENT_SCRIPT))
+        manifest: dict[str, list[object]] = agent["op_manifest"](str(self._local(path)), known)
+        return manifest
+
+    def mkdir(self, path: PurePath) -> None:
+        self._local(path).mkdir(parents=True, exist_ok=True)
+
+    def remove(self, path: PurePath) -> None:
+        local = self._local(path)
+        if local.is_dir():
+            shutil.rmtree(local)
+        else:
+            local.unlink(missing_ok=True)
+
+    def call(
+        self, args: list[str | PurePath], *, cwd: PurePath | None = None, **kwargs: object
+    ) -> str:
+        if args[0] == "cat":
+            return self._local(PurePosixPath(args[1])).read_text()
+        assert args[:2] == ["sh", "-c"]
+        assert cwd is not None
+        removed_list = self._local(PurePosixPath(str(args[2]).rsplit("< ", 1)[1]))
+        for path in removed_list.read_bytes().split(b"\0"):
+            (self._local(cwd) / path.decode()).unlink()
+        return ""
+
+    def copy_into(
+        self, from_path: Path, to_path: PurePath, *, paths: list[str] | None = None
+    ) -> None:
+        if from_path.is_file():
+            self._local(to_path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy(from_path, self._local(to_path))
+            return
+        assert paths is not None
+        for path in paths:
+            self._local(to_path / path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy(from_path / path, self._local(to_path / path))
+        self.copied.extend(paths)
+
+
+def test_sync_project_incremental(project: Path, tmp_path: Path) -> None:
+    container = FakeContainer(tmp_path / "container")
+    config = ProjectSyncConfig(mode="incremental", exclude=("build",))
+    dest = PurePosixPath("/project")
+
+    sync_project(container, project, dest, config)  # type: ignore[arg-type]
+    assert sorted(container.copied) == [".gitignore", "pyproject.toml", "src/pkg/__init__.py"]
+
+    container.copied.clear()
+    (project / "src" / "pkg" / "__init__.py").write_text("x = 1\n")
+    (project / "pyproject.toml").unlink()
+    (project / "pyproject.toml").write_text("[project]\nname = 'pkg'\n")  # same contents
+    (project / ".gitignore").unlink()
+
+    sync_project(container, project, dest, config)  # type: ignore[arg-type]
+    assert container.copied == ["src/pkg/__init__.py"]
+    synced = container.root / "project"
+    assert not (synced / ".gitignore").exists()
+    assert (synced / "src" / "pkg" / "__init__.py").read_text() == "x = 1\n"
+
+
+def test_sync_project_incremental_container_changes(project: Path, tmp_path: Path) -> None:
+    container = FakeContainer(tmp_path / "container")
+    config = ProjectSyncConfig(mode="incremental", exclude=("build",))
+    dest = PurePosixPath("/project")
+    sync_project(container, project, dest, config)  # type: ignore[arg-type]
+
+    # a build in the container edits a file, and leaves its output behind
+    synced = container.root / "project"
+    (synced / "pyproject.toml").write_text("[project]\nname = 'edited'\n")
+    (synced / "build").mkdir()
+    (synced / "build" / "pkg.so").write_text("binary")
+    (synced / "src" / "pkg" / "_ext.so").write_text("binary")
+    container.copied.clear()
+
+    sync_project(container, project, dest, config)  # type: ignore[arg-type]
+    assert container.copied == ["pyproject.toml"]
+    assert (synced / "pyproject.toml").read_text() == "[project]\nname = 'pkg'\n"
+    assert not (synced / "build" / "pkg.so").exists()
+    assert not (synced / "src" / "pkg" / "_ext.so").exists()
+
+    # nothing changed since
+    container.copied.clear()
+    sync_project(container, project, dest, config)  # type: ignore[arg-type]
+    assert container.copied == []
+
+
+def test_sync_project_copy_exclude(project: Path, tmp_path: Path) -> None:
+    container = FakeContainer(tmp_path / "container")
+    (project / "docs").mkdir()
+    (project / "docs" / "index.md").write_text("docs")
+    config = ProjectSyncConfig(mode="copy", exclude=("docs", "*.so"))
+
+    sync_project(container, project, PurePosixPath("/project"), config)  # type: ignore[arg-type]
+    assert sorted(container.copied) == [".gitignore", "pyproject.toml", "src/pkg/__init__.py"]
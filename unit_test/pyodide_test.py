@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import functools
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from cibuildwheel import errors
+from cibuildwheel.logger import log
+from cibuildwheel.options import CommandLineArguments, Options
+from cibuildwheel.platforms import pyodide
+from cibuildwheel.util.concurrency import run_in_parallel
+from cibuildwheel.util.packaging import BuiltWheels
+
+IDENTIFIERS = ["cp312-pyodide_wasm32", "cp313-pyodide_wasm32"]
+
+
+def build_concurrently(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, wheel_name: str
+) -> BuiltWheels[Path]:
+    """
+    Build IDENTIFIERS at the same time, each producing `wheel_name`, and
+    both finishing their build before either moves its wheel to the output.
+    """
+    both_built = threading.Barrier(len(IDENTIFIERS), timeout=10)
+
+    def call(*args: object, **kwargs: object) -> str:
+        if args[:2] == ("pyodide", "build"):
+            outdir = next(str(a) for a in args if str(a).startswith("--outdir="))
+            Path(outdir.removeprefix("--outdir="), wheel_name).write_text("wheel")
+            both_built.wait()
+        return ""
+
+    monkeypatch.setattr(pyodide, "setup_python", lambda **_: dict(os.environ))
+    monkeypatch.setattr(pyodide, "get_pip_version", lambda _: "24.0")
+    monkeypatch.setattr(pyodide, "call", call)
+    monkeypatch.setattr(pyodide, "run_audit", lambda **_: None)
+    monkeypatch.setattr(log, "summary", [])
+
+    args = CommandLineArguments.defaults()
+    args.output_dir = tmp_path / "wheelhouse"
+    options = Options(platform="pyodide", command_line_arguments=args, env={})
+    built_wheels = BuiltWheels[Path]()
+    run_in_parallel(
+        [
+            (
+                identifier,
+                functools.partial(
+                    pyodide._build_identifier,
+                    build_options=options.build_options(identifier),
+                    config=pyodide.PythonConfiguration(
+                        version=f"3.{identifier[3:5]}",
+                        identifier=identifier,
+                        default_pyodide_version="0.0.0",
+                        node_version="22",
+                    ),
+                    tmp_path=tmp_path,
+                    project_dir=tmp_path,
+                    built_wheels=built_wheels,
+                ),
+            )
+            for identifier in IDENTIFIERS
+        ],
+        jobs=len(IDENTIFIERS),
+    )
+    return built_wheels
+
+
+def test_concurrent_abi3_wheel(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    wheel_name = "spam-0.1-cp312-abi3-pyodide_2024_0_wasm32.whl"
+
+    built_wheels = build_concurrently(monkeypatch, tmp_path, wheel_name)
+
+    # one build's wheel is output, the other reuses it
+    assert built_wheels.wheels == [tmp_path / "wheelhouse" / wheel_name]
+    assert sorted(
+        (build.filename is not None, build.reused_wheel is not None) for build in log.summary
+    ) == [(False, True), (True, False)]
+
+
+def test_concurrent_duplicate_wheel(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    with pytest.raises(errors.AlreadyBuiltWheelError):
+        build_concurrently(monkeypatch, tmp_path, "spam-0.1-cp312-cp312-pyodide_2024_0_wasm32.whl")
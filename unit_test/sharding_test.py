@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import cibuildwheel.sharding
+from cibuildwheel import errors
+from cibuildwheel.logger import BuildInfo
+from cibuildwheel.options import CommandLineArguments, Options
+from cibuildwheel.sharding import (
+    ShardSpec,
+    identifier_groups,
+    plan_shards,
+    plan_summary,
+    read_durations,
+    record_durations,
+)
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture(autouse=True)
+def cache_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(cibuildwheel.sharding, "CIBW_CACHE_PATH", tmp_path / "cache")
+
+
+def test_shard_spec() -> None:
+    assert ShardSpec.from_string("2/3") == ShardSpec(index=2, count=3)
+    assert str(ShardSpec.from_string(" 1 / 4 ")) == "1/4"
+
+
+@pytest.mark.parametrize("shard", ["2", "0/3", "4/3", "a/b"])
+def test_shard_spec_invalid(shard: str) -> None:
+    with pytest.raises(errors.ConfigurationError):
+        ShardSpec.from_string(shard)
+
+
+def test_plan_without_durations() -> None:
+    identifiers = [f"id{i}" for i in range(7)]
+    shards = plan_shards([[i] for i in identifiers], {}, 3)
+
+    assert sorted(len(shard.identifiers) for shard in shards) == [2, 2, 3]
+    assert sorted(i for shard in shards for i in shard.identifiers) == identifiers
+    # the plan is the same every time
+    assert shards == plan_shards([[i] for i in identifiers], {}, 3)
+
+
+def test_plan_balances_durations() -> None:
+    durations = {"slow": 300.0, "a": 100.0, "b": 100.0, "c": 100.0}
+    shards = plan_shards([[i] for i in durations], durations, 2)
+
+    assert [shard.identifiers for shard in shards] == [["slow"], ["a", "b", "c"]]
+    assert [shard.estimated_duration for shard in shards] == [300.0, 300.0]
+
+
+def test_plan_keeps_groups_together() -> None:
+    groups = [["x1", "x2"], ["y1", "y2"], ["z1", "z2"], ["w1", "w2"]]
+    shards = plan_shards(groups, {}, 2)
+
+    for shard in shards:
+        assert len(shard.identifiers) == 4
+        for group in groups:
+            assert set(group) <= set(shard.identifiers) or not set(group) & set(shard.identifiers)
+
+
+def test_plan_splits_large_groups() -> None:
+    # a group that takes most of the time has to be split between shards
+    groups = [[f"x{i}" for i in range(6)], ["y"]]
+    durations = {"y": 60.0}
+    shards = plan_shards(groups, durations, 2)
+
+    assert sorted(shard.estimated_duration for shard in shards) == [180.0, 240.0]
+    assert sum(len(shard.identifiers) for shard in shards) == 7
+
+
+def test_more_shards_than_identifiers() -> None:
+    shards = plan_shards([["a"], ["b"]], {}, 3)
+    assert [shard.identifiers for shard in shards] == [["a"], ["b"], []]
+
+
+def test_record_durations(tmp_path: Path) -> None:
+    assert read_durations() == {}
+    record_durations([BuildInfo(identifier="a", filename=None, duration=12.34)])
+    record_durations([BuildInfo(identifier="b", filename=None, duration=5)])
+    assert read_durations() == {"a": 12.3, "b": 5.0}
+
+    # the output of --plan can be read back
+    plan = tmp_path / "plan.json"
+    plan.write_text(json.dumps(plan_summary(plan_shards([["a"], ["b"]], read_durations(), 2), {})))
+    assert read_durations(plan) == {}
+    plan.write_text(json.dumps(plan_summary(plan_shards([["a"]], {"a": 3}, 1), {"a": 3})))
+    assert read_durations(plan) == {"a": 3.0}
+
+    with pytest.raises(errors.ConfigurationError):
+        read_durations(tmp_path / "missing.json")
+
+
+def test_identifier_groups() -> None:
+    options = Options(
+        platform="linux",
+        command_line_arguments=CommandLineArguments.defaults(),
+        env={"CIBW_MANYLINUX_X86_64_IMAGE": "manylinux_2_28"},
+    )
+    identifiers = [
+        "cp312-manylinux_x86_64",
+        "cp313-manylinux_x86_64",
+        "cp312-musllinux_x86_64",
+        "cp312-manylinux_aarch64",
+    ]
+
+    assert identifier_groups(options=options, platform="linux", identifiers=identifiers) == [
+        ["cp312-manylinux_x86_64", "cp313-manylinux_x86_64"],
+        ["cp312-manylinux_aarch64"],
+        ["cp312-musllinux_x86_64"],
+    ]
+    assert identifier_groups(options=options, platform="macos", identifiers=identifiers[:2]) == [
+        ["cp312-manylinux_x86_64"],
+        ["cp313-manylinux_x86_64"],
+    ]
@@ -1,4 +1,5 @@
 import re
+import tarfile
 import textwrap
 from pathlib import Path, PurePath
 from unittest.mock import Mock, call
@@ -6,8 +7,14 @@
 import pytest
 
 from cibuildwheel import errors
+from cibuildwheel._compat.tarfile import validate_safe_member
 from cibuildwheel.ci import fix_ansi_codes_for_github_actions
-from cibuildwheel.util.file import copy_test_sources, remove_on_error
+from cibuildwheel.util.file import (
+    copy_test_sources,
+    directory_size,
+    move_file,
+    remove_on_error,
+)
 from cibuildwheel.util.helpers import (
     FlexibleVersion,
     format_safe,
@@ -16,7 +23,7 @@
     unwrap,
     unwrap_preserving_paragraphs,
 )
-from cibuildwheel.util.packaging import find_compatible_wheel, is_abi3_wheel
+from cibuildwheel.util.packaging import BuiltWheels, find_compatible_wheel, is_abi3_wheel
 
 
 def test_format_safe() -> None:
@@ -448,6 +455,37 @@ def _raise_cleanup_error(_: Path) -> None:
     assert caught_exception.value.exceptions == (original_exception, cleanup_exception)
 
 
+def test_move_file(tmp_path: Path) -> None:
+    src = tmp_path / "build" / "spam.whl"
+    src.parent.mkdir()
+    src.write_text("new")
+    dst = tmp_path / "wheelhouse" / "spam.whl"
+    dst.parent.mkdir()
+    dst.write_text("old")
+
+    assert move_file(src, dst) == dst.resolve()
+
+    assert dst.read_text() == "new"
+    assert not src.exists()
+    # nothing is left behind from moving the file into place
+    assert list(dst.parent.iterdir()) == [dst]
+
+
+def test_built_wheels() -> None:
+    built_wheels = BuiltWheels[PurePath]()
+    assert built_wheels.find_compatible("cp313-manylinux_x86_64") is None
+    built_wheels.wheels.append(PurePath("foo-0.1-cp38-abi3-manylinux_2_28_x86_64.whl"))
+    assert built_wheels.find_compatible("cp313-manylinux_x86_64") == built_wheels.wheels[0]
+
+
+def test_directory_size(tmp_path: Path) -> None:
+    assert directory_size(tmp_path / "missing") == 0
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "one").write_bytes(b"x" * 10)
+    (tmp_path / "a" / "b" / "two").write_bytes(b"x" * 32)
+    assert directory_size(tmp_path) == 42
+
+
 def test_unwrap() -> None:
     assert (
         unwrap("""
@@ -496,3 +534,33 @@ def test_none_any_wheel(self) -> None:
 
     def test_none_platform_wheel(self) -> None:
         assert is_abi3_wheel("foo-1.0-cp310-none-win_amd64.whl") is False
+
+
+def tar_member(name: str, type: bytes = tarfile.REGTYPE, linkname: str = "") -> tarfile.TarInfo:
+    member = tarfile.TarInfo(name)
+    member.type = type
+    member.linkname = linkname
+    return member
+
+
+def test_validate_safe_member(tmp_path: Path) -> None:
+    validate_safe_member(tar_member("src/mod.py"), tmp_path)
+    validate_safe_member(tar_member("link", tarfile.SYMTYPE, "src/mod.py"), tmp_path)
+
+
+@pytest.mark.parametrize(
+    "member",
+    [
+        tar_member("../outside"),
+        tar_member("/etc/passwd"),
+        tar_member("escape", tarfile.SYMTYPE, "../outside"),
+        tar_member("escape", tarfile.SYMTYPE, "/etc/passwd"),
+        tar_member("hardlink", tarfile.LNKTYPE, "../outside"),
+        tar_member("device", tarfile.CHRTYPE),
+        tar_member("fifo", tarfile.FIFOTYPE),
+    ],
+    ids=lambda member: f"{member.name}->{member.linkname}",
+)
+def test_validate_safe_member_unsafe(tmp_path: Path, member: tarfile.TarInfo) -> None:
+    with pytest.raises(tarfile.TarError):
+        validate_safe_member(member, tmp_path)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+import cibuildwheel.venv
+from cibuildwheel.venv import prepare_virtualenv, virtualenv
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="venvs aren't cloned on Windows")
+
+
+@pytest.fixture
+def created(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> list[Path]:
+    """Fakes virtualenv, and records the venvs that it's asked to create."""
+    created: list[Path] = []
+
+    def fake_call(*args: str | Path, **_: object) -> None:
+        venv_path = Path(args[-1])
+        created.append(venv_path)
+        (venv_path / "bin").mkdir(parents=True)
+        (venv_path / "pyvenv.cfg").write_text(f"home = {Path(args[-2]).parent}\n")
+        (venv_path / "bin" / "pip").write_text(f"#!{venv_path}/bin/python\nimport pip\n")
+        (venv_path / "bin" / "python").symlink_to(args[-2])
+
+    monkeypatch.setattr(cibuildwheel.venv, "CIBW_CACHE_PATH", tmp_path / "cache")
+    monkeypatch.setattr(cibuildwheel.venv, "call", fake_call)
+    monkeypatch.setattr(
+        cibuildwheel.venv,
+        "_ensure_virtualenv",
+        lambda _: (tmp_path / "virtualenv.pyz", Version("21.0")),
+    )
+    return created
+
+
+def test_virtualenv_is_cloned(created: list[Path], tmp_path: Path) -> None:
+    python = Path(sys.executable).resolve()
+    for name in ["venv1", "venv2"]:
+        env = virtualenv("3.12", python, tmp_path / name, None, use_uv=False, pip_version="24.0")
+        assert env["VIRTUAL_ENV"] == str(tmp_path / name)
+
+    # the template is created once, then copied for each venv
+    assert len(created) == 1
+    assert created[0].is_relative_to(tmp_path / "cache" / "venv-templates")
+    for name in ["venv1", "venv2"]:
+        venv_path = tmp_path / name
+        assert (venv_path / "bin" / "pip").read_text() == f"#!{venv_path}/bin/python\nimport pip\n"
+        assert (venv_path / "bin" / "python").readlink() == python
+        assert (venv_path / "pyvenv.cfg").read_text() == f"home = {python.parent}\n"
+
+    # the template isn't modified by the venvs made from it
+    (tmp_path / "venv1" / "bin" / "pip").write_text("changed")
+    virtualenv("3.12", python, tmp_path / "venv3", None, use_uv=False, pip_version="24.0")
+    assert (tmp_path / "venv3" / "bin" / "pip").read_text().startswith("#!")
+
+
+def test_virtualenv_template_key(created: list[Path], tmp_path: Path) -> None:
+    python = Path(sys.executable).resolve()
+    virtualenv("3.12", python, tmp_path / "venv1", None, use_uv=False, pip_version="24.0")
+    virtualenv("3.12", python, tmp_path / "venv2", None, use_uv=False, pip_version="25.0")
+    assert len(created) == 2
+
+    # a template left by an interrupted run isn't used
+    (created[1].with_name(f"{created[1].name}.ready")).unlink()
+    (created[1] / "bin" / "pip").unlink()
+    virtualenv("3.12", python, tmp_path / "venv3", None, use_uv=False, pip_version="25.0")
+    assert created[2] == created[1]
+    assert (tmp_path / "venv3" / "bin" / "pip").exists()
+
+
+def test_prepare_virtualenv(created: list[Path], tmp_path: Path) -> None:
+    python = Path(sys.executable).resolve()
+    prepare_virtualenv("3.12", python, None, use_uv=False, pip_version="24.0")
+    assert len(created) == 1
+
+    virtualenv("3.12", python, tmp_path / "venv", None, use_uv=False, pip_version="24.0")
+    assert len(created) == 1
+    assert (tmp_path / "venv" / "bin" / "pip").exists()
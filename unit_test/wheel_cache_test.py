@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import http.server
+import os
+import threading
+
+import pytest
+
+import cibuildwheel.wheel_cache
+from cibuildwheel.logger import BuildInfo
+from cibuildwheel.wheel_cache import (
+    HTTPWheelStore,
+    LocalWheelStore,
+    WheelCache,
+    WheelCacheConfig,
+    WheelCacheStats,
+    describe_wheel_cache,
+    parse_size,
+    read_stats,
+)
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from pathlib import Path
+
+FINGERPRINTS = {"cp312-manylinux_x86_64": "a" * 64, "cp313-manylinux_x86_64": "b" * 64}
+
+
+@pytest.fixture(autouse=True)
+def cache_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(cibuildwheel.wheel_cache, "CIBW_CACHE_PATH", tmp_path / "cache")
+
+
+def make_wheel(directory: Path, identifier: str, contents: str = "wheel") -> Path:
+    wheel = directory / f"spam-0.1-{identifier.replace('-', '-none-')}.whl"
+    wheel.parent.mkdir(parents=True, exist_ok=True)
+    wheel.write_text(contents)
+    return wheel
+
+
+@pytest.mark.parametrize(
+    ("size", "expected"),
+    [
+        ("100", 100),
+        ("2K", 2048),
+        ("1.5M", 3 * 512 * 1024),
+        ("5GB", 5 * 1024**3),
+        ("1 GiB", 1024**3),
+    ],
+)
+def test_parse_size(size: str, expected: int) -> None:
+    assert parse_size(size) == expected
+
+
+def test_parse_size_invalid() -> None:
+    with pytest.raises(ValueError, match="invalid size"):
+        parse_size("lots")
+
+
+def test_config() -> None:
+    assert WheelCacheConfig.from_config_string("") is None
+    assert WheelCacheConfig.from_config_string("/mnt/cache") == WheelCacheConfig(
+        location="/mnt/cache"
+    )
+    config = WheelCacheConfig.from_config_string("location: /mnt/cache; max-size: 1G")
+    assert config == WheelCacheConfig(location="/mnt/cache", max_size=1024**3)
+    assert not config.is_remote
+    remote = WheelCacheConfig.from_config_string("https://cache.example.com/wheels; max-size: 1K")
+    assert remote == WheelCacheConfig(location="https://cache.example.com/wheels", max_size=1024)
+    assert remote.is_remote
+
+
+@pytest.mark.parametrize(
+    ("config_string", "expected"),
+    [
+        ("C:\\cache", WheelCacheConfig(location="C:\\cache")),
+        ("D:/wheels", WheelCacheConfig(location="D:/wheels")),
+        (
+            "d:\\wheel cache; max-size: 2M",
+            WheelCacheConfig(location="d:\\wheel cache", max_size=2 * 1024**2),
+        ),
+        (
+            "location: C:/cache; max-size: 1K",
+            WheelCacheConfig(location="C:/cache", max_size=1024),
+        ),
+    ],
+)
+def test_config_windows_path(config_string: str, expected: WheelCacheConfig) -> None:
+    config = WheelCacheConfig.from_config_string(config_string)
+    assert config == expected
+    assert config is not None
+    assert not config.is_remote
+
+
+def test_local_store(tmp_path: Path) -> None:
+    store = LocalWheelStore(tmp_path / "store")
+    wheel = make_wheel(tmp_path / "built", "cp312-manylinux_x86_64")
+
+    assert store.get("a" * 64, tmp_path / "out") is None
+    store.put("a" * 64, wheel)
+    restored = store.get("a" * 64, tmp_path / "out")
+
+    assert restored == tmp_path / "out" / wheel.name
+    assert restored.read_text() == "wheel"
+    assert store.describe() == "1 wheels, 5 Bytes"
+
+
+def test_local_store_evicts_least_recently_used(tmp_path: Path) -> None:
+    store = LocalWheelStore(tmp_path / "store", max_size=10)
+    for fingerprint, age in [("a" * 64, 300), ("b" * 64, 200)]:
+        store.put(fingerprint, make_wheel(tmp_path / fingerprint, "cp312-manylinux_x86_64"))
+        (wheel,) = (tmp_path / "store" / "wheels" / fingerprint[:2] / fingerprint).glob("*.whl")
+        os.utime(wheel, (wheel.stat().st_atime - age, wheel.stat().st_mtime - age))
+
+    # using the oldest entry makes it the most recently used
+    assert store.get("a" * 64, tmp_path / "out") is not None
+    store.put("c" * 64, make_wheel(tmp_path / "c", "cp312-manylinux_x86_64"))
+
+    assert store.get("b" * 64, tmp_path / "out") is None
+    assert store.get("a" * 64, tmp_path / "out") is not None
+    assert store.get("c" * 64, tmp_path / "out") is not None
+
+
+class StoreHandler(http.server.BaseHTTPRequestHandler):
+    files: dict[str, bytes]
+    # paths whose responses are cut short
+    truncated: set[str]
+
+    def do_GET(self) -> None:
+        contents = self.files.get(self.path)
+        if contents is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        missing = 10 if self.path in self.truncated else 0
+        self.send_header("Content-Length", str(len(contents) + missing))
+        self.end_headers()
+        self.wfile.write(contents)
+
+    def do_PUT(self) -> None:
+        self.files[self.path] = self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def http_store() -> Generator[tuple[str, dict[str, bytes], set[str]], None, None]:
+    files: dict[str, bytes] = {}
+    truncated: set[str] = set()
+    handler = type("Handler", (StoreHandler,), {"files": files, "truncated": truncated})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/wheels", files, truncated
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_http_store(http_store: tuple[str, dict[str, bytes], set[str]], tmp_path: Path) -> None:
+    url, files, _ = http_store
+    store = HTTPWheelStore(url)
+    wheel = make_wheel(tmp_path / "built", "cp312-manylinux_x86_64")
+
+    assert store.get("a" * 64, tmp_path / "out") is None
+    store.put("a" * 64, wheel)
+    assert sorted(files) == [f"/wheels/{'a' * 64}.json", f"/wheels/{'a' * 64}/{wheel.name}"]
+
+    restored = store.get("a" * 64, tmp_path / "out")
+    assert restored == tmp_path / "out" / wheel.name
+    assert restored.read_text() == "wheel"
+
+    # a corrupted download is a miss
+    files[f"/wheels/{'a' * 64}/{wheel.name}"] = b"garbage"
+    assert store.get("a" * 64, tmp_path / "other") is None
+
+    # so is an index that isn't what the cache writes
+    for index in [b"[]", b'"x"', b"null", b'{"wheel": 1, "sha256": null}']:
+        files[f"/wheels/{'a' * 64}.json"] = index
+        assert store.get("a" * 64, tmp_path / "other") is None
+
+
+def test_wheel_cache_http_errors(
+    http_store: tuple[str, dict[str, bytes], set[str]],
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    url, _, truncated = http_store
+    identifier = next(iter(FINGERPRINTS))
+    HTTPWheelStore(url).put(FINGERPRINTS[identifier], make_wheel(tmp_path / "built", identifier))
+    truncated.add(f"/wheels/{FINGERPRINTS[identifier]}.json")
+
+    # a flaky server is a miss, rather than an error
+    cache = WheelCache(WheelCacheConfig(location=url), FINGERPRINTS)
+    assert cache.restore([identifier], tmp_path / "out") == {}
+    assert cache.stats == WheelCacheStats(misses=1)
+    assert "Failed to read from the wheel cache" in capsys.readouterr().err
+
+
+def test_wheel_cache(tmp_path: Path) -> None:
+    config = WheelCacheConfig(location=str(tmp_path / "store"))
+    identifiers = list(FINGERPRINTS)
+
+    # the first job builds the wheels, the second one fails
+    first = WheelCache(config, FINGERPRINTS)
+    assert first.restore(identifiers, tmp_path / "first") == {}
+    first.save(
+        [
+            BuildInfo(
+                identifier=identifiers[0],
+                filename=make_wheel(tmp_path / "first", identifiers[0]),
+                duration=1,
+            ),
+            BuildInfo(identifier=identifiers[1], filename=None, duration=1),
+        ]
+    )
+    first.finish()
+
+    second = WheelCache(config, FINGERPRINTS)
+    restored = second.restore(identifiers, tmp_path / "second")
+    second.finish()
+
+    assert list(restored) == [identifiers[0]]
+    assert restored[identifiers[0]].parent == tmp_path / "second"
+    assert second.stats == WheelCacheStats(hits=1, misses=1, bytes_saved=5)
+    assert read_stats(config.location) == WheelCacheStats(hits=1, misses=3, bytes_saved=5)
+    assert "1 hits, 3 misses" in describe_wheel_cache(config)
@@ -1,7 +1,9 @@
+import threading
 from pathlib import Path
 
 import pytest
 
+from cibuildwheel.errors import PostBuildCommandError
 from cibuildwheel.logger import BuildInfo, Logger
 from cibuildwheel.options import CommandLineArguments, Options
 
@@ -32,6 +34,25 @@ def test_printout_wheels(capsys: pytest.CaptureFixture[str]) -> None:
     assert "SHA256=" in captured.out
 
 
+def test_printout_compiler_cache(capsys: pytest.CaptureFixture[str]) -> None:
+    log = Logger()
+    log.fold_mode = "disabled"
+    log.colors_enabled = False
+
+    with log.print_summary(options=OPTIONS_DEFAULTS):
+        log.summary = [
+            BuildInfo(
+                identifier="id1",
+                filename=FILE,
+                duration=2,
+                compiler_cache="3 hits, 1 misses (75% hit rate)",
+            ),
+        ]
+
+    captured = capsys.readouterr()
+    assert "compiler cache: 3 hits, 1 misses (75% hit rate)" in captured.out
+
+
 def test_no_printout_on_error(capsys: pytest.CaptureFixture[str]) -> None:
     log = Logger()
     with pytest.raises(RuntimeError), log.print_summary(options=OPTIONS_DEFAULTS):
@@ -40,3 +61,45 @@ def test_no_printout_on_error(capsys: pytest.CaptureFixture[str]) -> None:
     captured = capsys.readouterr()
     assert captured.err == ""
     assert captured.out == ""
+
+
+def test_build_handoff() -> None:
+    log = Logger()
+    log.build_start("cp313-manylinux_x86_64")
+    build = log.handoff_build()
+
+    def finish() -> None:
+        log.resume_build(build)
+        log.build_end(None)
+
+    # the build is finished by another thread, but keeps its identifier
+    thread = threading.Thread(target=finish)
+    thread.start()
+    thread.join()
+
+    assert [b.identifier for b in log.summary] == ["cp313-manylinux_x86_64"]
+
+
+def test_printout_post_build(capsys: pytest.CaptureFixture[str]) -> None:
+    log = Logger()
+    log.fold_mode = "disabled"
+    log.colors_enabled = False
+
+    def summarize() -> None:
+        with log.print_summary(options=OPTIONS_DEFAULTS):
+            log.summary = [
+                BuildInfo(identifier="id1", filename=FILE, duration=2),
+                BuildInfo(identifier="id2", filename=FILE, duration=2),
+            ]
+            log.post_build_end(identifier="id1", wheel=FILE, duration=1)
+            log.post_build_end(identifier="id2", wheel=FILE, duration=1, error="exit code 1")
+
+    # failures are reported once the summary has been printed
+    with pytest.raises(PostBuildCommandError, match="post-build-command failed for id2"):
+        summarize()
+
+    captured = capsys.readouterr()
+    assert "post-build-command for id2 failed (exit code 1)" in captured.out
+    assert "post-build-command ran on 2 wheels, 1 failed" in captured.out
+    assert f"id2: {FILE.name} failed in" in captured.out
+    assert log.post_build_summary == []